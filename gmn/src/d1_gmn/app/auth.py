@@ -33,6 +33,7 @@ import django.db.models
 
 import d1_gmn.app.models
 import d1_gmn.app.node_registry
+import d1_gmn.app.request_cache
 
 # Actions have a relationship where each action implicitly includes the actions
 # of lower levels. The relationship is as follows:
@@ -105,10 +106,21 @@ def get_trusted_subjects_string():
 
 
 def is_trusted_subject(request):
-    """Determine if calling subject is fully trusted."""
+    """Determine if calling subject is fully trusted.
+
+    The result is memoized for the request.
+
+    """
+    return d1_gmn.app.request_cache.get_or_set(
+        request, ("is_trusted_subject",), lambda: _is_trusted_subject(request)
+    )
+
+
+def _is_trusted_subject(request):
+    trusted_subject_set = get_trusted_subjects()
     logging.debug("Session subjects: {}".format(", ".join(request.all_subjects_set)))
-    logging.debug("Trusted subjects: {}".format(", ".join(get_trusted_subjects())))
-    return not request.all_subjects_set.isdisjoint(get_trusted_subjects())
+    logging.debug("Trusted subjects: {}".format(", ".join(trusted_subject_set)))
+    return not request.all_subjects_set.isdisjoint(trusted_subject_set)
 
 
 def is_client_side_cert_subject(request):
@@ -184,11 +196,8 @@ def is_allowed(request, level, pid):
     """
     if is_trusted_subject(request):
         return True
-    return d1_gmn.app.models.Permission.objects.filter(
-        sciobj__pid__did=pid,
-        subject__subject__in=request.all_subjects_set,
-        level__gte=level,
-    ).exists()
+    max_level = d1_gmn.app.request_cache.get_permission_level(request, pid)
+    return max_level is not None and max_level >= level
 
 
 def has_create_update_delete_permission(request):
@@ -227,7 +236,7 @@ def assert_allowed(request, level, pid):
     object does not exist.
 
     """
-    if not d1_gmn.app.models.ScienceObject.objects.filter(pid__did=pid).exists():
+    if d1_gmn.app.request_cache.get_sciobj(request, pid) is None:
         raise d1_common.types.exceptions.NotFound(
             0,
             'Attempted to perform operation on non-existing object. pid="{}"'.format(
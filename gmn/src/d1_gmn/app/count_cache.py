@@ -0,0 +1,173 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cache the total number of items in the filtered result sets returned by
+MNRead.listObjects() and MNCore.getLogRecords().
+
+Every slice of a result set includes the total number of items in the complete result
+set. Counting the items requires a full scan of the filtered result set, which dominates
+the cost of retrieving each slice from large tables. Since the total rarely changes
+while a client pages through a result set, the count is cached in the Django cache.
+
+The cache key is created from the API version, the filters in the query parameters and
+the authenticated subjects, together with a generation number for each result set
+type. The generation is advanced whenever SciObjs or Event Log records are created,
+updated or deleted, which invalidates all cached counts for the type in the current
+process. Other processes see the new count when their cache entry expires, after
+settings.COUNT_CACHE_TIMEOUT seconds.
+
+If settings.COUNT_ESTIMATE is True, unfiltered queries from trusted subjects use the
+row count estimate that Postgres maintains for the table instead of counting the rows.
+
+"""
+import hashlib
+import logging
+import time
+
+import d1_common.url
+import d1_common.util
+
+import django.conf
+import django.core.cache
+import django.db
+import django.db.transaction
+
+import d1_gmn.app.auth
+
+# Result set types for which totals are cached.
+TYPE_NAME_LIST = ["object_list", "log"]
+
+# Query parameters that select the position and size of the slice and do not affect
+# the total.
+SLICE_PARAM_LIST = ["start", "count", "resumptionToken"]
+
+logger = logging.getLogger(__name__)
+
+
+def get_total(request, query, type_name):
+    """Get the total number of items in the filtered ``query``.
+
+    Args:
+        request: HttpRequest
+            The request for which ``query`` was created.
+
+        query: QuerySet
+            Fully filtered, unsliced query.
+
+        type_name: str
+            Result set type. One of TYPE_NAME_LIST.
+
+    """
+    if django.conf.settings.COUNT_ESTIMATE and _is_unfiltered(request):
+        estimate_int = _get_estimate(query.model)
+        if estimate_int is not None:
+            return estimate_int
+    if not django.conf.settings.COUNT_CACHE_TIMEOUT:
+        return query.count()
+    key_str = _gen_cache_key(request, type_name)
+    total_int = django.core.cache.cache.get(key_str)
+    if total_int is None:
+        total_int = query.count()
+        django.core.cache.cache.set(
+            key_str, total_int, django.conf.settings.COUNT_CACHE_TIMEOUT
+        )
+    logger.debug('Total. key="{}" total={}'.format(key_str, total_int))
+    return total_int
+
+
+def invalidate(*type_name_list):
+    """Invalidate cached totals for the given result set types, or for all types if
+    none are given.
+
+    The totals are invalidated immediately, and again when the current transaction
+    is committed. This prevents totals that are counted by concurrent requests before
+    the changes become visible from remaining in the cache.
+
+    """
+    type_name_list = type_name_list or TYPE_NAME_LIST
+    _advance_generation(type_name_list)
+    django.db.transaction.on_commit(lambda: _advance_generation(type_name_list))
+
+
+# Private
+
+
+def _is_unfiltered(request):
+    """Return True if ``request`` is from a trusted subject and has no filters, so that
+    the total is the number of rows in the table."""
+    return d1_gmn.app.auth.is_trusted_subject(request) and not (
+        set(request.GET.keys()) - set(SLICE_PARAM_LIST)
+    )
+
+
+def _get_estimate(model):
+    """Get the Postgres estimate for the number of rows in the table for ``model``.
+
+    Return None if an estimate is not available, which is the case if the table has
+    not yet been analyzed by VACUUM or ANALYZE.
+
+    """
+    if django.db.connection.vendor != "postgresql":
+        return None
+    with django.db.connection.cursor() as cursor:
+        cursor.execute(
+            "select reltuples::bigint from pg_class where oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] <= 0:
+        return None
+    return row[0]
+
+
+def _gen_cache_key(request, type_name):
+    url_dict = d1_common.url.parseUrl(request.get_full_path())
+    for param_name in SLICE_PARAM_LIST:
+        url_dict["query"].pop(param_name, None)
+    key_json = d1_common.util.serialize_to_normalized_compact_json(
+        {
+            "type": type_name,
+            "generation": _get_generation(type_name),
+            "url_dict": url_dict,
+            "subject": list(sorted(request.all_subjects_set)),
+        }
+    )
+    return "count_{}".format(hashlib.sha256(key_json.encode("utf-8")).hexdigest())
+
+
+def _get_generation(type_name):
+    generation_key_str = _gen_generation_key(type_name)
+    generation_int = django.core.cache.cache.get(generation_key_str)
+    if generation_int is None:
+        # Start from a value that cannot match any earlier generation, in case a
+        # previous generation was culled from the cache.
+        generation_int = time.time_ns()
+        django.core.cache.cache.add(generation_key_str, generation_int, None)
+    return generation_int
+
+
+def _advance_generation(type_name_list):
+    for type_name in type_name_list:
+        generation_key_str = _gen_generation_key(type_name)
+        try:
+            django.core.cache.cache.incr(generation_key_str)
+        except ValueError:
+            django.core.cache.cache.set(generation_key_str, time.time_ns(), None)
+
+
+def _gen_generation_key(type_name):
+    return "count_generation_{}".format(type_name)
@@ -50,10 +50,14 @@ def add_access_policy_filter(request, query, column_name):
     Since ``read`` is the lowest access level that a subject can have, this method only
     has to filter on the presence of the subject.
 
+    The session subjects are resolved to subject IDs up front, so that the filter is a
+    semi-join on the covering (subject, sciobj, level) index of the Permission table,
+    which the database can resolve with an index-only scan.
+
     """
-    q = d1_gmn.app.models.Subject.objects.filter(
-        subject__in=request.all_subjects_set
-    ).values("permission__sciobj")
+    q = d1_gmn.app.models.Permission.objects.filter(
+        subject_id__in=_get_subject_id_list(request)
+    ).values("sciobj_id")
     filter_arg = "{}__in".format(column_name)
     return query.filter(**{filter_arg: q})
 
@@ -74,7 +78,7 @@ def add_redact_annotation(request, query):
             django.db.models.expressions.Exists(
                 d1_gmn.app.models.Permission.objects.filter(
                     sciobj=django.db.models.OuterRef("sciobj"),
-                    subject__subject__in=request.all_subjects_set,
+                    subject_id__in=_get_subject_id_list(request),
                     level__gte=d1_gmn.app.auth.WRITE_LEVEL,
                 )
             )
@@ -145,3 +149,16 @@ def add_sid_or_string_begins_with_filter(request, query, column_name, param_name
         return d1_gmn.app.db_filter.add_string_begins_with_filter(
             request, query, column_name, param_name
         )
+
+
+def _get_subject_id_list(request):
+    """Get the IDs of the session subjects that are known to this MN.
+
+    Subjects that are unknown to this MN hold no permissions, so they are dropped.
+
+    """
+    return list(
+        d1_gmn.app.models.Subject.objects.filter(
+            subject__in=request.all_subjects_set
+        ).values_list("id", flat=True)
+    )
@@ -17,15 +17,22 @@
 # limitations under the License.
 """Delete science objects and metadata."""
 
+import logging
 import urllib.parse
 
 import django.apps
+import django.db.transaction
 
+import d1_gmn.app.count_cache
 import d1_gmn.app.did
 import d1_gmn.app.model_util
 import d1_gmn.app.models
 import d1_gmn.app.revision
 import d1_gmn.app.sciobj_store
+import d1_gmn.app.sid_cache
+import d1_gmn.app.sysmeta_cache
+
+logger = logging.getLogger(__name__)
 
 
 def delete_sciobj(pid):
@@ -51,14 +58,67 @@ def delete_all_from_db():
     # be deleted in any order without breaking constraints.
     for model in django.apps.apps.get_models():
         model.objects.all().delete()
+    d1_gmn.app.count_cache.invalidate()
+    d1_gmn.app.sysmeta_cache.clear()
+    d1_gmn.app.sid_cache.clear()
 
 
 def delete_sciobj_from_database(pid):
     sciobj_model = d1_gmn.app.model_util.get_sci_model(pid)
+    subject_id_set = _delete_sciobj_records(sciobj_model)
+    d1_gmn.app.model_util.delete_unused_subjects(subject_id_set)
+    d1_gmn.app.count_cache.invalidate()
+    d1_gmn.app.sysmeta_cache.invalidate(pid)
+
+
+def delete_sciobj_bulk(pid_list):
+    """Delete a batch of objects in a single transaction.
+
+    The checks for unused subjects and the invalidation of the object count cache are
+    done once for the batch instead of once per object. The object bytes are deleted
+    only after the database transaction has been committed, so that a failed batch
+    leaves all the objects in the batch intact. At that point, the objects are already
+    gone from the database, so errors raised when deleting the bytes of an object are
+    logged, and deletion continues with the next object.
+
+    Returns:
+        list of str: The PIDs of the deleted objects.
+
+    """
+    url_split_list = []
+    subject_id_set = set()
+    with django.db.transaction.atomic():
+        for pid in pid_list:
+            sciobj_model = d1_gmn.app.model_util.get_sci_model(pid)
+            url_split_list.append((urllib.parse.urlparse(sciobj_model.url), pid))
+            subject_id_set |= _delete_sciobj_records(sciobj_model)
+        d1_gmn.app.model_util.delete_unused_subjects(subject_id_set)
+    d1_gmn.app.count_cache.invalidate()
+    for url_split, pid in url_split_list:
+        d1_gmn.app.sysmeta_cache.invalidate(pid)
+        try:
+            d1_gmn.app.sciobj_store.delete_sciobj(url_split, pid)
+        except Exception:
+            logger.exception(
+                'Unable to delete SciObj bytes from the store. pid="{}"'.format(pid)
+            )
+    return [pid for _, pid in url_split_list]
+
+
+def _delete_sciobj_records(sciobj_model):
+    """Delete the database records for an object.
+
+    Returns:
+        set of int: The database IDs of the subjects that were referenced by the
+        deleted object and may now be unused.
+
+    """
+    pid = sciobj_model.pid.did
+    subject_id_set = d1_gmn.app.model_util.get_sciobj_subject_id_set(sciobj_model)
     if d1_gmn.app.did.is_in_revision_chain(sciobj_model):
         d1_gmn.app.revision.cut_from_chain(sciobj_model)
     d1_gmn.app.revision.delete_chain(pid)
     # The models.CASCADE property is set on all ForeignKey fields, so most object
     # related info is deleted when deleting the IdNamespace "root".
     d1_gmn.app.models.IdNamespace.objects.filter(did=pid).delete()
-    d1_gmn.app.model_util.delete_unused_subjects()
+    return subject_id_set
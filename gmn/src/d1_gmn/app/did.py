@@ -27,8 +27,13 @@ import d1_gmn.app.models
 import d1_gmn.app.proxy
 import d1_gmn.app.resource_map
 import d1_gmn.app.revision
+import d1_gmn.app.sid_cache
 import d1_gmn.app.views
 
+# Max number of DIDs in each IN clause or bulk insert, to stay well below the limits on
+# the number of parameters in a single query.
+DID_QUERY_CHUNK_SIZE = 1000
+
 logger = logging.getLogger(__name__)
 
 
@@ -119,15 +124,15 @@ def resolve_sid_v2(did):
 
     If the DID is a valid PID, return it. If not, try to resolve it as a SID and, if
     successful, return the new PID. Else, raise NotFound exception.
+
+    The resolution is cached. See d1_gmn.app.sid_cache.
     """
-    if is_existing_object(did):
-        return did
-    elif is_sid(did):
-        return d1_gmn.app.revision.resolve_sid(did)
-    else:
+    pid = d1_gmn.app.sid_cache.resolve(did)
+    if pid is None:
         raise d1_common.types.exceptions.NotFound(
             0, 'Unknown identifier. id="{}"'.format(did), identifier=did
         )
+    return pid
 
 
 def get_did_by_foreign_key(did_foreign_key):
@@ -214,6 +219,51 @@ def get_or_create_did(id_str):
     return d1_gmn.app.models.IdNamespace.objects.get_or_create(did=id_str)[0]
 
 
+def get_or_create_did_bulk(did_list):
+    """Get or create the IdNamespace models for multiple DIDs with a bounded number of
+    queries.
+
+    Returns:
+        dict: DID -> IdNamespace model
+
+    """
+    did_list = list(dict.fromkeys(did_list))
+    did_dict = {}
+    for did_chunk in _iter_chunks(did_list):
+        did_dict.update(
+            {
+                m.did: m
+                for m in d1_gmn.app.models.IdNamespace.objects.filter(did__in=did_chunk)
+            }
+        )
+    new_did_list = [
+        d1_gmn.app.models.IdNamespace(did=did)
+        for did in did_list
+        if did not in did_dict
+    ]
+    d1_gmn.app.models.IdNamespace.objects.bulk_create(
+        new_did_list, batch_size=DID_QUERY_CHUNK_SIZE
+    )
+    did_dict.update({m.did: m for m in new_did_list})
+    return did_dict
+
+
+def get_existing_object_pid_set(pid_list):
+    """Return the PIDs in ``pid_list`` that are for objects for which sysmeta exists.
+
+    Like is_existing_object(), for multiple PIDs with a bounded number of queries.
+
+    """
+    existing_pid_set = set()
+    for pid_chunk in _iter_chunks(list(pid_list)):
+        existing_pid_set.update(
+            d1_gmn.app.models.ScienceObject.objects.filter(
+                pid__did__in=pid_chunk
+            ).values_list("pid__did", flat=True)
+        )
+    return existing_pid_set
+
+
 def is_in_revision_chain(sciobj_model):
     return bool(sciobj_model.obsoleted_by or sciobj_model.obsoletes)
 
@@ -287,3 +337,8 @@ def _is_pid(did):
 
     """
     return is_did(did) and not is_sid(did)
+
+
+def _iter_chunks(item_list):
+    for i in range(0, len(item_list), DID_QUERY_CHUNK_SIZE):
+        yield item_list[i : i + DID_QUERY_CHUNK_SIZE]
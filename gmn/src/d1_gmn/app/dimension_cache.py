@@ -0,0 +1,93 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""In-process cache of the ids of rows in the tables that hold unique strings, such as
+Subject and Node.
+
+Rows in these tables are referenced by foreign keys from the main tables and are never
+modified. Resolving the strings through the cache removes the ``get_or_create()`` round
+trip to the database for strings that have been seen recently, which dominates the cost
+of writing large numbers of rows.
+
+The cached ids are only valid if the transaction in which the rows were created is
+committed. Clear the cache if the transaction is rolled back.
+
+"""
+import collections
+
+
+class DimensionIdCache(object):
+    """LRU cache of ids for rows in tables holding unique strings, such as Subject."""
+
+    def __init__(self, max_size):
+        self._max_size = max_size
+        self._id_dict = collections.OrderedDict()
+
+    def get_id(self, model_func, value_str):
+        """Get the id of the row for ``value_str``, calling ``model_func(value_str)`` to
+        get or create the row if the id is not cached."""
+        key_tup = model_func.__name__, value_str
+        try:
+            self._id_dict.move_to_end(key_tup)
+            return self._id_dict[key_tup]
+        except KeyError:
+            pass
+        row_id = model_func(value_str).id
+        self._id_dict[key_tup] = row_id
+        if len(self._id_dict) > self._max_size:
+            self._id_dict.popitem(last=False)
+        return row_id
+
+    def prefetch(self, model_func, model_class, field_str, value_iter):
+        """Resolve the ids for multiple strings with a fixed number of queries.
+
+        Rows are created for strings that are not in the table. The ids are then
+        returned by get_id() for the same ``model_func`` without further queries.
+
+        Args:
+            model_func: Function that gets or creates a row. See get_id().
+            model_class: The model for the table.
+            field_str: The name of the field holding the strings.
+            value_iter: The strings.
+
+        """
+        name_str = model_func.__name__
+        value_set = {v for v in value_iter if (name_str, v) not in self._id_dict}
+        if not value_set:
+            return
+        id_dict = self._get_id_dict(model_class, field_str, value_set)
+        new_value_set = value_set - set(id_dict)
+        if new_value_set:
+            model_class.objects.bulk_create(
+                [model_class(**{field_str: v}) for v in new_value_set],
+                ignore_conflicts=True,
+            )
+            id_dict.update(self._get_id_dict(model_class, field_str, new_value_set))
+        for value_str, row_id in id_dict.items():
+            self._id_dict[(name_str, value_str)] = row_id
+        while len(self._id_dict) > self._max_size:
+            self._id_dict.popitem(last=False)
+
+    def clear(self):
+        self._id_dict.clear()
+
+    def _get_id_dict(self, model_class, field_str, value_set):
+        return dict(
+            model_class.objects.filter(
+                **{"{}__in".format(field_str): value_set}
+            ).values_list(field_str, "id")
+        )
@@ -20,6 +20,9 @@
 The Event Log is a log of all operations performed on SciObjs. It is retrieved with
 MNCore.getLogRecords() and aggregated by CNs.
 
+Depending on the EVENT_LOG_WRITE_MODE setting, read events are either written
+immediately or passed to the batched writer in event_log_writer.
+
 """
 import re
 
@@ -28,7 +31,10 @@ import d1_common.types.exceptions
 import django.conf
 
 import d1_gmn.app.auth
+import d1_gmn.app.count_cache
+import d1_gmn.app.event_log_writer
 import d1_gmn.app.models
+import d1_gmn.app.request_cache
 
 
 def create_log_entry(object_model, event, ip_address, user_agent, subject):
@@ -39,6 +45,7 @@ def create_log_entry(object_model, event, ip_address, user_agent, subject):
     event_log_model.user_agent = d1_gmn.app.models.user_agent(user_agent)
     event_log_model.subject = d1_gmn.app.models.subject(subject)
     event_log_model.save()
+    d1_gmn.app.count_cache.invalidate("log")
     return event_log_model
 
 
@@ -80,11 +87,8 @@ def _log(pid, request, event, timestamp=None):
     # Support logging events that are not associated with an object.
     sciobj_model = None
     if pid is not None:
-        try:
-            sciobj_model = d1_gmn.app.models.ScienceObject.objects.filter(pid__did=pid)[
-                0
-            ]
-        except IndexError:
+        sciobj_model = d1_gmn.app.request_cache.get_sciobj(request, pid)
+        if sciobj_model is None:
             raise d1_common.types.exceptions.ServiceFailure(
                 0,
                 'Attempted to create event log for non-existing object. pid="{}"'.format(
@@ -92,6 +96,17 @@ def _log(pid, request, event, timestamp=None):
                 ),
             )
 
+    if sciobj_model is not None and d1_gmn.app.event_log_writer.is_batched(event):
+        d1_gmn.app.event_log_writer.add(
+            sciobj_model.id,
+            event,
+            request.META["REMOTE_ADDR"],
+            request.META.get("HTTP_USER_AGENT", "<not provided>"),
+            request.primary_subject_str,
+            timestamp,
+        )
+        return
+
     event_log_model = create_log_entry(
         sciobj_model,
         event,
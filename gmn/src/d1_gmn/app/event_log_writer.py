@@ -0,0 +1,382 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Batched Event Log writer.
+
+Used when EVENT_LOG_WRITE_MODE is "batch". Events are appended to a spool file in
+EVENT_LOG_SPOOL_DIR while the request is being processed, and a background thread
+periodically writes them to the database with a single bulk insert. The spool file is
+flushed to the OS for each event, so events are not lost if the process crashes before
+they are written to the database. Spool files left behind by processes that are no
+longer running are claimed and written when the writer starts in a new process.
+
+If a batch cannot be written, its events are written one at a time, and events that
+still cannot be written, e.g., because a value is too long for its column, are moved to
+a ".failed" file in EVENT_LOG_SPOOL_DIR and logged, so that they do not block the
+events that follow.
+
+The ids of rows in the Event, IpAddress, UserAgent and Subject tables are kept in an
+in-process LRU cache, so the database is only queried for values that have not been
+seen recently.
+
+Only the "read" and "replicate" events, which are created in the read path, are
+batched. Other events are logged in the same transaction as the operation that caused
+them.
+
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+import d1_common.date_time
+
+import django.conf
+import django.db
+import django.db.transaction
+import django.utils.timezone
+
+import d1_gmn.app.count_cache
+import d1_gmn.app.dimension_cache
+import d1_gmn.app.models
+
+BATCHED_EVENT_LIST = ["read", "replicate"]
+
+SPOOL_FILE_PREFIX = "event_log"
+SPOOL_FILE_EXT = ".spool"
+PENDING_FILE_EXT = ".pending"
+FAILED_FILE_EXT = ".failed"
+
+DIMENSION_CACHE_SIZE = 10000
+
+logger = logging.getLogger(__name__)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def is_batched(event):
+    return (
+        django.conf.settings.EVENT_LOG_WRITE_MODE == "batch"
+        and event in BATCHED_EVENT_LIST
+    )
+
+
+def add(sciobj_id, event, ip_address, user_agent, subject, timestamp=None):
+    """Add an event to be written to the Event Log by the background thread."""
+    _get_writer().add(sciobj_id, event, ip_address, user_agent, subject, timestamp)
+
+
+def flush():
+    """Write any buffered events to the Event Log."""
+    if _writer is not None:
+        _writer.flush()
+
+
+class EventLogWriter(object):
+    def __init__(self, spool_dir_path, batch_size, flush_interval):
+        self._spool_dir_path = spool_dir_path
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._pid = os.getpid()
+        self._spool_path = os.path.join(
+            spool_dir_path,
+            "{}.{}{}".format(SPOOL_FILE_PREFIX, self._pid, SPOOL_FILE_EXT),
+        )
+        self._spool_file = None
+        self._spool_count = 0
+        # Protects the spool file. Held only while appending or claiming it.
+        self._spool_lock = threading.Lock()
+        # Serializes writes to the database.
+        self._flush_lock = threading.Lock()
+        self._flush_event = threading.Event()
+        self._dimension_cache = d1_gmn.app.dimension_cache.DimensionIdCache(
+            DIMENSION_CACHE_SIZE
+        )
+
+    @property
+    def pid(self):
+        return self._pid
+
+    def start(self):
+        """Claim spool files left by earlier processes and start the thread that
+        periodically flushes events to the database."""
+        self.recover()
+        thread = threading.Thread(target=self._run, name="EventLogWriter", daemon=True)
+        thread.start()
+        atexit.register(self.flush)
+
+    def add(self, sciobj_id, event, ip_address, user_agent, subject, timestamp=None):
+        row_dict = {
+            "sciobj_id": sciobj_id,
+            "event": event,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "subject": subject,
+            "timestamp": (timestamp or django.utils.timezone.now()).isoformat(),
+        }
+        with self._spool_lock:
+            if self._spool_file is None:
+                self._spool_file = open(self._spool_path, "a", encoding="utf-8")
+            self._spool_file.write(json.dumps(row_dict) + "\n")
+            self._spool_file.flush()
+            self._spool_count += 1
+            is_full = self._spool_count >= self._batch_size
+        if is_full:
+            self._flush_event.set()
+
+    def flush(self):
+        """Write all events in the current spool file and in pending files owned by
+        this process to the database.
+
+        A pending file is removed only after its events have been committed or moved to
+        a failed file. If the database cannot be reached, the pending file is kept, and
+        the write is retried on the next flush.
+
+        """
+        with self._flush_lock:
+            self._claim_spool_file()
+            for pending_path in sorted(self._get_own_pending_path_list()):
+                self._write_pending_file(pending_path)
+
+    def recover(self):
+        """Claim spool and pending files that were left behind by processes that are no
+        longer running."""
+        for path in glob.glob(
+            os.path.join(self._spool_dir_path, SPOOL_FILE_PREFIX + ".*")
+        ):
+            if path.endswith(FAILED_FILE_EXT):
+                continue
+            owner_pid = _get_owner_pid(path)
+            if owner_pid is None or owner_pid == self._pid or _is_running(owner_pid):
+                continue
+            try:
+                os.rename(path, self._get_new_pending_path())
+            except FileNotFoundError:
+                # Claimed by another process
+                continue
+            logger.info('Claimed Event Log spool file. path="{}"'.format(path))
+
+    def _run(self):
+        while True:
+            self._flush_event.wait(self._flush_interval)
+            self._flush_event.clear()
+            try:
+                django.db.close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception("Unable to write buffered events to the Event Log")
+
+    def _claim_spool_file(self):
+        with self._spool_lock:
+            if self._spool_file is None:
+                return
+            self._spool_file.close()
+            self._spool_file = None
+            self._spool_count = 0
+            os.rename(self._spool_path, self._get_new_pending_path())
+
+    def _get_new_pending_path(self):
+        return os.path.join(
+            self._spool_dir_path,
+            "{}.{}.{}{}".format(
+                SPOOL_FILE_PREFIX, self._pid, time.time_ns(), PENDING_FILE_EXT
+            ),
+        )
+
+    def _get_own_pending_path_list(self):
+        return glob.glob(
+            os.path.join(
+                self._spool_dir_path,
+                "{}.{}.*{}".format(SPOOL_FILE_PREFIX, self._pid, PENDING_FILE_EXT),
+            )
+        )
+
+    def _read_rows(self, pending_path):
+        row_list = []
+        with open(pending_path, "r", encoding="utf-8") as f:
+            for line_str in f:
+                try:
+                    row_list.append(json.loads(line_str))
+                except ValueError:
+                    # Partially written line from a process that crashed while
+                    # appending to the spool file.
+                    logger.warning(
+                        'Skipped invalid Event Log spool line. path="{}" line="{}"'.format(
+                            pending_path, line_str.strip()
+                        )
+                    )
+        return row_list
+
+    def _write_pending_file(self, pending_path):
+        row_list = self._read_rows(pending_path)
+        try:
+            self._write_rows_with_retry(row_list)
+        except (django.db.OperationalError, django.db.InterfaceError):
+            # The database cannot be reached. Keep the pending file for the next flush.
+            raise
+        except django.db.DatabaseError as e:
+            logger.warning(
+                "Unable to write Event Log batch. Writing events one at a time. "
+                'path="{}" error="{}"'.format(pending_path, e)
+            )
+            failed_row_list = []
+            for row_dict in row_list:
+                try:
+                    self._write_rows_with_retry([row_dict])
+                except django.db.DatabaseError:
+                    self._dimension_cache.clear()
+                    failed_row_list.append(row_dict)
+            if failed_row_list:
+                self._write_failed_rows(pending_path, failed_row_list)
+        os.remove(pending_path)
+
+    def _write_rows_with_retry(self, row_list):
+        try:
+            self._write_rows(row_list)
+        except django.db.IntegrityError:
+            # A cached dimension row may have been deleted since it was cached.
+            self._dimension_cache.clear()
+            self._write_rows(row_list)
+
+    def _write_rows(self, row_list):
+        # The rows are written in a savepoint, so that a failed write does not break an
+        # enclosing transaction. New dicts are created so that ``row_list`` can be
+        # written again on retry.
+        with django.db.transaction.atomic():
+            create_bulk(
+                [
+                    dict(
+                        row_dict,
+                        timestamp=d1_common.date_time.dt_from_iso8601_str(
+                            row_dict["timestamp"]
+                        ),
+                    )
+                    for row_dict in row_list
+                ],
+                self._dimension_cache,
+            )
+
+    def _write_failed_rows(self, pending_path, row_list):
+        """Move events that cannot be written to a failed file, where they are kept for
+        inspection and are not retried."""
+        failed_path = pending_path[: -len(PENDING_FILE_EXT)] + FAILED_FILE_EXT
+        with open(failed_path, "w", encoding="utf-8") as f:
+            for row_dict in row_list:
+                f.write(json.dumps(row_dict) + "\n")
+        logger.error(
+            "Unable to write events to the Event Log. Moved to failed file. count={} "
+            'path="{}"'.format(len(row_list), failed_path)
+        )
+
+
+def create_bulk(row_list, dimension_cache):
+    """Write events to the Event Log with a single bulk insert.
+
+    Args:
+        row_list: list of dict
+            Each dict holds the sciobj_id, event, ip_address, user_agent, subject and
+            timestamp of an event. The timestamp is a timezone aware datetime.
+        dimension_cache: DimensionIdCache
+
+    Returns:
+        int: Number of events written. Events are only kept for existing objects, so
+        events for objects that have been deleted are dropped.
+
+    """
+    existing_id_set = set(
+        d1_gmn.app.models.ScienceObject.objects.filter(
+            id__in={r["sciobj_id"] for r in row_list}
+        ).values_list("id", flat=True)
+    )
+    model_list = []
+    timestamp_list = []
+    for row_dict in row_list:
+        if row_dict["sciobj_id"] not in existing_id_set:
+            continue
+        model_list.append(
+            d1_gmn.app.models.EventLog(
+                sciobj_id=row_dict["sciobj_id"],
+                event_id=dimension_cache.get_id(
+                    d1_gmn.app.models.event, row_dict["event"]
+                ),
+                ip_address_id=dimension_cache.get_id(
+                    d1_gmn.app.models.ip_address, row_dict["ip_address"]
+                ),
+                user_agent_id=dimension_cache.get_id(
+                    d1_gmn.app.models.user_agent, row_dict["user_agent"]
+                ),
+                subject_id=dimension_cache.get_id(
+                    d1_gmn.app.models.subject, row_dict["subject"]
+                ),
+            )
+        )
+        timestamp_list.append(row_dict["timestamp"])
+    if model_list:
+        with django.db.transaction.atomic():
+            d1_gmn.app.models.EventLog.objects.bulk_create(model_list)
+            # bulk_create() sets auto_now_add fields to the current time, so the time
+            # of the event is restored in a separate step.
+            for event_log_model, timestamp in zip(model_list, timestamp_list):
+                event_log_model.timestamp = timestamp
+            d1_gmn.app.models.EventLog.objects.bulk_update(model_list, ["timestamp"])
+        d1_gmn.app.count_cache.invalidate("log")
+    if len(model_list) != len(row_list):
+        logger.info(
+            "Dropped events for deleted objects. count={}".format(
+                len(row_list) - len(model_list)
+            )
+        )
+    return len(model_list)
+
+
+def _get_writer():
+    """Get the writer for this process, creating and starting it on first use.
+
+    A writer is not inherited by processes forked from the process that created it.
+
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None or _writer.pid != os.getpid():
+            _writer = EventLogWriter(
+                django.conf.settings.EVENT_LOG_SPOOL_DIR,
+                django.conf.settings.EVENT_LOG_BATCH_SIZE,
+                django.conf.settings.EVENT_LOG_FLUSH_INTERVAL,
+            )
+            _writer.start()
+        return _writer
+
+
+def _get_owner_pid(path):
+    try:
+        return int(os.path.basename(path).split(".")[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
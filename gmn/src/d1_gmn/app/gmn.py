@@ -43,10 +43,26 @@ import d1_gmn.app.sciobj_store
 import d1_gmn.app.util
 
 RESOURCE_MAP_CREATE_MODE_LIST = ["block", "open"]
+OBJECT_STORE_SERVE_MODE_LIST = ["stream", "file", "x-sendfile", "x-accel-redirect"]
+EVENT_LOG_WRITE_MODE_LIST = ["sync", "batch"]
 
 logger = logging.getLogger(__name__)
 
 
+def _get_umask_file_mode():
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# The mode that new files get under the umask of the process. Used for SciObj files that
+# are moved into the SciObj store when FILE_UPLOAD_PERMISSIONS is set to None. The umask
+# can only be read by changing it, which affects files created by other threads in the
+# process, so it is read when Django imports this module while populating the app
+# registry, before GMN starts servicing requests.
+UMASK_FILE_MODE = _get_umask_file_mode()
+
+
 class Startup(django.apps.AppConfig):
     name = "d1_gmn.app"
 
@@ -70,14 +86,31 @@ class Startup(django.apps.AppConfig):
         self._assert_is_type("SCIMETA_VALIDATION_ENABLED", bool)
         self._assert_is_type("SCIMETA_VALIDATION_MAX_SIZE", int)
         self._assert_is_in("SCIMETA_VALIDATION_OVER_SIZE_ACTION", ("reject", "accept"))
+        self._assert_is_in("OBJECT_STORE_SERVE_MODE", OBJECT_STORE_SERVE_MODE_LIST)
+        self._assert_is_type("OBJECT_STORE_X_ACCEL_REDIRECT_PREFIX", str)
+        self._assert_is_type("COUNT_CACHE_TIMEOUT", int)
+        self._assert_is_type("COUNT_ESTIMATE", bool)
+        self._assert_is_in("EVENT_LOG_WRITE_MODE", EVENT_LOG_WRITE_MODE_LIST)
+        self._assert_is_type("EVENT_LOG_BATCH_SIZE", int)
+        self._assert_is_type("EVENT_LOG_FLUSH_INTERVAL", int)
+        self._assert_is_type("EVENT_LOG_SPOOL_DIR", str)
+        self._assert_is_cache_alias_if_set("SYSMETA_CACHE_ALIAS")
+        self._assert_is_cache_alias_if_set("SID_CACHE_ALIAS")
+        self._assert_is_type("CERT_SUBJECT_CACHE_SIZE", int)
+        self._assert_is_type("CHECKSUM_ALGORITHM_LIST", list)
+        self._assert_is_type("REPLICATION_MAX_CONCURRENT", int)
+        self._assert_is_type("REPLICATION_MAX_CONCURRENT_PER_NODE", int)
+        self._assert_is_type("REPLICATION_MAX_BYTES_PER_SEC_PER_NODE", int)
 
         if django.conf.settings.UNSAFE_SETTING_WARNINGS:
             self._warn_unsafe_for_prod()
 
         self._check_resource_map_create()
+        self._create_event_log_spool_dir()
 
         if not d1_gmn.app.sciobj_store.is_existing_store():
             self._create_sciobj_store_root()
+        d1_gmn.app.sciobj_store.delete_stale_ingest_tmp_files()
 
         self._add_xslt_mimetype()
         self._set_mn_logo()
@@ -92,6 +125,19 @@ class Startup(django.apps.AppConfig):
         if v not in valid_list:
             self.raise_config_error(setting_name, v, valid_list)
 
+    def _assert_is_cache_alias_if_set(self, setting_name):
+        v = self._get_setting(setting_name)
+        if v is None:
+            return
+        if v not in django.conf.settings.CACHES:
+            self.raise_config_error(
+                setting_name,
+                v,
+                str,
+                "the name of an entry in the CACHES setting",
+                is_none_allowed=True,
+            )
+
     def _assert_readable_file_if_set(self, setting_name):
         v = self._get_setting(setting_name)
         if v is None:
@@ -189,6 +235,19 @@ class Startup(django.apps.AppConfig):
                 )
             )
 
+    def _create_event_log_spool_dir(self):
+        if django.conf.settings.EVENT_LOG_WRITE_MODE != "batch":
+            return
+        try:
+            os.makedirs(django.conf.settings.EVENT_LOG_SPOOL_DIR, exist_ok=True)
+        except EnvironmentError as e:
+            raise django.core.exceptions.ImproperlyConfigured(
+                "Configuration error: Unable to create Event Log spool directory. "
+                'path="{}". msg="{}"'.format(
+                    django.conf.settings.EVENT_LOG_SPOOL_DIR, str(e)
+                )
+            )
+
     def _set_secret_key(self):
         try:
             with open(django.conf.settings.SECRET_KEY_PATH, "rb") as f:
@@ -0,0 +1,288 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Single pass ingest of SciObj bytes uploaded with MNStorage.create() and
+MNStorage.update().
+
+The uploaded bytes are read once. While reading, the checksums and size of the object
+are calculated, the bytes are written to a temporary file in the SciObj store and, for
+Science Metadata that will be validated, fed to an incremental XML parser. Resource Maps
+are fed to an incremental parser that extracts the aggregated PIDs. When the object has
+been accepted, the temporary file is moved into its final location in the SciObj store
+with an atomic rename.
+
+If Django has already streamed a large upload to a temporary file on the same
+filesystem as the SciObj store, the file is moved into place instead of being copied.
+See ``FILE_UPLOAD_TEMP_DIR`` in the Django settings.
+
+"""
+import logging
+import os
+import tempfile
+import xml.sax
+
+import d1_scimeta.util
+import lxml.etree
+
+import d1_common.resource_map
+import d1_common.utils.filesystem
+
+import django.conf
+
+import d1_gmn.app.gmn
+import d1_gmn.app.sciobj_checksum
+import d1_gmn.app.sciobj_store
+
+TMP_FILE_PREFIX = d1_gmn.app.sciobj_store.INGEST_TMP_FILE_PREFIX
+TMP_FILE_SUFFIX = d1_gmn.app.sciobj_store.INGEST_TMP_FILE_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+
+class SciObjIngest(object):
+    """Ingest the bytes of an uploaded SciObj in a single pass.
+
+    The upload is read on first access to the results, or when the object is
+    committed. If the object is not committed before leaving the context, any
+    temporary file is removed.
+
+    Args:
+        upload_file: django.core.files.uploadedfile.UploadedFile
+            The uploaded SciObj bytes.
+
+        checksum_algorithm_list: list of str
+            DataONE checksum algorithms for which to calculate checksums. Unsupported
+            algorithms are ignored.
+
+        is_xml_parsed: bool
+            Parse the upload as an XML doc.
+
+        is_resource_map_parsed: bool
+            Parse the upload as a Resource Map.
+
+    """
+
+    def __init__(
+        self,
+        upload_file,
+        checksum_algorithm_list,
+        is_xml_parsed=False,
+        is_resource_map_parsed=False,
+    ):
+        self._upload_file = upload_file
+        self._checksum_algorithm_list = checksum_algorithm_list
+        self._is_xml_parsed = is_xml_parsed
+        self._is_resource_map_parsed = is_resource_map_parsed
+        self._is_read = False
+        self._is_committed = False
+        self._tmp_path = None
+        self._abs_path = None
+        self._resource_map_summary = None
+        self._resource_map_error_str = None
+        self._checksum_dict = {}
+        self._size = None
+        self._xml_tree = None
+        self._xml_error_str = None
+        self.read_byte_count = 0
+        self.write_byte_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.discard()
+
+    @property
+    def size(self):
+        self._read()
+        return self._size
+
+    def get_checksum(self, algorithm_str):
+        """Get the checksum of the uploaded bytes as a hex string."""
+        self._read()
+        return self._checksum_dict[algorithm_str]
+
+    def get_checksum_dict(self):
+        """Get the checksums of the uploaded bytes.
+
+        Returns:
+            dict: DataONE checksum algorithm -> checksum as hex string.
+
+        """
+        self._read()
+        return dict(self._checksum_dict)
+
+    def get_xml_tree(self):
+        """Get the uploaded XML doc as an lxml.etree.ElementTree.
+
+        Raises:
+            d1_scimeta.util.SciMetaError: The upload is not well formed XML.
+
+        """
+        assert self._is_xml_parsed, "Upload was not parsed as XML"
+        self._read()
+        if self._xml_error_str is not None:
+            raise d1_scimeta.util.SciMetaError(
+                "Invalid XML (not well formed). {}".format(self._xml_error_str)
+            )
+        return self._xml_tree
+
+    def get_resource_map_summary(self):
+        """Get the summary of the uploaded Resource Map.
+
+        Returns:
+            d1_common.resource_map.ResourceMapSummary
+
+        Raises:
+            xml.sax.SAXException: The upload is not a valid Resource Map.
+
+        """
+        assert self._is_resource_map_parsed, "Upload was not parsed as a Resource Map"
+        self._read()
+        if self._resource_map_error_str is not None:
+            raise xml.sax.SAXException(self._resource_map_error_str)
+        if self._resource_map_summary is None:
+            # The Resource Map uses RDF/XML that the incremental parser does not handle,
+            # which requires parsing the complete document. The bytes are read back
+            # from the local file to which they were written, instead of from the
+            # upload.
+            with open(self._get_path(), "rb") as f:
+                self._resource_map_summary = (
+                    d1_common.resource_map.createResourceMapSummaryFromStream(f)
+                )
+        return self._resource_map_summary
+
+    def commit(self, pid):
+        """Move the uploaded bytes into the location for ``pid`` in the SciObj store.
+
+        Returns:
+            str: Absolute path to the SciObj file.
+
+        """
+        self._read()
+        abs_path = d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid)
+        d1_common.utils.filesystem.create_missing_directories_for_file(abs_path)
+        tmp_path = self._get_path()
+        # Temporary files are created with mode 0600, which os.replace() keeps. Set the
+        # mode a file written directly to the SciObj store would get, so that the web
+        # server can serve the file if it runs as a different user.
+        os.chmod(tmp_path, _get_sciobj_file_mode())
+        os.replace(tmp_path, abs_path)
+        self._tmp_path = None
+        self._abs_path = abs_path
+        self._is_committed = True
+        return abs_path
+
+    def discard(self):
+        """Remove the temporary file if the object was not committed."""
+        if self._tmp_path is not None:
+            try:
+                os.unlink(self._tmp_path)
+            except FileNotFoundError:
+                pass
+            self._tmp_path = None
+
+    def _get_path(self):
+        """Get the path to the file holding the uploaded bytes."""
+        if self._is_committed:
+            return self._abs_path
+        return self._tmp_path or self._upload_file.temporary_file_path()
+
+    def _read(self):
+        if self._is_read:
+            return
+        checksum_calculator = d1_gmn.app.sciobj_checksum.ChecksumCalculator(
+            self._checksum_algorithm_list
+        )
+        xml_parser = (
+            lxml.etree.XMLParser(no_network=True) if self._is_xml_parsed else None
+        )
+        resource_map_parser = (
+            d1_common.resource_map.ResourceMapSummaryParser()
+            if self._is_resource_map_parsed
+            else None
+        )
+        tmp_file = None
+        if not self._is_movable_upload():
+            tmp_fd, self._tmp_path = tempfile.mkstemp(
+                suffix=TMP_FILE_SUFFIX,
+                prefix=TMP_FILE_PREFIX,
+                dir=d1_gmn.app.sciobj_store.get_abs_sciobj_store_path(),
+            )
+            tmp_file = os.fdopen(tmp_fd, "wb")
+        try:
+            for chunk_bytes in self._upload_file.chunks(
+                django.conf.settings.NUM_CHUNK_BYTES
+            ):
+                self.read_byte_count += len(chunk_bytes)
+                checksum_calculator.update(chunk_bytes)
+                if xml_parser is not None and self._xml_error_str is None:
+                    try:
+                        xml_parser.feed(chunk_bytes)
+                    except lxml.etree.XMLSyntaxError as e:
+                        self._xml_error_str = str(e)
+                if (
+                    resource_map_parser is not None
+                    and self._resource_map_error_str is None
+                ):
+                    try:
+                        resource_map_parser.feed(chunk_bytes)
+                    except xml.sax.SAXException as e:
+                        self._resource_map_error_str = str(e)
+                if tmp_file is not None:
+                    tmp_file.write(chunk_bytes)
+                    self.write_byte_count += len(chunk_bytes)
+        finally:
+            if tmp_file is not None:
+                tmp_file.close()
+        if xml_parser is not None and self._xml_error_str is None:
+            try:
+                self._xml_tree = lxml.etree.ElementTree(xml_parser.close())
+            except lxml.etree.XMLSyntaxError as e:
+                self._xml_error_str = str(e)
+        if resource_map_parser is not None and self._resource_map_error_str is None:
+            try:
+                self._resource_map_summary = resource_map_parser.close()
+            except xml.sax.SAXException as e:
+                self._resource_map_error_str = str(e)
+        self._checksum_dict = checksum_calculator.get_checksum_dict()
+        self._size = self.read_byte_count
+        self._is_read = True
+        logger.debug(
+            "Ingested SciObj. read={} bytes written={} bytes".format(
+                self.read_byte_count, self.write_byte_count
+            )
+        )
+
+    def _is_movable_upload(self):
+        """Return True if the upload is in a temporary file on the same filesystem as
+        the SciObj store, so that it can be moved into place with a rename."""
+        if not hasattr(self._upload_file, "temporary_file_path"):
+            return False
+        return (
+            os.stat(self._upload_file.temporary_file_path()).st_dev
+            == os.stat(d1_gmn.app.sciobj_store.get_abs_sciobj_store_path()).st_dev
+        )
+
+
+def _get_sciobj_file_mode():
+    """Return FILE_UPLOAD_PERMISSIONS if set, else the mode for a new file under the
+    umask that was read when GMN started."""
+    mode = django.conf.settings.FILE_UPLOAD_PERMISSIONS
+    if mode is not None:
+        return mode
+    return d1_gmn.app.gmn.UMASK_FILE_MODE
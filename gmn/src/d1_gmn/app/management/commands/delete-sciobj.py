@@ -0,0 +1,109 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Delete a list of Science Objects from this GMN.
+
+The PIDs of the objects to delete are read from the file passed with --pid-path. The
+file must be UTF-8 encoded and contain one PID per line.
+
+This performs the same steps as MNStorage.delete() for each object, but deletes the
+objects in batches, where the database records for all the objects in a batch are
+deleted in a single transaction, and checking for subjects that are no longer in use is
+done once for each batch. If a batch fails, none of the objects in the batch are
+deleted, and the command continues with the next batch.
+
+The object bytes of local objects are deleted from the filesystem after the transaction
+for the batch has been committed. Errors raised while deleting the bytes of an object
+are logged, and the object is still reported as deleted.
+
+PIDs that are not for objects on this GMN are logged and skipped. SIDs are not resolved.
+
+"""
+import django.core.exceptions
+import django.db
+
+import d1_gmn.app.delete
+import d1_gmn.app.did
+import d1_gmn.app.mgmt_base
+
+DEFAULT_BATCH_SIZE = 100
+
+
+class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(__doc__, __name__, *args, **kwargs)
+        self.delete_tracker = None
+
+    def add_components(self, parser):
+        self.using_single_instance(parser)
+        self.using_pid_file(parser)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of objects to delete in each database transaction",
+        )
+        parser.add_argument(
+            "--max-objects",
+            type=int,
+            default=0,
+            help="Maximum number of objects to delete. 0 is unlimited",
+        )
+
+    def handle_serial(self):
+        if not self.pid_set:
+            raise self.CommandError("Must specify a list of PIDs with --pid-path")
+        pid_list = self.get_existing_pid_list()
+        if self.opt_dict["max_objects"]:
+            pid_list = pid_list[: self.opt_dict["max_objects"]]
+        self.delete_tracker = self.tracker.tracker("Deleting SciObj", len(pid_list))
+        batch_size = max(1, self.opt_dict["batch_size"])
+        for i in range(0, len(pid_list), batch_size):
+            self.delete_batch(pid_list[i : i + batch_size])
+
+    def get_existing_pid_list(self):
+        """Get the PIDs in the PID file that are for objects on this GMN, in the same
+        order as in the file."""
+        # self.pid_set does not preserve the order of the file.
+        with open(self.opt_dict["pid_path"], encoding="utf-8") as f:
+            pid_list = list(dict.fromkeys(s.strip() for s in f if s.strip()))
+        existing_pid_set = d1_gmn.app.did.get_existing_object_pid_set(pid_list)
+        for pid in pid_list:
+            if pid not in existing_pid_set:
+                self.tracker.event(
+                    "Skipped: Unknown on local node", f'pid="{pid}"', is_error=True
+                )
+        return [pid for pid in pid_list if pid in existing_pid_set]
+
+    def delete_batch(self, pid_list):
+        try:
+            deleted_pid_list = d1_gmn.app.delete.delete_sciobj_bulk(pid_list)
+        except (
+            django.core.exceptions.ObjectDoesNotExist,
+            django.db.DatabaseError,
+        ) as e:
+            for pid in pid_list:
+                self.delete_tracker.step()
+                self.delete_tracker.event(
+                    "Delete failed", f'pid="{pid}" error="{e}"', is_error=True
+                )
+            return
+        for pid in deleted_pid_list:
+            self.delete_tracker.step()
+            self.delete_tracker.event("Deleted", f'pid="{pid}"')
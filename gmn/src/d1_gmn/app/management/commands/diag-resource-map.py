@@ -39,7 +39,6 @@ import d1_gmn.app.mgmt_base
 import d1_gmn.app.model_util
 import d1_gmn.app.models
 import d1_gmn.app.resource_map
-import d1_gmn.app.sciobj_store
 
 
 class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
@@ -68,13 +67,7 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             if not self.is_resource_map(sciobj_model):
                 self.res_tracker.event("Not a Resource Map", f"pid={pid}")
             elif not d1_gmn.app.did.is_resource_map_db(pid):
-                with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(
-                    pid
-                ) as sciobj_file:
-                    resource_map_xml = sciobj_file.read()
-                resource_map = d1_gmn.app.resource_map.parse_resource_map_from_str(
-                    resource_map_xml
-                )
+                resource_map = d1_gmn.app.resource_map.get_resource_map_from_sciobj(pid)
                 d1_gmn.app.resource_map.create_or_update(pid, resource_map)
                 self.res_tracker.event(
                     "Triggered processing for unprocessed Resource Map", f"pid={pid}"
@@ -21,13 +21,30 @@ obsoleted and obsoletedBy references should not break during regular use of GMN
 production, but it may happen during development or if the database is manipulated
 directly during testing.
 
+With ``--benchmark``, the chains are not modified. Instead, a chain with
+``--chain-length`` objects is created in a transaction that is rolled back, and the
+time taken by the revision chain operations that run on create, update and delete is
+logged.
+
 """
+import io
+import time
+
+import d1_common.system_metadata
+
+import django.conf
+import django.db.transaction
 
 import d1_gmn.app.did
 import d1_gmn.app.mgmt_base
 import d1_gmn.app.model_util
 import d1_gmn.app.models
 import d1_gmn.app.revision
+import d1_gmn.app.sysmeta
+
+DEFAULT_CHAIN_LENGTH = 10000
+# Number of objects created with each bulk create when generating the benchmark chain.
+BENCHMARK_BATCH_SIZE = 1000
 
 
 class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
@@ -39,9 +56,24 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
         self.using_single_instance(parser)
 
     def add_arguments(self, parser):
-        pass
+        parser.add_argument(
+            "--benchmark",
+            action="store_true",
+            help="Time revision chain operations on a generated chain instead of "
+            "reprocessing the chains",
+        )
+        parser.add_argument(
+            "--chain-length",
+            type=int,
+            action="store",
+            default=DEFAULT_CHAIN_LENGTH,
+            help="Number of objects in the generated chain with --benchmark",
+        )
 
     def handle_serial(self):
+        if self.opt_dict["benchmark"]:
+            self.benchmark()
+            return
         self.reprocess_all()
         self.res_tracker.completed()
 
@@ -71,3 +103,102 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             d1_gmn.app.revision.create_or_update_chain(
                 sciobj_model.pid.did, None, obsoletes_pid, obsoleted_by_pid
             )
+
+    # Benchmark
+
+    def benchmark(self):
+        chain_length = self.opt_dict["chain_length"]
+        if chain_length < 3:
+            raise self.CommandError("--chain-length must be 3 or more")
+        with django.db.transaction.atomic():
+            start_sec = time.perf_counter()
+            sid, pid_list = self.create_benchmark_chain(chain_length)
+            self.log.info(
+                "Created chain. chain_length={} sec={:.3f}".format(
+                    chain_length, time.perf_counter() - start_sec
+                )
+            )
+            cut_pid = pid_list[chain_length // 2]
+            for op_str, op_func in (
+                (
+                    "Find head from tail",
+                    lambda: d1_gmn.app.revision._find_head_or_latest_connected(
+                        pid_list[0]
+                    ),
+                ),
+                (
+                    "Map SID to head",
+                    lambda: d1_gmn.app.revision._update_sid_to_last_existing_pid_map(
+                        pid_list[0]
+                    ),
+                ),
+                ("Resolve SID", lambda: d1_gmn.app.revision.resolve_sid(sid)),
+                (
+                    "Get all PIDs in chain",
+                    lambda: d1_gmn.app.revision.get_all_pid_by_sid(sid),
+                ),
+                (
+                    "Cut object from middle of chain",
+                    lambda: d1_gmn.app.revision.cut_from_chain(
+                        d1_gmn.app.model_util.get_sci_model(cut_pid)
+                    ),
+                ),
+            ):
+                start_sec = time.perf_counter()
+                op_func()
+                self.log.info(
+                    "{}: sec={:.6f}".format(op_str, time.perf_counter() - start_sec)
+                )
+            django.db.transaction.set_rollback(True)
+        self.log.info("Rolled back benchmark chain")
+
+    def create_benchmark_chain(self, chain_length):
+        """Create a chain of objects, ordered from tail to head.
+
+        The objects are created as standalone objects, then linked and merged into a
+        single chain with bulk updates, as creating them one at a time in a chain is
+        itself slow for long chains.
+
+        """
+        run_str = "benchmark_{}".format(time.time())
+        sid = "{}_sid".format(run_str)
+        pid_list = ["{}_{}".format(run_str, i) for i in range(chain_length)]
+        sci_model_list = []
+        for i in range(0, chain_length, BENCHMARK_BATCH_SIZE):
+            sci_model_list.extend(
+                d1_gmn.app.sysmeta.create_or_update_bulk(
+                    [
+                        d1_common.system_metadata.generate_system_metadata_pyxb(
+                            pid,
+                            "application/octet-stream",
+                            io.BytesIO(pid.encode("utf-8")),
+                            "benchmark_subject",
+                            "benchmark_subject",
+                            django.conf.settings.NODE_IDENTIFIER,
+                        )
+                        for pid in pid_list[i : i + BENCHMARK_BATCH_SIZE]
+                    ]
+                )
+            )
+        for i, sci_model in enumerate(sci_model_list):
+            if i > 0:
+                sci_model.obsoletes_id = sci_model_list[i - 1].pid_id
+            if i < chain_length - 1:
+                sci_model.obsoleted_by_id = sci_model_list[i + 1].pid_id
+        d1_gmn.app.models.ScienceObject.objects.bulk_update(
+            sci_model_list, ["obsoletes", "obsoleted_by"], BENCHMARK_BATCH_SIZE
+        )
+        member_queryset = d1_gmn.app.models.ChainMember.objects.filter(
+            pid_id__in=[m.pid_id for m in sci_model_list]
+        )
+        chain_id_list = list(member_queryset.values_list("chain_id", flat=True))
+        chain_model = d1_gmn.app.models.Chain.objects.get(
+            chainmember__pid_id=sci_model_list[0].pid_id
+        )
+        member_queryset.update(chain=chain_model)
+        d1_gmn.app.models.Chain.objects.filter(id__in=chain_id_list).exclude(
+            id=chain_model.id
+        ).delete()
+        chain_model.sid = d1_gmn.app.did.get_or_create_did(sid)
+        chain_model.save()
+        return sid, pid_list
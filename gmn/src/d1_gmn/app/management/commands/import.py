@@ -37,9 +37,31 @@ subjects have read or access or better. Subjects that are whitelisted for create
 and delete access in GMN, and subjects authenticated as Coordinating Nodes, have
 unfiltered access to ``listObjects()``. See settings.py for more information.
 
+The import runs as a pipeline. Pages of ``listObjects()`` results are retrieved
+concurrently, the System Metadata and bytes of the objects are downloaded concurrently,
+and the downloaded objects are written to the DB in batches by a separate DB writer
+thread, with a bounded number of queries per batch. The batch size can be set with
+``--batch-size``. If a batch cannot be written, its objects are written one by one, so
+that only the objects that cannot be written fail.
+
+Progress is recorded in a checkpoint file, set with ``--checkpoint-path``. If the import
+is interrupted, running it again with the same arguments resumes it, skipping the pages
+of objects and events that were completely imported. Pages with objects or events that
+failed to import are retried. Use ``--restart`` to ignore the checkpoint. The checkpoint
+file is deleted when an import completes without errors.
+
+Pages are identified by their offset in the results, so the results must not change
+between runs. To keep new and modified objects and events from shifting the pages, the
+results are limited with ``toDate`` to the items that existed when the objects or events
+were first listed, and the checkpoint records the number of items. If the number has
+changed when the import is resumed, objects or events have been modified or deleted on
+the source MN, and all pages of the objects or events are imported again. Objects that
+were already imported are skipped. Events that were already imported are imported again.
+
 Member Nodes keep an event log, where operations on objects, such as reads, are stored
 together with associated details. After completed object import, the importer will
-attempt to import the events for all successfully imported objects. For event logs,
+attempt to import the events for all successfully imported objects. Each page of events
+is written to the DB with a single bulk insert. For event logs,
 ``MNRead.getLogRecords()`` provides functionality equivalent to what ``listObjects``
 provides for objects, with the same access control related restrictions.
 
@@ -57,39 +79,67 @@ on the source MN for the subject(s) contained in the certificate. If no certific
 provided, only objects and APIs that are available to the public user are accessible.
 """
 import asyncio
+import concurrent.futures
+import json
 import logging
+import os
+import tempfile
 
 import d1_common.date_time
-import d1_common.type_conversions
-import d1_common.types.dataoneTypes
 import d1_common.types.exceptions
 import d1_common.utils.filesystem
-import d1_common.utils.progress_tracker
-import d1_common.utils.ulog
 import d1_common.xml
 
 import django.conf
 import django.core.management.base
+import django.db
 import django.db.transaction
 
 import d1_gmn.app.delete
-import d1_gmn.app.did
-import d1_gmn.app.event_log
+import d1_gmn.app.dimension_cache
+import d1_gmn.app.event_log_writer
 import d1_gmn.app.mgmt_base
-import d1_gmn.app.model_util
 import d1_gmn.app.models
+import d1_gmn.app.replica_download
 import d1_gmn.app.resource_map
+import d1_gmn.app.sciobj_checksum
 import d1_gmn.app.sciobj_store
 import d1_gmn.app.sysmeta
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DIMENSION_CACHE_SIZE = 10000
+# Max number of SciObj batches waiting for the DB writer. Downloads pause when reached.
+MAX_PENDING_BATCHES = 4
+DEFAULT_CHECKPOINT_PATH = os.path.join(
+    tempfile.gettempdir(), "gmn_import_checkpoint.json"
+)
+
 
 class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
     def __init__(self, *args, **kwargs):
         super().__init__(__doc__, __name__, *args, **kwargs)
-        self.list_arg_dict = None
-        self.log_records_arg_dict = None
         self.sciobj_tracker = None
         self.event_tracker = None
+        self.checkpoint = None
+        # listObjects() and getLogRecords() args, including the toDate of the import.
+        self.sciobj_list_arg_dict = None
+        self.event_list_arg_dict = None
+        # All DB access runs in this single thread, so that the event loop is not
+        # blocked by DB queries, and batches are committed in the order they are
+        # submitted.
+        self.db_executor = None
+        self.download_semaphore = None
+        # SciObjs that have been downloaded and are waiting to be written to the DB.
+        self.sciobj_batch_list = []
+        # SciObjs that are being downloaded or are waiting to be written to the DB.
+        self.sciobj_pending_pid_set = set()
+        self.sciobj_write_task_set = set()
+        # Only used from the DB writer thread.
+        self.dimension_cache = d1_gmn.app.dimension_cache.DimensionIdCache(
+            DIMENSION_CACHE_SIZE
+        )
 
     def add_components(self, parser):
         self.using_single_instance(parser)
@@ -132,12 +182,53 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             action="store_true",
             help="Recursively import all nested objects in Resource Maps",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            action="store",
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of SciObj to write to the DB in each transaction",
+        )
+        parser.add_argument(
+            "--checkpoint-path",
+            action="store",
+            default=DEFAULT_CHECKPOINT_PATH,
+            help="File in which to record the progress of the import",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the progress recorded by an interrupted import and start "
+            "from the beginning",
+        )
 
     async def handle_async(self):
         # Suppress debug output from async_client
         logging.getLogger("d1_client.aio.async_client").setLevel(logging.ERROR)
 
-        if not self.is_db_empty() and not self.opt_dict["force"]:
+        self.db_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="gmn_import_db"
+        )
+        self.download_semaphore = asyncio.Semaphore(self.opt_dict["max_concurrent"])
+        try:
+            await self.import_all()
+        finally:
+            await self.db_call(django.db.connection.close)
+            self.db_executor.shutdown()
+
+    async def import_all(self):
+        self.checkpoint = ImportCheckpoint(
+            self.opt_dict["checkpoint_path"],
+            self.get_checkpoint_key_dict(),
+            is_restart=self.opt_dict["restart"] or self.opt_dict["clear"],
+        )
+        if self.checkpoint.is_resumed:
+            self.log.info(
+                'Resuming interrupted import. checkpoint_path="{}"'.format(
+                    self.opt_dict["checkpoint_path"]
+                )
+            )
+        elif not await self.db_call(self.is_db_empty) and not self.opt_dict["force"]:
             raise django.core.management.base.CommandError(
                 "There are already local objects or Event Logs in the DB. "
                 "Use --force to import anyway. "
@@ -146,10 +237,10 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             )
         if self.opt_dict["clear"]:
             if self.opt_dict["only_log"]:
-                d1_gmn.app.models.EventLog.objects.all().delete()
+                await self.db_call(self.event_clear_db)
                 self.log.info("Cleared Event Logs from DB")
             else:
-                d1_gmn.app.delete.delete_all_from_db()
+                await self.db_call(d1_gmn.app.delete.delete_all_from_db)
                 self.log.info("Cleared objects and Event Logs from DB")
 
         if not self.opt_dict["only_log"]:
@@ -158,28 +249,169 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             else:
                 await self.sciobj_import_all()
             await self.await_all()
-            self.sciobj_tracker.completed()
+            await self.sciobj_flush_batch()
+            await self.sciobj_await_writes()
+            if self.sciobj_tracker:
+                self.sciobj_tracker.completed()
+            if self.sciobj_list_arg_dict is not None:
+                await self.end_phase(
+                    "sciobj",
+                    self.async_d1_client.list_objects,
+                    self.sciobj_list_arg_dict,
+                )
 
         await self.event_import_all()
         await self.await_all()
         self.event_tracker.completed()
+        await self.end_phase(
+            "event", self.async_d1_client.get_log_records, self.event_list_arg_dict
+        )
+
+        if self.checkpoint.is_failed:
+            self.log.warning(
+                "Some items could not be imported. Run the import again to retry "
+                'them. checkpoint_path="{}"'.format(self.opt_dict["checkpoint_path"])
+            )
+        else:
+            self.checkpoint.delete()
+
+    async def db_call(self, func, *args):
+        """Run a function that accesses the DB in the DB writer thread."""
+        return await asyncio.get_event_loop().run_in_executor(
+            self.db_executor, func, *args
+        )
+
+    async def begin_phase(self, phase, list_func, list_arg_dict):
+        """Limit the results of listObjects() or getLogRecords() to the items that
+        existed when the phase was started by the first run of the import.
+
+        If the number of items has changed since then, the pages recorded as completed
+        in the checkpoint may no longer hold the same items, so the phase is started
+        over with a new toDate.
+
+        Returns:
+            tuple: listObjects() or getLogRecords() args, number of items.
+
+        """
+        to_date, recorded_count = self.checkpoint.get_source(phase)
+        if to_date is not None:
+            phase_arg_dict = dict(list_arg_dict, toDate=to_date)
+            total_count = await self.get_total_count(list_func, phase_arg_dict)
+            if total_count == recorded_count:
+                return phase_arg_dict, total_count
+            self.log.warning(
+                "Number of items on source has changed since the import was started. "
+                "Importing all pages again. phase={} recorded={} current={}".format(
+                    phase, recorded_count, total_count
+                )
+            )
+        phase_arg_dict = dict(
+            list_arg_dict,
+            toDate=list_arg_dict.get("toDate")
+            or d1_common.date_time.strip_timezone(
+                d1_common.date_time.utc_now()
+            ).isoformat(),
+        )
+        total_count = await self.get_total_count(list_func, phase_arg_dict)
+        self.checkpoint.begin_phase(phase, phase_arg_dict["toDate"], total_count)
+        return phase_arg_dict, total_count
+
+    async def end_phase(self, phase, list_func, list_arg_dict):
+        """Check that the number of items on the source did not change while the
+        phase was running.
+
+        If it changed, the pages may have shifted, so items may have been skipped. The
+        checkpoint is kept, and the next run starts the phase over.
+
+        """
+        total_count = await self.get_total_count(list_func, list_arg_dict)
+        recorded_count = self.checkpoint.get_source(phase)[1]
+        if total_count != recorded_count:
+            self.log.warning(
+                "Number of items on source changed during import. Some items may not "
+                "have been imported. Run the import again to import them. "
+                "phase={} recorded={} current={}".format(
+                    phase, recorded_count, total_count
+                )
+            )
+            self.checkpoint.fail_phase(phase)
+
+    async def get_total_count(self, list_func, list_arg_dict):
+        return (
+            await list_func(start=0, count=0, as_records=True, **list_arg_dict)
+        ).total
+
+    def event_clear_db(self):
+        d1_gmn.app.models.EventLog.objects.all().delete()
+
+    def get_checkpoint_key_dict(self):
+        """The checkpoint is only valid for imports from the same source with the
+        same paging of the results."""
+        return {
+            "base_url": self.async_d1_client_arg_parser.get_method_args(self.opt_dict)[
+                "base_url"
+            ],
+            "object_page_size": self.async_object_list_iter.page_size,
+            "object_list_args": str(self.async_object_list_iter.list_arg_dict),
+            "event_page_size": self.async_event_log_iter.page_size,
+            "event_list_args": str(self.async_event_log_iter.list_arg_dict),
+        }
 
     # SciObj
 
     async def sciobj_import_all(self):
-        """Import all SciObj on remote MN."""
+        """Import all SciObj on remote MN.
+
+        The pages of the object list are retrieved and imported concurrently. Pages
+        completed by an earlier, interrupted import are skipped.
+
+        """
         self.log.info("Starting SciObj import")
-        total_count = await self.async_object_list_iter.total
+        self.sciobj_list_arg_dict, total_count = await self.begin_phase(
+            "sciobj",
+            self.async_d1_client.list_objects,
+            self.async_object_list_iter.list_arg_dict,
+        )
         self.log.info("Number of SciObj to import: {}".format(total_count))
         self.sciobj_tracker = self.tracker.tracker("Importing SciObj", total_count)
-        async for object_info_pyxb in self.async_object_list_iter:
-            pid = object_info_pyxb.identifier.value()
-            await self.add_task(self.sciobj_import_pid(pid))
+        page_size = self.async_object_list_iter.page_size
+        page_count = (total_count + page_size - 1) // page_size
+        completed_count = self.checkpoint.get_completed_count("sciobj")
+        if completed_count:
+            self.log.info(
+                "Skipping SciObj pages imported earlier. pages={} of {}".format(
+                    completed_count, page_count
+                )
+            )
+        for page_idx in range(page_count):
+            if self.checkpoint.is_completed("sciobj", page_idx):
+                continue
+            await self.add_task(self.sciobj_import_page(page_idx, page_size))
+
+    async def sciobj_import_page(self, page_idx, page_size):
+        # Only the identifiers are needed, so the page is deserialized to records
+        # instead of validated PyXB objects.
+        object_list_record = await self.async_d1_client.list_objects(
+            start=page_idx * page_size,
+            count=page_size,
+            as_records=True,
+            **self.sciobj_list_arg_dict
+        )
+        page_key = self.checkpoint.begin_page("sciobj", page_idx)
+        await self.sciobj_import_pid_list(
+            [o.identifier for o in object_list_record.objectInfo], page_key
+        )
+        self.checkpoint.end_page(page_key)
 
     async def sciobj_import_by_pid_list(self):
-        """Import SciObj specified by PID list file."""
+        """Import SciObj specified by PID list file.
+
+        Progress is not recorded in the checkpoint. Objects imported by an earlier,
+        interrupted import are skipped because they already exist.
+
+        """
         self.log.info("Starting SciObj import from PID file")
-        pid_list = self.load_set_from_file(self.opt_dict["pid_path"])
+        pid_list = sorted(self.pid_set)
         total_count = len(pid_list)
         self.log.info("Number of SciObj to import: {}".format(total_count))
         if not total_count:
@@ -188,34 +420,96 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
         self.sciobj_tracker = self.tracker.tracker(
             "Importing SciObj by PID list file", total_count
         )
-        for pid in pid_list:
-            await self.add_task(self.sciobj_import_pid(pid))
+        page_size = self.async_object_list_iter.page_size
+        for i in range(0, total_count, page_size):
+            await self.add_task(
+                self.sciobj_import_pid_list(pid_list[i : i + page_size], None)
+            )
 
-    async def sciobj_import_pid(self, pid):
-        """Import SciObj SysMeta and bytes"""
+    async def sciobj_import_pid_list(self, pid_list, page_key):
+        """Import a list of SciObj concurrently, skipping the ones that already exist
+        locally with a single query."""
+        existing_pid_set = await self.db_call(self.get_existing_pid_set, pid_list)
+        await asyncio.gather(
+            *[
+                self.sciobj_import_pid(pid, page_key, pid in existing_pid_set)
+                for pid in pid_list
+            ]
+        )
+
+    def get_existing_pid_set(self, pid_list):
+        return set(
+            d1_gmn.app.models.ScienceObject.objects.filter(
+                pid__did__in=pid_list
+            ).values_list("pid__did", flat=True)
+        )
+
+    async def sciobj_import_pid(self, pid, page_key, is_existing):
+        """Import SciObj SysMeta and bytes.
+
+        The SciObj is added to the current batch, and is written to the DB when the
+        batch is full.
+
+        """
         self.log.debug("Starting import of SciObj: {}".format(pid))
         self.sciobj_tracker.step()
-        if d1_gmn.app.did.is_existing_object(pid):
+        if is_existing or pid in self.sciobj_pending_pid_set:
             self.sciobj_tracker.event(
                 "Skipped object import: Local object already exists",
                 'pid="{}"'.format(pid),
             )
             return
 
-        with django.db.transaction.atomic():
-            await self.sciobj_download_and_create(pid)
+        self.sciobj_pending_pid_set.add(pid)
+        async with self.download_semaphore:
+            item_tup = await self.sciobj_download(pid)
+        if item_tup is None:
+            self.sciobj_pending_pid_set.discard(pid)
+            self.checkpoint.fail_page(page_key)
+            return
 
-        if self.opt_dict["deep"]:
-            if d1_gmn.app.did.is_resource_map_db(pid):
-                for (
-                    member_pid
-                ) in d1_gmn.app.resource_map.get_resource_map_members_by_map(pid):
-                    await self.sciobj_import_pid(member_pid)
-                    self.sciobj_tracker.event(
-                        "Imported aggregated SciObj", 'pid="{}"'.format(pid)
-                    )
+        self.checkpoint.add_item(page_key)
+        sysmeta_pyxb, sciobj_url, checksum_dict = item_tup
+        self.sciobj_batch_list.append(
+            (sysmeta_pyxb, sciobj_url, checksum_dict, page_key)
+        )
+        if len(self.sciobj_batch_list) >= self.opt_dict["batch_size"]:
+            await self.sciobj_flush_batch()
+
+        # With --deep, the members of Resource Maps are found by parsing the
+        # downloaded Resource Map, so the import does not wait for the map to be
+        # written to the DB. The members are included in the page of the map.
+        if (
+            self.opt_dict["deep"]
+            and d1_gmn.app.resource_map.is_resource_map_sysmeta_pyxb(sysmeta_pyxb)
+            and d1_gmn.app.sciobj_store.is_existing_sciobj_file(pid)
+        ):
+            member_pid_list = await asyncio.get_event_loop().run_in_executor(
+                None, self.get_resource_map_member_list, pid
+            )
+            await self.sciobj_import_pid_list(member_pid_list, page_key)
+            self.sciobj_tracker.event(
+                "Imported aggregated SciObj",
+                'pid="{}"'.format(pid),
+                len(member_pid_list),
+            )
+
+    def get_resource_map_member_list(self, pid):
+        return [
+            str(member_pid)
+            for member_pid in d1_gmn.app.resource_map.get_resource_map_from_sciobj(
+                pid
+            ).getAggregatedPids()
+        ]
 
-    async def sciobj_download_and_create(self, pid):
+    async def sciobj_download(self, pid):
+        """Download the SysMeta and bytes of a SciObj.
+
+        Returns:
+            tuple: SysMeta PyXB, SciObj URL and checksum dict. None if the SciObj
+            could not be downloaded.
+
+        """
         try:
             sysmeta_pyxb = await self.async_d1_client.get_system_metadata(pid)
         except d1_common.types.exceptions.DataONEException as e:
@@ -226,6 +520,7 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             )
             return
 
+        checksum_dict = None
         sciobj_url = await self.sciobj_get_proxy_location(pid)
         if sciobj_url:
             self.sciobj_tracker.event(
@@ -234,7 +529,9 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             )
         else:
             try:
-                await self.sciobj_download_bytes_to_store(pid)
+                checksum_dict = await self.sciobj_download_bytes_to_store(
+                    pid, sysmeta_pyxb.checksum.algorithm
+                )
             except d1_common.types.exceptions.DataONEException as e:
                 self.sciobj_tracker.event(
                     "SciObj import failed: MNRead.get() returned error",
@@ -244,13 +541,115 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
                 return
             sciobj_url = d1_gmn.app.sciobj_store.get_rel_sciobj_file_url_by_pid(pid)
 
-        d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb, sciobj_url)
+        return sysmeta_pyxb, sciobj_url, checksum_dict
+
+    async def sciobj_flush_batch(self):
+        """Hand the current batch to the DB writer.
+
+        If the DB writer is too far behind, wait for it before continuing, so that
+        the number of downloaded SciObj held in memory stays bounded.
+
+        """
+        if not self.sciobj_batch_list:
+            return
+        batch_list = self.sciobj_batch_list
+        self.sciobj_batch_list = []
+        while len(self.sciobj_write_task_set) >= MAX_PENDING_BATCHES:
+            await asyncio.wait(
+                self.sciobj_write_task_set.copy(),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        task = asyncio.ensure_future(self.sciobj_write_batch(batch_list))
+        self.sciobj_write_task_set.add(task)
+        task.add_done_callback(self.sciobj_write_task_set.discard)
+
+    async def sciobj_await_writes(self):
+        while self.sciobj_write_task_set:
+            await asyncio.wait(self.sciobj_write_task_set.copy())
+
+    async def sciobj_write_batch(self, batch_list):
+        pid_list = [
+            d1_common.xml.get_req_val(item_tup[0].identifier) for item_tup in batch_list
+        ]
+        try:
+            error_dict = await self.db_call(self.sciobj_create_batch, batch_list)
+        except Exception as e:
+            self.log.exception("Unable to write SciObj batch to DB")
+            error_dict = {pid: str(e) for pid in pid_list}
+        try:
+            for pid, item_tup in zip(pid_list, batch_list):
+                if pid in error_dict:
+                    self.sciobj_tracker.event(
+                        "Import failed: Unable to write SciObj to DB",
+                        'pid="{}" error="{}"'.format(pid, error_dict[pid]),
+                        is_error=True,
+                    )
+                    self.checkpoint.fail_page(item_tup[3])
+                else:
+                    self.sciobj_tracker.event("Imported SciObj", 'pid="{}"'.format(pid))
+        finally:
+            self.sciobj_pending_pid_set.difference_update(pid_list)
+            for item_tup in batch_list:
+                self.checkpoint.complete_item(item_tup[3])
+
+    def sciobj_create_batch(self, batch_list):
+        """Write the SysMeta and checksums of the downloaded SciObjs to the DB.
 
-        if d1_gmn.app.resource_map.is_resource_map_sysmeta_pyxb(sysmeta_pyxb):
-            d1_gmn.app.resource_map.create_or_update_db(sysmeta_pyxb)
-            self.sciobj_tracker.event("Processed Resource Map", 'pid="{}"'.format(pid))
+        The batch is written in a single transaction, with a bounded number of queries.
+        If that fails, each SciObj is written in a separate transaction, so that only
+        the SciObjs that cannot be written fail.
 
-        self.sciobj_tracker.event("Imported SciObj", 'pid="{}"'.format(pid))
+        Runs in the DB writer thread.
+
+        Returns:
+            dict: PID -> error message for the SciObjs that could not be written.
+
+        """
+        try:
+            self.sciobj_create_items(batch_list)
+        except Exception as e:
+            if len(batch_list) == 1:
+                return {d1_common.xml.get_req_val(batch_list[0][0].identifier): str(e)}
+            self.log.warning(
+                "Unable to write SciObj batch to DB. Writing SciObjs separately. "
+                'error="{}"'.format(str(e))
+            )
+        else:
+            return {}
+        error_dict = {}
+        for item_tup in batch_list:
+            try:
+                self.sciobj_create_items([item_tup])
+            except Exception as e:
+                pid = d1_common.xml.get_req_val(item_tup[0].identifier)
+                self.log.debug(
+                    'Unable to write SciObj to DB. pid="{}" error="{}"'.format(
+                        pid, str(e)
+                    )
+                )
+                error_dict[pid] = str(e)
+        return error_dict
+
+    def sciobj_create_items(self, batch_list):
+        """Write SciObjs to the DB in a single transaction."""
+        sysmeta_pyxb_list, sciobj_url_list, checksum_dict_list, _ = zip(*batch_list)
+        try:
+            with django.db.transaction.atomic():
+                sciobj_model_list = d1_gmn.app.sysmeta.create_or_update_bulk(
+                    sysmeta_pyxb_list, sciobj_url_list, self.dimension_cache
+                )
+                d1_gmn.app.sciobj_checksum.create_bulk(
+                    sciobj_model_list, checksum_dict_list, self.dimension_cache
+                )
+                for sysmeta_pyxb in sysmeta_pyxb_list:
+                    if d1_gmn.app.resource_map.is_resource_map_sysmeta_pyxb(
+                        sysmeta_pyxb
+                    ):
+                        d1_gmn.app.resource_map.create_or_update_db(sysmeta_pyxb)
+        except Exception:
+            # Ids of dimension rows created in the rolled back transaction are invalid.
+            self.dimension_cache.clear()
+            raise
 
     async def sciobj_get_proxy_location(self, pid):
         """If object is a proxy, return the proxy location URL.
@@ -264,18 +663,58 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             # Workaround for older GMNs that return 500 instead of 404 for describe()
             pass
 
-    async def sciobj_download_bytes_to_store(self, pid):
+    async def sciobj_download_bytes_to_store(
+        self, pid, sysmeta_checksum_algorithm_str=None
+    ):
+        """Download the SciObj bytes to the SciObj store.
+
+        The bytes are downloaded to a partial file, which is moved to its final location
+        in the SciObj store only when the download is complete. So a file in the SciObj
+        store is never a truncated download from an interrupted import.
+
+        Returns:
+            dict: DataONE checksum algorithm -> checksum of the bytes, calculated while
+            downloading, or from the file if it was already in the SciObj store.
+
+        """
+        checksum_calculator = d1_gmn.app.sciobj_checksum.ChecksumCalculator(
+            d1_gmn.app.sciobj_checksum.get_algorithm_list(
+                sysmeta_checksum_algorithm_str
+            )
+        )
         if d1_gmn.app.sciobj_store.is_existing_sciobj_file(pid):
             self.sciobj_tracker.event(
                 "Skipped object bytes download: File already in local SciObj store",
                 'pid="{}"'.format(pid),
             )
-            return
+            await asyncio.get_event_loop().run_in_executor(
+                None, self.add_sciobj_file_to_checksum, pid, checksum_calculator
+            )
+            return checksum_calculator.get_checksum_dict()
 
-        with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(
-            pid, write=True
-        ) as sciobj_file:
-            await self.async_d1_client.get(sciobj_file, pid)
+        partial_path = d1_gmn.app.replica_download.get_partial_path(pid)
+        d1_common.utils.filesystem.create_missing_directories_for_file(partial_path)
+        try:
+            with open(partial_path, "wb") as partial_file:
+                await self.async_d1_client.get(
+                    d1_gmn.app.sciobj_checksum.ChecksumFileWriter(
+                        partial_file, checksum_calculator
+                    ),
+                    pid,
+                )
+        except BaseException:
+            d1_gmn.app.replica_download.delete_partial_file(pid)
+            raise
+        d1_gmn.app.replica_download.move_to_store(pid)
+        return checksum_calculator.get_checksum_dict()
+
+    def add_sciobj_file_to_checksum(self, pid, checksum_calculator):
+        with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(pid) as sciobj_file:
+            while True:
+                chunk_bytes = sciobj_file.read(django.conf.settings.NUM_CHUNK_BYTES)
+                if not chunk_bytes:
+                    break
+                checksum_calculator.update(chunk_bytes)
 
     def get_list_objects_arg_dict(self):
         """Create a dict of arguments that will be passed to listObjects().
@@ -296,38 +735,103 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
     # Event Logs
 
     async def event_import_all(self):
-        """Import all events on remote MN."""
+        """Import all events on remote MN.
+
+        The pages of the event log are retrieved concurrently, and each page is
+        written to the DB with a single bulk insert.
+
+        """
         self.log.info("Starting Event Log import")
-        total_count = await self.async_event_log_iter.total
+        self.event_list_arg_dict, total_count = await self.begin_phase(
+            "event",
+            self.async_d1_client.get_log_records,
+            self.async_event_log_iter.list_arg_dict,
+        )
         self.log.info("Number of events to import: {}".format(total_count))
         self.event_tracker = self.tracker.tracker("Importing Event Logs", total_count)
-        async for log_entry_pyxb in self.async_event_log_iter:
-            await self.add_task(self.event_import_entry(log_entry_pyxb))
-
-    async def event_import_entry(self, log_entry_pyxb):
-        self.event_tracker.step()
-        pid = d1_common.xml.get_req_val(log_entry_pyxb.identifier)
-        if not d1_gmn.app.did.is_existing_object(pid):
+        page_size = self.async_event_log_iter.page_size
+        page_count = (total_count + page_size - 1) // page_size
+        completed_count = self.checkpoint.get_completed_count("event")
+        if completed_count:
+            self.log.info(
+                "Skipping Event Log pages imported earlier. pages={} of {}".format(
+                    completed_count, page_count
+                )
+            )
+        for page_idx in range(page_count):
+            if self.checkpoint.is_completed("event", page_idx):
+                continue
+            await self.add_task(self.event_import_page(page_idx, page_size))
+
+    async def event_import_page(self, page_idx, page_size):
+        log_record = await self.async_d1_client.get_log_records(
+            start=page_idx * page_size,
+            count=page_size,
+            as_records=True,
+            **self.event_list_arg_dict
+        )
+        page_key = self.checkpoint.begin_page("event", page_idx)
+        log_entry_record_list = log_record.logEntry
+        for _ in log_entry_record_list:
+            self.event_tracker.step()
+        try:
+            imported_count = await self.db_call(
+                self.event_create_batch, log_entry_record_list
+            )
+        except Exception as e:
+            self.log.exception("Unable to write events to DB")
             self.event_tracker.event(
-                "Skipped Event Log: Local object does not exist", 'pid="{}"'.format(pid)
+                "Import failed: Unable to write events to DB",
+                'page={} error="{}"'.format(page_idx, str(e)),
+                len(log_entry_record_list),
+                is_error=True,
             )
-            return
+            self.checkpoint.fail_page(page_key)
+        else:
+            self.event_tracker.event("Imported Event", count_int=imported_count)
+            skipped_count = len(log_entry_record_list) - imported_count
+            if skipped_count:
+                self.event_tracker.event(
+                    "Skipped Event Log: Local object does not exist",
+                    count_int=skipped_count,
+                )
+        self.checkpoint.end_page(page_key)
 
-        with django.db.transaction.atomic():
+    def event_create_batch(self, log_entry_record_list):
+        """Write a page of events to the DB with a bounded number of queries.
 
-            event_log_model = d1_gmn.app.event_log.create_log_entry(
-                d1_gmn.app.model_util.get_sci_model(pid),
-                log_entry_pyxb.event,
-                log_entry_pyxb.ipAddress,
-                log_entry_pyxb.userAgent,
-                log_entry_pyxb.subject.value(),
-            )
-            event_log_model.timestamp = d1_common.date_time.normalize_datetime_to_utc(
-                log_entry_pyxb.dateLogged
-            )
-            event_log_model.save()
+        Runs in the DB writer thread.
+
+        Args:
+            log_entry_record_list: list of d1_common.type_records.LogEntryRecord
 
-        self.event_tracker.event("Imported Event", 'pid="{}"'.format(pid))
+        Returns:
+            int: Number of events written. Events for objects that do not exist
+            locally are skipped.
+
+        """
+        sciobj_id_dict = dict(
+            d1_gmn.app.models.ScienceObject.objects.filter(
+                pid__did__in={r.identifier for r in log_entry_record_list}
+            ).values_list("pid__did", "id")
+        )
+        row_list = [
+            {
+                "sciobj_id": sciobj_id_dict[log_entry_record.identifier],
+                "event": log_entry_record.event,
+                "ip_address": log_entry_record.ipAddress,
+                "user_agent": log_entry_record.userAgent,
+                "subject": log_entry_record.subject,
+                "timestamp": d1_common.date_time.normalize_datetime_to_utc(
+                    log_entry_record.dateLogged
+                ),
+            }
+            for log_entry_record in log_entry_record_list
+            if log_entry_record.identifier in sciobj_id_dict
+        ]
+        if not row_list:
+            return 0
+        return d1_gmn.app.event_log_writer.create_bulk(row_list, self.dimension_cache)
 
     def get_log_records_arg_dict(self):
         """Create a dict of arguments that will be passed to getLogRecords().
@@ -345,3 +849,161 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             arg_dict["nodeId"] = django.conf.settings.NODE_IDENTIFIER
         self.log.debug("getLogRecords args: {}".format(arg_dict))
         return arg_dict
+
+
+class ImportCheckpoint(object):
+    """Record the pages of ``listObjects()`` and ``getLogRecords()`` results that have
+    been completely imported, so that an interrupted import can resume where it
+    stopped.
+
+    A page is completed when all of its items have been written to the DB or skipped
+    because they already existed locally. Pages with items that could not be imported
+    are not completed, so they are retried when the import is run again.
+
+    Pages are only valid for the results they were listed from, so for each phase, the
+    checkpoint also records the toDate that limits the results, and the number of items
+    in the results.
+
+    The checkpoint file is rewritten each time a page is completed. If the import is
+    interrupted between committing a page of events and recording the page, the events
+    in that page are imported twice when the import is resumed.
+
+    """
+
+    PHASE_LIST = ["sciobj", "event"]
+
+    def __init__(self, path, key_dict, is_restart=False):
+        self._path = path
+        self._key_dict = key_dict
+        self._completed_dict = {phase: set() for phase in self.PHASE_LIST}
+        # phase -> [to_date, total_count]
+        self._source_dict = {}
+        # (phase, page_idx) -> [pending_item_count, is_listed, is_failed]
+        self._page_dict = {}
+        self.is_resumed = False
+        self.is_failed = False
+        if not is_restart:
+            self._load()
+
+    def is_completed(self, phase, page_idx):
+        return page_idx in self._completed_dict[phase]
+
+    def get_completed_count(self, phase):
+        return len(self._completed_dict[phase])
+
+    def get_source(self, phase):
+        """Returns:
+            tuple: toDate and number of items recorded for the phase. (None, None) if
+            the phase has not been started.
+
+        """
+        return tuple(self._source_dict.get(phase, (None, None)))
+
+    def begin_phase(self, phase, to_date, total_count):
+        """Record the toDate and number of items of the results of a phase that is
+        started over. Pages completed earlier in the phase are discarded."""
+        self._source_dict[phase] = [to_date, total_count]
+        self._completed_dict[phase] = set()
+        self._save()
+
+    def fail_phase(self, phase):
+        """Call if the results of the phase changed while it was running, so that the
+        phase is started over by the next run."""
+        self.is_failed = True
+        self._source_dict.pop(phase, None)
+        self._completed_dict[phase] = set()
+        self._save()
+
+    def begin_page(self, phase, page_idx):
+        """Start tracking the items in a page.
+
+        Returns:
+            tuple: Key for the page, to be passed to the other methods.
+
+        """
+        page_key = phase, page_idx
+        self._page_dict[page_key] = [0, False, False]
+        return page_key
+
+    def end_page(self, page_key):
+        """Call when all items in the page have been added."""
+        self._page_dict[page_key][1] = True
+        self._complete_if_done(page_key)
+
+    def add_item(self, page_key):
+        """Call for each item in the page that is waiting to be written to the DB.
+
+        A page key of None is ignored, which allows tracking items that are not part
+        of a page.
+
+        """
+        if page_key is not None:
+            self._page_dict[page_key][0] += 1
+
+    def complete_item(self, page_key):
+        if page_key is not None:
+            self._page_dict[page_key][0] -= 1
+            self._complete_if_done(page_key)
+
+    def fail_page(self, page_key):
+        self.is_failed = True
+        if page_key is not None:
+            self._page_dict[page_key][2] = True
+
+    def delete(self):
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
+
+    def _complete_if_done(self, page_key):
+        pending_count, is_listed, is_failed = self._page_dict[page_key]
+        if not is_listed or pending_count:
+            return
+        del self._page_dict[page_key]
+        if not is_failed:
+            phase, page_idx = page_key
+            self._completed_dict[phase].add(page_idx)
+            self._save()
+
+    def _load(self):
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                checkpoint_dict = json.load(f)
+        except FileNotFoundError:
+            return
+        except (EnvironmentError, ValueError) as e:
+            logger.warning(
+                'Ignored unreadable checkpoint. path="{}" error="{}"'.format(
+                    self._path, str(e)
+                )
+            )
+            return
+        if checkpoint_dict.get("key") != self._key_dict:
+            logger.warning(
+                "Ignored checkpoint from import with different source or paging. "
+                'path="{}"'.format(self._path)
+            )
+            return
+        for phase in self.PHASE_LIST:
+            self._completed_dict[phase] = set(checkpoint_dict["completed"][phase])
+        self._source_dict = checkpoint_dict.get("source", {})
+        self.is_resumed = True
+
+    def _save(self):
+        # Write to a temporary file and rename, so that an interruption while writing
+        # does not leave a truncated checkpoint.
+        tmp_path = self._path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "key": self._key_dict,
+                    "source": self._source_dict,
+                    "completed": {
+                        phase: sorted(page_idx_set)
+                        for phase, page_idx_set in self._completed_dict.items()
+                    },
+                },
+                f,
+            )
+        os.replace(tmp_path, self._path)
@@ -0,0 +1,203 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Verify the checksums stored for local Science Objects against the object bytes.
+
+This command should run periodically, typically via cron. It can also be run manually as
+required.
+
+GMN calculates checksums when the bytes of local objects are received and stores them
+in the database, from where they are returned by MNRead.getChecksum(). This reads the
+bytes of the objects for which the stored checksums were least recently verified,
+recalculates the checksums and compares them with the stored checksums and the checksum
+in the System Metadata.
+
+- Objects for which no checksums have been stored, such as objects created before the
+  checksums were stored, are processed first and their checksums are stored.
+
+- Checksums that still match the object bytes are marked as verified.
+
+- Mismatches are logged as errors. Stored checksums that do not match the object bytes
+  are not modified, so the objects are processed again on the next run.
+
+- Proxy objects are not processed.
+
+To limit the impact on other users of the storage, the rate at which the object bytes
+are read can be limited with --max-bytes-per-sec. Use --max-objects to bound the time
+used by each run.
+
+"""
+import datetime
+
+import d1_common.checksum
+import d1_common.date_time
+
+import django.conf
+import django.db.models
+
+import d1_gmn.app.mgmt_base
+import d1_gmn.app.models
+import d1_gmn.app.sciobj_checksum
+import d1_gmn.app.sciobj_store
+import d1_gmn.app.throttle
+
+
+class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(__doc__, __name__, *args, **kwargs)
+        self.scrub_tracker = None
+        self.throttle = None
+
+    def add_components(self, parser):
+        self.using_single_instance(parser)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-bytes-per-sec",
+            type=int,
+            default=0,
+            help="Limit the rate at which object bytes are read. 0 is unlimited",
+        )
+        parser.add_argument(
+            "--min-age-days",
+            type=int,
+            default=30,
+            help="Only verify checksums that were last verified at least this many "
+            "days ago",
+        )
+        parser.add_argument(
+            "--max-objects",
+            type=int,
+            default=0,
+            help="Maximum number of objects to process. 0 is unlimited",
+        )
+
+    def handle_serial(self):
+        self.throttle = d1_gmn.app.throttle.ByteRateThrottle(
+            self.opt_dict["max_bytes_per_sec"]
+        )
+        sciobj_queryset = self.query_sciobj()
+        sciobj_count = sciobj_queryset.count()
+        if not sciobj_count:
+            self.log.debug("No SciObj checksums to verify")
+            return
+        self.scrub_tracker = self.tracker.tracker(
+            "Verifying SciObj checksums", sciobj_count
+        )
+        # The number of objects is unbounded if --max-objects is not set, so the
+        # objects are streamed instead of being loaded into memory.
+        for sciobj_model in sciobj_queryset.iterator():
+            self.scrub_tracker.step()
+            self.scrub(sciobj_model)
+
+    def query_sciobj(self):
+        """Get the local objects, ordered with the objects for which no checksums have
+        been stored first, followed by the objects with the least recently verified
+        checksums."""
+        oldest_verified_timestamp = d1_common.date_time.utc_now() - datetime.timedelta(
+            days=self.opt_dict["min_age_days"]
+        )
+        queryset = (
+            d1_gmn.app.models.ScienceObject.objects.filter(url__startswith="file://")
+            .select_related("pid", "checksum_algorithm")
+            .annotate(
+                verified_timestamp=django.db.models.Min(
+                    "scienceobjectchecksum__verified_timestamp"
+                )
+            )
+            .filter(
+                django.db.models.Q(verified_timestamp__isnull=True)
+                | django.db.models.Q(verified_timestamp__lte=oldest_verified_timestamp)
+            )
+            .order_by(
+                django.db.models.F("verified_timestamp").asc(nulls_first=True), "id"
+            )
+        )
+        if self.opt_dict["max_objects"]:
+            queryset = queryset[: self.opt_dict["max_objects"]]
+        return queryset
+
+    def scrub(self, sciobj_model):
+        pid = sciobj_model.pid.did
+        stored_checksum_dict = d1_gmn.app.sciobj_checksum.get_dict(sciobj_model)
+        sysmeta_algorithm_str = sciobj_model.checksum_algorithm.checksum_algorithm
+        algorithm_list = d1_gmn.app.sciobj_checksum.get_algorithm_list(
+            sysmeta_algorithm_str
+        ) + [
+            a
+            for a in stored_checksum_dict
+            if d1_common.checksum.is_supported_algorithm(a)
+        ]
+        try:
+            calculated_checksum_dict = self.calculate_checksums(
+                sciobj_model, algorithm_list
+            )
+        except EnvironmentError as e:
+            self.scrub_tracker.event(
+                "Unable to read SciObj bytes", f'pid="{pid}" error="{e}"', is_error=True
+            )
+            return
+
+        if not self.is_equal_checksum(
+            calculated_checksum_dict.get(sysmeta_algorithm_str), sciobj_model.checksum
+        ):
+            self.scrub_tracker.event(
+                "Checksum mismatch: System Metadata",
+                f'pid="{pid}" algorithm="{sysmeta_algorithm_str}" '
+                f'sysmeta="{sciobj_model.checksum}" '
+                f'calculated="{calculated_checksum_dict.get(sysmeta_algorithm_str)}"',
+                is_error=True,
+            )
+
+        verified_checksum_dict = {}
+        for algorithm_str, checksum_str in calculated_checksum_dict.items():
+            stored_checksum_str = stored_checksum_dict.get(algorithm_str)
+            if stored_checksum_str is None:
+                self.scrub_tracker.event("Stored missing checksum", f'pid="{pid}"')
+            elif not self.is_equal_checksum(checksum_str, stored_checksum_str):
+                self.scrub_tracker.event(
+                    "Checksum mismatch: Stored checksum",
+                    f'pid="{pid}" algorithm="{algorithm_str}" '
+                    f'stored="{stored_checksum_str}" calculated="{checksum_str}"',
+                    is_error=True,
+                )
+                continue
+            verified_checksum_dict[algorithm_str] = checksum_str
+
+        d1_gmn.app.sciobj_checksum.save(sciobj_model, verified_checksum_dict)
+        self.scrub_tracker.event("Verified SciObj checksums", f'pid="{pid}"')
+
+    def calculate_checksums(self, sciobj_model, algorithm_list):
+        checksum_calculator = d1_gmn.app.sciobj_checksum.ChecksumCalculator(
+            algorithm_list
+        )
+        abs_path = d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_url(
+            sciobj_model.url
+        )
+        with d1_gmn.app.sciobj_store.open_sciobj_file_by_path_ctx(abs_path) as f:
+            while True:
+                chunk_bytes = f.read(django.conf.settings.NUM_CHUNK_BYTES)
+                if not chunk_bytes:
+                    break
+                checksum_calculator.update(chunk_bytes)
+                self.throttle.add(len(chunk_bytes))
+        return checksum_calculator.get_checksum_dict()
+
+    def is_equal_checksum(self, a_str, b_str):
+        return (
+            a_str is not None and b_str is not None and a_str.lower() == b_str.lower()
+        )
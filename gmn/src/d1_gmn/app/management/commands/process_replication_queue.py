@@ -24,11 +24,23 @@ CNs call MNReplication.replicate() to request the creation of replicas. GMN queu
 requests and processes them asynchronously. This command iterates over the requests and
 attempts to create the replicas.
 
+Replicas are downloaded concurrently by a pool of worker threads. The number of
+concurrent downloads is limited by the REPLICATION_MAX_CONCURRENT setting, and by the
+REPLICATION_MAX_CONCURRENT_PER_NODE setting for each source node. The combined download
+rate from each source node can be limited with the
+REPLICATION_MAX_BYTES_PER_SEC_PER_NODE setting.
+
+Interrupted downloads are resumed on the next attempt. See d1_gmn.app.replica_download.
+
+The worker threads only download. The replicas are recorded in the database by the main
+thread as the downloads complete.
+
 """
+import collections
+import concurrent.futures
+import threading
 
 import d1_common.types.exceptions
-import d1_common.utils.filesystem
-import d1_common.utils.ulog
 import d1_common.xml
 
 import d1_client.cnclient
@@ -39,42 +51,125 @@ import django.core.management.base
 import django.db.transaction
 
 import d1_gmn.app.did
+import d1_gmn.app.dimension_cache
 import d1_gmn.app.event_log
 import d1_gmn.app.mgmt_base
 import d1_gmn.app.models
+import d1_gmn.app.replica_download
+import d1_gmn.app.sciobj_checksum
 import d1_gmn.app.sciobj_store
 import d1_gmn.app.sysmeta
+import d1_gmn.app.throttle
+
+DIMENSION_CACHE_SIZE = 10000
 
 
 class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
     def __init__(self, *args, **kwargs):
         super().__init__(__doc__, __name__, *args, **kwargs)
+        self.cn_client = None
+        self.dimension_cache = d1_gmn.app.dimension_cache.DimensionIdCache(
+            DIMENSION_CACHE_SIZE
+        )
+        # Source node ID -> BaseURL. Resolved with a single CNCore.listNodes() call.
+        self.node_base_url_dict = None
+        # Source node ID -> ByteRateThrottle, shared by the workers for the node.
+        self.node_throttle_dict = {}
+        # Clients are not shared between threads. Each worker thread holds a CN client
+        # and a client, with its own connection pool, for each source node.
+        self.thread_local = threading.local()
+        self.replication_tracker = None
 
     def add_components(self, parser):
         self.using_single_instance(parser)
-        self.using_
-        self.cn_client = self.create_cn_client()
 
     def handle_serial(self):
+        self.cn_client = self.create_cn_client()
         self.process_replication_queue()
 
     def process_replication_queue(self):
-        queue_queryset = d1_gmn.app.models.ReplicationQueue.objects.filter(
-            local_replica__info__status__status="queued"
-        ).order_by("local_replica__info__timestamp", "local_replica__pid__did")
-        if not len(queue_queryset):
+        queue_list = list(
+            d1_gmn.app.models.ReplicationQueue.objects.filter(
+                local_replica__info__status__status="queued"
+            )
+            .select_related("local_replica__pid", "local_replica__info__member_node")
+            .order_by("local_replica__info__timestamp", "local_replica__pid__did")
+        )
+        if not queue_list:
             self.log.debug("No replication requests to process")
             return
-        for queue_model in queue_queryset:
-            self.process_replication_request(queue_model)
+        self.replication_tracker = self.tracker.tracker(
+            "Processing replication requests", len(queue_list)
+        )
+        self.node_base_url_dict = self.get_node_base_url_dict()
+        # Source node ID -> Requests not yet submitted to the worker pool, in queue
+        # order.
+        pending_dict = collections.OrderedDict()
+        for queue_model in queue_list:
+            pending_dict.setdefault(
+                queue_model.local_replica.info.member_node.urn, collections.deque()
+            ).append(queue_model)
+        active_count_dict = collections.Counter()
+        future_dict = {}
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, django.conf.settings.REPLICATION_MAX_CONCURRENT)
+        ) as executor:
+            while pending_dict or future_dict:
+                self.submit_downloads(
+                    executor, pending_dict, active_count_dict, future_dict
+                )
+                done_set, _ = concurrent.futures.wait(
+                    future_dict, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done_set:
+                    queue_model = future_dict.pop(future)
+                    active_count_dict[
+                        queue_model.local_replica.info.member_node.urn
+                    ] -= 1
+                    self.process_replication_request(queue_model, future)
         self.remove_completed_requests_from_queue()
 
-    def process_replication_request(self, queue_model):
+    def submit_downloads(self, executor, pending_dict, active_count_dict, future_dict):
+        """Submit pending requests to the worker pool while staying within the total
+        and per source node concurrency limits.
+
+        Requests are taken round-robin from the source nodes, so that a large backlog
+        from one node does not hold up replication from other nodes.
+        """
+        max_total = max(1, django.conf.settings.REPLICATION_MAX_CONCURRENT)
+        max_per_node = max(1, django.conf.settings.REPLICATION_MAX_CONCURRENT_PER_NODE)
+        is_submitted = True
+        while is_submitted and len(future_dict) < max_total:
+            is_submitted = False
+            for source_node_urn, queue_deque in list(pending_dict.items()):
+                if len(future_dict) >= max_total:
+                    break
+                if active_count_dict[source_node_urn] >= max_per_node:
+                    continue
+                queue_model = queue_deque.popleft()
+                if not queue_deque:
+                    del pending_dict[source_node_urn]
+                active_count_dict[source_node_urn] += 1
+                future = executor.submit(
+                    self.download_replica,
+                    queue_model.local_replica.pid.did,
+                    source_node_urn,
+                    self.get_node_throttle(source_node_urn),
+                )
+                future_dict[future] = queue_model
+                is_submitted = True
+
+    def process_replication_request(self, queue_model, download_future):
+        pid = queue_model.local_replica.pid.did
+        self.replication_tracker.step()
         self.log.info("-" * 100)
-        self.log.info("Processing PID: {}".format(queue_model.local_replica.pid.did))
+        self.log.info("Processing PID: {}".format(pid))
         try:
-            self.replicate(queue_model)
+            sysmeta_pyxb, checksum_dict = download_future.result()
+            self.replicate(queue_model, sysmeta_pyxb, checksum_dict)
         except Exception as e:
+            # Ids of dimension rows created in the rolled back transaction are invalid.
+            self.dimension_cache.clear()
             self.log.exception("Replication failed with exception:")
             num_failed_attempts = self.inc_and_get_failed_attempts(queue_model)
             if num_failed_attempts < django.conf.settings.REPLICATION_MAX_ATTEMPTS:
@@ -94,6 +189,7 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
                         django.conf.settings.REPLICATION_MAX_ATTEMPTS,
                     )
                 )
+                d1_gmn.app.replica_download.delete_partial_file(pid)
                 self.update_request_status(
                     queue_model,
                     "failed",
@@ -101,13 +197,14 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
                     if isinstance(e, d1_common.types.exceptions.DataONEException)
                     else None,
                 )
+            self.replication_tracker.event("Replication failed", f'pid="{pid}"')
+        else:
+            self.replication_tracker.event("Replicated", f'pid="{pid}"')
 
-    def replicate(self, queue_model):
+    def replicate(self, queue_model, sysmeta_pyxb, checksum_dict):
         with django.db.transaction.atomic():
-            sysmeta_pyxb = self.get_system_metadata(queue_model)
             self.set_origin(queue_model, sysmeta_pyxb)
-            sciobj_bytestream = self.get_sciobj_bytestream(queue_model)
-            self.create_replica(sysmeta_pyxb, sciobj_bytestream)
+            self.create_replica(sysmeta_pyxb, checksum_dict)
             self.update_request_status(queue_model, "completed")
 
     def set_origin(self, queue_model, sysmeta_pyxb):
@@ -160,47 +257,111 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
             try_count=1,
         )
 
-    def get_system_metadata(self, queue_model):
-        pid = queue_model.local_replica.pid.did
-        self.log.debug("Calling CNRead.getSystemMetadata() pid={}".format(pid))
-        return self.cn_client.getSystemMetadata(pid)
-
-    def get_sciobj_bytestream(self, queue_model):
-        source_node_base_url = self.resolve_source_node_id_to_base_url(
-            queue_model.local_replica.info.member_node.urn
-        )
-        mn_client = d1_client.mnclient.MemberNodeClient(
-            base_url=source_node_base_url,
+    def create_mn_client(self, base_url):
+        return d1_client.mnclient.MemberNodeClient(
+            base_url=base_url,
             cert_pem_path=django.conf.settings.CLIENT_CERT_PATH,
             cert_key_path=django.conf.settings.CLIENT_CERT_PRIVATE_KEY_PATH,
             try_count=1,
-        )
-        return self.open_sciobj_bytestream_on_member_node(
-            mn_client, queue_model.local_replica.pid.did
+            use_stream=True,
         )
 
-    def resolve_source_node_id_to_base_url(self, source_node):
-        node_list = self.get_node_list()
-        discovered_nodes = []
-        for node in node_list.node:
-            discovered_node_id = d1_common.xml.get_req_val(node.identifier)
-            discovered_nodes.append(discovered_node_id)
-            if discovered_node_id == source_node:
-                return node.baseURL
-        raise self.CommandError(
-            "Unable to resolve Source Node ID. "
-            'source_node="{}", discovered_nodes="{}"'.format(
-                source_node, ", ".join(discovered_nodes)
+    def get_node_base_url_dict(self):
+        try:
+            node_list = self.cn_client.listNodes()
+        except d1_common.types.exceptions.DataONEException:
+            # Without the NodeList, no source nodes can be resolved, and each request
+            # is recorded as a failed attempt.
+            self.log.exception("Unable to retrieve NodeList from CN:")
+            return {}
+        return {
+            d1_common.xml.get_req_val(node.identifier): node.baseURL
+            for node in node_list.node
+        }
+
+    def get_node_throttle(self, source_node_urn):
+        if source_node_urn not in self.node_throttle_dict:
+            self.node_throttle_dict[
+                source_node_urn
+            ] = d1_gmn.app.throttle.ByteRateThrottle(
+                django.conf.settings.REPLICATION_MAX_BYTES_PER_SEC_PER_NODE
             )
+        return self.node_throttle_dict[source_node_urn]
+
+    # Worker threads. These must not access the database.
+
+    def download_replica(self, pid, source_node_urn, throttle):
+        """Get the System Metadata for a replica from the CN and download the replica
+        bytes from the source node.
+
+        Returns:
+            2-tuple: System Metadata PyXB object, dict of checksums calculated from the
+            downloaded bytes.
+
+        """
+        self.log.debug("Calling CNRead.getSystemMetadata() pid={}".format(pid))
+        sysmeta_pyxb = self.get_thread_cn_client().getSystemMetadata(pid)
+        mn_client = self.get_thread_mn_client(source_node_urn)
+        checksum_dict = d1_gmn.app.replica_download.download(
+            mn_client,
+            pid,
+            d1_gmn.app.sciobj_checksum.get_algorithm_list(
+                sysmeta_pyxb.checksum.algorithm
+            ),
+            throttle,
+            sysmeta_pyxb.size,
         )
+        self.assert_checksum_matches_sysmeta(pid, sysmeta_pyxb, checksum_dict)
+        return sysmeta_pyxb, checksum_dict
+
+    def assert_checksum_matches_sysmeta(self, pid, sysmeta_pyxb, checksum_dict):
+        """Verify the downloaded bytes, which may have been assembled from several
+        partial downloads, against the checksum in the System Metadata."""
+        algorithm_str = sysmeta_pyxb.checksum.algorithm
+        if algorithm_str not in checksum_dict:
+            return
+        sysmeta_checksum_str = d1_common.xml.get_req_val(sysmeta_pyxb.checksum)
+        if checksum_dict[algorithm_str].lower() != sysmeta_checksum_str.lower():
+            d1_gmn.app.replica_download.delete_partial_file(pid)
+            raise d1_common.types.exceptions.ServiceFailure(
+                0,
+                "Checksum of downloaded replica does not match System Metadata. "
+                'pid="{}" algorithm="{}" sysmeta="{}" calculated="{}"'.format(
+                    pid,
+                    algorithm_str,
+                    sysmeta_checksum_str,
+                    checksum_dict[algorithm_str],
+                ),
+            )
 
-    def get_node_list(self):
-        return self.cn_client.listNodes()
+    def get_thread_cn_client(self):
+        if not hasattr(self.thread_local, "cn_client"):
+            self.thread_local.cn_client = self.create_cn_client()
+        return self.thread_local.cn_client
+
+    def get_thread_mn_client(self, source_node_urn):
+        if not hasattr(self.thread_local, "mn_client_dict"):
+            self.thread_local.mn_client_dict = {}
+        if source_node_urn not in self.thread_local.mn_client_dict:
+            self.thread_local.mn_client_dict[source_node_urn] = self.create_mn_client(
+                self.resolve_source_node_id_to_base_url(source_node_urn)
+            )
+        return self.thread_local.mn_client_dict[source_node_urn]
+
+    def resolve_source_node_id_to_base_url(self, source_node):
+        try:
+            return self.node_base_url_dict[source_node]
+        except KeyError:
+            raise self.CommandError(
+                "Unable to resolve Source Node ID. "
+                'source_node="{}", discovered_nodes="{}"'.format(
+                    source_node, ", ".join(sorted(self.node_base_url_dict))
+                )
+            )
 
-    def open_sciobj_bytestream_on_member_node(self, mn_client, pid):
-        return mn_client.getReplica(pid)
+    # Main thread
 
-    def create_replica(self, sysmeta_pyxb, sciobj_bytestream):
+    def create_replica(self, sysmeta_pyxb, checksum_dict):
         """GMN handles replicas differently from native objects, with the main
         differences being related to handling of restrictions related to revision chains
         and SIDs.
@@ -214,11 +375,14 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
         self.check_and_create_replica_revision(sysmeta_pyxb, "obsoletes")
         self.check_and_create_replica_revision(sysmeta_pyxb, "obsoletedBy")
         sciobj_url = d1_gmn.app.sciobj_store.get_rel_sciobj_file_url_by_pid(pid)
-        sciobj_model = d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb, sciobj_url)
-        self.store_science_object_bytes(pid, sciobj_bytestream)
+        sciobj_model = d1_gmn.app.sysmeta.create_or_update_bulk(
+            [sysmeta_pyxb], [sciobj_url], self.dimension_cache
+        )[0]
+        d1_gmn.app.sciobj_checksum.save(sciobj_model, checksum_dict)
         d1_gmn.app.event_log.create_log_entry(
             sciobj_model, "create", "0.0.0.0", "[replica]", "[replica]"
         )
+        d1_gmn.app.replica_download.move_to_store(pid)
 
     def check_and_create_replica_revision(self, sysmeta_pyxb, attr_str):
         revision_attr = getattr(sysmeta_pyxb, attr_str)
@@ -230,15 +394,6 @@ class Command(d1_gmn.app.mgmt_base.GMNCommandBase):
     def create_replica_revision_reference(self, pid):
         d1_gmn.app.models.replica_revision_chain_reference(pid)
 
-    def store_science_object_bytes(self, pid, sciobj_bytestream):
-        sciobj_path = d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid)
-        d1_common.utils.filesystem.create_missing_directories_for_file(sciobj_path)
-        with open(sciobj_path, "wb") as f:
-            for chunk in sciobj_bytestream.iter_content(
-                chunk_size=django.conf.settings.NUM_CHUNK_BYTES
-            ):
-                f.write(chunk)
-
     def assert_is_pid_of_local_unprocessed_replica(self, pid):
         if not d1_gmn.app.did.is_unprocessed_local_replica(pid):
             raise self.CommandError(
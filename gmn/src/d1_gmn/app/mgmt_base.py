@@ -299,6 +299,15 @@ class GMNCommandBase(django.core.management.base.BaseCommand):
         # else:
         #     logging.disable(logging.DEBUG)
 
+        # When called via call_command(), as in the tests, run_from_argv() is bypassed
+        # and the tracker must be set up here.
+        if self.tracker is None:
+            with d1_common.utils.progress_tracker.ProgressTracker(self.log) as tracker:
+                self.tracker = tracker
+                return self._call_handler()
+        return self._call_handler()
+
+    def _call_handler(self):
         try:
             return self._call_serial()
         except NotHandledError:
@@ -572,7 +581,7 @@ class GMNCommandBase(django.core.management.base.BaseCommand):
     async def add_task(self, task_func):
         if len(self.task_set) >= self.opt_dict["max_concurrent"]:
             await self.await_task()
-        self.task_set.add(task_func)
+        self.task_set.add(asyncio.ensure_future(task_func))
 
     async def await_task(self):
         task_set = self.task_set.copy()
@@ -27,11 +27,9 @@ import logging
 import d1_common.const
 import d1_common.date_time
 import d1_common.types.exceptions
-import d1_common.xml
 
 import django.conf
 import django.db
-import django.db.models
 import django.http
 import django.http.response
 import django.urls
@@ -39,6 +37,29 @@ import django.urls.base
 
 import d1_gmn.app.views.slice
 import d1_gmn.app.views.util
+import d1_gmn.app.xml_stream
+
+# Fields retrieved for each ObjectInfo in an ObjectList.
+OBJECT_LIST_FIELD_LIST = [
+    "id",
+    "pid__did",
+    "format__format",
+    "checksum",
+    "checksum_algorithm__checksum_algorithm",
+    "modified_timestamp",
+    "size",
+]
+
+# Fields retrieved for each LogEntry in a Log.
+LOG_FIELD_LIST = [
+    "id",
+    "sciobj__pid__did",
+    "ip_address__ip_address",
+    "subject__subject",
+    "user_agent__user_agent",
+    "event__event",
+    "timestamp",
+]
 
 
 class ResponseHandler:
@@ -98,127 +119,90 @@ class ResponseHandler:
         return response
 
     def _serialize_object(self, request, view_result):
-        response = django.http.HttpResponse()
+        """Stream the ObjectList or Log XML document for a slice.
+
+        The rows for the slice are retrieved before the response is returned, so the
+        Last-Modified and Link headers and the last-in-slice cache entry can be set. The
+        document is then generated as it is being returned to the client, so
+        Content-Length is not set.
+
+        """
         name_to_func_map = {
-            "object_list": (self._generate_object_list, ["modified_timestamp", "id"]),
-            "object_list_json": (
-                self._generate_object_field_json,
+            "object_list": (
+                d1_gmn.app.xml_stream.generate_object_list,
                 ["modified_timestamp", "id"],
+                OBJECT_LIST_FIELD_LIST,
+            ),
+            "log": (
+                d1_gmn.app.xml_stream.generate_log,
+                ["timestamp", "id"],
+                LOG_FIELD_LIST,
             ),
-            "log": (self._generate_log_records, ["timestamp", "id"]),
         }
-        d1_type_generator, sort_field_list = name_to_func_map[view_result["type"]]
-        d1_type_pyxb = d1_type_generator(
-            request, view_result["query"], view_result["start"], view_result["total"]
-        )
-        d1_type_latest_date = self._latest_date(
-            view_result["query"], sort_field_list[0]
-        )
+        xml_generator, sort_field_list, field_list = name_to_func_map[
+            view_result["type"]
+        ]
+        row_list = self._get_row_list(view_result["query"], field_list)
+        d1_type_latest_date = self._latest_date(row_list, sort_field_list[0])
         d1_gmn.app.views.slice.cache_add_last_in_slice(
             request,
-            view_result["query"],
+            row_list,
             view_result["start"],
             view_result["total"],
             sort_field_list,
         )
-        response.write(
-            d1_common.xml.serialize_for_transport(
-                d1_type_pyxb,
+        response = django.http.StreamingHttpResponse(
+            xml_generator(
+                d1_gmn.app.views.util.dataoneTypes(request),
+                row_list,
+                view_result["start"],
+                view_result["total"],
                 xslt_url=django.urls.base.reverse("home_xslt")
                 # d1_gmn.app.util.get_static_path('xslt/xhtml_grid.xsl')
             )
         )
-        self._set_headers(response, d1_type_latest_date, response.tell())
+        self._set_headers(response, d1_type_latest_date)
+        next_slice_url = d1_gmn.app.views.slice.get_next_slice_url(
+            request,
+            row_list,
+            view_result["start"],
+            view_result["total"],
+            sort_field_list,
+        )
+        if next_slice_url is not None:
+            response["Link"] = '<{}>; rel="next"'.format(next_slice_url)
         return response
 
-    def _generate_object_list(self, request, db_query, start, total):
-        objectList = d1_gmn.app.views.util.dataoneTypes(request).objectList()
-        for row in db_query:
-            objectInfo = d1_gmn.app.views.util.dataoneTypes(request).ObjectInfo()
-            objectInfo.identifier = row.pid.did
-            objectInfo.formatId = row.format.format
-            checksum = d1_gmn.app.views.util.dataoneTypes(request).Checksum(
-                row.checksum
-            )
-            checksum.algorithm = row.checksum_algorithm.checksum_algorithm
-            objectInfo.checksum = checksum
-            objectInfo.dateSysMetadataModified = d1_common.date_time.normalize_datetime_to_utc(
-                row.modified_timestamp
-            )
-            objectInfo.size = row.size
-            objectList.objectInfo.append(objectInfo)
-        objectList.start = start
-        objectList.count = len(objectList.objectInfo)
-        objectList.total = total
-        return objectList
-
-    def _generate_object_field_json(self, request, db_query, start, total):
-        objectList = d1_gmn.app.views.util.dataoneTypes(request).objectList()
-        for row in db_query:
-            objectInfo = d1_gmn.app.views.util.dataoneTypes(request).ObjectInfo()
-            objectInfo.identifier = row.pid.did
-            objectInfo.formatId = row.format.format
-            checksum = d1_gmn.app.views.util.dataoneTypes(request).Checksum(
-                row.checksum
-            )
-            checksum.algorithm = row.checksum_algorithm.checksum_algorithm
-            objectInfo.checksum = checksum
-            objectInfo.dateSysMetadataModified = d1_common.date_time.normalize_datetime_to_utc(
-                d1_common.date_time.row.modified_timestamp
-            )
-            objectInfo.size = row.size
-            objectList.objectInfo.append(objectInfo)
-        objectList.start = start
-        objectList.count = len(objectList.objectInfo)
-        objectList.total = total
-        return objectList
-
-    def _generate_log_records(self, request, db_query, start, total):
-        log = d1_gmn.app.views.util.dataoneTypes(request).log()
-        for row in db_query:
-            logEntry = d1_gmn.app.views.util.dataoneTypes(request).LogEntry()
-            logEntry.entryId = str(row.id)
-            logEntry.identifier = row.sciobj.pid.did
-            # Redact ipAddress and subject on records for which client has only "read"
-            # access.
-            if getattr(row, "redact", False):
-                logEntry.ipAddress = "<NotAuthorized>"
-                logEntry.subject = "<NotAuthorized>"
-            else:
-                logEntry.ipAddress = row.ip_address.ip_address
-                logEntry.subject = row.subject.subject
-            logEntry.userAgent = row.user_agent.user_agent
-            logEntry.event = row.event.event
-            logEntry.dateLogged = d1_common.date_time.normalize_datetime_to_utc(
-                row.timestamp
-            )
-            logEntry.nodeIdentifier = django.conf.settings.NODE_IDENTIFIER
-            log.logEntry.append(logEntry)
-        log.start = start
-        log.count = len(log.logEntry)
-        log.total = total
-        return log
+    def _get_row_list(self, db_query, field_list):
+        """Retrieve the slice as a list of dicts holding only the fields required for
+        generating the response.
+
+        The related fields are retrieved with JOINs in a single query. Iterating over
+        the model instances instead would issue separate queries for each related field
+        on each row.
+
+        """
+        if "redact" in db_query.query.annotations:
+            field_list = field_list + ["redact"]
+        return list(db_query.values(*field_list))
 
     def _http_response_with_identifier_type(self, request, pid):
         pid_pyxb = d1_gmn.app.views.util.dataoneTypes(request).identifier(pid)
         pid_xml = pid_pyxb.toxml("utf-8")
         return django.http.HttpResponse(pid_xml, d1_common.const.CONTENT_TYPE_XML)
 
-    def _set_headers(self, response, content_modified_timestamp, content_length):
+    def _set_headers(self, response, content_modified_timestamp):
         if content_modified_timestamp is not None:
             response["Last-Modified"] = d1_common.date_time.normalize_datetime_to_utc(
                 content_modified_timestamp
             )
-        response["Content-Length"] = str(content_length)
         response["Content-Type"] = d1_common.const.CONTENT_TYPE_XML
 
-    def _latest_date(self, query, datetime_field_name):
-        """Given a QuerySet and the name of field containing datetimes, return the
-        latest (most recent) date.
+    def _latest_date(self, row_list, datetime_field_name):
+        """Given a list of row dicts and the name of field containing datetimes,
+        return the latest (most recent) date.
 
-        Return None if QuerySet is empty.
+        Return None if the list is empty.
 
         """
-        return list(
-            query.aggregate(django.db.models.Max(datetime_field_name)).values()
-        )[0]
+        return max((row[datetime_field_name] for row in row_list), default=None)
@@ -28,12 +28,26 @@ equivalent identities and group memberships (no SubjectInfo). This limits the
 user's access to data that is publicly available and that is available directly
 to that user (as designated in the Subject DN).
 
+Extracting the subjects requires deserializing the SubjectInfo in the certificate, which
+is slow compared to the rest of the request. Clients such as CNs and harvesters connect
+with the same certificate many times, so the subjects are cached in a per-process LRU
+cache, keyed by the SHA-256 fingerprint of the certificate. Entries are dropped when the
+certificate expires. The size of the cache is set by settings.CERT_SUBJECT_CACHE_SIZE.
+
 """
+import collections
+import hashlib
+import ssl
+import threading
 
 import d1_common.cert.subjects
+import d1_common.cert.x509
 import d1_common.const
+import d1_common.date_time
 import d1_common.types.exceptions
 
+import django.conf
+
 
 def get_subjects(request):
     """Get all subjects in the certificate.
@@ -64,8 +78,107 @@ def get_authenticated_subjects(cert_pem):
     """
     if isinstance(cert_pem, str):
         cert_pem = cert_pem.encode("utf-8")
-    return d1_common.cert.subjects.extract_subjects(cert_pem)
+    max_size = django.conf.settings.CERT_SUBJECT_CACHE_SIZE
+    if not max_size:
+        return d1_common.cert.subjects.extract_subjects(cert_pem)
+    fingerprint_str = _get_fingerprint(cert_pem)
+    if fingerprint_str is None:
+        return d1_common.cert.subjects.extract_subjects(cert_pem)
+    return _subject_cache.get(fingerprint_str, cert_pem, max_size)
+
+
+def get_cache_stats():
+    """Return a dict with the size and hit/miss counters of the subject cache."""
+    return _subject_cache.get_stats()
+
+
+def clear_cache():
+    """Clear the subject cache and reset the counters."""
+    _subject_cache.clear()
 
 
 def _is_certificate_provided(request):
     return "SSL_CLIENT_CERT" in request.META and request.META["SSL_CLIENT_CERT"] != ""
+
+
+def _get_fingerprint(cert_pem):
+    """Return the hex SHA-256 fingerprint of the DER encoded certificate.
+
+    Returns None if ``cert_pem`` does not hold a single PEM encoded certificate, in which
+    case the certificate is not cached and errors are reported by the uncached path.
+
+    """
+    try:
+        cert_der = ssl.PEM_cert_to_DER_cert(cert_pem.decode("ascii"))
+    except ValueError:
+        return None
+    return hashlib.sha256(cert_der).hexdigest()
+
+
+def _get_not_after(cert_pem):
+    cert_obj = d1_common.cert.x509.deserialize_pem(cert_pem)
+    try:
+        return cert_obj.not_valid_after_utc
+    except AttributeError:
+        return d1_common.date_time.cast_naive_datetime_to_tz(cert_obj.not_valid_after)
+
+
+class _SubjectCache(object):
+    """Thread safe LRU cache of the subjects extracted from certificates."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entry_dict = collections.OrderedDict()
+        self._reset_counters()
+
+    def get(self, fingerprint_str, cert_pem, max_size):
+        now_dt = d1_common.date_time.utc_now()
+        with self._lock:
+            entry_tup = self._entry_dict.get(fingerprint_str)
+            if entry_tup is not None:
+                primary_str, equivalent_set, not_after_dt = entry_tup
+                if now_dt < not_after_dt:
+                    self._entry_dict.move_to_end(fingerprint_str)
+                    self._hit_count += 1
+                    return primary_str, set(equivalent_set)
+                del self._entry_dict[fingerprint_str]
+                self._expired_count += 1
+            self._miss_count += 1
+        primary_str, equivalent_set = d1_common.cert.subjects.extract_subjects(cert_pem)
+        not_after_dt = _get_not_after(cert_pem)
+        if now_dt < not_after_dt:
+            with self._lock:
+                self._entry_dict[fingerprint_str] = (
+                    primary_str,
+                    frozenset(equivalent_set),
+                    not_after_dt,
+                )
+                self._entry_dict.move_to_end(fingerprint_str)
+                while len(self._entry_dict) > max_size:
+                    self._entry_dict.popitem(last=False)
+                    self._evicted_count += 1
+        return primary_str, set(equivalent_set)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entry_dict),
+                "hits": self._hit_count,
+                "misses": self._miss_count,
+                "expired": self._expired_count,
+                "evicted": self._evicted_count,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entry_dict.clear()
+            self._reset_counters()
+
+    def _reset_counters(self):
+        self._hit_count = 0
+        self._miss_count = 0
+        self._expired_count = 0
+        self._evicted_count = 0
+
+
+_subject_cache = _SubjectCache()
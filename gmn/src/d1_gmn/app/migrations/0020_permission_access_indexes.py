@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 12:00
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('app', '0019_auto_20190418_1512')]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='permission',
+            index=models.Index(
+                fields=['subject', 'sciobj', 'level'],
+                name='app_permiss_subject_939c96_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='permission',
+            index=models.Index(
+                fields=['sciobj', 'subject', 'level'],
+                name='app_permiss_sciobj__d33899_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-18 12:00
+
+from django.db import migrations
+from django.db import models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [('app', '0020_permission_access_indexes')]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScienceObjectChecksum',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                ('checksum', models.CharField(max_length=128)),
+                ('verified_timestamp', models.DateTimeField(db_index=True)),
+                (
+                    'checksum_algorithm',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to='app.ScienceObjectChecksumAlgorithm',
+                    ),
+                ),
+                (
+                    'sciobj',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to='app.ScienceObject',
+                    ),
+                ),
+            ],
+            options={'unique_together': {('sciobj', 'checksum_algorithm')}},
+        ),
+    ]
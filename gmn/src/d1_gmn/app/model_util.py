@@ -91,23 +91,56 @@ def count_all_sysmeta_backed_sciobj():
     return query_all_sysmeta_backed_sciobj().count()
 
 
-def delete_unused_subjects():
+def delete_unused_subjects(subject_id_set=None):
     """Delete any unused subjects from the database.
 
     This is not strictly required as any unused subjects will automatically be reused if
     needed in the future.
 
+    Args:
+        subject_id_set: set of int
+            If provided, only the subjects with the given database IDs are checked, which
+            avoids a scan of the full Subject table. See get_sciobj_subject_id_set().
+
     """
     # This causes Django to create a single join (check with query.query)
     query = d1_gmn.app.models.Subject.objects.all()
+    if subject_id_set is not None:
+        if not subject_id_set:
+            return
+        query = query.filter(id__in=subject_id_set)
     query = query.filter(scienceobject_submitter__isnull=True)
     query = query.filter(scienceobject_rights_holder__isnull=True)
     query = query.filter(eventlog__isnull=True)
     query = query.filter(permission__isnull=True)
     query = query.filter(whitelistforcreateupdatedelete__isnull=True)
 
-    logger.debug("Deleting {} unused subjects:".format(query.count()))
-    for s in query.all():
-        logging.debug("  {}".format(s.subject))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Deleting {} unused subjects:".format(query.count()))
+        for s in query.all():
+            logging.debug("  {}".format(s.subject))
 
     query.delete()
+
+
+def get_sciobj_subject_id_set(sciobj_model):
+    """Get the database IDs of the subjects that are referenced by an object.
+
+    This includes the submitter, rightsHolder and subjects in the access policy and
+    Event Log of the object. These are the only subjects that may become unused when
+    the object is deleted, so the set can be passed to delete_unused_subjects() after
+    the object has been deleted.
+
+    """
+    subject_id_set = {sciobj_model.submitter_id, sciobj_model.rights_holder_id}
+    subject_id_set.update(
+        d1_gmn.app.models.Permission.objects.filter(sciobj=sciobj_model)
+        .values_list("subject_id", flat=True)
+        .distinct()
+    )
+    subject_id_set.update(
+        d1_gmn.app.models.EventLog.objects.filter(sciobj=sciobj_model)
+        .values_list("subject_id", flat=True)
+        .distinct()
+    )
+    return subject_id_set
@@ -155,6 +155,26 @@ class ScienceObject(django.db.models.Model):
         indexes = [django.db.models.Index(fields=["modified_timestamp", "id"])]
 
 
+# ------------------------------------------------------------------------------
+# Calculated checksums
+# ------------------------------------------------------------------------------
+
+
+class ScienceObjectChecksum(django.db.models.Model):
+    # Checksums calculated from the bytes of the SciObj when it was created, for
+    # serving MNRead.getChecksum() without reading the bytes. See sciobj_checksum.
+    sciobj = django.db.models.ForeignKey(ScienceObject, django.db.models.CASCADE)
+    checksum_algorithm = django.db.models.ForeignKey(
+        ScienceObjectChecksumAlgorithm, django.db.models.CASCADE
+    )
+    checksum = django.db.models.CharField(max_length=128)
+    # Time at which the checksum was last calculated from the SciObj bytes.
+    verified_timestamp = django.db.models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ("sciobj", "checksum_algorithm")
+
+
 # ------------------------------------------------------------------------------
 # MediaType
 # ------------------------------------------------------------------------------
@@ -457,6 +477,18 @@ class Permission(django.db.models.Model):
     subject = django.db.models.ForeignKey(Subject, django.db.models.CASCADE)
     level = django.db.models.PositiveSmallIntegerField()
 
+    class Meta:
+        # Covering indexes for access control. They hold all the columns of the table,
+        # enabling the database to check permissions with index-only scans.
+        # (subject, sciobj, level): Find the SciObjs on which one or more subjects
+        # have access, for filtering listObjects() and getLogRecords().
+        # (sciobj, subject, level): Check the access of one or more subjects on a
+        # given SciObj, for checking access and redacting getLogRecords().
+        indexes = [
+            django.db.models.Index(fields=["subject", "sciobj", "level"]),
+            django.db.models.Index(fields=["sciobj", "subject", "level"]),
+        ]
+
 
 class WhitelistForCreateUpdateDelete(django.db.models.Model):
     subject = django.db.models.OneToOneField(Subject, django.db.models.CASCADE)
@@ -28,19 +28,33 @@ import d1_common.url
 
 
 def get_sciobj_iter_remote(url):
+    response = get_sciobj_response_remote(url)
+    return response.iter_content(chunk_size=django.conf.settings.NUM_CHUNK_BYTES)
+
+
+def get_sciobj_response_remote(url, range_str=None):
+    """Open a streaming connection to the remote server holding the bytes of a proxy
+    object.
+
+    If ``range_str`` is provided, it is forwarded as the Range header. The remote
+    server may ignore it and return the full object, so callers must check the status
+    code of the returned response.
+
+    """
+    header_dict = _mk_header_dict()
+    if range_str is not None:
+        header_dict["Range"] = range_str
     try:
-        response = requests.get(
+        return requests.get(
             url,
             stream=True,
-            headers=_mk_header_dict(),
+            headers=header_dict,
             timeout=django.conf.settings.PROXY_MODE_STREAM_TIMEOUT,
         )
     except requests.RequestException as e:
         raise d1_common.types.exceptions.ServiceFailure(
             0, 'Unable to open proxy object for streaming. error="{}"'.format(str(e))
         )
-    else:
-        return response.iter_content(chunk_size=django.conf.settings.NUM_CHUNK_BYTES)
 
 
 def is_proxy_url(url):
@@ -0,0 +1,171 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Download replica bytes from a source Member Node with resume of interrupted
+transfers.
+
+The bytes are downloaded to a partial file next to the location of the object in the
+SciObj store. If a download is interrupted, the partial file is kept, and the next
+download of the same object requests only the missing bytes with an HTTP Range
+request. If the source node does not honor the Range request, the download restarts
+from the beginning.
+
+When the download is complete and the replica has been recorded in the database, the
+partial file is moved to its final location in the SciObj store.
+
+Functions in this module do not access the database, so they can be called from worker
+threads.
+
+"""
+import logging
+import os
+import re
+
+import d1_common.types.exceptions
+import d1_common.utils.filesystem
+
+import django.conf
+
+import d1_gmn.app.sciobj_checksum
+import d1_gmn.app.sciobj_store
+
+PARTIAL_FILE_EXT = ".partial"
+
+logger = logging.getLogger(__name__)
+
+
+def download(mn_client, pid, algorithm_list, throttle=None, size=None):
+    """Download the bytes of a replica to its partial file, resuming any earlier
+    interrupted download.
+
+    Args:
+        mn_client: MemberNodeClient
+            Client for the source node, created with ``use_stream=True``.
+        algorithm_list: list of str
+            DataONE checksum algorithms for which to calculate checksums.
+        throttle: ByteRateThrottle
+            Optional limit for the download rate.
+        size: int
+            Optional size of the replica, from its System Metadata. If the partial file
+            already holds this number of bytes and the source node rejects the Range
+            request as out of range, the earlier download is taken to be complete.
+
+    Returns:
+        dict: DataONE checksum algorithm -> checksum of the complete replica bytes.
+
+    """
+    partial_path = get_partial_path(pid)
+    d1_common.utils.filesystem.create_missing_directories_for_file(partial_path)
+    checksum_calculator = d1_gmn.app.sciobj_checksum.ChecksumCalculator(algorithm_list)
+    offset = _add_partial_file_to_checksum(partial_path, checksum_calculator)
+    response = mn_client.getReplicaResponse(
+        pid, {"Range": "bytes={}-".format(offset)} if offset else None
+    )
+    try:
+        if response.status_code == 206 and _get_range_start(response) == offset:
+            logger.info(
+                'Resuming replica download. pid="{}" offset={}'.format(pid, offset)
+            )
+            mode_str = "ab"
+        elif response.status_code == 200:
+            if offset:
+                logger.info(
+                    "Source node did not honor Range request. Restarting replica "
+                    'download. pid="{}"'.format(pid)
+                )
+                checksum_calculator = d1_gmn.app.sciobj_checksum.ChecksumCalculator(
+                    algorithm_list
+                )
+            mode_str = "wb"
+        elif response.status_code == 416 and offset and offset == size:
+            # The earlier download completed, but the replica was not moved into the
+            # SciObj store.
+            logger.info(
+                'Replica already fully downloaded. pid="{}" size={}'.format(pid, size)
+            )
+            return checksum_calculator.get_checksum_dict()
+        elif response.status_code in (206, 416):
+            # The partial file is not a prefix of the object, or the source node
+            # returned an unexpected range. Discard the partial file so that the next
+            # attempt starts from the beginning.
+            delete_partial_file(pid)
+            raise d1_common.types.exceptions.ServiceFailure(
+                0,
+                "Partial replica file did not match the object on the source node. "
+                'pid="{}" offset={}'.format(pid, offset),
+            )
+        else:
+            raise d1_common.types.exceptions.deserialize(response.content)
+        with open(partial_path, mode_str) as f:
+            for chunk_bytes in response.iter_content(
+                chunk_size=django.conf.settings.NUM_CHUNK_BYTES
+            ):
+                checksum_calculator.update(chunk_bytes)
+                f.write(chunk_bytes)
+                if throttle is not None:
+                    throttle.add(len(chunk_bytes))
+    finally:
+        response.close()
+    return checksum_calculator.get_checksum_dict()
+
+
+def move_to_store(pid):
+    """Move a completely downloaded replica from its partial file to its final location
+    in the SciObj store."""
+    os.replace(
+        get_partial_path(pid),
+        d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid),
+    )
+
+
+def delete_partial_file(pid):
+    try:
+        os.unlink(get_partial_path(pid))
+    except FileNotFoundError:
+        pass
+
+
+def get_partial_path(pid):
+    return (
+        d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid) + PARTIAL_FILE_EXT
+    )
+
+
+def _add_partial_file_to_checksum(partial_path, checksum_calculator):
+    """Add the bytes already downloaded to the checksums.
+
+    Returns:
+        int: Number of bytes already downloaded.
+
+    """
+    byte_count = 0
+    try:
+        with open(partial_path, "rb") as f:
+            while True:
+                chunk_bytes = f.read(django.conf.settings.NUM_CHUNK_BYTES)
+                if not chunk_bytes:
+                    break
+                checksum_calculator.update(chunk_bytes)
+                byte_count += len(chunk_bytes)
+    except FileNotFoundError:
+        pass
+    return byte_count
+
+
+def _get_range_start(response):
+    m = re.match(r"bytes\s+(\d+)-", response.headers.get("Content-Range", ""))
+    return int(m.group(1)) if m else None
@@ -0,0 +1,105 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Request scoped cache for values that are needed multiple times while processing a
+single request.
+
+A typical MNRead call on a single object checks that the object exists when resolving
+the identifier, checks that the object exists again and that the session subjects have
+access while asserting permissions, then retrieves the object for the view and again for
+the event log. This module retrieves each of these values once per request.
+
+The values are stored on the request object, so they are discarded when the request has
+been processed. Only values that were found are cached, so an object that is created
+while processing the request is found on a later lookup.
+
+"""
+import django.db.models
+
+import d1_gmn.app.models
+
+# Related rows that are retrieved together with a ScienceObject. These cover the values
+# used for creating the HTTP headers for the object and the base of its SysMeta.
+SCIOBJ_RELATED_LIST = [
+    "pid",
+    "format",
+    "checksum_algorithm",
+    "submitter",
+    "rights_holder",
+    "origin_member_node",
+    "authoritative_member_node",
+    "obsoletes",
+    "obsoleted_by",
+]
+
+
+def get_sciobj(request, pid):
+    """Get the ScienceObject model for ``pid``, with related rows.
+
+    Return None if there is no object with the PID.
+
+    """
+    cache_dict = _get_cache_dict(request)
+    key_tup = ("sciobj", pid)
+    if key_tup not in cache_dict:
+        try:
+            cache_dict[
+                key_tup
+            ] = d1_gmn.app.models.ScienceObject.objects.select_related(
+                *SCIOBJ_RELATED_LIST
+            ).get(
+                pid__did=pid
+            )
+        except d1_gmn.app.models.ScienceObject.DoesNotExist:
+            return None
+    return cache_dict[key_tup]
+
+
+def get_permission_level(request, pid):
+    """Get the highest access level that any of the session subjects have on the object
+    with ``pid``.
+
+    Return None if none of the session subjects have access.
+
+    """
+    cache_dict = _get_cache_dict(request)
+    key_tup = ("permission_level", pid)
+    if key_tup not in cache_dict:
+        cache_dict[key_tup] = d1_gmn.app.models.Permission.objects.filter(
+            sciobj__pid__did=pid, subject__subject__in=request.all_subjects_set
+        ).aggregate(django.db.models.Max("level"))["level__max"]
+    return cache_dict[key_tup]
+
+
+def get_or_set(request, key_tup, value_func):
+    """Get the value for ``key_tup``, calling ``value_func()`` to create it on the first
+    call for the request."""
+    cache_dict = _get_cache_dict(request)
+    if key_tup not in cache_dict:
+        cache_dict[key_tup] = value_func()
+    return cache_dict[key_tup]
+
+
+# Private
+
+
+def _get_cache_dict(request):
+    try:
+        return request._gmn_request_cache_dict
+    except AttributeError:
+        request._gmn_request_cache_dict = {}
+        return request._gmn_request_cache_dict
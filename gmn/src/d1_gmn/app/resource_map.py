@@ -69,11 +69,9 @@ def _is_map_valid_for_create(resource_map):
 
 
 def _is_map_valid_for_block_mode_create(resource_map):
-    member_pid_list = resource_map.getAggregatedPids()
-    for member_pid in member_pid_list:
-        if not d1_gmn.app.did.is_existing_object(member_pid):
-            return False
-    return True
+    member_pid_set = set(resource_map.getAggregatedPids())
+    existing_pid_set = d1_gmn.app.did.get_existing_object_pid_set(member_pid_set)
+    return len(existing_pid_set) == len(member_pid_set)
 
 
 def create_or_update_db(sysmeta_pyxb):
@@ -83,8 +81,14 @@ def create_or_update_db(sysmeta_pyxb):
 
 
 def get_resource_map_from_sciobj(pid):
+    """Return a summary of the Resource Map stored for ``pid``.
+
+    The map is streamed from the SciObj store without loading it into an RDF graph.
+    Use parse_resource_map_from_str() when the full graph is needed.
+
+    """
     with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(pid) as sciobj_file:
-        return d1_gmn.app.resource_map.parse_resource_map_from_str(sciobj_file.read())
+        return parse_resource_map_summary(sciobj_file)
 
 
 def create_or_update(map_pid, resource_map):
@@ -148,6 +152,44 @@ def parse_resource_map_from_str(resource_map_xml):
     return resource_map
 
 
+def get_ingested_resource_map_summary(sciobj_ingest):
+    """Get the aggregated PIDs and other values that GMN needs from a Resource Map that
+    was parsed while its bytes were ingested.
+
+    Args:
+        sciobj_ingest: d1_gmn.app.ingest.SciObjIngest
+            Created with ``is_resource_map_parsed=True``.
+
+    Returns:
+        d1_common.resource_map.ResourceMapSummary
+
+    """
+    try:
+        return sciobj_ingest.get_resource_map_summary()
+    except xml.sax.SAXException as e:
+        raise d1_common.types.exceptions.InvalidRequest(
+            0, 'Invalid Resource Map. error="{}"'.format(str(e))
+        )
+
+
+def parse_resource_map_summary(resource_map_stream):
+    """Extract the aggregated PIDs and other values that GMN needs from a stream
+    holding a Resource Map.
+
+    Returns:
+        d1_common.resource_map.ResourceMapSummary
+
+    """
+    try:
+        return d1_common.resource_map.createResourceMapSummaryFromStream(
+            resource_map_stream
+        )
+    except xml.sax.SAXException as e:
+        raise d1_common.types.exceptions.InvalidRequest(
+            0, 'Invalid Resource Map. error="{}"'.format(str(e))
+        )
+
+
 def _create_or_update_map(map_pid, member_pid_list):
     map_model = _get_or_create_map(map_pid)
     _update_map(map_model, member_pid_list)
@@ -164,12 +206,42 @@ def _get_map(map_pid):
 
 
 def _update_map(map_model, member_pid_list):
-    d1_gmn.app.models.ResourceMapMember.objects.filter(resource_map=map_model).delete()
-    for member_pid in member_pid_list:
-        member_model = d1_gmn.app.models.ResourceMapMember(
-            resource_map=map_model, did=d1_gmn.app.did.get_or_create_did(member_pid)
-        )
-        member_model.save()
+    """Update the members of the map to match ``member_pid_list``.
+
+    Only the members that were added or removed are written, with a bounded number of
+    queries, so updating a large map that changed little is fast.
+
+    """
+    member_pid_set = set(member_pid_list)
+    kept_pid_set = set()
+    removed_id_list = []
+    for member_pid, member_id in d1_gmn.app.models.ResourceMapMember.objects.filter(
+        resource_map=map_model
+    ).values_list("did__did", "id"):
+        # Also removes any duplicate members.
+        if member_pid in member_pid_set and member_pid not in kept_pid_set:
+            kept_pid_set.add(member_pid)
+        else:
+            removed_id_list.append(member_id)
+    for i in range(0, len(removed_id_list), d1_gmn.app.did.DID_QUERY_CHUNK_SIZE):
+        d1_gmn.app.models.ResourceMapMember.objects.filter(
+            id__in=removed_id_list[i : i + d1_gmn.app.did.DID_QUERY_CHUNK_SIZE]
+        ).delete()
+    added_pid_list = [
+        member_pid
+        for member_pid in dict.fromkeys(member_pid_list)
+        if member_pid not in kept_pid_set
+    ]
+    did_dict = d1_gmn.app.did.get_or_create_did_bulk(added_pid_list)
+    d1_gmn.app.models.ResourceMapMember.objects.bulk_create(
+        [
+            d1_gmn.app.models.ResourceMapMember(
+                resource_map=map_model, did=did_dict[member_pid]
+            )
+            for member_pid in added_pid_list
+        ],
+        batch_size=d1_gmn.app.did.DID_QUERY_CHUNK_SIZE,
+    )
 
 
 def _get_resource_map_by_member(member_pid):
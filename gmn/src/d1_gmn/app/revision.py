@@ -19,10 +19,17 @@
 
 import d1_common.types.exceptions
 
+import django.db
+
 import d1_gmn.app
 import d1_gmn.app.did
 import d1_gmn.app.model_util
 import d1_gmn.app.models
+import d1_gmn.app.sid_cache
+
+# Max number of obsoletedBy links followed when searching for the head of a chain. This
+# only guards against cycles, which can be created by manipulating the DB directly.
+MAX_CHAIN_WALK_LEN = 1000000
 
 
 def create_or_update_chain(pid, sid, obsoletes_pid, obsoleted_by_pid):
@@ -32,12 +39,46 @@ def create_or_update_chain(pid, sid, obsoletes_pid, obsoleted_by_pid):
     else:
         _add_sciobj(pid, sid, obsoletes_pid, obsoleted_by_pid)
     _update_sid_to_last_existing_pid_map(pid)
+    d1_gmn.app.sid_cache.invalidate(sid)
+
+
+def create_standalone_chain_bulk(did_model_list):
+    """Create single member chains for multiple new standalone objects, with a fixed
+    number of queries.
+
+    Objects that are already members of a chain are skipped.
+
+    Preconditions:
+    - The objects have no SID, obsoletes or obsoletedBy, and are not referenced in the
+      obsoletes or obsoletedBy fields of any other object.
+
+    """
+    member_did_set = set(
+        d1_gmn.app.models.ChainMember.objects.filter(
+            pid__in=did_model_list
+        ).values_list("pid__did", flat=True)
+    )
+    did_model_list = [m for m in did_model_list if m.did not in member_did_set]
+    chain_model_list = [
+        d1_gmn.app.models.Chain(head_pid=did_model) for did_model in did_model_list
+    ]
+    d1_gmn.app.models.Chain.objects.bulk_create(chain_model_list)
+    d1_gmn.app.models.ChainMember.objects.bulk_create(
+        [
+            d1_gmn.app.models.ChainMember(chain=chain_model, pid=did_model)
+            for chain_model, did_model in zip(chain_model_list, did_model_list)
+        ]
+    )
 
 
 def delete_chain(pid):
     pid_to_chain_model = d1_gmn.app.models.ChainMember.objects.get(pid__did=pid)
     chain_model = pid_to_chain_model.chain
     pid_to_chain_model.delete()
+    d1_gmn.app.sid_cache.invalidate(pid)
+    d1_gmn.app.sid_cache.invalidate(
+        d1_gmn.app.did.get_did_by_foreign_key(chain_model.sid)
+    )
     if not d1_gmn.app.models.ChainMember.objects.filter(chain=chain_model).exists():
         if chain_model.sid:
             # Cascades back to chain_model.
@@ -82,7 +123,9 @@ def cut_from_chain(sciobj_model):
 
 
 def get_all_pid_by_sid(sid):
-    return [c.pid.did for c in _get_all_chain_member_queryset_by_sid(sid)]
+    return list(
+        _get_all_chain_member_queryset_by_sid(sid).values_list("pid__did", flat=True)
+    )
 
 
 # def set_revision(pid, obsoletes_pid=None, obsoleted_by_pid=None):
@@ -120,13 +163,19 @@ def get_sid_by_pid(pid):
 
 
 def set_revision_links(sciobj_model, obsoletes_pid=None, obsoleted_by_pid=None):
+    # Only the modified fields are saved, so that links set on this object by the
+    # reverse link updates of other objects are not overwritten by a stale model.
+    update_field_list = []
     if obsoletes_pid:
         sciobj_model.obsoletes = d1_gmn.app.did.get_or_create_did(obsoletes_pid)
         _set_revision_reverse(sciobj_model.pid.did, obsoletes_pid, is_obsoletes=False)
+        update_field_list.append("obsoletes")
     if obsoleted_by_pid:
         sciobj_model.obsoleted_by = d1_gmn.app.did.get_or_create_did(obsoleted_by_pid)
         _set_revision_reverse(sciobj_model.pid.did, obsoleted_by_pid, is_obsoletes=True)
-    sciobj_model.save()
+        update_field_list.append("obsoleted_by")
+    if update_field_list:
+        sciobj_model.save(update_fields=update_field_list)
 
 
 def is_obsoletes_pid(pid):
@@ -211,13 +260,11 @@ def _merge_chains(chain_model_a, chain_model_b):
       B.
 
     """
-    _set_chain_sid(
-        chain_model_a, d1_gmn.app.did.get_did_by_foreign_key(chain_model_b.sid)
-    )
-    for member_model in _get_all_chain_member_queryset_by_chain(chain_model_b):
-        member_model.chain = chain_model_a
-        member_model.save()
+    # The SID is moved after deleting chain B, as a SID can only belong to one chain.
+    sid = d1_gmn.app.did.get_did_by_foreign_key(chain_model_b.sid)
+    _get_all_chain_member_queryset_by_chain(chain_model_b).update(chain=chain_model_a)
     chain_model_b.delete()
+    _set_chain_sid(chain_model_a, sid)
 
 
 def _add_pid_to_chain(chain_model, pid):
@@ -260,7 +307,7 @@ def _assert_sid_is_in_chain(sid, pid):
         )
 
 
-def _find_head_or_latest_connected(pid, last_pid=None):
+def _find_head_or_latest_connected(pid):
     """Find latest existing sciobj that can be reached by walking towards the head from
     ``pid``
 
@@ -269,13 +316,42 @@ def _find_head_or_latest_connected(pid, last_pid=None):
     the last existing object.
 
     """
-    try:
-        sci_model = d1_gmn.app.model_util.get_sci_model(pid)
-    except d1_gmn.app.models.ScienceObject.DoesNotExist:
-        return last_pid
-    if sci_model.obsoleted_by is None:
-        return pid
-    return _find_head_or_latest_connected(sci_model.obsoleted_by.did, pid)
+    row = _find_head_or_latest_connected_row(pid)
+    return row[1] if row else None
+
+
+def _find_head_or_latest_connected_row(pid):
+    """Walk the chain with a single recursive query.
+
+    Returns:
+        tuple: (IdNamespace id, PID) of the object found, or None if ``pid`` does not
+        exist.
+
+    """
+    sciobj_table = d1_gmn.app.models.ScienceObject._meta.db_table
+    did_table = d1_gmn.app.models.IdNamespace._meta.db_table
+    with django.db.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            with recursive walk (pid_id, obsoleted_by_id, depth) as (
+                select s.pid_id, s.obsoleted_by_id, 0
+                from {sciobj} s join {did} d on d.id = s.pid_id
+                where d.did = %s
+              union all
+                select s.pid_id, s.obsoleted_by_id, w.depth + 1
+                from {sciobj} s join walk w on s.pid_id = w.obsoleted_by_id
+                where w.depth < %s
+            )
+            select w.pid_id, d.did
+            from walk w join {did} d on d.id = w.pid_id
+            order by w.depth desc
+            limit 1
+            """.format(
+                sciobj=sciobj_table, did=did_table
+            ),
+            [pid, MAX_CHAIN_WALK_LEN],
+        )
+        return cursor.fetchone()
 
 
 def _get_chain_by_pid(pid):
@@ -309,12 +385,20 @@ def _update_sid_to_last_existing_pid_map(pid):
       d1_gmn.app.views.asserts.is_existing_object()
 
     """
-    last_pid = _find_head_or_latest_connected(pid)
-    chain_model = _get_chain_by_pid(last_pid)
-    if not chain_model:
+    row = _find_head_or_latest_connected_row(pid)
+    if not row:
         return
-    chain_model.head_pid = d1_gmn.app.did.get_or_create_did(last_pid)
-    chain_model.save()
+    last_pid_id = row[0]
+    chain_row = (
+        d1_gmn.app.models.Chain.objects.filter(chainmember__pid_id=last_pid_id)
+        .values_list("id", "sid__did")
+        .first()
+    )
+    if not chain_row:
+        return
+    chain_id, sid = chain_row
+    d1_gmn.app.models.Chain.objects.filter(id=chain_id).update(head_pid_id=last_pid_id)
+    d1_gmn.app.sid_cache.invalidate(sid)
 
 
 def _create_chain(pid, sid):
@@ -361,31 +445,37 @@ def _get_all_chain_member_queryset_by_chain(chain_model):
 
 
 def _cut_head_from_chain(sciobj_model):
-    new_head_model = d1_gmn.app.model_util.get_sci_model(sciobj_model.obsoletes.did)
-    new_head_model.obsoleted_by = None
+    new_head_pid_id = sciobj_model.obsoletes_id
     sciobj_model.obsoletes = None
-    sciobj_model.save()
-    new_head_model.save()
+    sciobj_model.save(update_fields=["obsoletes"])
+    d1_gmn.app.models.ScienceObject.objects.filter(pid_id=new_head_pid_id).update(
+        obsoleted_by=None
+    )
 
 
 def _cut_tail_from_chain(sciobj_model):
-    new_tail_model = d1_gmn.app.model_util.get_sci_model(sciobj_model.obsoleted_by.did)
-    new_tail_model.obsoletes = None
+    new_tail_pid_id = sciobj_model.obsoleted_by_id
     sciobj_model.obsoleted_by = None
-    sciobj_model.save()
-    new_tail_model.save()
+    sciobj_model.save(update_fields=["obsoleted_by"])
+    d1_gmn.app.models.ScienceObject.objects.filter(pid_id=new_tail_pid_id).update(
+        obsoletes=None
+    )
 
 
 def _cut_embedded_from_chain(sciobj_model):
-    prev_model = d1_gmn.app.model_util.get_sci_model(sciobj_model.obsoletes.did)
-    next_model = d1_gmn.app.model_util.get_sci_model(sciobj_model.obsoleted_by.did)
-    prev_model.obsoleted_by = next_model.pid
-    next_model.obsoletes = prev_model.pid
+    # The links are unique, so they are removed from the cut object before they are
+    # set on the adjacent objects.
+    prev_pid_id = sciobj_model.obsoletes_id
+    next_pid_id = sciobj_model.obsoleted_by_id
     sciobj_model.obsoletes = None
     sciobj_model.obsoleted_by = None
-    sciobj_model.save()
-    prev_model.save()
-    next_model.save()
+    sciobj_model.save(update_fields=["obsoletes", "obsoleted_by"])
+    d1_gmn.app.models.ScienceObject.objects.filter(pid_id=prev_pid_id).update(
+        obsoleted_by_id=next_pid_id
+    )
+    d1_gmn.app.models.ScienceObject.objects.filter(pid_id=next_pid_id).update(
+        obsoletes_id=prev_pid_id
+    )
 
 
 def _is_head(sciobj_model):
@@ -27,10 +27,13 @@ import django.conf
 import d1_gmn.app.sciobj_store
 
 
-def assert_valid(sysmeta_pyxb, pid):
+def assert_valid(sysmeta_pyxb, pid, sciobj_ingest=None):
     """Validate file at {sciobj_path} against schema selected via formatId and raise
     InvalidRequest if invalid.
 
+    If ``sciobj_ingest`` is provided, the XML doc that was parsed while ingesting the
+    upload is validated instead of reading the file.
+
     Validation is only performed when:
 
     - SciMeta validation is enabled
@@ -57,11 +60,30 @@ def assert_valid(sysmeta_pyxb, pid):
                 ),
             )
 
-    with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(pid) as sciobj_file:
-        try:
-            d1_scimeta.validate.assert_valid(sysmeta_pyxb.formatId, sciobj_file.read())
-        except d1_scimeta.util.SciMetaError as e:
-            raise d1_common.types.exceptions.InvalidRequest(0, str(e))
+    try:
+        if sciobj_ingest is not None:
+            d1_scimeta.validate.assert_valid(
+                sysmeta_pyxb.formatId, sciobj_ingest.get_xml_tree()
+            )
+        else:
+            with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(
+                pid
+            ) as sciobj_file:
+                d1_scimeta.validate.assert_valid(
+                    sysmeta_pyxb.formatId, sciobj_file.read()
+                )
+    except d1_scimeta.util.SciMetaError as e:
+        raise d1_common.types.exceptions.InvalidRequest(0, str(e))
+
+
+def is_validation_required(sysmeta_pyxb):
+    """Return True if the object is Science Metadata that will be validated by
+    assert_valid()."""
+    return (
+        _is_validation_enabled()
+        and _is_installed_scimeta_format_id(sysmeta_pyxb)
+        and not _is_above_size_limit(sysmeta_pyxb)
+    )
 
 
 def _is_validation_enabled():
@@ -0,0 +1,223 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Checksums calculated from the bytes of SciObjs.
+
+When the bytes of a SciObj are received through MNStorage.create(), replication or bulk
+import, checksums are calculated for each algorithm in ``CHECKSUM_ALGORITHM_LIST`` and
+the algorithm in the System Metadata of the object while the bytes are written to the
+SciObj store. The checksums are stored in the ScienceObjectChecksum table, from which
+MNRead.getChecksum() is served without reading the object bytes. Checksums for proxy
+objects are calculated and stored by MNRead.getChecksum() on first request.
+
+The stored checksums are verified against the object bytes by the
+process_checksum_scrub management command.
+
+"""
+import logging
+
+import d1_common.checksum
+import d1_common.date_time
+import d1_common.types.dataoneTypes
+
+import django.conf
+
+import d1_gmn.app.models
+
+logger = logging.getLogger(__name__)
+
+
+def get_algorithm_list(sysmeta_checksum_algorithm_str=None):
+    """Get the list of checksum algorithms for which checksums are calculated when
+    the bytes of a SciObj are received.
+
+    Args:
+        sysmeta_checksum_algorithm_str: str
+            The checksum algorithm in the System Metadata of the object. Always included
+            if it is supported.
+
+    Returns:
+        list of str: Supported DataONE checksum algorithms, without duplicates.
+
+    """
+    algorithm_list = list(django.conf.settings.CHECKSUM_ALGORITHM_LIST)
+    if sysmeta_checksum_algorithm_str is not None:
+        algorithm_list.append(sysmeta_checksum_algorithm_str)
+    return [
+        a
+        for i, a in enumerate(algorithm_list)
+        if a not in algorithm_list[:i] and d1_common.checksum.is_supported_algorithm(a)
+    ]
+
+
+class ChecksumCalculator(object):
+    """Calculate checksums for multiple algorithms in a single pass over the bytes
+    of a SciObj."""
+
+    def __init__(self, algorithm_list):
+        self._calculator_dict = {
+            a: d1_common.checksum.get_checksum_calculator_by_dataone_designator(a)
+            for a in algorithm_list
+            if d1_common.checksum.is_supported_algorithm(a)
+        }
+
+    def update(self, chunk_bytes):
+        for calculator in self._calculator_dict.values():
+            calculator.update(chunk_bytes)
+
+    def get_checksum_dict(self):
+        """Get the calculated checksums.
+
+        Returns:
+            dict: DataONE checksum algorithm -> checksum as hex string.
+
+        """
+        return {a: c.hexdigest() for a, c in self._calculator_dict.items()}
+
+
+class ChecksumFileWriter(object):
+    """File-like object that passes written bytes through a ChecksumCalculator.
+
+    For calculating checksums while bytes are written to the SciObj store by code that
+    writes to a file object.
+
+    """
+
+    def __init__(self, file, checksum_calculator):
+        self._file = file
+        self._checksum_calculator = checksum_calculator
+
+    def write(self, chunk_bytes):
+        self._checksum_calculator.update(chunk_bytes)
+        return self._file.write(chunk_bytes)
+
+
+def save(sciobj_model, checksum_dict, timestamp=None):
+    """Store checksums calculated from the bytes of a SciObj.
+
+    Existing checksums for the algorithms are replaced. Checksums for other algorithms
+    are not modified.
+
+    Args:
+        sciobj_model: ScienceObject
+
+        checksum_dict: dict
+            DataONE checksum algorithm -> checksum as hex string.
+
+        timestamp: datetime
+            The time at which the checksums were calculated. Default is the current
+            time.
+
+    """
+    if not checksum_dict:
+        return
+    timestamp = timestamp or d1_common.date_time.utc_now()
+    algorithm_model_list = [
+        d1_gmn.app.models.checksum_algorithm(a) for a in checksum_dict
+    ]
+    d1_gmn.app.models.ScienceObjectChecksum.objects.filter(
+        sciobj=sciobj_model, checksum_algorithm__in=algorithm_model_list
+    ).delete()
+    d1_gmn.app.models.ScienceObjectChecksum.objects.bulk_create(
+        [
+            d1_gmn.app.models.ScienceObjectChecksum(
+                sciobj=sciobj_model,
+                checksum_algorithm=algorithm_model,
+                checksum=checksum_dict[algorithm_model.checksum_algorithm],
+                verified_timestamp=timestamp,
+            )
+            for algorithm_model in algorithm_model_list
+        ]
+    )
+
+
+def create_bulk(sciobj_model_list, checksum_dict_list, dimension_cache=None):
+    """Store checksums for multiple new SciObjs with a single insert.
+
+    The SciObjs must not have any stored checksums.
+
+    Args:
+        sciobj_model_list: list of ScienceObject
+
+        checksum_dict_list: list of dict
+            Checksums for the SciObjs, in the same order as ``sciobj_model_list``.
+            DataONE checksum algorithm -> checksum as hex string. None is allowed.
+
+        dimension_cache: d1_gmn.app.dimension_cache.DimensionIdCache
+            Cache to use for resolving the ids of the checksum algorithms.
+
+    """
+    timestamp = d1_common.date_time.utc_now()
+
+    def get_algorithm_id(algorithm_str):
+        if dimension_cache is not None:
+            return dimension_cache.get_id(
+                d1_gmn.app.models.checksum_algorithm, algorithm_str
+            )
+        return d1_gmn.app.models.checksum_algorithm(algorithm_str).id
+
+    d1_gmn.app.models.ScienceObjectChecksum.objects.bulk_create(
+        [
+            d1_gmn.app.models.ScienceObjectChecksum(
+                sciobj=sciobj_model,
+                checksum_algorithm_id=get_algorithm_id(algorithm_str),
+                checksum=checksum_str,
+                verified_timestamp=timestamp,
+            )
+            for sciobj_model, checksum_dict in zip(
+                sciobj_model_list, checksum_dict_list
+            )
+            for algorithm_str, checksum_str in (checksum_dict or {}).items()
+        ]
+    )
+
+
+def get(sciobj_model, algorithm_str):
+    """Get a stored checksum.
+
+    Returns:
+        str: Checksum as hex string, or None if no checksum has been stored for the
+        algorithm.
+
+    """
+    try:
+        return d1_gmn.app.models.ScienceObjectChecksum.objects.get(
+            sciobj=sciobj_model, checksum_algorithm__checksum_algorithm=algorithm_str
+        ).checksum
+    except d1_gmn.app.models.ScienceObjectChecksum.DoesNotExist:
+        return None
+
+
+def get_dict(sciobj_model):
+    """Get all stored checksums for a SciObj.
+
+    Returns:
+        dict: DataONE checksum algorithm -> checksum as hex string.
+
+    """
+    return {
+        a: c
+        for a, c in d1_gmn.app.models.ScienceObjectChecksum.objects.filter(
+            sciobj=sciobj_model
+        ).values_list("checksum_algorithm__checksum_algorithm", "checksum")
+    }
+
+
+def create_checksum_pyxb(checksum_str, algorithm_str):
+    checksum_pyxb = d1_common.types.dataoneTypes.checksum(checksum_str)
+    checksum_pyxb.algorithm = algorithm_str
+    return checksum_pyxb
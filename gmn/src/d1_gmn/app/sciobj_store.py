@@ -27,9 +27,12 @@
 
 """
 import contextlib
+import glob
 import hashlib
+import logging
 import os
 import re
+import time
 
 import d1_common.iter
 import d1_common.iter.stream
@@ -45,6 +48,17 @@ import d1_gmn
 
 SCIOBJ_JSON_NAME = "gmn_object_store.json"
 
+# Temporary files to which SciObj bytes are written by the ingest module before they are
+# moved into place. They are created in the root of the store.
+INGEST_TMP_FILE_PREFIX = ".ingest_"
+INGEST_TMP_FILE_SUFFIX = ".tmp"
+
+# Temporary files that have not been modified for this long are considered to have been
+# left behind by processes that stopped while ingesting an object.
+STALE_INGEST_TMP_FILE_AGE_SEC = 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
 # http://en.wikipedia.org/wiki/File_URI_scheme
 #
 # To enable easily moving the SciObj disk store, we don't want to store absolute
@@ -221,6 +235,37 @@ def is_existing_store():
     return os.path.isdir(django.conf.settings.OBJECT_STORE_PATH)
 
 
+def delete_stale_ingest_tmp_files(min_age_sec=STALE_INGEST_TMP_FILE_AGE_SEC):
+    """Delete ingest temporary files left behind by processes that stopped while
+    ingesting an object.
+
+    Only files that have not been modified for ``min_age_sec`` are deleted, so that
+    files that are being written by running processes are kept.
+
+    Returns:
+        int: Number of deleted files.
+
+    """
+    oldest_mtime = time.time() - min_age_sec
+    deleted_count = 0
+    for tmp_path in glob.glob(
+        os.path.join(
+            get_abs_sciobj_store_path(),
+            INGEST_TMP_FILE_PREFIX + "*" + INGEST_TMP_FILE_SUFFIX,
+        )
+    ):
+        try:
+            if os.path.getmtime(tmp_path) > oldest_mtime:
+                continue
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            # Committed, discarded or deleted by another process.
+            continue
+        logger.info('Deleted stale ingest temporary file. path="{}"'.format(tmp_path))
+        deleted_count += 1
+    return deleted_count
+
+
 def is_existing_sciobj_file(pid):
     return os.path.isfile(get_abs_sciobj_file_path_by_pid(pid))
 
@@ -257,6 +302,25 @@ def get_abs_sciobj_file_path_by_url(file_url):
     return m.group(2)
 
 
+def get_x_accel_redirect_uri_by_path(abs_sciobj_file_path):
+    """Get the URI under which a web server configured for X-Accel-Redirect makes the
+    file holding an object's bytes available.
+
+    - The URI is the path of the file relative to settings.OBJECT_STORE_PATH, joined to
+      settings.OBJECT_STORE_X_ACCEL_REDIRECT_PREFIX.
+    - Return None if the file is stored in a custom location outside of the SciObj
+      store, as such files cannot be reached through the internal location.
+
+    """
+    rel_path = os.path.relpath(abs_sciobj_file_path, get_abs_sciobj_store_path())
+    if rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
+        return None
+    return "{}/{}".format(
+        django.conf.settings.OBJECT_STORE_X_ACCEL_REDIRECT_PREFIX.rstrip("/"),
+        rel_path,
+    )
+
+
 # SciObj store versioning
 
 
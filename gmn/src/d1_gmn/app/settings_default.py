@@ -79,12 +79,19 @@ LOG_IGNORE_SUBJECT = []
 LOG_IGNORE_TRUSTED_SUBJECT = True
 LOG_IGNORE_NODE_SUBJECT = True
 
+EVENT_LOG_WRITE_MODE = "sync"
+EVENT_LOG_BATCH_SIZE = 500
+EVENT_LOG_FLUSH_INTERVAL = 5
+EVENT_LOG_SPOOL_DIR = "/var/tmp/gmn_event_log_spool"
+
 CLIENT_CERT_PATH = "/var/local/dataone/certs/client/client_cert.pem"
 CLIENT_CERT_PRIVATE_KEY_PATH = (
     "/var/local/dataone/certs/client/client_key_nopassword.pem"
 )
 
 OBJECT_STORE_PATH = "/var/local/dataone/gmn_object_store"
+OBJECT_STORE_SERVE_MODE = "stream"
+OBJECT_STORE_X_ACCEL_REDIRECT_PREFIX = "/gmn_object_store/"
 
 NODE_REPLICATE = False
 
@@ -93,6 +100,9 @@ REPLICATION_SPACEALLOCATED = 10 * 1024 ** 3
 REPLICATION_ALLOWEDNODE = ()
 REPLICATION_ALLOWEDOBJECTFORMAT = ()
 REPLICATION_MAX_ATTEMPTS = 24
+REPLICATION_MAX_CONCURRENT = 8
+REPLICATION_MAX_CONCURRENT_PER_NODE = 2
+REPLICATION_MAX_BYTES_PER_SEC_PER_NODE = 0
 REPLICATION_ALLOW_ONLY_PUBLIC = False
 
 SYSMETA_REFRESH_MAX_ATTEMPTS = 24
@@ -125,6 +135,16 @@ CORS_DEFAULT_ORIGIN = "https://search.dataone.org"
 MAX_XML_DOCUMENT_SIZE = 10 * 1024 ** 2
 NUM_CHUNK_BYTES = 1024 ** 2
 MAX_SLICE_ITEMS = 5000
+COUNT_CACHE_TIMEOUT = 5 * 60
+COUNT_ESTIMATE = False
+
+SYSMETA_CACHE_ALIAS = "sysmeta"
+
+SID_CACHE_ALIAS = "sid"
+
+CERT_SUBJECT_CACHE_SIZE = 1000
+
+CHECKSUM_ALGORITHM_LIST = ["MD5", "SHA-1"]
 
 # Serving of static files, such as images
 
@@ -293,7 +313,19 @@ CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         "TIMEOUT": 60 * 60,
-    }
+    },
+    "sysmeta": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sysmeta",
+        "TIMEOUT": 24 * 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    "sid": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sid",
+        "TIMEOUT": 24 * 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
 }
 
 ROOT_URLCONF = "d1_gmn.app.urls"
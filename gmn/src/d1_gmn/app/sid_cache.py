@@ -0,0 +1,142 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cache the resolution of the identifiers passed to the v2 API.
+
+Resolving an identifier that is not the PID of a local object requires checking if it
+is a SID and then looking up the head PID of the SID's revision chain. Clients that
+address objects by SID pay for these queries on every call. This module caches the
+head PID for each SID and, as a negative cache, records that a PID is not a SID.
+
+The cache is stored in the Django cache selected by settings.SID_CACHE_ALIAS. The entry
+for a SID is removed when its revision chain is modified in the current process.
+Callers that can see the resolved object check that it still exists and has not been
+obsoleted, so changes made by other processes are picked up on the next call. Setting
+SID_CACHE_ALIAS to None disables the cache.
+
+"""
+import hashlib
+import logging
+
+import django.conf
+import django.core.cache
+import django.db.transaction
+
+import d1_gmn.app.models
+
+logger = logging.getLogger(__name__)
+
+
+def resolve(did):
+    """Resolve a DID passed to a v2 API method.
+
+    Returns:
+        str: The head PID if ``did`` is a SID, ``did`` if it is the PID of an existing
+        object. None if it is neither.
+
+    """
+    pid = get(did)
+    if pid is None:
+        pid = _resolve_db(did)
+        if pid is not None:
+            add(did, pid)
+    return pid
+
+
+def get(did):
+    """Get the cached resolution for ``did``.
+
+    Return None if the resolution is not cached.
+
+    """
+    cache = _get_cache()
+    if cache is None:
+        return None
+    return cache.get(_gen_cache_key(did))
+
+
+def add(did, pid):
+    """Cache the resolution of ``did`` to ``pid``.
+
+    ``pid`` is the head PID if ``did`` is a SID, and ``did`` itself if it is the PID of
+    an existing object.
+
+    """
+    cache = _get_cache()
+    if cache is None:
+        return
+    cache.set(_gen_cache_key(did), pid)
+    logger.debug('Cached resolved DID. did="{}" pid="{}"'.format(did, pid))
+
+
+def invalidate(did):
+    """Remove the cached resolution for ``did``.
+
+    The entry is removed immediately, and again when the current transaction is
+    committed. This prevents a resolution that is cached by concurrent requests before
+    the changes become visible from remaining in the cache.
+
+    """
+    cache = _get_cache()
+    if cache is None or did is None:
+        return
+    key_str = _gen_cache_key(did)
+    cache.delete(key_str)
+    django.db.transaction.on_commit(lambda: cache.delete(key_str))
+
+
+def clear():
+    """Remove all cached resolutions.
+
+    This clears the complete Django cache selected by SID_CACHE_ALIAS.
+
+    """
+    cache = _get_cache()
+    if cache is not None:
+        cache.clear()
+
+
+# Private
+
+
+def _resolve_db(did):
+    """Classify and resolve ``did`` with a single query."""
+    row = (
+        d1_gmn.app.models.IdNamespace.objects.filter(did=did)
+        .values_list("chain_sid__head_pid__did", "scienceobject__id")
+        .first()
+    )
+    if row is None:
+        return None
+    head_pid, sciobj_id = row
+    if head_pid is not None:
+        return head_pid
+    if sciobj_id is not None:
+        return did
+    return None
+
+
+def _get_cache():
+    alias_str = django.conf.settings.SID_CACHE_ALIAS
+    if alias_str is None:
+        return None
+    return django.core.cache.caches[alias_str]
+
+
+def _gen_cache_key(did):
+    # DIDs may contain characters that are not valid in memcached keys.
+    return "sid_{}".format(hashlib.sha256(did.encode("utf-8")).hexdigest())
@@ -42,14 +42,35 @@ import django.urls.base
 
 import d1_gmn.app
 import d1_gmn.app.auth
+import d1_gmn.app.count_cache
 import d1_gmn.app.did
+import d1_gmn.app.dimension_cache
 import d1_gmn.app.model_util
 import d1_gmn.app.models
 import d1_gmn.app.object_format_cache
 import d1_gmn.app.revision
 import d1_gmn.app.sciobj_store
+import d1_gmn.app.sysmeta_cache
 import d1_gmn.app.views.util
 
+BULK_DIMENSION_CACHE_SIZE = 10000
+
+# ScienceObject fields that are updated from the SysMeta of existing objects. See
+# _base_pyxb_to_model().
+BULK_UPDATE_FIELD_LIST = [
+    "modified_timestamp",
+    "format",
+    "filename",
+    "checksum",
+    "checksum_algorithm",
+    "size",
+    "submitter",
+    "rights_holder",
+    "origin_member_node",
+    "authoritative_member_node",
+    "is_archived",
+]
+
 
 def archive_sciobj(pid):
     """Set the status of an object to archived.
@@ -134,6 +155,10 @@ def create_or_update(sysmeta_pyxb, sciobj_url=None):
 
     sci_model.save()
 
+    # Access policy changes also affect the Event Log records visible to subjects.
+    d1_gmn.app.count_cache.invalidate()
+    d1_gmn.app.sysmeta_cache.invalidate(pid)
+
     return sci_model
 
 
@@ -180,12 +205,19 @@ def update_modified_timestamp(pid):
     _update_modified_timestamp(sci_model)
 
 
-def model_to_pyxb(pid):
-    return _model_to_pyxb(pid)
+def model_to_pyxb(pid, sciobj_model=None):
+    """Generate SysMeta PyXB for ``pid`` from the database.
 
+    ``sciobj_model`` can be passed in to avoid retrieving the ScienceObject again when
+    it has already been retrieved by the caller.
 
-def _model_to_pyxb(pid):
-    sciobj_model = d1_gmn.app.model_util.get_sci_model(pid)
+    """
+    return _model_to_pyxb(pid, sciobj_model)
+
+
+def _model_to_pyxb(pid, sciobj_model=None):
+    if sciobj_model is None:
+        sciobj_model = d1_gmn.app.model_util.get_sci_model(pid)
     sysmeta_pyxb = _base_model_to_pyxb(sciobj_model)
     if _has_media_type_db(sciobj_model):
         sysmeta_pyxb.mediaType = _media_type_model_to_pyxb(sciobj_model)
@@ -255,6 +287,8 @@ def _base_model_to_pyxb(sciobj_model):
 def _update_modified_timestamp(sci_model):
     sci_model.modified_timestamp = d1_common.date_time.utc_now()
     sci_model.save()
+    d1_gmn.app.count_cache.invalidate("object_list")
+    d1_gmn.app.sysmeta_cache.invalidate(sci_model.pid.did)
 
 
 # ------------------------------------------------------------------------------
@@ -574,3 +608,368 @@ def replica_model_to_pyxb(sciobj_model):
         )
         replica_pyxb_list.append(replica_pyxb)
     return replica_pyxb_list
+
+
+# ------------------------------------------------------------------------------
+# Bulk create or update
+# ------------------------------------------------------------------------------
+
+
+def create_or_update_bulk(
+    sysmeta_pyxb_list, sciobj_url_list=None, dimension_cache=None
+):
+    """Create or update the database representation of multiple System Metadata
+    objects with a bounded number of queries.
+
+    Equivalent to calling create_or_update() for each object, in order. The
+    ScienceObject rows and the rows for the media types, access policies, replication
+    policies and remote replicas are written with one bulk statement per table for the
+    batch. Subjects, nodes, formats and checksum algorithms are resolved through
+    ``dimension_cache``, so only strings that have not been seen before cause queries.
+    Revision chains are created in bulk for new objects that are not in revision
+    chains. Other objects are added to their chains one at a time, in order, as each
+    object can modify the chains of the objects before it.
+
+    Args:
+        sysmeta_pyxb_list: list of SystemMetadata PyXB objects
+
+        sciobj_url_list: list of str
+            URLs for the objects, in the same order as ``sysmeta_pyxb_list``. See
+            create_or_update(). If not passed, storage in the internal sciobj store is
+            assumed for new objects.
+
+        dimension_cache: d1_gmn.app.dimension_cache.DimensionIdCache
+            Cache to use for resolving the ids of dimension rows. Pass the same cache
+            to multiple calls to reuse the ids. The caller must clear the cache if the
+            transaction is rolled back. If not passed, a cache is created for the call.
+
+    Returns:
+        list of ScienceObject models, in the same order as ``sysmeta_pyxb_list``.
+
+    Preconditions:
+
+        - All values in the ``sysmeta_pyxb`` objects must be valid for the operation
+          being performed
+        - The PIDs are unique within the batch
+
+    """
+    if not sysmeta_pyxb_list:
+        return []
+    if sciobj_url_list is None:
+        sciobj_url_list = [None] * len(sysmeta_pyxb_list)
+    if dimension_cache is None:
+        dimension_cache = d1_gmn.app.dimension_cache.DimensionIdCache(
+            BULK_DIMENSION_CACHE_SIZE
+        )
+
+    pid_list = [d1_common.xml.get_req_val(s.identifier) for s in sysmeta_pyxb_list]
+    did_dict = d1_gmn.app.did.get_or_create_did_bulk(pid_list)
+    _prefetch_dimension_ids(sysmeta_pyxb_list, dimension_cache)
+    existing_sci_dict = {
+        m.pid.did: m
+        for m in d1_gmn.app.models.ScienceObject.objects.filter(
+            pid__did__in=pid_list
+        ).select_related("pid")
+    }
+
+    sci_model_list = []
+    new_sci_model_list = []
+    for pid, sysmeta_pyxb, sciobj_url in zip(
+        pid_list, sysmeta_pyxb_list, sciobj_url_list
+    ):
+        sci_model = existing_sci_dict.get(pid)
+        if sci_model is None:
+            sci_model = d1_gmn.app.models.ScienceObject()
+            sci_model.pid = did_dict[pid]
+            sci_model.url = (
+                sciobj_url
+                or d1_gmn.app.sciobj_store.get_rel_sciobj_file_url_by_pid(pid)
+            )
+            sci_model.serial_version = sysmeta_pyxb.serialVersion
+            sci_model.uploaded_timestamp = (
+                d1_common.date_time.normalize_datetime_to_utc(sysmeta_pyxb.dateUploaded)
+            )
+            new_sci_model_list.append(sci_model)
+        _base_pyxb_to_model_bulk(sci_model, sysmeta_pyxb, dimension_cache)
+        sci_model_list.append(sci_model)
+
+    d1_gmn.app.models.ScienceObject.objects.bulk_create(new_sci_model_list)
+    if existing_sci_dict:
+        d1_gmn.app.models.ScienceObject.objects.bulk_update(
+            list(existing_sci_dict.values()), BULK_UPDATE_FIELD_LIST
+        )
+
+    _media_type_pyxb_to_model_bulk(sci_model_list, sysmeta_pyxb_list)
+    _access_policy_pyxb_to_model_bulk(
+        sci_model_list, sysmeta_pyxb_list, dimension_cache
+    )
+    _replication_policy_pyxb_to_model_bulk(
+        sci_model_list, sysmeta_pyxb_list, dimension_cache
+    )
+    _replica_pyxb_to_model_bulk(sci_model_list, sysmeta_pyxb_list, dimension_cache)
+
+    # New objects that are not in revision chains get single member chains, which are
+    # created in bulk. Other objects may modify existing chains and are processed in
+    # order.
+    revision_pid_set = _get_revision_pid_set(sysmeta_pyxb_list)
+    standalone_did_list = []
+    for pid, sci_model, sysmeta_pyxb in zip(
+        pid_list, sci_model_list, sysmeta_pyxb_list
+    ):
+        if pid not in existing_sci_dict and pid not in revision_pid_set:
+            standalone_did_list.append(did_dict[pid])
+        else:
+            revision_pyxb_to_model(sci_model, sysmeta_pyxb, pid)
+    d1_gmn.app.revision.create_standalone_chain_bulk(standalone_did_list)
+
+    d1_gmn.app.count_cache.invalidate()
+    for pid in pid_list:
+        d1_gmn.app.sysmeta_cache.invalidate(pid)
+
+    return sci_model_list
+
+
+def _get_revision_pid_set(sysmeta_pyxb_list):
+    """Get the PIDs of the objects in the batch that have a SID or revision links, and
+    the PIDs that are referenced by revision links in the batch."""
+    revision_pid_set = set()
+    for sysmeta_pyxb in sysmeta_pyxb_list:
+        obsoletes_pid = d1_common.xml.get_opt_val(sysmeta_pyxb, "obsoletes")
+        obsoleted_by_pid = d1_common.xml.get_opt_val(sysmeta_pyxb, "obsoletedBy")
+        if (
+            obsoletes_pid
+            or obsoleted_by_pid
+            or d1_common.xml.get_opt_val(sysmeta_pyxb, "seriesId")
+        ):
+            revision_pid_set.add(d1_common.xml.get_req_val(sysmeta_pyxb.identifier))
+        revision_pid_set.update({obsoletes_pid, obsoleted_by_pid} - {None})
+    return revision_pid_set
+
+
+def _prefetch_dimension_ids(sysmeta_pyxb_list, dimension_cache):
+    """Resolve the ids of all the dimension rows referenced by the batch with a fixed
+    number of queries."""
+    subject_set = set()
+    node_set = set()
+    for sysmeta_pyxb in sysmeta_pyxb_list:
+        subject_set.add(d1_common.xml.get_req_val(sysmeta_pyxb.rightsHolder))
+        if sysmeta_pyxb.submitter:
+            subject_set.add(d1_common.xml.get_req_val(sysmeta_pyxb.submitter))
+        if _has_access_policy_pyxb(sysmeta_pyxb):
+            for allow_rule in sysmeta_pyxb.accessPolicy.allow:
+                subject_set.update(
+                    d1_common.xml.get_req_val(s) for s in allow_rule.subject
+                )
+        node_set.add(d1_common.xml.get_req_val(sysmeta_pyxb.originMemberNode))
+        node_set.add(d1_common.xml.get_req_val(sysmeta_pyxb.authoritativeMemberNode))
+        if _has_replication_policy_pyxb(sysmeta_pyxb):
+            for node_pyxb in list(
+                sysmeta_pyxb.replicationPolicy.preferredMemberNode
+            ) + list(sysmeta_pyxb.replicationPolicy.blockedMemberNode):
+                node_set.add(d1_common.xml.get_req_val(node_pyxb))
+        for replica_pyxb in sysmeta_pyxb.replica:
+            node_set.add(d1_common.xml.get_req_val(replica_pyxb.replicaMemberNode))
+    for model_func, model_class, field_str, value_set in (
+        (d1_gmn.app.models.subject, d1_gmn.app.models.Subject, "subject", subject_set),
+        (d1_gmn.app.models.node, d1_gmn.app.models.Node, "urn", node_set),
+        (
+            d1_gmn.app.models.format,
+            d1_gmn.app.models.ScienceObjectFormat,
+            "format",
+            {s.formatId for s in sysmeta_pyxb_list},
+        ),
+        (
+            d1_gmn.app.models.checksum_algorithm,
+            d1_gmn.app.models.ScienceObjectChecksumAlgorithm,
+            "checksum_algorithm",
+            {s.checksum.algorithm for s in sysmeta_pyxb_list},
+        ),
+        (
+            d1_gmn.app.models.replica_status,
+            d1_gmn.app.models.ReplicaStatus,
+            "status",
+            {r.replicationStatus for s in sysmeta_pyxb_list for r in s.replica},
+        ),
+    ):
+        dimension_cache.prefetch(model_func, model_class, field_str, value_set)
+
+
+def _base_pyxb_to_model_bulk(sci_model, sysmeta_pyxb, dimension_cache):
+    """Like _base_pyxb_to_model(), with the dimension rows resolved through
+    ``dimension_cache``."""
+    sci_model.modified_timestamp = d1_common.date_time.normalize_datetime_to_utc(
+        sysmeta_pyxb.dateSysMetadataModified
+    )
+    sci_model.format_id = dimension_cache.get_id(
+        d1_gmn.app.models.format, sysmeta_pyxb.formatId
+    )
+    sci_model.filename = getattr(sysmeta_pyxb, "fileName", None)
+    sci_model.checksum = d1_common.xml.get_req_val(sysmeta_pyxb.checksum)
+    sci_model.checksum_algorithm_id = dimension_cache.get_id(
+        d1_gmn.app.models.checksum_algorithm, sysmeta_pyxb.checksum.algorithm
+    )
+    sci_model.size = sysmeta_pyxb.size
+    if sysmeta_pyxb.submitter:
+        sci_model.submitter_id = dimension_cache.get_id(
+            d1_gmn.app.models.subject, d1_common.xml.get_req_val(sysmeta_pyxb.submitter)
+        )
+    sci_model.rights_holder_id = dimension_cache.get_id(
+        d1_gmn.app.models.subject, d1_common.xml.get_req_val(sysmeta_pyxb.rightsHolder)
+    )
+    sci_model.origin_member_node_id = dimension_cache.get_id(
+        d1_gmn.app.models.node, d1_common.xml.get_req_val(sysmeta_pyxb.originMemberNode)
+    )
+    sci_model.authoritative_member_node_id = dimension_cache.get_id(
+        d1_gmn.app.models.node,
+        d1_common.xml.get_req_val(sysmeta_pyxb.authoritativeMemberNode),
+    )
+    sci_model.is_archived = sysmeta_pyxb.archived or False
+
+
+def _media_type_pyxb_to_model_bulk(sci_model_list, sysmeta_pyxb_list):
+    pair_list = [
+        (m, s)
+        for m, s in zip(sci_model_list, sysmeta_pyxb_list)
+        if _has_media_type_pyxb(s)
+    ]
+    if not pair_list:
+        return
+    d1_gmn.app.models.MediaType.objects.filter(
+        sciobj__in=[m for m, s in pair_list]
+    ).delete()
+    media_type_model_list = [
+        d1_gmn.app.models.MediaType(sciobj=m, name=s.mediaType.name)
+        for m, s in pair_list
+    ]
+    d1_gmn.app.models.MediaType.objects.bulk_create(media_type_model_list)
+    d1_gmn.app.models.MediaTypeProperty.objects.bulk_create(
+        [
+            d1_gmn.app.models.MediaTypeProperty(
+                media_type=media_type_model,
+                name=p.name,
+                value=d1_common.xml.get_req_val(p),
+            )
+            for media_type_model, (m, s) in zip(media_type_model_list, pair_list)
+            for p in s.mediaType.property_
+        ]
+    )
+
+
+def _access_policy_pyxb_to_model_bulk(
+    sci_model_list, sysmeta_pyxb_list, dimension_cache
+):
+    """Like _access_policy_pyxb_to_model(), for multiple objects."""
+    d1_gmn.app.models.Permission.objects.filter(sciobj__in=sci_model_list).delete()
+    permission_model_list = []
+
+    def add(sci_model, subject_str_list, top_level):
+        for subject_str in subject_str_list:
+            permission_model_list.append(
+                d1_gmn.app.models.Permission(
+                    sciobj=sci_model,
+                    subject_id=dimension_cache.get_id(
+                        d1_gmn.app.models.subject, subject_str
+                    ),
+                    level=top_level,
+                )
+            )
+
+    for sci_model, sysmeta_pyxb in zip(sci_model_list, sysmeta_pyxb_list):
+        # Add changePermission for rights holder.
+        add(
+            sci_model,
+            [d1_common.xml.get_req_val(sysmeta_pyxb.rightsHolder)],
+            d1_gmn.app.auth.CHANGEPERMISSION_LEVEL,
+        )
+        if _has_access_policy_pyxb(sysmeta_pyxb):
+            for allow_rule in sysmeta_pyxb.accessPolicy.allow:
+                add(
+                    sci_model,
+                    [d1_common.xml.get_req_val(s) for s in allow_rule.subject],
+                    _get_highest_level_action_for_rule(allow_rule),
+                )
+
+    d1_gmn.app.models.Permission.objects.bulk_create(permission_model_list)
+
+
+def _replication_policy_pyxb_to_model_bulk(
+    sci_model_list, sysmeta_pyxb_list, dimension_cache
+):
+    pair_list = [
+        (m, s)
+        for m, s in zip(sci_model_list, sysmeta_pyxb_list)
+        if _has_replication_policy_pyxb(s)
+    ]
+    if not pair_list:
+        return
+    d1_gmn.app.models.ReplicationPolicy.objects.filter(
+        sciobj__in=[m for m, s in pair_list]
+    ).delete()
+    replication_policy_model_list = [
+        d1_gmn.app.models.ReplicationPolicy(
+            sciobj=m,
+            replication_is_allowed=d1_common.xml.get_opt_attr(
+                s.replicationPolicy,
+                "replicationAllowed",
+                d1_common.const.DEFAULT_REPLICATION_ALLOWED,
+            ),
+            desired_number_of_replicas=d1_common.xml.get_opt_attr(
+                s.replicationPolicy,
+                "numberReplicas",
+                d1_common.const.DEFAULT_NUMBER_OF_REPLICAS,
+            ),
+        )
+        for m, s in pair_list
+    ]
+    d1_gmn.app.models.ReplicationPolicy.objects.bulk_create(
+        replication_policy_model_list
+    )
+
+    def create_rep_node_rows(rep_node_model, attr_str):
+        rep_node_model.objects.bulk_create(
+            [
+                rep_node_model(
+                    replication_policy=replication_policy_model,
+                    node_id=dimension_cache.get_id(
+                        d1_gmn.app.models.node, d1_common.xml.get_req_val(node_pyxb)
+                    ),
+                )
+                for replication_policy_model, (m, s) in zip(
+                    replication_policy_model_list, pair_list
+                )
+                for node_pyxb in getattr(s.replicationPolicy, attr_str)
+            ]
+        )
+
+    create_rep_node_rows(d1_gmn.app.models.PreferredMemberNode, "preferredMemberNode")
+    create_rep_node_rows(d1_gmn.app.models.BlockedMemberNode, "blockedMemberNode")
+
+
+def _replica_pyxb_to_model_bulk(sci_model_list, sysmeta_pyxb_list, dimension_cache):
+    """Like replica_pyxb_to_model(), for multiple objects."""
+    d1_gmn.app.models.RemoteReplica.objects.filter(sciobj__in=sci_model_list).delete()
+    pair_list = [
+        (m, r) for m, s in zip(sci_model_list, sysmeta_pyxb_list) for r in s.replica
+    ]
+    if not pair_list:
+        return
+    replica_info_model_list = [
+        d1_gmn.app.models.ReplicaInfo(
+            status_id=dimension_cache.get_id(
+                d1_gmn.app.models.replica_status, r.replicationStatus
+            ),
+            member_node_id=dimension_cache.get_id(
+                d1_gmn.app.models.node, d1_common.xml.get_req_val(r.replicaMemberNode)
+            ),
+            timestamp=d1_common.date_time.normalize_datetime_to_utc(r.replicaVerified)
+            or d1_common.date_time.utc_now(),
+        )
+        for m, r in pair_list
+    ]
+    d1_gmn.app.models.ReplicaInfo.objects.bulk_create(replica_info_model_list)
+    d1_gmn.app.models.RemoteReplica.objects.bulk_create(
+        [
+            d1_gmn.app.models.RemoteReplica(sciobj=m, info=replica_info_model)
+            for replica_info_model, (m, r) in zip(replica_info_model_list, pair_list)
+        ]
+    )
@@ -0,0 +1,135 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cache the serialized v1 and v2 System Metadata XML documents returned by
+MNRead.getSystemMetadata().
+
+Generating the SysMeta XML for an object requires around ten database queries, followed
+by serialization and conversion to the API version of the request. As SysMeta is read
+much more often than it is modified, the resulting documents are cached.
+
+The cache is stored in the Django cache selected by settings.SYSMETA_CACHE_ALIAS, so
+any of the Django cache backends can be used, such as local memory, files, memcached
+or Redis. Setting SYSMETA_CACHE_ALIAS to None disables the cache.
+
+Each entry is stored together with the properties of the ScienceObject that change
+whenever the SysMeta is modified, such as the serial version and the modified
+timestamp. An entry is only used if these match the current properties of the object,
+so changes made by other processes are picked up on the next read. In addition, the
+entry for an object is removed when the object is modified in the current process.
+
+"""
+import hashlib
+import logging
+
+import django.conf
+import django.core.cache
+import django.db.transaction
+
+API_VERSION_LIST = ["v1", "v2"]
+
+logger = logging.getLogger(__name__)
+
+
+def get_or_create(sciobj_model, api_version_str, create_func):
+    """Get the SysMeta XML doc for ``sciobj_model`` in ``api_version_str``, calling
+    ``create_func()`` to generate it if it is not cached.
+
+    Args:
+        sciobj_model: ScienceObject
+            Model for which to get the SysMeta XML doc.
+
+        api_version_str: str
+            API version of the XML doc. One of API_VERSION_LIST.
+
+        create_func: callable
+            Generates the SysMeta XML doc.
+
+    """
+    cache = _get_cache()
+    if cache is None:
+        return create_func()
+    key_str = _gen_cache_key(sciobj_model.pid.did)
+    version_tup = _get_version_tup(sciobj_model)
+    entry_dict = cache.get(key_str)
+    if entry_dict is None or entry_dict["version"] != version_tup:
+        entry_dict = {"version": version_tup}
+    elif api_version_str in entry_dict:
+        return entry_dict[api_version_str]
+    xml_str = create_func()
+    entry_dict[api_version_str] = xml_str
+    cache.set(key_str, entry_dict)
+    logger.debug(
+        'Cached SysMeta. pid="{}" api_version="{}"'.format(
+            sciobj_model.pid.did, api_version_str
+        )
+    )
+    return xml_str
+
+
+def invalidate(pid):
+    """Remove the cached SysMeta XML docs for ``pid``.
+
+    The entry is removed immediately, and again when the current transaction is
+    committed. This prevents SysMeta that is cached by concurrent requests before the
+    changes become visible from remaining in the cache.
+
+    """
+    cache = _get_cache()
+    if cache is None:
+        return
+    key_str = _gen_cache_key(pid)
+    cache.delete(key_str)
+    django.db.transaction.on_commit(lambda: cache.delete(key_str))
+
+
+def clear():
+    """Remove all cached SysMeta XML docs.
+
+    This clears the complete Django cache selected by SYSMETA_CACHE_ALIAS.
+
+    """
+    cache = _get_cache()
+    if cache is not None:
+        cache.clear()
+
+
+# Private
+
+
+def _get_cache():
+    alias_str = django.conf.settings.SYSMETA_CACHE_ALIAS
+    if alias_str is None:
+        return None
+    return django.core.cache.caches[alias_str]
+
+
+def _get_version_tup(sciobj_model):
+    """Get the properties of ``sciobj_model`` that change when its SysMeta is
+    modified."""
+    return (
+        sciobj_model.serial_version,
+        sciobj_model.modified_timestamp,
+        sciobj_model.is_archived,
+        sciobj_model.obsoletes_id,
+        sciobj_model.obsoleted_by_id,
+    )
+
+
+def _gen_cache_key(pid):
+    # PIDs may contain characters that are not valid in memcached keys.
+    return "sysmeta_{}".format(hashlib.sha256(pid.encode("utf-8")).hexdigest())
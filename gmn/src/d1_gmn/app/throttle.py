@@ -0,0 +1,72 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Limit the rate at which bytes are transferred.
+
+Used by management commands that read or download object bytes in the background, to
+limit the impact on other users of the storage and network.
+
+"""
+import threading
+import time
+
+
+class ByteRateThrottle(object):
+    """Limit the rate at which bytes are transferred by sleeping when transfers get
+    ahead of the allowed rate.
+
+    The limit is enforced with a token bucket. Bytes transferred while the bucket holds
+    enough tokens pass without delay, and the bucket refills at the allowed rate, up to
+    ``max_burst_sec`` seconds worth of bytes. So, after an idle period, transfers can
+    only burst above the allowed rate until the bucket is empty.
+
+    A single throttle can be shared by multiple threads, in which case the limit
+    applies to the combined rate.
+
+    Args:
+        max_bytes_per_sec: int
+            Allowed rate. 0 is unlimited.
+
+        max_burst_sec: float
+            Size of the bucket, in seconds of transfer at the allowed rate.
+
+    """
+
+    def __init__(self, max_bytes_per_sec, max_burst_sec=1.0):
+        self._max_bytes_per_sec = max_bytes_per_sec
+        self._max_token_count = max_bytes_per_sec * max_burst_sec
+        self._token_count = self._max_token_count
+        self._last_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, byte_count):
+        if not self._max_bytes_per_sec:
+            return
+        with self._lock:
+            now_time = time.monotonic()
+            self._token_count = min(
+                self._max_token_count,
+                self._token_count
+                + (now_time - self._last_time) * self._max_bytes_per_sec,
+            )
+            self._last_time = now_time
+            # The count goes negative when transfers are ahead of the allowed rate.
+            # Later transfers then wait until the debt has been paid off as well.
+            self._token_count -= byte_count
+            sleep_sec = -self._token_count / self._max_bytes_per_sec
+        if sleep_sec > 0:
+            time.sleep(sleep_sec)
@@ -33,9 +33,14 @@ import d1_gmn.app.model_util
 import d1_gmn.app.revision
 
 
-def sanity(request, sysmeta_pyxb):
+def sanity(request, sysmeta_pyxb, sciobj_ingest=None):
     """Check that sysmeta_pyxb is suitable for creating a new object and matches the
-    uploaded sciobj bytes."""
+    uploaded sciobj bytes.
+
+    If ``sciobj_ingest`` is provided, the checksum is taken from the ingest of the
+    upload instead of reading the upload again.
+
+    """
     _does_not_contain_replica_sections(sysmeta_pyxb)
     _is_not_archived(sysmeta_pyxb)
     _obsoleted_by_not_specified(sysmeta_pyxb)
@@ -43,7 +48,7 @@ def sanity(request, sysmeta_pyxb):
         return
     _has_correct_file_size(request, sysmeta_pyxb)
     _is_supported_checksum_algorithm(sysmeta_pyxb)
-    _is_correct_checksum(request, sysmeta_pyxb)
+    _is_correct_checksum(request, sysmeta_pyxb, sciobj_ingest)
 
 
 def matches_url_pid(sysmeta_pyxb, url_pid):
@@ -175,11 +180,14 @@ def _has_correct_file_size(request, sysmeta_pyxb):
         )
 
 
-def _is_correct_checksum(request, sysmeta_pyxb):
-    checksum_calculator = d1_common.checksum.get_checksum_calculator_by_dataone_designator(
-        sysmeta_pyxb.checksum.algorithm
-    )
-    checksum_str = calculate_checksum(request, checksum_calculator)
+def _is_correct_checksum(request, sysmeta_pyxb, sciobj_ingest=None):
+    if sciobj_ingest is not None:
+        checksum_str = sciobj_ingest.get_checksum(sysmeta_pyxb.checksum.algorithm)
+    else:
+        checksum_calculator = d1_common.checksum.get_checksum_calculator_by_dataone_designator(
+            sysmeta_pyxb.checksum.algorithm
+        )
+        checksum_str = calculate_checksum(request, checksum_calculator)
     if sysmeta_pyxb.checksum.value().lower() != checksum_str.lower():
         raise d1_common.types.exceptions.InvalidSystemMetadata(
             0,
@@ -0,0 +1,223 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Handle HTTP Range requests (RFC 7233) for SciObj bytes.
+
+- Only the "bytes" range unit is supported. Range headers with other units or invalid
+  syntax are ignored, as required by the RFC, and the full SciObj is returned.
+- A single range is returned as the body of a 206 Partial Content response. Multiple
+  ranges are returned as a multipart/byteranges body.
+- If-Range is supported with the ETag and Last-Modified validators.
+
+"""
+import re
+import uuid
+
+import django.conf
+import django.http
+import django.utils.http
+
+import d1_gmn.app.views.headers
+
+# Requests for more ranges than this are handled as if no Range header was included.
+# This guards against requests that would cause excessive overhead.
+MAX_RANGE_COUNT = 100
+
+BYTE_RANGE_RX = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+
+def get_range_list(request, sciobj_model):
+    """Get the list of byte ranges requested for a SciObj.
+
+    Returns:
+        None: No Range header, invalid header, or If-Range precondition failed. The
+        full SciObj should be returned.
+
+        Empty list: None of the ranges can be satisfied.
+
+        List of (first, last) tuples: Inclusive byte positions of the satisfiable
+        ranges, in the order requested.
+
+    """
+    range_str = request.META.get("HTTP_RANGE")
+    if range_str is None or not _is_if_range_match(request, sciobj_model):
+        return None
+    return parse_range_header(range_str, sciobj_model.size)
+
+
+def is_range_requested(request, sciobj_model):
+    """Return True if the request includes a Range header that should be honored."""
+    return "HTTP_RANGE" in request.META and _is_if_range_match(request, sciobj_model)
+
+
+def parse_range_header(range_str, size):
+    """Parse the value of a Range header against a SciObj of ``size`` bytes.
+
+    See get_range_list() for return values.
+
+    """
+    unit_str, sep, range_set_str = range_str.partition("=")
+    if not sep or unit_str.strip().lower() != "bytes":
+        return None
+    spec_list = range_set_str.split(",")
+    if len(spec_list) > MAX_RANGE_COUNT:
+        return None
+    range_list = []
+    for spec_str in spec_list:
+        m = BYTE_RANGE_RX.match(spec_str)
+        if not m:
+            return None
+        first_str, last_str = m.groups()
+        if first_str:
+            first = int(first_str)
+            last = int(last_str) if last_str else size - 1
+            if last < first:
+                return None
+            if first >= size:
+                continue
+            range_list.append((first, min(last, size - 1)))
+        elif last_str:
+            suffix_len = int(last_str)
+            if suffix_len and size:
+                range_list.append((max(size - suffix_len, 0), size - 1))
+        else:
+            return None
+    return range_list
+
+
+def create_range_response(sciobj_file, sciobj_model, content_type_str, range_list):
+    """Create a 206 Partial Content response holding the ``range_list`` byte ranges of
+    the SciObj bytes in the open ``sciobj_file``.
+
+    The file is closed when the response has been returned.
+
+    """
+    if len(range_list) == 1:
+        first, last = range_list[0]
+        response = django.http.StreamingHttpResponse(
+            _iter_file_range_list(sciobj_file, range_list),
+            content_type_str,
+            status=206,
+        )
+        d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(
+            response, sciobj_model
+        )
+        response["Content-Range"] = _format_content_range(
+            first, last, sciobj_model.size
+        )
+        response["Content-Length"] = str(last - first + 1)
+        response["Content-Type"] = content_type_str
+        return response
+    boundary_str = uuid.uuid4().hex
+    part_header_list = [
+        _format_part_header(
+            boundary_str, content_type_str, first, last, sciobj_model.size
+        )
+        for first, last in range_list
+    ]
+    closing_bytes = "\r\n--{}--\r\n".format(boundary_str).encode("ascii")
+    response = django.http.StreamingHttpResponse(
+        _iter_multipart(sciobj_file, range_list, part_header_list, closing_bytes),
+        status=206,
+    )
+    d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(
+        response, sciobj_model
+    )
+    response["Content-Length"] = str(
+        sum(
+            len(h) + last - first + 1
+            for h, (first, last) in zip(part_header_list, range_list)
+        )
+        + len(closing_bytes)
+    )
+    response["Content-Type"] = "multipart/byteranges; boundary={}".format(boundary_str)
+    return response
+
+
+def create_not_satisfiable_response(sciobj_model):
+    """Create a 416 Range Not Satisfiable response for a SciObj."""
+    response = django.http.HttpResponse(status=416)
+    d1_gmn.app.views.headers.add_http_date(response)
+    response["Accept-Ranges"] = "bytes"
+    response["Content-Range"] = "bytes */{}".format(sciobj_model.size)
+    return response
+
+
+# Private
+
+
+def _is_if_range_match(request, sciobj_model):
+    """Return True if the Range header should be honored according to If-Range.
+
+    If-Range holds either an ETag, which requires a strong match, or a date, which
+    requires an exact match with Last-Modified.
+
+    """
+    if_range_str = request.META.get("HTTP_IF_RANGE")
+    if if_range_str is None:
+        return True
+    if_range_str = if_range_str.strip()
+    if if_range_str.startswith('"'):
+        return if_range_str == d1_gmn.app.views.headers.get_etag(sciobj_model)
+    since_ts = django.utils.http.parse_http_date_safe(if_range_str)
+    return (
+        since_ts is not None
+        and int(sciobj_model.modified_timestamp.timestamp()) == since_ts
+    )
+
+
+def _format_content_range(first, last, size):
+    return "bytes {}-{}/{}".format(first, last, size)
+
+
+def _format_part_header(boundary_str, content_type_str, first, last, size):
+    return (
+        "\r\n--{}\r\nContent-Type: {}\r\nContent-Range: {}\r\n\r\n".format(
+            boundary_str, content_type_str, _format_content_range(first, last, size)
+        )
+    ).encode("ascii")
+
+
+def _iter_multipart(sciobj_file, range_list, part_header_list, closing_bytes):
+    try:
+        for part_header_bytes, byte_range in zip(part_header_list, range_list):
+            yield part_header_bytes
+            yield from _iter_file_range(sciobj_file, *byte_range)
+        yield closing_bytes
+    finally:
+        sciobj_file.close()
+
+
+def _iter_file_range_list(sciobj_file, range_list):
+    try:
+        for first, last in range_list:
+            yield from _iter_file_range(sciobj_file, first, last)
+    finally:
+        sciobj_file.close()
+
+
+def _iter_file_range(sciobj_file, first, last):
+    sciobj_file.seek(first)
+    remaining_int = last - first + 1
+    while remaining_int:
+        chunk_bytes = sciobj_file.read(
+            min(remaining_int, django.conf.settings.NUM_CHUNK_BYTES)
+        )
+        if not chunk_bytes:
+            break
+        remaining_int -= len(chunk_bytes)
+        yield chunk_bytes
@@ -17,16 +17,16 @@
 # limitations under the License.
 """SciObj create for view methods."""
 import d1_common.date_time
-import d1_common.utils.filesystem
 import d1_common.utils.ulog
 import d1_common.xml
 
 import django.conf
-import django.core.files.move
 
 import d1_gmn.app.event_log
+import d1_gmn.app.ingest
 import d1_gmn.app.resource_map
 import d1_gmn.app.scimeta
+import d1_gmn.app.sciobj_checksum
 import d1_gmn.app.sciobj_store
 import d1_gmn.app.sysmeta
 import d1_gmn.app.views.assert_db
@@ -58,22 +58,22 @@ def create_sciobj(request, sysmeta_pyxb):
 
     set_mn_controlled_values(request, sysmeta_pyxb, is_modification=False)
     d1_gmn.app.views.assert_db.is_valid_pid_for_create(pid)
-    d1_gmn.app.views.assert_sysmeta.sanity(request, sysmeta_pyxb)
 
     if _is_proxy_sciobj(request):
+        d1_gmn.app.views.assert_sysmeta.sanity(request, sysmeta_pyxb)
         sciobj_url = _get_sciobj_proxy_url(request)
         _sanity_check_proxy_url(sciobj_url)
+        checksum_dict = None
     else:
         sciobj_url = d1_gmn.app.sciobj_store.get_rel_sciobj_file_url_by_pid(pid)
+        checksum_dict = _ingest_sciobj_bytes_from_request(
+            request, pid, sysmeta_pyxb, sciobj_url
+        )
 
-    if not _is_proxy_sciobj(request):
-        if d1_gmn.app.resource_map.is_resource_map_sysmeta_pyxb(sysmeta_pyxb):
-            _create_resource_map(pid, request, sysmeta_pyxb, sciobj_url)
-        else:
-            _save_sciobj_bytes_from_request(request, pid)
-            d1_gmn.app.scimeta.assert_valid(sysmeta_pyxb, pid)
+    sciobj_model = d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb, sciobj_url)
 
-    d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb, sciobj_url)
+    if checksum_dict:
+        d1_gmn.app.sciobj_checksum.save(sciobj_model, checksum_dict)
 
     d1_gmn.app.event_log.create(
         d1_common.xml.get_req_val(sysmeta_pyxb.identifier),
@@ -84,14 +84,38 @@ def create_sciobj(request, sysmeta_pyxb):
     )
 
 
-def _create_resource_map(pid, request, sysmeta_pyxb, sciobj_url):
-    map_xml = _read_sciobj_bytes_from_request(request)
-    resource_map = d1_gmn.app.resource_map.parse_resource_map_from_str(map_xml)
+def _ingest_sciobj_bytes_from_request(request, pid, sysmeta_pyxb, sciobj_url):
+    """Check the uploaded bytes against the SysMeta and move them into the SciObj store.
+
+    The upload is read once, while checking the checksum and calculating the checksums
+    that are stored for MNRead.getChecksum(). See the ingest module.
+
+    Returns:
+        dict: DataONE checksum algorithm -> checksum of the uploaded bytes.
+
+    """
+    is_resource_map = d1_gmn.app.resource_map.is_resource_map_sysmeta_pyxb(sysmeta_pyxb)
+    with d1_gmn.app.ingest.SciObjIngest(
+        request.FILES["object"],
+        d1_gmn.app.sciobj_checksum.get_algorithm_list(sysmeta_pyxb.checksum.algorithm),
+        is_xml_parsed=d1_gmn.app.scimeta.is_validation_required(sysmeta_pyxb),
+        is_resource_map_parsed=is_resource_map,
+    ) as sciobj_ingest:
+        d1_gmn.app.views.assert_sysmeta.sanity(request, sysmeta_pyxb, sciobj_ingest)
+        if is_resource_map:
+            _create_resource_map(pid, request, sysmeta_pyxb, sciobj_url, sciobj_ingest)
+        else:
+            d1_gmn.app.scimeta.assert_valid(sysmeta_pyxb, pid, sciobj_ingest)
+            sciobj_ingest.commit(pid)
+        return sciobj_ingest.get_checksum_dict()
+
+
+def _create_resource_map(pid, request, sysmeta_pyxb, sciobj_url, sciobj_ingest):
+    resource_map = d1_gmn.app.resource_map.get_ingested_resource_map_summary(
+        sciobj_ingest
+    )
     d1_gmn.app.resource_map.assert_map_is_valid_for_create(resource_map)
-    with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid_ctx(
-        pid, write=True
-    ) as sciobj_file:
-        sciobj_file.write(map_xml)
+    sciobj_ingest.commit(pid)
     d1_gmn.app.sysmeta.create_or_update(sysmeta_pyxb, sciobj_url)
     d1_gmn.app.resource_map.create_or_update(pid, resource_map)
 
@@ -111,36 +135,6 @@ def _get_sciobj_proxy_url(request):
     return request.META["HTTP_VENDOR_GMN_REMOTE_URL"]
 
 
-def _read_sciobj_bytes_from_request(request):
-    request.FILES["object"].seek(0)
-    sciobj_bytes = request.FILES["object"].read()
-    return sciobj_bytes
-
-
-def _save_sciobj_bytes_from_request(request, pid):
-    """Django stores small uploads in memory and streams large uploads directly to disk.
-
-    Uploads stored in memory are represented by UploadedFile and on disk,
-    TemporaryUploadedFile. To store an UploadedFile on disk, it's iterated and saved in
-    chunks. To store a TemporaryUploadedFile, it's moved from the temporary to the final
-    location. Django automatically handles this when using the file related fields in
-    the models, but GMN is not using those, so has to do it manually here.
-
-    """
-    sciobj_path = d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid)
-    if hasattr(request.FILES["object"], "temporary_file_path"):
-        d1_common.utils.filesystem.create_missing_directories_for_file(sciobj_path)
-        django.core.files.move.file_move_safe(
-            request.FILES["object"].temporary_file_path(), sciobj_path
-        )
-    else:
-        with d1_gmn.app.sciobj_store.open_sciobj_file_by_path_ctx(
-            sciobj_path, write=True
-        ) as sciobj_stream:
-            for chunk in request.FILES["object"].chunks():
-                sciobj_stream.write(chunk)
-
-
 def set_mn_controlled_values(request, sysmeta_pyxb, is_modification):
     """See the description of TRUST_CLIENT_* in settings.py."""
     now_datetime = d1_common.date_time.utc_now()
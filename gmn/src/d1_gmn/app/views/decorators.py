@@ -27,7 +27,9 @@ import django.conf
 
 import d1_gmn.app.auth
 import d1_gmn.app.did
+import d1_gmn.app.request_cache
 import d1_gmn.app.revision
+import d1_gmn.app.sid_cache
 import d1_gmn.app.views.assert_db
 import d1_gmn.app.views.util
 
@@ -56,13 +58,43 @@ def resolve_sid(f):
 
 def resolve_sid_func(request, did):
     if d1_gmn.app.views.util.is_v1_api(request):
+        # An existing PID resolves to itself. The retrieved object is reused by later
+        # permission checks and by the view.
+        if d1_gmn.app.request_cache.get_sciobj(request, did) is not None:
+            return did
         return d1_gmn.app.did.resolve_sid_v1(did)
     elif d1_gmn.app.views.util.is_v2_api(request):
-        return d1_gmn.app.did.resolve_sid_v2(did)
+        return _resolve_sid_v2(request, did)
     else:
         assert False, "Unable to determine API version"
 
 
+def _resolve_sid_v2(request, did):
+    """Resolve a v2 DID through the SID cache.
+
+    The object that the DID resolves to is retrieved for the view in any case, so it is
+    used for checking that a cached resolution is still valid. If the object no longer
+    exists, or a SID resolves to an object that has been obsoleted, the resolution may
+    have been changed by another process and is refreshed from the DB.
+
+    """
+    pid = d1_gmn.app.sid_cache.get(did)
+    if pid is None:
+        # An existing PID resolves to itself. The retrieved object is reused by later
+        # permission checks and by the view.
+        if d1_gmn.app.request_cache.get_sciobj(request, did) is not None:
+            d1_gmn.app.sid_cache.add(did, did)
+            return did
+        return d1_gmn.app.did.resolve_sid_v2(did)
+    sciobj_model = d1_gmn.app.request_cache.get_sciobj(request, pid)
+    if sciobj_model is None or (
+        pid != did and sciobj_model.obsoleted_by_id is not None
+    ):
+        d1_gmn.app.sid_cache.invalidate(did)
+        return d1_gmn.app.did.resolve_sid_v2(did)
+    return pid
+
+
 def decode_did(f):
     """View handler decorator that decodes "%2f" ("/") in SID or PID extracted from URL
     path segment by Django."""
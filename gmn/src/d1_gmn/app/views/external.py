@@ -32,6 +32,7 @@ import django.conf
 import django.http
 
 import d1_gmn.app.auth
+import d1_gmn.app.count_cache
 import d1_gmn.app.db_filter
 import d1_gmn.app.delete
 import d1_gmn.app.did
@@ -41,11 +42,14 @@ import d1_gmn.app.models
 import d1_gmn.app.node
 import d1_gmn.app.object_format_cache
 import d1_gmn.app.proxy
+import d1_gmn.app.request_cache
+import d1_gmn.app.sciobj_checksum
 import d1_gmn.app.sciobj_store
 import d1_gmn.app.sysmeta
 import d1_gmn.app.util
 import d1_gmn.app.views.assert_db
 import d1_gmn.app.views.assert_sysmeta
+import d1_gmn.app.views.byte_range
 import d1_gmn.app.views.create
 import d1_gmn.app.views.decorators
 import d1_gmn.app.views.headers
@@ -151,7 +155,7 @@ def get_log(request):
         )
     else:
         assert False, "Unable to determine API version"
-    total_int = query.count()
+    total_int = d1_gmn.app.count_cache.get_total(request, query, "log")
     query, start, count = d1_gmn.app.views.slice.add_slice_filter(
         request, query, total_int
     )
@@ -181,18 +185,25 @@ def get_node(request):
 @d1_gmn.app.views.decorators.resolve_sid
 @d1_gmn.app.views.decorators.read_permission
 def get_object(request, pid):
-    """MNRead.get(session, did) → OctetStream."""
-    # TODO: Replace all ScienceObject.objects.get() with d1_gmn.app.model_util.get_sci_model()
-    sciobj = d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid)
+    """MNRead.get(session, did) → OctetStream.
+
+    Supports conditional requests (If-None-Match, If-Modified-Since) and byte range
+    requests (Range, If-Range).
+
+    """
+    sciobj = d1_gmn.app.request_cache.get_sciobj(request, pid)
+    if d1_gmn.app.views.headers.is_not_modified(request, sciobj):
+        return d1_gmn.app.views.headers.create_not_modified_response(sciobj)
     content_type_str = d1_gmn.app.object_format_cache.get_content_type(
         sciobj.format.format
     )
     # Return local or proxy SciObj bytes
-    response = django.http.StreamingHttpResponse(
-        _get_sciobj_iter(sciobj), content_type_str
-    )
-    d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(response, sciobj)
-    d1_gmn.app.event_log.log_read_event(pid, request)
+    if d1_gmn.app.proxy.is_proxy_url(sciobj.url):
+        response = _get_proxy_sciobj_response(request, sciobj, content_type_str)
+    else:
+        response = _get_local_sciobj_response(request, sciobj, content_type_str)
+    if response.status_code in (200, 206):
+        d1_gmn.app.event_log.log_read_event(pid, request)
     return response
 
 
@@ -203,6 +214,93 @@ def _get_sciobj_iter(sciobj):
         return d1_gmn.app.sciobj_store.get_sciobj_iter_by_url(sciobj.url)
 
 
+def _get_local_sciobj_response(request, sciobj, content_type_str, stream_as_file=False):
+    """Create a response that returns the bytes of a SciObj in the local filesystem as
+    set by settings.OBJECT_STORE_SERVE_MODE.
+
+    In the "x-sendfile" and "x-accel-redirect" modes, the response holds only the
+    location of the file, and the web server replaces the empty body with the file
+    contents. This frees the GMN worker as soon as the headers have been returned. Any
+    Range header is then also handled by the web server.
+
+    If ``stream_as_file`` is True, the "stream" mode is handled as "file".
+
+    """
+    serve_mode = django.conf.settings.OBJECT_STORE_SERVE_MODE
+    abs_path = d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_url(sciobj.url)
+    x_accel_uri = (
+        d1_gmn.app.sciobj_store.get_x_accel_redirect_uri_by_path(abs_path)
+        if serve_mode == "x-accel-redirect"
+        else None
+    )
+    if serve_mode == "x-sendfile":
+        response = django.http.HttpResponse(content_type=content_type_str)
+        response["X-Sendfile"] = abs_path
+    elif x_accel_uri is not None:
+        response = django.http.HttpResponse(content_type=content_type_str)
+        response["X-Accel-Redirect"] = x_accel_uri
+    else:
+        range_list = d1_gmn.app.views.byte_range.get_range_list(request, sciobj)
+        if range_list is not None:
+            if not range_list:
+                return d1_gmn.app.views.byte_range.create_not_satisfiable_response(
+                    sciobj
+                )
+            return d1_gmn.app.views.byte_range.create_range_response(
+                d1_gmn.app.sciobj_store.open_sciobj_file_by_path(abs_path),
+                sciobj,
+                content_type_str,
+                range_list,
+            )
+        if serve_mode == "stream" and not stream_as_file:
+            response = django.http.StreamingHttpResponse(
+                d1_gmn.app.sciobj_store.get_sciobj_iter_by_url(sciobj.url),
+                content_type_str,
+            )
+        else:
+            # FileResponse passes the open file to the WSGI server's wsgi.file_wrapper
+            # if one is available, which enables the server to use sendfile().
+            response = django.http.FileResponse(
+                d1_gmn.app.sciobj_store.open_sciobj_file_by_path(abs_path),
+                content_type_str,
+            )
+    d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(response, sciobj)
+    return response
+
+
+def _get_proxy_sciobj_response(request, sciobj, content_type_str):
+    """Create a response that streams the bytes of a proxy SciObj from the remote
+    server.
+
+    Any Range header is forwarded to the remote server. If the remote server honors it,
+    the partial content is returned with the Content-Range, Content-Length and
+    Content-Type (which may be multipart/byteranges) provided by the remote server.
+
+    """
+    range_str = (
+        request.META["HTTP_RANGE"]
+        if d1_gmn.app.views.byte_range.is_range_requested(request, sciobj)
+        else None
+    )
+    remote_response = d1_gmn.app.proxy.get_sciobj_response_remote(sciobj.url, range_str)
+    if range_str is not None and remote_response.status_code == 416:
+        remote_response.close()
+        return d1_gmn.app.views.byte_range.create_not_satisfiable_response(sciobj)
+    response = django.http.StreamingHttpResponse(
+        remote_response.iter_content(chunk_size=django.conf.settings.NUM_CHUNK_BYTES),
+        content_type_str,
+    )
+    d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(response, sciobj)
+    if range_str is not None and remote_response.status_code == 206:
+        response.status_code = 206
+        for header_name in ("Content-Range", "Content-Length", "Content-Type"):
+            if header_name in remote_response.headers:
+                response[header_name] = remote_response.headers[header_name]
+            elif header_name in response:
+                del response[header_name]
+    return response
+
+
 @d1_gmn.app.views.decorators.decode_did
 @d1_gmn.app.views.decorators.resolve_sid
 @d1_gmn.app.views.decorators.read_permission
@@ -220,7 +318,7 @@ def get_meta(request, pid):
 @d1_gmn.app.views.decorators.read_permission
 def head_object(request, pid):
     """MNRead.describe(session, did) → DescribeResponse."""
-    sciobj = d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid)
+    sciobj = d1_gmn.app.request_cache.get_sciobj(request, pid)
     response = django.http.HttpResponse()
     d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(response, sciobj)
     d1_gmn.app.event_log.log_read_event(pid, request)
@@ -231,10 +329,23 @@ def head_object(request, pid):
 @d1_gmn.app.views.decorators.resolve_sid
 @d1_gmn.app.views.decorators.read_permission
 def get_checksum(request, pid):
-    """MNRead.getChecksum(session, did[, checksumAlgorithm]) → Checksum."""
-    # MNRead.getChecksum() requires that a new checksum be calculated. Cannot
-    # simply return the checksum from the sysmeta.
-    #
+    """MNRead.getChecksum(session, did[, checksumAlgorithm]) → Checksum.
+
+    Checksums are calculated from the bytes of local objects when the objects are
+    received and stored in the database, so that the bytes do not have to be read
+    again here. A new checksum is calculated if no checksum has been stored for the
+    algorithm, or if the VENDOR_GMN_FRESH_CHECKSUM header is included in the request.
+    Checksums are never copied from the System Metadata.
+
+    The bytes of proxy objects are not received by GMN, so their checksums are
+    calculated by downloading the bytes from the remote server the first time a checksum
+    is requested for an algorithm, and are then stored like the checksums of local
+    objects.
+
+    A new checksum that does not match the stored checksum is returned and logged as an
+    error, but does not replace the stored checksum.
+
+    """
     # If the checksumAlgorithm argument was not provided, it defaults to
     # the system wide default checksum algorithm.
     algorithm = request.GET.get(
@@ -254,10 +365,29 @@ def get_checksum(request, pid):
             ),
         )
 
-    sciobj_model = d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid)
-    sciobj_iter = _get_sciobj_iter(sciobj_model)
-    checksum_obj = d1_common.checksum.create_checksum_object_from_iterator(
-        sciobj_iter, algorithm
+    sciobj_model = d1_gmn.app.request_cache.get_sciobj(request, pid)
+    stored_checksum_str = d1_gmn.app.sciobj_checksum.get(sciobj_model, algorithm)
+    checksum_str = stored_checksum_str
+    if checksum_str is None or "HTTP_VENDOR_GMN_FRESH_CHECKSUM" in request.META:
+        sciobj_iter = _get_sciobj_iter(sciobj_model)
+        checksum_str = d1_common.checksum.create_checksum_object_from_iterator(
+            sciobj_iter, algorithm
+        ).value()
+        if stored_checksum_str is not None and (
+            checksum_str.lower() != stored_checksum_str.lower()
+        ):
+            # As in process_checksum_scrub, a stored checksum that does not match the
+            # object bytes is not replaced, so that the mismatch is not hidden.
+            logging.error(
+                'Checksum mismatch: Stored checksum. pid="{}" algorithm="{}" '
+                'stored="{}" calculated="{}"'.format(
+                    pid, algorithm, stored_checksum_str, checksum_str
+                )
+            )
+        else:
+            d1_gmn.app.sciobj_checksum.save(sciobj_model, {algorithm: checksum_str})
+    checksum_obj = d1_gmn.app.sciobj_checksum.create_checksum_pyxb(
+        checksum_str, algorithm
     )
     # Log the access of this object.
     # TODO: look into log type other than 'read'
@@ -326,17 +456,20 @@ def post_error(request):
 def get_replica(request, pid):
     """MNReplication.getReplica(session, did) → OctetStream."""
     _assert_node_is_authorized(request, pid)
-    sciobj = d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid)
+    sciobj = d1_gmn.app.request_cache.get_sciobj(request, pid)
+    if d1_gmn.app.views.headers.is_not_modified(request, sciobj):
+        return d1_gmn.app.views.headers.create_not_modified_response(sciobj)
     content_type_str = d1_gmn.app.object_format_cache.get_content_type(
         sciobj.format.format
     )
-    # Replica is always a local file that can be handled with FileResponse()
-    response = django.http.FileResponse(
-        d1_gmn.app.sciobj_store.open_sciobj_file_by_pid(pid), content_type_str
+    # Replica is always a local file that can be handled with FileResponse(). A
+    # replication target can resume an interrupted transfer with a Range request.
+    response = _get_local_sciobj_response(
+        request, sciobj, content_type_str, stream_as_file=True
     )
-    d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(response, sciobj)
     # Log the replication of this object.
-    d1_gmn.app.event_log.log_replicate_event(pid, request)
+    if response.status_code in (200, 206):
+        d1_gmn.app.event_log.log_replicate_event(pid, request)
     return response
 
 
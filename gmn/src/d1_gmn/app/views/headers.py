@@ -23,6 +23,8 @@ import d1_common.date_time
 import d1_common.url
 
 import django.conf
+import django.http
+import django.utils.http
 
 import d1_gmn.app
 import d1_gmn.app.object_format_cache
@@ -71,6 +73,49 @@ def add_cors(response, request):
     response["Access-Control-Allow-Credentials"] = "true"
 
 
+def get_etag(sciobj_model):
+    """Get the entity tag for the bytes of a SciObj.
+
+    The SciObj bytes cannot be modified after the object has been created, so the
+    checksum recorded in the SysMeta is a strong validator.
+
+    """
+    return '"{}:{}"'.format(
+        sciobj_model.checksum_algorithm.checksum_algorithm, sciobj_model.checksum
+    )
+
+
+def is_not_modified(request, sciobj_model):
+    """Return True if the client already holds a current copy of the SciObj bytes, as
+    indicated by the If-None-Match or If-Modified-Since request headers.
+
+    If-Modified-Since is ignored when If-None-Match is present (RFC 7232, 3.3).
+
+    """
+    if_none_match_str = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match_str is not None:
+        etag_list = django.utils.http.parse_etags(if_none_match_str)
+        if "*" in etag_list:
+            return True
+        # Weak comparison
+        etag_str = get_etag(sciobj_model)
+        return any((e[2:] if e.startswith("W/") else e) == etag_str for e in etag_list)
+    if_modified_since_str = request.META.get("HTTP_IF_MODIFIED_SINCE")
+    if if_modified_since_str is not None:
+        since_ts = django.utils.http.parse_http_date_safe(if_modified_since_str)
+        if since_ts is not None:
+            return int(sciobj_model.modified_timestamp.timestamp()) <= since_ts
+    return False
+
+
+def create_not_modified_response(sciobj_model):
+    """Create a 304 Not Modified response holding the validators for the SciObj."""
+    response = django.http.HttpResponseNotModified()
+    _add_standard(response, sciobj_model)
+    response["ETag"] = get_etag(sciobj_model)
+    return response
+
+
 def add_http_date(response, date_time=None):
     response["Date"] = d1_common.date_time.http_datetime_str_from_dt(
         d1_common.date_time.normalize_datetime_to_utc(date_time)
@@ -91,6 +136,9 @@ def _add_sciobj_standard(response, sciobj_model):
     response["Content-Type"] = d1_gmn.app.object_format_cache.get_content_type(
         sciobj_model
     )
+    if not d1_common.url.isHttpOrHttps(sciobj_model.url):
+        response["Accept-Ranges"] = "bytes"
+    response["ETag"] = get_etag(sciobj_model)
     response["Content-Disposition"] = 'attachment; filename="{}"'.format(
         d1_gmn.app.sysmeta.get_filename(sciobj_model)
     )
@@ -40,6 +40,7 @@ import django.http
 import django.shortcuts
 import django.urls.base
 
+import d1_gmn.app.middleware.session_cert
 import d1_gmn.app.models
 
 
@@ -139,6 +140,7 @@ def get_context_dict():
         "sciobjCountByFormat": get_object_count_by_format(),
         "description": django.conf.settings.NODE_DESCRIPTION,
         "mnLogoUrl": django.conf.settings.NODE_LOGO_URL,
+        "certSubjectCache": d1_gmn.app.middleware.session_cert.get_cache_stats(),
     }
 
 
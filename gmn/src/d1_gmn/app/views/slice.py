@@ -15,9 +15,26 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""Handle slicing / paging of multi-page result set."""
+"""Handle slicing / paging of multi-page result set.
+
+Slices are retrieved with a fast keyset filter, ``(timestamp, id) > last``, when the
+sort key of the last item in the previous slice is known. Otherwise, the slower
+``OFFSET / LIMIT`` fallback is used, which runs in time proportional to ``start``.
+
+The sort key of the last item is found in one of two places:
+
+- A signed resumption token, passed in the ``resumptionToken`` query parameter. GMN
+  returns a URL holding the token for the next slice in the ``Link`` response header
+  (``rel="next"``). As the token is carried by the client, the fast filter is used
+  regardless of which GMN process serves the request.
+
+- The Django cache, which holds the last item of slices recently returned by the
+  current process.
+
+"""
 
 import copy
+import datetime
 import hashlib
 import logging
 
@@ -30,8 +47,15 @@ import d1_common.utils.ulog
 
 import django.conf
 import django.core.cache
+import django.core.signing
 import django.db.models
 
+# Name of the query parameter holding the resumption token.
+RESUMPTION_TOKEN_PARAM = "resumptionToken"
+
+# Salt used when signing resumption tokens.
+RESUMPTION_TOKEN_SALT = "d1_gmn.app.views.slice"
+
 # import logging
 
 
@@ -49,9 +73,11 @@ def add_slice_filter(request, query, total_int):
             start_int, count_int, total_int, ",".join(authn_subj_list)
         )
     )
-    last_ts_tup = _cache_get_last_in_slice(
-        url_dict, start_int, total_int, authn_subj_list
-    )
+    last_ts_tup = _get_last_in_slice_from_token(url_dict, start_int, authn_subj_list)
+    if not last_ts_tup:
+        last_ts_tup = _cache_get_last_in_slice(
+            url_dict, start_int, total_int, authn_subj_list
+        )
     if last_ts_tup:
         query = _add_fast_slice_filter(query, last_ts_tup, count_int)
     else:
@@ -59,21 +85,58 @@ def add_slice_filter(request, query, total_int):
     return query, start_int, count_int
 
 
-def cache_add_last_in_slice(request, query, start_int, total_int, sort_field_list):
-    """"""
+def cache_add_last_in_slice(request, row_list, start_int, total_int, sort_field_list):
+    """Cache the sort key of the last row in the slice that is being returned, enabling
+    the next slice to be retrieved with the fast slice filter.
+
+    ``row_list`` is the list of dicts that was retrieved for the slice.
+
+    """
     url_dict = d1_common.url.parseUrl(request.get_full_path())
     authn_subj_list = _get_authenticated_subj_list(request)
     key_str = _gen_cache_key_for_slice(
-        url_dict, start_int + query.count(), total_int, authn_subj_list
-    )
-    last_model = query[query.count() - 1] if query.count() else None
-    last_ts_tup = (
-        tuple([getattr(last_model, f) for f in sort_field_list]) if last_model else None
+        url_dict, start_int + len(row_list), total_int, authn_subj_list
     )
+    last_row = row_list[-1] if row_list else None
+    last_ts_tup = tuple([last_row[f] for f in sort_field_list]) if last_row else None
     django.core.cache.cache.set(key_str, last_ts_tup)
     logging.debug('Cache set. key="{}" last={}'.format(key_str, last_ts_tup))
 
 
+def get_next_slice_url(request, row_list, start_int, total_int, sort_field_list):
+    """Get the URL for the slice following the one that is being returned.
+
+    The URL is the same as for the current slice, except that ``start`` is advanced
+    past the current slice and a resumption token holding the sort key of the last row
+    in the current slice is added.
+
+    Return None if the current slice is the last one.
+
+    """
+    next_start_int = start_int + len(row_list)
+    if not row_list or next_start_int >= total_int:
+        return None
+    url_dict = d1_common.url.parseUrl(request.get_full_path())
+    authn_subj_list = _get_authenticated_subj_list(request)
+    last_row = row_list[-1]
+    timestamp, id_int = [last_row[f] for f in sort_field_list]
+    query_dict = request.GET.copy()
+    query_dict["start"] = str(next_start_int)
+    query_dict[RESUMPTION_TOKEN_PARAM] = django.core.signing.dumps(
+        {
+            "key": _gen_cache_key_for_slice(
+                url_dict, next_start_int, None, authn_subj_list
+            ),
+            "last": [timestamp.isoformat(), id_int],
+        },
+        salt=RESUMPTION_TOKEN_SALT,
+        compress=True,
+    )
+    return request.build_absolute_uri(
+        "{}?{}".format(request.path, query_dict.urlencode())
+    )
+
+
 # Private
 
 
@@ -171,6 +234,41 @@ def _add_fallback_slice_filter(query, start_int, count_int, total_int):
         return query[start_int : start_int + count_int]
 
 
+def _get_last_in_slice_from_token(url_dict, start_int, authn_subj_list):
+    """Return the sort key of the last item in the previous slice as held in the
+    resumption token.
+
+    Return None if the request does not include a resumption token. Raise
+    InvalidRequest if the token is invalid or was issued for a different query,
+    subject or start position.
+
+    The token only selects the position in the result set. Access control and filters
+    are applied to the query as for any other slice.
+
+    """
+    token_str = url_dict["query"].get(RESUMPTION_TOKEN_PARAM)
+    if token_str is None:
+        return None
+    try:
+        token_dict = django.core.signing.loads(token_str, salt=RESUMPTION_TOKEN_SALT)
+        timestamp_str, id_int = token_dict["last"]
+        last_ts_tup = datetime.datetime.fromisoformat(timestamp_str), int(id_int)
+    except (django.core.signing.BadSignature, KeyError, TypeError, ValueError) as e:
+        raise d1_common.types.exceptions.InvalidRequest(
+            0, 'Invalid resumption token. error="{}"'.format(str(e))
+        )
+    if token_dict.get("key") != _gen_cache_key_for_slice(
+        url_dict, start_int, None, authn_subj_list
+    ):
+        raise d1_common.types.exceptions.InvalidRequest(
+            0,
+            "Resumption token was issued for a different query, subject or start "
+            "position. start={}".format(start_int),
+        )
+    logging.debug("Resumption token. last_ts_tup={}".format(last_ts_tup))
+    return last_ts_tup
+
+
 def _cache_get_last_in_slice(url_dict, start_int, total_int, authn_subj_list):
     """Return None if cache entry does not exist."""
     key_str = _gen_cache_key_for_slice(url_dict, start_int, total_int, authn_subj_list)
@@ -205,7 +303,11 @@ def _gen_cache_key_for_slice(url_dict, start_int, total_int, authn_subj_list):
     potentially expensive database queries to find the current slice position.
 
     To support adjustments in desired slice size during slicing, the count is not
-    used when generating the key.
+    used when generating the key. The resumption token is also not used, so that the
+    key is the same whether or not the client passes a token.
+
+    When used for resumption tokens, ``total_int`` is None, so that a token remains
+    valid if objects are added while the client is paging through the result set.
 
     The active subjects are used in the key in order to prevent potential security
     issues if authenticated subjects change during slicing.
@@ -219,6 +321,7 @@ def _gen_cache_key_for_slice(url_dict, start_int, total_int, authn_subj_list):
     key_url_dict = copy.deepcopy(url_dict)
     key_url_dict["query"].pop("start", None)
     key_url_dict["query"].pop("count", None)
+    key_url_dict["query"].pop(RESUMPTION_TOKEN_PARAM, None)
     key_json = d1_common.util.serialize_to_normalized_compact_json(
         {
             "url_dict": key_url_dict,
@@ -34,10 +34,13 @@ import django.http
 
 import d1_gmn.app
 import d1_gmn.app.auth
+import d1_gmn.app.count_cache
 import d1_gmn.app.db_filter
 import d1_gmn.app.did
 import d1_gmn.app.models
+import d1_gmn.app.request_cache
 import d1_gmn.app.sysmeta
+import d1_gmn.app.sysmeta_cache
 import d1_gmn.app.views.slice
 
 
@@ -119,14 +122,32 @@ def assert_xml_file_is_under_size_limit(xml_file):
 
 
 def generate_sysmeta_xml_matching_api_version(request, pid):
-    sysmeta_pyxb = d1_gmn.app.sysmeta.model_to_pyxb(pid)
-    sysmeta_xml_str = d1_gmn.app.sysmeta.serialize(sysmeta_pyxb)
+    """Get the SysMeta XML doc for ``pid`` in the API version of ``request``.
+
+    The doc is retrieved from the SysMeta cache if available.
+
+    """
+    sciobj_model = d1_gmn.app.request_cache.get_sciobj(request, pid)
     if is_v1_api(request):
-        return d1_common.type_conversions.str_to_v1_str(sysmeta_xml_str)
+        api_version_str = "v1"
     elif is_v2_api(request):
-        return d1_common.type_conversions.str_to_v2_str(sysmeta_xml_str)
+        api_version_str = "v2"
     else:
         assert False, "Unable to determine API version"
+    return d1_gmn.app.sysmeta_cache.get_or_create(
+        sciobj_model,
+        api_version_str,
+        lambda: _generate_sysmeta_xml(pid, sciobj_model, api_version_str),
+    )
+
+
+def _generate_sysmeta_xml(pid, sciobj_model, api_version_str):
+    sysmeta_pyxb = d1_gmn.app.sysmeta.model_to_pyxb(pid, sciobj_model)
+    sysmeta_xml_str = d1_gmn.app.sysmeta.serialize(sysmeta_pyxb)
+    if api_version_str == "v1":
+        return d1_common.type_conversions.str_to_v1_str(sysmeta_xml_str)
+    else:
+        return d1_common.type_conversions.str_to_v2_str(sysmeta_xml_str)
 
 
 def http_response_with_boolean_true_type():
@@ -161,7 +182,7 @@ def query_object_list(request, type_name):
                 request, query, "pid__did", "identifier"
             )
     query = d1_gmn.app.db_filter.add_replica_filter(request, query)
-    total_int = query.count()
+    total_int = d1_gmn.app.count_cache.get_total(request, query, "object_list")
     query, start, count = d1_gmn.app.views.slice.add_slice_filter(
         request, query, total_int
     )
@@ -0,0 +1,182 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Stream ObjectList and Log XML documents directly from database rows.
+
+The documents are byte-identical to the ones created by building the corresponding
+PyXB objects and serializing them with ``d1_common.xml.serialize_for_transport()``, but
+are generated without creating the PyXB objects or the intermediate DOM. Memory usage
+is independent of the number of entries in the slice, and the first bytes of the
+response can be returned before the complete document has been generated.
+
+The rows are dicts, as returned by ``QuerySet.values()``. See
+``d1_gmn.app.middleware.response_handler`` for the fields that are required in each
+row.
+
+"""
+import d1_common.date_time
+
+import django.conf
+
+# Number of entries to serialize into each chunk yielded by the generators.
+ROWS_PER_CHUNK = 100
+
+
+def generate_object_list(binding, row_list, start, total, xslt_url=None):
+    """Generate an ObjectList XML document in UTF-8 encoded chunks.
+
+    Args:
+        binding: module
+            PyXB binding for the API version of the request. Only used for
+            determining the namespace of the root element.
+
+        row_list: list of dict
+            Rows for the ObjectInfo entries.
+
+        start: int
+        total: int
+            Values for the ``start`` and ``total`` attributes.
+
+        xslt_url: str
+            If specified, add a processing instruction that specifies the download
+            location for an XSLT stylesheet.
+
+    """
+    return _generate_doc(
+        binding.objectList.name().namespaceURI(),
+        "objectList",
+        _format_object_info,
+        row_list,
+        start,
+        total,
+        xslt_url,
+    )
+
+
+def generate_log(binding, row_list, start, total, xslt_url=None):
+    """Generate a Log XML document in UTF-8 encoded chunks.
+
+    See ``generate_object_list()`` for arguments.
+
+    """
+    return _generate_doc(
+        binding.log.name().namespaceURI(),
+        "log",
+        _format_log_entry,
+        row_list,
+        start,
+        total,
+        xslt_url,
+    )
+
+
+# Private
+
+
+def _generate_doc(
+    ns_str, root_tag_str, format_row_func, row_list, start, total, xslt_url
+):
+    head_str = '<?xml version="1.0" encoding="utf-8"?>'
+    if xslt_url:
+        head_str += '<?xml-stylesheet type="text/xsl" href="{}"?>'.format(xslt_url)
+    head_str += '<ns1:{} count="{}" start="{}" total="{}" xmlns:ns1="{}"'.format(
+        root_tag_str, len(row_list), start, total, _escape(ns_str)
+    )
+    if not row_list:
+        yield (head_str + "/>").encode("utf-8")
+        return
+    yield (head_str + ">").encode("utf-8")
+    for i in range(0, len(row_list), ROWS_PER_CHUNK):
+        yield "".join(
+            format_row_func(row) for row in row_list[i : i + ROWS_PER_CHUNK]
+        ).encode("utf-8")
+    yield "</ns1:{}>".format(root_tag_str).encode("utf-8")
+
+
+def _format_object_info(row):
+    return (
+        "<objectInfo>"
+        "<identifier>{}</identifier>"
+        "<formatId>{}</formatId>"
+        '<checksum algorithm="{}">{}</checksum>'
+        "<dateSysMetadataModified>{}</dateSysMetadataModified>"
+        "<size>{}</size>"
+        "</objectInfo>"
+    ).format(
+        _escape(row["pid__did"]),
+        _escape(row["format__format"]),
+        _escape(row["checksum_algorithm__checksum_algorithm"]),
+        _escape(row["checksum"]),
+        _format_datetime(row["modified_timestamp"]),
+        row["size"],
+    )
+
+
+def _format_log_entry(row):
+    # Redact ipAddress and subject on records for which client has only "read" access.
+    if row.get("redact", False):
+        ip_address_str = subject_str = "&lt;NotAuthorized&gt;"
+    else:
+        ip_address_str = _escape(row["ip_address__ip_address"])
+        subject_str = _escape(row["subject__subject"])
+    return (
+        "<logEntry>"
+        "<entryId>{}</entryId>"
+        "<identifier>{}</identifier>"
+        "<ipAddress>{}</ipAddress>"
+        "<userAgent>{}</userAgent>"
+        "<subject>{}</subject>"
+        "<event>{}</event>"
+        "<dateLogged>{}</dateLogged>"
+        "<nodeIdentifier>{}</nodeIdentifier>"
+        "</logEntry>"
+    ).format(
+        row["id"],
+        _escape(row["sciobj__pid__did"]),
+        ip_address_str,
+        _escape(row["user_agent__user_agent"]),
+        subject_str,
+        _escape(row["event__event"]),
+        _format_datetime(row["timestamp"]),
+        _escape(django.conf.settings.NODE_IDENTIFIER),
+    )
+
+
+def _format_datetime(dt):
+    """Format datetime as xs:dateTime in UTC, matching the PyXB lexical form.
+
+    Microseconds are included only if non-zero, with trailing zeros removed.
+
+    """
+    dt = d1_common.date_time.normalize_datetime_to_utc(dt)
+    dt_str = "{:04d}-{:02d}-{:02d}T{:02d}:{:02d}:{:02d}".format(
+        dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second
+    )
+    if dt.microsecond:
+        dt_str += ".{:06d}".format(dt.microsecond).rstrip("0")
+    return dt_str + "Z"
+
+
+def _escape(s):
+    """Escape a value for use in text or attribute content, matching the escaping
+    done by minidom."""
+    return (
+        s.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace('"', "&quot;")
+        .replace(">", "&gt;")
+    )
@@ -242,6 +242,32 @@ LOG_IGNORE_TRUSTED_SUBJECT = True
 # - Do not apply this filter.
 LOG_IGNORE_NODE_SUBJECT = True
 
+# How events are written to the Event Log.
+# "sync" (default):
+# - Each event is written to the database while the request is being processed.
+# "batch":
+# - "read" and "replicate" events are appended to a spool file and written to
+# the database in batches by a background thread in each GMN process. This
+# removes several database queries from each read request. Events appear in
+# MNCore.getLogRecords() with a delay of up to EVENT_LOG_FLUSH_INTERVAL
+# seconds. Other events are always written immediately.
+EVENT_LOG_WRITE_MODE = "sync"
+
+# In "batch" mode, the number of spooled events that triggers a write to the
+# database before EVENT_LOG_FLUSH_INTERVAL has passed.
+EVENT_LOG_BATCH_SIZE = 500
+
+# In "batch" mode, the maximum number of seconds between writes to the database.
+EVENT_LOG_FLUSH_INTERVAL = 5
+
+# In "batch" mode, the directory in which events are spooled before they are
+# written to the database. Events that are spooled by a GMN process that stops
+# before writing them are written when GMN is started again, so the directory
+# should not be under "/tmp". The directory is created on startup if it does
+# not exist, and must be writable by the GMN user. Events that cannot be written
+# to the database are logged and kept in "*.failed" files in the directory.
+EVENT_LOG_SPOOL_DIR = "/var/tmp/gmn_event_log_spool"
+
 # ==============================================================================
 
 # Path to the client side certificate that GMN uses when initiating TLS/SSL
@@ -261,6 +287,40 @@ CLIENT_CERT_PRIVATE_KEY_PATH = (
 # default.
 OBJECT_STORE_PATH = "/var/local/dataone/gmn_object_store"
 
+# How the bytes of science objects in the object store are returned by
+# MNRead.get() and MNReplication.getReplica(). Authorization and event logging
+# is always performed by GMN before the object is returned. Proxy objects are
+# always streamed through GMN.
+#
+# 'stream' (default):
+# - The object is read and returned by GMN in chunks of NUM_CHUNK_BYTES. This
+#   works with any web server but keeps a GMN worker busy for the duration of
+#   the download.
+#
+# 'file':
+# - The open file is returned to the WSGI server, which can then use an
+#   optimized method such as sendfile() for returning it. With Apache and
+#   mod_wsgi, this is enabled by default (see WSGIEnableSendfile).
+#
+# 'x-sendfile':
+# - GMN returns only the headers and the absolute path of the object in an
+#   X-Sendfile header, and the web server returns the object. Requires Apache
+#   with mod_xsendfile, configured with "XSendFile On" and
+#   "XSendFilePath <OBJECT_STORE_PATH>".
+#
+# 'x-accel-redirect':
+# - GMN returns only the headers and the location of the object below
+#   OBJECT_STORE_X_ACCEL_REDIRECT_PREFIX in an X-Accel-Redirect header, and the
+#   web server returns the object. Requires Nginx, configured with an
+#   "internal" location for the prefix that has OBJECT_STORE_PATH as its
+#   "alias". Objects stored outside of OBJECT_STORE_PATH are returned as
+#   with 'file'.
+OBJECT_STORE_SERVE_MODE = "stream"
+
+# The internal location under which the web server makes OBJECT_STORE_PATH
+# available when OBJECT_STORE_SERVE_MODE is 'x-accel-redirect'.
+OBJECT_STORE_X_ACCEL_REDIRECT_PREFIX = "/gmn_object_store/"
+
 # Enable this node to be used as a replication target.
 # True:
 # - DataONE can use this node to store replicas of science objects.
@@ -297,6 +357,19 @@ REPLICATION_ALLOWEDOBJECTFORMAT = ()
 # to be retried for 24 hours.
 REPLICATION_MAX_ATTEMPTS = 24
 
+# The maximum number of replicas that are downloaded concurrently when processing the
+# replication queue.
+REPLICATION_MAX_CONCURRENT = 8
+
+# The maximum number of replicas that are downloaded concurrently from a single source
+# Member Node.
+REPLICATION_MAX_CONCURRENT_PER_NODE = 2
+
+# The maximum combined rate, in bytes per second, at which replicas are downloaded from
+# a single source Member Node. Set to 0 for no limit. E.g., for a maximum of 10 MiB/s:
+# 10 * 1024 ** 2
+REPLICATION_MAX_BYTES_PER_SEC_PER_NODE = 0
+
 # Accept only public objects for replication
 # True:
 # - This node will deny any replication requests for access controlled objects.
@@ -518,6 +591,91 @@ NUM_CHUNK_BYTES = 1024 ** 2
 # and server.
 MAX_SLICE_ITEMS = 5000
 
+# The number of seconds for which the total number of items in a filtered result
+# set from MNRead.listObjects() and MNCore.getLogRecords() is cached. Counting
+# the items is typically the most expensive part of retrieving each page of
+# results from large tables. The cached totals are invalidated when objects or
+# event log records are created, updated or deleted, but, when GMN runs in
+# multiple processes, other processes may return an outdated total for up to
+# this number of seconds. Set to 0 to disable the cache.
+# E.g.: 5 minutes = 5 * 60 (default)
+COUNT_CACHE_TIMEOUT = 5 * 60
+
+# Use the row count estimate maintained by Postgres as the total for unfiltered
+# calls to MNRead.listObjects() and MNCore.getLogRecords() from trusted
+# subjects, such as the CN harvesting all objects. The estimate is updated by
+# VACUUM and ANALYZE, so it may differ from the actual number of rows, which can
+# cause the last page of results to be truncated or empty.
+# True:
+# - Return an estimated total for unfiltered queries from trusted subjects.
+# False (default):
+# - Always count the items in the result set.
+COUNT_ESTIMATE = False
+
+# Cache the System Metadata XML documents returned by
+# MNRead.getSystemMetadata(). The setting is the name of an entry in the Django
+# CACHES setting. The cache is cleared when all objects are deleted, so the
+# entry should not be shared with other uses.
+#
+# By default, an in-memory cache named "sysmeta" is used. Each GMN process keeps
+# a separate in-memory cache. To share the cache between processes, configure
+# the "sysmeta" entry to use one of the other Django cache backends. E.g.:
+#
+# CACHES["sysmeta"] = {
+#     "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+#     "LOCATION": "/var/tmp/gmn_sysmeta_cache",
+# }
+#
+# CACHES["sysmeta"] = {
+#     "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+#     "LOCATION": "127.0.0.1:11211",
+# }
+#
+# CACHES["sysmeta"] = {
+#     "BACKEND": "django.core.cache.backends.redis.RedisCache",
+#     "LOCATION": "redis://127.0.0.1:6379",
+# }
+#
+# Set to None to disable the cache.
+SYSMETA_CACHE_ALIAS = "sysmeta"
+
+# Cache the resolution of identifiers passed to the v2 API, mapping each SID to
+# the PID of the head of its revision chain, and recording that PIDs are not
+# SIDs. This saves several queries on each call for clients that address
+# objects by SID. The setting is the name of an entry in the Django CACHES
+# setting, which should not be shared with other uses.
+#
+# By default, an in-memory cache named "sid" is used. Each GMN process keeps a
+# separate in-memory cache. Resolutions that are found to be stale are
+# refreshed, so a separate cache is safe, but the cache can be shared between
+# processes by configuring the "sid" entry as shown for SYSMETA_CACHE_ALIAS.
+#
+# Set to None to disable the cache.
+SID_CACHE_ALIAS = "sid"
+
+# Cache the subjects extracted from client side certificates. Extracting the
+# subjects requires deserializing the SubjectInfo in the certificate, and CNs
+# and other clients connect with the same certificate many times. Each GMN
+# process keeps a separate cache, holding up to this number of certificates.
+# A certificate is dropped from the cache when it expires. Hit and miss
+# counters for the cache are included in the status page at /home.
+#
+# Set to 0 to disable the cache.
+CERT_SUBJECT_CACHE_SIZE = 1000
+
+# Checksum algorithms for which checksums are calculated when the bytes of an
+# object are received through MNStorage.create(), replication or bulk import.
+# The checksums are stored in the database and MNRead.getChecksum() returns the
+# stored value instead of reading the object bytes. The algorithm specified in
+# the System Metadata of the object is always included. Checksums for other
+# algorithms are calculated on request and then stored.
+#
+# Algorithms that are not supported by d1_common.checksum are ignored.
+#
+# The stored checksums can be verified against the object bytes with the
+# process_checksum_scrub management command.
+CHECKSUM_ALGORITHM_LIST = ["MD5", "SHA-1"]
+
 # Postgres database connection.
 d1_common.util.nested_update(
     DATABASES,
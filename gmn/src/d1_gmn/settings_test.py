@@ -83,6 +83,16 @@ PROXY_MODE_STREAM_TIMEOUT = 30
 MAX_XML_DOCUMENT_SIZE = 10 * 1024 ** 2
 NUM_CHUNK_BYTES = 1024 ** 2
 MAX_SLICE_ITEMS = 5000
+# Tests modify and roll back the database directly, which does not invalidate
+# cached totals. Tests for the count cache enable it explicitly.
+COUNT_CACHE_TIMEOUT = 0
+COUNT_ESTIMATE = False
+SYSMETA_CACHE_ALIAS = None
+SID_CACHE_ALIAS = None
+# Tests check the Event Log directly after each call. Tests for the batched
+# writer flush it explicitly.
+EVENT_LOG_WRITE_MODE = "sync"
+EVENT_LOG_SPOOL_DIR = "/tmp/gmn_test_event_log_spool"
 
 # mk_db_fixture:
 # - Uses DATABASES.default
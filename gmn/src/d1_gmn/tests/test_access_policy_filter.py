@@ -0,0 +1,204 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test filtering and redaction of listObjects() and getLogRecords() results by access
+policy."""
+import datetime
+import logging
+import time
+
+import pytest
+import responses
+
+import django.db
+
+import d1_gmn.app.auth
+import d1_gmn.app.models
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_OBJECT_COUNT = 1000 * 1000
+BENCHMARK_SUBJECT_COUNT = 10
+BENCHMARK_BATCH_SIZE = 10 * 1000
+BENCHMARK_SLICE_SIZE = 1000
+BENCHMARK_REPEAT_COUNT = 5
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestAccessPolicyFilter")
+class TestAccessPolicyFilter(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    @responses.activate
+    def test_1000(self):
+        """listObjects(): Subjects unknown to the MN only see the objects that are
+        visible to the symbolic subjects, such as public."""
+        with d1_gmn.tests.gmn_mock.set_auth_context(
+            session_subj_list=["unknown_subj_1", "unknown_subj_2"], trusted_subj_list=[]
+        ):
+            unknown_total = self.client_v2.listObjects(start=0, count=0).total
+        with d1_gmn.tests.gmn_mock.set_auth_context(
+            session_subj_list=[], trusted_subj_list=[]
+        ):
+            symbolic_total = self.client_v2.listObjects(start=0, count=0).total
+        assert unknown_total == symbolic_total
+
+    @responses.activate
+    def test_1010(self):
+        """listObjects(): Object is visible only to the subjects that have access."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(
+                self.client_v2, permission_list=[(["acl_filter_subj"], ["read"])]
+            )
+        for subj_str, expected_count in (
+            ("acl_filter_subj", 1),
+            ("acl_filter_other_subj", 0),
+        ):
+            with d1_gmn.tests.gmn_mock.set_auth_context(
+                session_subj_list=[subj_str], trusted_subj_list=[]
+            ):
+                object_list_pyxb = self.client_v2.listObjects(identifier=pid)
+            assert len(object_list_pyxb.objectInfo) == expected_count
+
+    @responses.activate
+    def test_1020(self):
+        """getLogRecords(): Records are redacted for subject with read access and not
+        redacted for subject with write access."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(
+                self.client_v2,
+                permission_list=[
+                    (["acl_filter_read_subj"], ["read"]),
+                    (["acl_filter_write_subj"], ["write"]),
+                ],
+            )
+        for subj_str, is_redacted in (
+            ("acl_filter_read_subj", True),
+            ("acl_filter_write_subj", False),
+        ):
+            with d1_gmn.tests.gmn_mock.set_auth_context(
+                session_subj_list=[subj_str], trusted_subj_list=[]
+            ):
+                log_pyxb = self.client_v2.getLogRecords(idFilter=pid)
+            assert len(log_pyxb.logEntry) == 1
+            assert (log_pyxb.logEntry[0].subject.value() == "<NotAuthorized>") == (
+                is_redacted
+            )
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestAccessPolicyFilterBenchmark")
+@pytest.mark.skip("Benchmark. Slow, creates a large number of database rows")
+class TestAccessPolicyFilterBenchmark(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    """Measure listObjects() and getLogRecords() for untrusted subjects on a node with
+    BENCHMARK_OBJECT_COUNT objects, each readable by one of BENCHMARK_SUBJECT_COUNT
+    subjects, and with one Event Log record per object."""
+
+    def _create_benchmark_rows(self):
+        template_model = d1_gmn.app.models.ScienceObject.objects.first()
+        subject_list = [
+            d1_gmn.app.models.subject("benchmark_subj_{}".format(i))
+            for i in range(BENCHMARK_SUBJECT_COUNT)
+        ]
+        event_model = d1_gmn.app.models.event("read")
+        ip_address_model = d1_gmn.app.models.ip_address("127.0.0.1")
+        user_agent_model = d1_gmn.app.models.user_agent("benchmark")
+        base_dt = datetime.datetime(2010, 1, 1, tzinfo=datetime.timezone.utc)
+        for batch_start in range(0, BENCHMARK_OBJECT_COUNT, BENCHMARK_BATCH_SIZE):
+            idx_range = range(batch_start, batch_start + BENCHMARK_BATCH_SIZE)
+            did_list = d1_gmn.app.models.IdNamespace.objects.bulk_create(
+                [
+                    d1_gmn.app.models.IdNamespace(did="benchmark_pid_{}".format(i))
+                    for i in idx_range
+                ]
+            )
+            sciobj_list = d1_gmn.app.models.ScienceObject.objects.bulk_create(
+                [
+                    d1_gmn.app.models.ScienceObject(
+                        pid=did_model,
+                        serial_version=1,
+                        modified_timestamp=base_dt + datetime.timedelta(seconds=i),
+                        uploaded_timestamp=base_dt + datetime.timedelta(seconds=i),
+                        format_id=template_model.format_id,
+                        checksum="{:032x}".format(i),
+                        checksum_algorithm_id=template_model.checksum_algorithm_id,
+                        size=i,
+                        submitter_id=template_model.submitter_id,
+                        rights_holder_id=template_model.rights_holder_id,
+                        origin_member_node_id=template_model.origin_member_node_id,
+                        authoritative_member_node_id=(
+                            template_model.authoritative_member_node_id
+                        ),
+                        is_archived=False,
+                        url="benchmark/{}".format(i),
+                    )
+                    for i, did_model in zip(idx_range, did_list)
+                ]
+            )
+            d1_gmn.app.models.Permission.objects.bulk_create(
+                [
+                    d1_gmn.app.models.Permission(
+                        sciobj=sciobj_model,
+                        subject=subject_list[i % BENCHMARK_SUBJECT_COUNT],
+                        level=d1_gmn.app.auth.READ_LEVEL,
+                    )
+                    for i, sciobj_model in zip(idx_range, sciobj_list)
+                ]
+            )
+            d1_gmn.app.models.EventLog.objects.bulk_create(
+                [
+                    d1_gmn.app.models.EventLog(
+                        sciobj=sciobj_model,
+                        event=event_model,
+                        ip_address=ip_address_model,
+                        user_agent=user_agent_model,
+                        subject=subject_list[i % BENCHMARK_SUBJECT_COUNT],
+                    )
+                    for i, sciobj_model in zip(idx_range, sciobj_list)
+                ]
+            )
+        with django.db.connection.cursor() as cursor:
+            for table_name in ("app_scienceobject", "app_permission", "app_eventlog"):
+                cursor.execute("analyze {}".format(table_name))
+
+    def _measure(self, api_func, subj_list, start):
+        with d1_gmn.tests.gmn_mock.set_auth_context(
+            session_subj_list=subj_list, trusted_subj_list=[]
+        ):
+            start_ts = time.perf_counter()
+            for _ in range(BENCHMARK_REPEAT_COUNT):
+                api_func(start=start, count=BENCHMARK_SLICE_SIZE)
+            elapsed_sec = (time.perf_counter() - start_ts) / BENCHMARK_REPEAT_COUNT
+        logger.info(
+            "api={} subj_count={} start={} count={} sec_per_slice={:.3f}".format(
+                api_func.__name__,
+                len(subj_list),
+                start,
+                BENCHMARK_SLICE_SIZE,
+                elapsed_sec,
+            )
+        )
+
+    @responses.activate
+    def test_1000(self):
+        """listObjects() and getLogRecords() with access policy filter."""
+        self._create_benchmark_rows()
+        for subj_count in (1, 3, BENCHMARK_SUBJECT_COUNT):
+            subj_list = ["benchmark_subj_{}".format(i) for i in range(subj_count)]
+            for api_func in (self.client_v2.listObjects, self.client_v2.getLogRecords):
+                for start in (0, BENCHMARK_OBJECT_COUNT // 20):
+                    self._measure(api_func, subj_list, start)
@@ -0,0 +1,223 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test HTTP Range and conditional requests for MNRead.get() and
+MNReplication.getReplica()."""
+import email.utils
+
+import pytest
+import responses
+
+import d1_common.url
+
+import django.http
+import django.test
+
+import d1_gmn.app.models
+import d1_gmn.app.views.byte_range
+import d1_gmn.app.views.headers
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestByteRange")
+class TestByteRange(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _get(self, pid, **header_dict):
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            return django.test.Client().get(
+                d1_common.url.joinPathElements(
+                    "/", "v2", "object", pid.encode("utf-8")
+                ),
+                **header_dict
+            )
+
+    def _get_body(self, response):
+        if response.streaming:
+            return b"".join(response.streaming_content)
+        return response.content
+
+    def _get_etag(self, pid):
+        return d1_gmn.app.views.headers.get_etag(
+            d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid)
+        )
+
+    @pytest.mark.parametrize(
+        "range_str, expected_list",
+        [
+            ("bytes=0-9", [(0, 9)]),
+            ("bytes=10-", [(10, 99)]),
+            ("bytes=-10", [(90, 99)]),
+            ("bytes=90-200", [(90, 99)]),
+            ("bytes=-200", [(0, 99)]),
+            ("bytes=0-0, 5-9, -1", [(0, 0), (5, 9), (99, 99)]),
+            ("bytes=100-", []),
+            ("bytes=-0", []),
+            ("bytes=9-0", None),
+            ("bytes=a-b", None),
+            ("bytes=", None),
+            ("lines=0-9", None),
+            ("0-9", None),
+        ],
+    )
+    def test_1000(self, range_str, expected_list):
+        """parse_range_header(): Valid, unsatisfiable and invalid ranges."""
+        assert (
+            d1_gmn.app.views.byte_range.parse_range_header(range_str, 100)
+            == expected_list
+        )
+
+    @responses.activate
+    def test_1010(self):
+        """get(): Full SciObj advertises Range support and holds an ETag."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        response = self._get(pid)
+        assert response.status_code == 200
+        assert response["Accept-Ranges"] == "bytes"
+        assert response["ETag"] == self._get_etag(pid)
+        assert self._get_body(response) == sciobj_bytes
+
+    @responses.activate
+    def test_1020(self):
+        """get(): Single range returns 206 with only the requested bytes."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        response = self._get(pid, HTTP_RANGE="bytes=1-4")
+        assert response.status_code == 206
+        assert response["Content-Range"] == "bytes 1-4/{}".format(len(sciobj_bytes))
+        assert response["Content-Length"] == "4"
+        assert self._get_body(response) == sciobj_bytes[1:5]
+
+    @responses.activate
+    def test_1030(self):
+        """get(): Suffix range returns the last bytes of the SciObj."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        response = self._get(pid, HTTP_RANGE="bytes=-3")
+        assert response.status_code == 206
+        assert self._get_body(response) == sciobj_bytes[-3:]
+
+    @responses.activate
+    def test_1040(self):
+        """get(): Multiple ranges return a multipart/byteranges body with a correct
+        Content-Length."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        response = self._get(pid, HTTP_RANGE="bytes=0-1,-2")
+        assert response.status_code == 206
+        content_type_str = response["Content-Type"]
+        assert content_type_str.startswith("multipart/byteranges; boundary=")
+        body_bytes = self._get_body(response)
+        assert response["Content-Length"] == str(len(body_bytes))
+        size = len(sciobj_bytes)
+        assert "Content-Range: bytes 0-1/{}".format(size).encode() in body_bytes
+        assert (
+            "Content-Range: bytes {}-{}/{}".format(size - 2, size - 1, size).encode()
+            in body_bytes
+        )
+        assert sciobj_bytes[:2] in body_bytes
+        assert sciobj_bytes[-2:] in body_bytes
+        assert body_bytes.endswith(
+            "--{}--\r\n".format(content_type_str.split("=")[1]).encode()
+        )
+
+    @responses.activate
+    def test_1050(self):
+        """get(): Unsatisfiable range returns 416 with the size of the SciObj."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        response = self._get(pid, HTTP_RANGE="bytes={}-".format(len(sciobj_bytes) + 10))
+        assert response.status_code == 416
+        assert response["Content-Range"] == "bytes */{}".format(len(sciobj_bytes))
+
+    @responses.activate
+    def test_1060(self):
+        """get(): Invalid Range header is ignored and the full SciObj is returned."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        response = self._get(pid, HTTP_RANGE="bytes=5-1")
+        assert response.status_code == 200
+        assert self._get_body(response) == sciobj_bytes
+
+    @responses.activate
+    def test_1070(self):
+        """get(): If-Range with the current ETag honors the Range header."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        response = self._get(
+            pid, HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE=self._get_etag(pid)
+        )
+        assert response.status_code == 206
+        assert self._get_body(response) == sciobj_bytes[:2]
+
+    @responses.activate
+    def test_1080(self):
+        """get(): If-Range with a non-matching ETag returns the full SciObj."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        response = self._get(pid, HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE='"MD5:0"')
+        assert response.status_code == 200
+        assert self._get_body(response) == sciobj_bytes
+
+    @responses.activate
+    def test_1090(self):
+        """get(): If-None-Match with the current ETag returns 304 without a body."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        response = self._get(pid, HTTP_IF_NONE_MATCH=self._get_etag(pid))
+        assert response.status_code == 304
+        assert response["ETag"] == self._get_etag(pid)
+        assert response.content == b""
+
+    @responses.activate
+    def test_1100(self):
+        """get(): If-None-Match with a different ETag returns the full SciObj."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        response = self._get(pid, HTTP_IF_NONE_MATCH='"MD5:0", W/"SHA-1:0"')
+        assert response.status_code == 200
+        assert self._get_body(response) == sciobj_bytes
+
+    @responses.activate
+    def test_1110(self):
+        """get(): If-Modified-Since at or after Last-Modified returns 304, while an
+        earlier date returns the full SciObj."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        last_modified_str = self._get(pid)["Last-Modified"]
+        response = self._get(pid, HTTP_IF_MODIFIED_SINCE=last_modified_str)
+        assert response.status_code == 304
+        response = self._get(
+            pid, HTTP_IF_MODIFIED_SINCE=email.utils.formatdate(0, usegmt=True)
+        )
+        assert response.status_code == 200
+        assert self._get_body(response) == sciobj_bytes
+
+    @responses.activate
+    def test_1120(self):
+        """get(): Conditional request that returns 304 is not logged as a read
+        event."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        with django.test.override_settings(LOG_IGNORE_TRUSTED_SUBJECT=False):
+            event_count = d1_gmn.app.models.EventLog.objects.count()
+            response = self._get(pid, HTTP_IF_NONE_MATCH="*")
+            assert response.status_code == 304
+            assert d1_gmn.app.models.EventLog.objects.count() == event_count
+
+    @responses.activate
+    def test_1130(self):
+        """Proxy SciObj headers do not advertise Range support."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        sciobj_model = d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid)
+        sciobj_model.url = "https://remote.invalid/object/{}".format(pid)
+        response = django.http.HttpResponse()
+        d1_gmn.app.views.headers.add_sciobj_properties_headers_to_response(
+            response, sciobj_model
+        )
+        assert "Accept-Ranges" not in response
+        assert response["DataONE-Proxy"] == sciobj_model.url
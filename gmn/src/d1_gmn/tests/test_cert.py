@@ -17,8 +17,11 @@
 # limitations under the License.
 """Test subject extraction from certificate and SubjectInfo."""
 
+import freezegun
 import responses
 
+import django.test
+
 import d1_gmn.app.middleware.session_cert
 import d1_gmn.tests.gmn_test_case
 
@@ -29,6 +32,19 @@ class TestCert(d1_gmn.tests.gmn_test_case.GMNTestCase):
     cert_simple_subject_info_pem = d1_test.test_files.load_cert(
         "cert_with_simple_subject_info.pem"
     )
+    cert_no_subject_info_pem = d1_test.test_files.load_cert(
+        "cert_cn_ucsb_1_dataone_org_20150709_180838.pem"
+    )
+
+    def setup_method(self, method):
+        super().setup_method(method)
+        d1_gmn.app.middleware.session_cert.clear_cache()
+
+    def _get_subjects(self, cert_pem):
+        return d1_gmn.app.middleware.session_cert.get_authenticated_subjects(cert_pem)
+
+    def _get_stats(self):
+        return d1_gmn.app.middleware.session_cert.get_cache_stats()
 
     @responses.activate
     def test_1000(self):
@@ -47,3 +63,60 @@ class TestCert(d1_gmn.tests.gmn_test_case.GMNTestCase):
             "public",
             "verifiedUser",
         ]
+
+    @freezegun.freeze_time("2016-10-25 12:00:00")
+    def test_1010(self):
+        """Subjects for a repeated certificate are returned from the cache."""
+        first_tup = self._get_subjects(self.cert_simple_subject_info_pem)
+        second_tup = self._get_subjects(self.cert_simple_subject_info_pem)
+        assert first_tup == second_tup
+        stats_dict = self._get_stats()
+        assert stats_dict["misses"] == 1
+        assert stats_dict["hits"] == 1
+        assert stats_dict["size"] == 1
+
+    @freezegun.freeze_time("2016-10-25 12:00:00")
+    def test_1020(self):
+        """Modifying the returned equivalent set does not modify the cached set."""
+        primary_str, equivalent_set = self._get_subjects(
+            self.cert_simple_subject_info_pem
+        )
+        equivalent_set.clear()
+        assert len(self._get_subjects(self.cert_simple_subject_info_pem)[1]) == 4
+
+    def test_1030(self):
+        """A certificate that has expired is not returned from the cache."""
+        with freezegun.freeze_time("2016-10-25 12:00:00"):
+            self._get_subjects(self.cert_simple_subject_info_pem)
+        with freezegun.freeze_time("2016-10-26"):
+            primary_str, equivalent_set = self._get_subjects(
+                self.cert_simple_subject_info_pem
+            )
+        assert primary_str == "CN=Roger Dahl A1779,O=Google,C=US,DC=cilogon,DC=org"
+        stats_dict = self._get_stats()
+        assert stats_dict["hits"] == 0
+        assert stats_dict["misses"] == 2
+        assert stats_dict["expired"] == 1
+        assert stats_dict["size"] == 0
+
+    @freezegun.freeze_time("2016-10-25 12:00:00")
+    def test_1040(self):
+        """The least recently used certificate is evicted when the cache is full."""
+        with django.test.override_settings(CERT_SUBJECT_CACHE_SIZE=1):
+            self._get_subjects(self.cert_simple_subject_info_pem)
+            self._get_subjects(self.cert_no_subject_info_pem)
+            self._get_subjects(self.cert_simple_subject_info_pem)
+        stats_dict = self._get_stats()
+        assert stats_dict["hits"] == 0
+        assert stats_dict["misses"] == 3
+        assert stats_dict["evicted"] == 2
+        assert stats_dict["size"] == 1
+
+    @freezegun.freeze_time("2016-10-25 12:00:00")
+    def test_1050(self):
+        """CERT_SUBJECT_CACHE_SIZE = 0 disables the cache."""
+        with django.test.override_settings(CERT_SUBJECT_CACHE_SIZE=0):
+            self._get_subjects(self.cert_simple_subject_info_pem)
+            self._get_subjects(self.cert_simple_subject_info_pem)
+        stats_dict = self._get_stats()
+        assert stats_dict["hits"] == stats_dict["misses"] == stats_dict["size"] == 0
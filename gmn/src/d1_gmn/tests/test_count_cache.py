@@ -0,0 +1,145 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test caching and estimation of the total number of items in listObjects() and
+getLogRecords() result sets."""
+import datetime
+
+import responses
+
+import django.core.cache
+import django.db
+import django.test
+import django.test.utils
+
+import d1_gmn.app.count_cache
+import d1_gmn.app.models
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestCountCache")
+class TestCountCache(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _get_total_and_count_query_count(self, api_func, **filter_dict):
+        """Return the total, and the number of COUNT queries issued to get it."""
+        with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+            with d1_gmn.tests.gmn_mock.disable_auth():
+                total_int = api_func(start=0, count=0, **filter_dict).total
+        return (
+            total_int,
+            len([q for q in ctx.captured_queries if "COUNT(" in q["sql"].upper()]),
+        )
+
+    @responses.activate
+    def test_1000(self):
+        """listObjects(): The total is counted by the first call and retrieved from the
+        cache by the next."""
+        django.core.cache.cache.clear()
+        with django.test.override_settings(COUNT_CACHE_TIMEOUT=300):
+            total_1, count_query_1 = self._get_total_and_count_query_count(
+                self.client_v2.listObjects
+            )
+            total_2, count_query_2 = self._get_total_and_count_query_count(
+                self.client_v2.listObjects
+            )
+        assert total_1 == total_2
+        assert count_query_1 == 1
+        assert count_query_2 == 0
+
+    @responses.activate
+    def test_1010(self):
+        """getLogRecords(): The total is counted by the first call and retrieved from
+        the cache by the next."""
+        django.core.cache.cache.clear()
+        with django.test.override_settings(COUNT_CACHE_TIMEOUT=300):
+            total_1, count_query_1 = self._get_total_and_count_query_count(
+                self.client_v2.getLogRecords
+            )
+            total_2, count_query_2 = self._get_total_and_count_query_count(
+                self.client_v2.getLogRecords
+            )
+        assert total_1 == total_2
+        assert count_query_1 == 1
+        assert count_query_2 == 0
+
+    @responses.activate
+    def test_1020(self):
+        """Creating an object invalidates the cached totals for both listObjects() and
+        getLogRecords()."""
+        django.core.cache.cache.clear()
+        with django.test.override_settings(COUNT_CACHE_TIMEOUT=300):
+            object_total_1, _ = self._get_total_and_count_query_count(
+                self.client_v2.listObjects
+            )
+            log_total_1, _ = self._get_total_and_count_query_count(
+                self.client_v2.getLogRecords
+            )
+            with d1_gmn.tests.gmn_mock.disable_auth():
+                self.create_obj(self.client_v2)
+            object_total_2, _ = self._get_total_and_count_query_count(
+                self.client_v2.listObjects
+            )
+            log_total_2, _ = self._get_total_and_count_query_count(
+                self.client_v2.getLogRecords
+            )
+        assert object_total_2 == object_total_1 + 1
+        assert log_total_2 == log_total_1 + 1
+
+    @responses.activate
+    def test_1030(self):
+        """Totals for different filters are cached separately."""
+        django.core.cache.cache.clear()
+        from_date = datetime.datetime(2000, 5, 6, 15, 16, 17)
+        with django.test.override_settings(COUNT_CACHE_TIMEOUT=300):
+            unfiltered_total, _ = self._get_total_and_count_query_count(
+                self.client_v2.listObjects
+            )
+            filtered_total, count_query = self._get_total_and_count_query_count(
+                self.client_v2.listObjects, fromDate=from_date
+            )
+        assert count_query == 1
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            assert (
+                filtered_total
+                == self.client_v2.listObjects(
+                    start=0, count=0, fromDate=from_date
+                ).total
+            )
+        assert filtered_total < unfiltered_total
+
+    @responses.activate
+    def test_1040(self):
+        """COUNT_ESTIMATE=True: Unfiltered query from trusted subject returns the
+        Postgres estimate without counting, while filtered queries are counted."""
+        with django.db.connection.cursor() as cursor:
+            cursor.execute("analyze app_scienceobject")
+        estimate_int = d1_gmn.app.count_cache._get_estimate(
+            d1_gmn.app.models.ScienceObject
+        )
+        assert estimate_int
+        with django.test.override_settings(COUNT_ESTIMATE=True):
+            total_int, count_query = self._get_total_and_count_query_count(
+                self.client_v2.listObjects
+            )
+            assert total_int == estimate_int
+            assert count_query == 0
+            total_int, count_query = self._get_total_and_count_query_count(
+                self.client_v2.listObjects, formatId="text/plain"
+            )
+            assert count_query == 1
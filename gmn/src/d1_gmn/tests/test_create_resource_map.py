@@ -137,3 +137,32 @@ class TestCreateResourceMap(d1_gmn.tests.gmn_test_case.GMNTestCase):
                     len(uncreated_pid_set), len(avail_pid_set), is_ore, len(aggr_list)
                 )
             )
+
+    @responses.activate
+    @django.test.override_settings(RESOURCE_MAP_CREATE="block")
+    def test_1050(self, gmn_client_v2):
+        """MNStorage.create(): "block" mode: Creating a resource map where only some of
+        the aggregated objects exist raises InvalidRequest."""
+        pid_list = self.create_multiple_objects(gmn_client_v2)
+        pid_list.append(d1_test.instance_generator.identifier.generate_pid("PID_AGGR_"))
+        with pytest.raises(d1_common.types.exceptions.InvalidRequest):
+            self.create_resource_map(gmn_client_v2, pid_list)
+
+    def test_1060(self):
+        """_create_or_update_map(): Updating the membership of an existing map adds
+        new members, removes dropped members and ignores duplicates."""
+        map_pid = d1_test.instance_generator.identifier.generate_pid("PID_ORE_")
+        pid_list = [
+            d1_test.instance_generator.identifier.generate_pid("PID_AGGR_")
+            for _ in range(10)
+        ]
+        d1_gmn.app.resource_map._create_or_update_map(map_pid, pid_list)
+        new_pid_list = pid_list[3:] + [
+            d1_test.instance_generator.identifier.generate_pid("PID_AGGR_")
+            for _ in range(5)
+        ]
+        d1_gmn.app.resource_map._create_or_update_map(
+            map_pid, new_pid_list + new_pid_list[:2]
+        )
+        member_list = d1_gmn.app.resource_map.get_resource_map_members_by_map(map_pid)
+        assert sorted(new_pid_list) == sorted(member_list)
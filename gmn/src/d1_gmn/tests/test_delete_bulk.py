@@ -0,0 +1,167 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test bulk delete of objects and the subject cleanup performed on delete."""
+import os
+import tempfile
+import unittest.mock
+
+import responses
+
+import d1_gmn.app.delete
+import d1_gmn.app.did
+import d1_gmn.app.model_util
+import d1_gmn.app.models
+import d1_gmn.app.sciobj_store
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+import d1_test.instance_generator.random_data
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestDeleteBulk")
+class TestDeleteBulk(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _create_obj_list(self, n_objects, **create_dict):
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            return [
+                self.create_obj(self.client_v2, **create_dict)[0]
+                for _ in range(n_objects)
+            ]
+
+    def _delete_bulk(self, pid_list, *arg_list):
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt") as f:
+            f.write("\n".join(pid_list))
+            f.flush()
+            self.call_management_command(
+                "delete-sciobj", "--pid-path", f.name, *arg_list
+            )
+
+    def _is_sciobj_file(self, pid):
+        return os.path.exists(
+            d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid)
+        )
+
+    @responses.activate
+    def test_1000(self):
+        """delete-sciobj: Objects are deleted in batches and unknown PIDs are
+        skipped."""
+        pid_list = self._create_obj_list(7)
+        keep_pid = pid_list.pop()
+        self._delete_bulk(pid_list + ["unknown_pid"], "--batch-size=3")
+        for pid in pid_list:
+            assert not d1_gmn.app.did.is_existing_object(pid)
+            assert not self._is_sciobj_file(pid)
+        assert d1_gmn.app.did.is_existing_object(keep_pid)
+        assert self._is_sciobj_file(keep_pid)
+
+    @responses.activate
+    def test_1010(self):
+        """delete-sciobj: --max-objects limits the number of deleted objects."""
+        pid_list = self._create_obj_list(4)
+        self._delete_bulk(pid_list, "--max-objects=2")
+        assert [d1_gmn.app.did.is_existing_object(pid) for pid in pid_list] == [
+            False,
+            False,
+            True,
+            True,
+        ]
+
+    @responses.activate
+    def test_1020(self):
+        """delete-sciobj: Subjects that were only used by the deleted objects are
+        removed while subjects still in use are kept."""
+        shared_subj = d1_test.instance_generator.random_data.random_subj(fixed_len=12)
+        unique_subj_list = [
+            d1_test.instance_generator.random_data.random_subj(fixed_len=12)
+            for _ in range(3)
+        ]
+        pid_list = [
+            self._create_obj_list(
+                1,
+                rights_holder=subj,
+                permission_list=[([shared_subj], ["write"])],
+            )[0]
+            for subj in unique_subj_list
+        ]
+        self._delete_bulk(pid_list[:2])
+        db_subj_set = set(
+            d1_gmn.app.models.Subject.objects.values_list("subject", flat=True)
+        )
+        assert not set(unique_subj_list[:2]) & db_subj_set
+        assert {unique_subj_list[2], shared_subj} <= db_subj_set
+
+    def test_1030(self):
+        """delete_unused_subjects(): Only the given subjects are checked."""
+        unused_subj_list = [
+            d1_gmn.app.models.subject(
+                d1_test.instance_generator.random_data.random_subj(fixed_len=12)
+            )
+            for _ in range(2)
+        ]
+        d1_gmn.app.model_util.delete_unused_subjects({unused_subj_list[0].id})
+        assert not d1_gmn.app.models.Subject.objects.filter(
+            id=unused_subj_list[0].id
+        ).exists()
+        assert d1_gmn.app.models.Subject.objects.filter(
+            id=unused_subj_list[1].id
+        ).exists()
+
+    @responses.activate
+    def test_1040(self):
+        """delete-sciobj: A batch that fails leaves its objects intact and the command
+        continues with the next batch."""
+        pid_list = self._create_obj_list(4)
+        # Simulate an object that is deleted after the PID file has been checked.
+        existing_pid_set = set(pid_list) | {"deleted_pid"}
+        with unittest.mock.patch(
+            "d1_gmn.app.did.get_existing_object_pid_set",
+            return_value=existing_pid_set,
+        ):
+            self._delete_bulk(
+                pid_list[:1] + ["deleted_pid"] + pid_list[1:], "--batch-size=2"
+            )
+        assert [d1_gmn.app.did.is_existing_object(pid) for pid in pid_list] == [
+            True,
+            False,
+            False,
+            False,
+        ]
+        assert self._is_sciobj_file(pid_list[0])
+        assert not self._is_sciobj_file(pid_list[3])
+
+    @responses.activate
+    def test_1050(self):
+        """delete_sciobj_bulk(): An error when deleting the bytes of an object is logged
+        and the remaining objects are deleted."""
+        pid_list = self._create_obj_list(3)
+        delete_sciobj = d1_gmn.app.sciobj_store.delete_sciobj
+
+        def delete_sciobj_failing(url_split, pid):
+            if pid == pid_list[0]:
+                raise OSError("Simulated store error")
+            return delete_sciobj(url_split, pid)
+
+        with unittest.mock.patch(
+            "d1_gmn.app.sciobj_store.delete_sciobj", side_effect=delete_sciobj_failing
+        ):
+            assert d1_gmn.app.delete.delete_sciobj_bulk(pid_list) == pid_list
+        for pid in pid_list:
+            assert not d1_gmn.app.did.is_existing_object(pid)
+        assert self._is_sciobj_file(pid_list[0])
+        assert not self._is_sciobj_file(pid_list[1])
+        assert not self._is_sciobj_file(pid_list[2])
@@ -0,0 +1,205 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the batched Event Log writer."""
+import datetime
+import json
+import os
+import subprocess
+import tempfile
+import unittest.mock
+
+import responses
+
+import django.db
+import django.test
+
+import d1_gmn.app.event_log_writer
+import d1_gmn.app.models
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestEventLogWriter")
+class TestEventLogWriter(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _create_writer(self, spool_dir_path):
+        # The background thread is not started, as it would write to the database
+        # through a separate connection, outside of the test transaction.
+        return d1_gmn.app.event_log_writer.EventLogWriter(
+            spool_dir_path, batch_size=500, flush_interval=5
+        )
+
+    def _add_events(self, writer, sciobj_id, count):
+        for i in range(count):
+            writer.add(
+                sciobj_id,
+                "read",
+                "10.0.0.{}".format(i),
+                "event_log_writer_agent",
+                "event_log_writer_subj",
+                datetime.datetime(2001, 2, 3, 4, 5, i, tzinfo=datetime.timezone.utc),
+            )
+
+    def _get_event_log_queryset(self):
+        return d1_gmn.app.models.EventLog.objects.filter(
+            user_agent__user_agent="event_log_writer_agent"
+        )
+
+    def test_1000(self):
+        """flush(): Spooled events are written with their original timestamps and the
+        spool is removed."""
+        sciobj_model = d1_gmn.app.models.ScienceObject.objects.first()
+        with tempfile.TemporaryDirectory() as spool_dir_path:
+            writer = self._create_writer(spool_dir_path)
+            self._add_events(writer, sciobj_model.id, 3)
+            assert not self._get_event_log_queryset().exists()
+            writer.flush()
+            assert os.listdir(spool_dir_path) == []
+        event_log_list = list(self._get_event_log_queryset().order_by("timestamp"))
+        assert len(event_log_list) == 3
+        assert all(e.sciobj_id == sciobj_model.id for e in event_log_list)
+        assert event_log_list[2].timestamp == datetime.datetime(
+            2001, 2, 3, 4, 5, 2, tzinfo=datetime.timezone.utc
+        )
+
+    def test_1010(self):
+        """flush(): Events for objects that no longer exist are dropped."""
+        missing_id = d1_gmn.app.models.ScienceObject.objects.order_by("-id")[0].id + 1
+        with tempfile.TemporaryDirectory() as spool_dir_path:
+            writer = self._create_writer(spool_dir_path)
+            self._add_events(writer, missing_id, 2)
+            writer.flush()
+            assert os.listdir(spool_dir_path) == []
+        assert not self._get_event_log_queryset().exists()
+
+    def test_1020(self):
+        """recover(): Spool left by a process that is no longer running is claimed and
+        written by the next flush."""
+        sciobj_model = d1_gmn.app.models.ScienceObject.objects.first()
+        proc = subprocess.Popen(["true"])
+        proc.wait()
+        with tempfile.TemporaryDirectory() as spool_dir_path:
+            crashed_writer = self._create_writer(spool_dir_path)
+            crashed_writer._pid = proc.pid
+            crashed_writer._spool_path = os.path.join(
+                spool_dir_path, "event_log.{}.spool".format(proc.pid)
+            )
+            self._add_events(crashed_writer, sciobj_model.id, 4)
+            writer = self._create_writer(spool_dir_path)
+            writer.recover()
+            writer.flush()
+            assert os.listdir(spool_dir_path) == []
+        assert self._get_event_log_queryset().count() == 4
+
+    @responses.activate
+    def test_1030(self):
+        """getSystemMetadata(): In batch mode, the read event is written when the
+        writer is flushed."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(
+                self.client_v2, permission_list=[(["event_log_writer_subj"], ["read"])]
+            )
+        with tempfile.TemporaryDirectory() as spool_dir_path:
+            writer = self._create_writer(spool_dir_path)
+            with django.test.override_settings(EVENT_LOG_WRITE_MODE="batch"):
+                with unittest.mock.patch(
+                    "d1_gmn.app.event_log_writer._get_writer", return_value=writer
+                ):
+                    with d1_gmn.tests.gmn_mock.set_auth_context(
+                        session_subj_list=["event_log_writer_subj"],
+                        trusted_subj_list=[],
+                    ):
+                        self.client_v2.getSystemMetadata(pid)
+            assert self._get_read_count(pid) == 0
+            writer.flush()
+        assert self._get_read_count(pid) == 1
+
+    def _get_read_count(self, pid):
+        return d1_gmn.app.models.EventLog.objects.filter(
+            sciobj__pid__did=pid, event__event="read"
+        ).count()
+
+    def test_1040(self):
+        """flush(): Events are written when the first write fails with an
+        IntegrityError and is retried."""
+        sciobj_model = d1_gmn.app.models.ScienceObject.objects.first()
+        create_bulk = d1_gmn.app.event_log_writer.create_bulk
+        call_list = []
+
+        def create_bulk_once_failing(row_list, dimension_cache):
+            call_list.append(row_list)
+            if len(call_list) == 1:
+                raise django.db.IntegrityError()
+            return create_bulk(row_list, dimension_cache)
+
+        with tempfile.TemporaryDirectory() as spool_dir_path:
+            writer = self._create_writer(spool_dir_path)
+            self._add_events(writer, sciobj_model.id, 2)
+            with unittest.mock.patch(
+                "d1_gmn.app.event_log_writer.create_bulk",
+                side_effect=create_bulk_once_failing,
+            ):
+                writer.flush()
+            assert os.listdir(spool_dir_path) == []
+        assert len(call_list) == 2
+        assert self._get_event_log_queryset().count() == 2
+
+    def test_1050(self):
+        """flush(): An event that cannot be written is moved to a failed file, and the
+        other events in its batch and the following batches are written."""
+        sciobj_model = d1_gmn.app.models.ScienceObject.objects.first()
+        # Longer than the ip_address column.
+        bad_ip_address = "2001:0db8:85a3:0000:0000:8a2e:0370:7334"
+        create_bulk = d1_gmn.app.event_log_writer.create_bulk
+
+        def create_bulk_failing_for_bad_row(row_list, dimension_cache):
+            if any(r["ip_address"] == bad_ip_address for r in row_list):
+                raise django.db.DataError()
+            return create_bulk(row_list, dimension_cache)
+
+        with tempfile.TemporaryDirectory() as spool_dir_path:
+            writer = self._create_writer(spool_dir_path)
+            writer.add(
+                sciobj_model.id,
+                "read",
+                bad_ip_address,
+                "event_log_writer_agent",
+                "event_log_writer_subj",
+            )
+            self._add_events(writer, sciobj_model.id, 1)
+            writer._claim_spool_file()
+            self._add_events(writer, sciobj_model.id, 3)
+            with unittest.mock.patch(
+                "d1_gmn.app.event_log_writer.create_bulk",
+                side_effect=create_bulk_failing_for_bad_row,
+            ):
+                writer.flush()
+            file_name_list = os.listdir(spool_dir_path)
+            assert len(file_name_list) == 1
+            assert file_name_list[0].endswith(
+                d1_gmn.app.event_log_writer.FAILED_FILE_EXT
+            )
+            with open(os.path.join(spool_dir_path, file_name_list[0])) as f:
+                failed_row_list = [json.loads(s) for s in f]
+            assert [r["ip_address"] for r in failed_row_list] == [bad_ip_address]
+            # Failed files are not claimed as pending files.
+            writer.recover()
+            writer.flush()
+            assert os.listdir(spool_dir_path) == file_name_list
+        assert self._get_event_log_queryset().count() == 4
@@ -28,6 +28,9 @@ import d1_common.types
 import d1_common.types.exceptions
 import d1_common.xml
 
+import django.db
+import django.test.utils
+
 import d1_gmn.tests.gmn_mock
 import d1_gmn.tests.gmn_test_case
 
@@ -227,3 +230,40 @@ class TestGetLogRecords(d1_gmn.tests.gmn_test_case.GMNTestCase):
             pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(gmn_client_v1_v2)
             log = gmn_client_v1_v2.getLogRecords(idFilter=sid)
             print(log)
+
+    @responses.activate
+    def test_1140(self, gmn_client_v1_v2):
+        """MNCore.getLogRecords(): Number of database queries does not depend on the
+        number of records in the slice."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            with django.test.utils.CaptureQueriesContext(
+                django.db.connection
+            ) as small_ctx:
+                log = gmn_client_v1_v2.getLogRecords(start=0, count=2)
+            assert len(log.logEntry) == 2
+            with django.test.utils.CaptureQueriesContext(
+                django.db.connection
+            ) as large_ctx:
+                log = gmn_client_v1_v2.getLogRecords(start=0, count=50)
+            assert len(log.logEntry) == 50
+        assert len(large_ctx.captured_queries) == len(small_ctx.captured_queries)
+
+    @responses.activate
+    def test_1150(self, gmn_client_v1_v2):
+        """MNCore.getLogRecords(): Number of database queries does not depend on the
+        number of records in the slice when records are filtered and redacted for an
+        untrusted subject."""
+        with d1_gmn.tests.gmn_mock.set_auth_context(
+            session_subj_list=["public"], trusted_subj_list=[]
+        ):
+            with django.test.utils.CaptureQueriesContext(
+                django.db.connection
+            ) as small_ctx:
+                gmn_client_v1_v2.getLogRecords(start=0, count=2)
+            with django.test.utils.CaptureQueriesContext(
+                django.db.connection
+            ) as large_ctx:
+                log = gmn_client_v1_v2.getLogRecords(start=0, count=50)
+            assert len(log.logEntry) > 2
+            assert all(e.subject == "<NotAuthorized>" for e in log.logEntry)
+        assert len(large_ctx.captured_queries) == len(small_ctx.captured_queries)
@@ -0,0 +1,113 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test writing of the SciObj batches downloaded by the import command to the DB."""
+import asyncio
+import importlib
+import logging
+import os
+import tempfile
+import unittest.mock
+
+import responses
+
+import d1_common.const
+import d1_common.xml
+
+import d1_gmn.app.did
+import d1_gmn.app.models
+import d1_gmn.app.sciobj_checksum
+import d1_gmn.app.sciobj_store
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+# "import" is a reserved word, so the command module is imported by name.
+import_command = importlib.import_module("d1_gmn.app.management.commands.import")
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestImportBatch")
+class TestImportBatch(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _create_command(self, checkpoint_path):
+        command = import_command.Command()
+        command.log = logging.getLogger(__name__)
+        command.sciobj_tracker = unittest.mock.Mock()
+        command.checkpoint = import_command.ImportCheckpoint(
+            checkpoint_path, {"base_url": "https://mn.example.org/mn"}
+        )
+
+        # Write in the test thread, so that the writes are in the test transaction.
+        async def db_call(func, *args):
+            return func(*args)
+
+        command.db_call = db_call
+        return command
+
+    def _create_item(self, command, page_key, is_resource_map=False):
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.generate_sciobj_with_defaults(
+            self.client_v2
+        )
+        if is_resource_map:
+            # The bytes of the Resource Map are not in the SciObj store, so the map
+            # cannot be written to the DB.
+            sysmeta_pyxb.formatId = d1_common.const.ORE_FORMAT_ID
+        command.checkpoint.add_item(page_key)
+        return (
+            sysmeta_pyxb,
+            d1_gmn.app.sciobj_store.get_rel_sciobj_file_url_by_pid(pid),
+            {"MD5": "0" * 32},
+            page_key,
+        )
+
+    def _get_pid(self, item_tup):
+        return d1_common.xml.get_req_val(item_tup[0].identifier)
+
+    @responses.activate
+    def test_1000(self):
+        """sciobj_write_batch(): Only the SciObj that cannot be written fails, and the
+        other SciObjs in the batch are written with their checksums."""
+        with tempfile.TemporaryDirectory() as tmp_dir_path:
+            command = self._create_command(os.path.join(tmp_dir_path, "cp.json"))
+            page_key_list = [command.checkpoint.begin_page("sciobj", i) for i in (0, 1)]
+            item_list = [
+                self._create_item(command, page_key_list[0]),
+                self._create_item(command, page_key_list[1], is_resource_map=True),
+                self._create_item(command, page_key_list[0]),
+            ]
+            for page_key in page_key_list:
+                command.checkpoint.end_page(page_key)
+            asyncio.run(command.sciobj_write_batch(item_list))
+            good_pid_list = [self._get_pid(item_list[0]), self._get_pid(item_list[2])]
+            bad_pid = self._get_pid(item_list[1])
+            for pid in good_pid_list:
+                assert d1_gmn.app.did.is_existing_object(pid)
+                assert (
+                    d1_gmn.app.sciobj_checksum.get(
+                        d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid), "MD5"
+                    )
+                    == "0" * 32
+                )
+            assert not d1_gmn.app.did.is_existing_object(bad_pid)
+            assert command.checkpoint.is_completed("sciobj", 0)
+            assert not command.checkpoint.is_completed("sciobj", 1)
+            error_list = [
+                c[0][1]
+                for c in command.sciobj_tracker.event.call_args_list
+                if c[1].get("is_error")
+            ]
+            assert len(error_list) == 1
+            assert error_list[0].startswith('pid="{}"'.format(bad_pid))
@@ -0,0 +1,206 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the checkpoint that allows an interrupted import to resume."""
+import asyncio
+import importlib
+import os
+import tempfile
+import unittest.mock
+
+import pytest
+
+import django.test
+
+import d1_gmn.app.sciobj_store
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+# "import" is a reserved word, so the command module is imported by name.
+import_command = importlib.import_module("d1_gmn.app.management.commands.import")
+
+KEY_DICT = {"base_url": "https://mn.example.org/mn", "object_page_size": 10}
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestImportCheckpoint")
+class TestImportCheckpoint(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _checkpoint(self, path, key_dict=None, is_restart=False):
+        return import_command.ImportCheckpoint(path, key_dict or KEY_DICT, is_restart)
+
+    def _complete_page(self, checkpoint, phase, page_idx, item_count=2):
+        page_key = checkpoint.begin_page(phase, page_idx)
+        for _ in range(item_count):
+            checkpoint.add_item(page_key)
+        checkpoint.end_page(page_key)
+        for _ in range(item_count):
+            checkpoint.complete_item(page_key)
+
+    def test_1000(self):
+        """A page is completed only when it has been listed and all of its items have
+        been written, and completed pages are restored when resuming."""
+        with tempfile.TemporaryDirectory() as tmp_dir_path:
+            path = os.path.join(tmp_dir_path, "checkpoint.json")
+            checkpoint = self._checkpoint(path)
+            assert not checkpoint.is_resumed
+            page_key = checkpoint.begin_page("sciobj", 3)
+            checkpoint.add_item(page_key)
+            checkpoint.end_page(page_key)
+            assert not checkpoint.is_completed("sciobj", 3)
+            checkpoint.complete_item(page_key)
+            assert checkpoint.is_completed("sciobj", 3)
+            self._complete_page(checkpoint, "event", 0)
+            resumed_checkpoint = self._checkpoint(path)
+            assert resumed_checkpoint.is_resumed
+            assert resumed_checkpoint.is_completed("sciobj", 3)
+            assert resumed_checkpoint.is_completed("event", 0)
+            assert not resumed_checkpoint.is_completed("sciobj", 0)
+            assert resumed_checkpoint.get_completed_count("sciobj") == 1
+
+    def test_1010(self):
+        """A page with a failed item is not completed, so it is retried when
+        resuming."""
+        with tempfile.TemporaryDirectory() as tmp_dir_path:
+            path = os.path.join(tmp_dir_path, "checkpoint.json")
+            checkpoint = self._checkpoint(path)
+            self._complete_page(checkpoint, "sciobj", 0)
+            page_key = checkpoint.begin_page("sciobj", 1)
+            checkpoint.add_item(page_key)
+            checkpoint.fail_page(page_key)
+            checkpoint.end_page(page_key)
+            checkpoint.complete_item(page_key)
+            assert checkpoint.is_failed
+            assert not checkpoint.is_completed("sciobj", 1)
+            resumed_checkpoint = self._checkpoint(path)
+            assert resumed_checkpoint.is_completed("sciobj", 0)
+            assert not resumed_checkpoint.is_completed("sciobj", 1)
+
+    def test_1020(self):
+        """A checkpoint from an import with a different source, or one that is
+        restarted, is ignored."""
+        with tempfile.TemporaryDirectory() as tmp_dir_path:
+            path = os.path.join(tmp_dir_path, "checkpoint.json")
+            self._complete_page(self._checkpoint(path), "sciobj", 0)
+            other_checkpoint = self._checkpoint(
+                path, dict(KEY_DICT, base_url="https://other.example.org/mn")
+            )
+            assert not other_checkpoint.is_resumed
+            assert not other_checkpoint.is_completed("sciobj", 0)
+            restarted_checkpoint = self._checkpoint(path, is_restart=True)
+            assert not restarted_checkpoint.is_resumed
+
+    def test_1030(self):
+        """Deleting the checkpoint removes the file, and is a no-op if there is no
+        file."""
+        with tempfile.TemporaryDirectory() as tmp_dir_path:
+            path = os.path.join(tmp_dir_path, "checkpoint.json")
+            checkpoint = self._checkpoint(path)
+            self._complete_page(checkpoint, "sciobj", 0)
+            assert os.path.exists(path)
+            checkpoint.delete()
+            assert not os.path.exists(path)
+            checkpoint.delete()
+
+    def _download_bytes_to_store(self, pid, is_interrupted):
+        class AsyncClient(object):
+            async def get(self, out_file, pid):
+                out_file.write(b"abc")
+                if is_interrupted:
+                    raise asyncio.CancelledError()
+                out_file.write(b"def")
+
+        command = import_command.Command()
+        command.async_d1_client = AsyncClient()
+        command.sciobj_tracker = unittest.mock.Mock()
+        return asyncio.run(command.sciobj_download_bytes_to_store(pid, "MD5"))
+
+    def test_1040(self):
+        """An interrupted SciObj download does not leave a truncated file in the SciObj
+        store, so the download is not skipped when the import is resumed."""
+        with tempfile.TemporaryDirectory() as tmp_dir_path:
+            with django.test.override_settings(OBJECT_STORE_PATH=tmp_dir_path):
+                with pytest.raises(asyncio.CancelledError):
+                    self._download_bytes_to_store("import_pid", is_interrupted=True)
+                assert not d1_gmn.app.sciobj_store.is_existing_sciobj_file("import_pid")
+                checksum_dict = self._download_bytes_to_store(
+                    "import_pid", is_interrupted=False
+                )
+                assert checksum_dict["MD5"] == "e80b5017098950fc58aad83c8c14978e"
+                with d1_gmn.app.sciobj_store.open_sciobj_file_by_pid(
+                    "import_pid"
+                ) as sciobj_file:
+                    assert sciobj_file.read() == b"abcdef"
+
+    def test_1050(self):
+        """A SciObj that is already in the SciObj store is not downloaded again, and
+        its checksums are calculated from the stored file."""
+        with tempfile.TemporaryDirectory() as tmp_dir_path:
+            with django.test.override_settings(OBJECT_STORE_PATH=tmp_dir_path):
+                self._download_bytes_to_store("import_pid", is_interrupted=False)
+                checksum_dict = self._download_bytes_to_store(
+                    "import_pid", is_interrupted=True
+                )
+                assert checksum_dict["MD5"] == "e80b5017098950fc58aad83c8c14978e"
+
+    def test_1060(self):
+        """The toDate and number of items of each phase are restored when resuming.
+        Starting a phase over, or failing it, discards its completed pages."""
+        with tempfile.TemporaryDirectory() as tmp_dir_path:
+            path = os.path.join(tmp_dir_path, "checkpoint.json")
+            checkpoint = self._checkpoint(path)
+            assert checkpoint.get_source("sciobj") == (None, None)
+            checkpoint.begin_phase("sciobj", "2019-01-01T00:00:00", 25)
+            self._complete_page(checkpoint, "sciobj", 0)
+            resumed_checkpoint = self._checkpoint(path)
+            assert resumed_checkpoint.get_source("sciobj") == (
+                "2019-01-01T00:00:00",
+                25,
+            )
+            assert resumed_checkpoint.is_completed("sciobj", 0)
+            resumed_checkpoint.begin_phase("sciobj", "2019-02-01T00:00:00", 24)
+            assert not resumed_checkpoint.is_completed("sciobj", 0)
+            self._complete_page(resumed_checkpoint, "sciobj", 1)
+            resumed_checkpoint.fail_phase("sciobj")
+            assert resumed_checkpoint.is_failed
+            failed_checkpoint = self._checkpoint(path)
+            assert failed_checkpoint.get_source("sciobj") == (None, None)
+            assert not failed_checkpoint.is_completed("sciobj", 1)
+
+    def _begin_phase(self, path, total_count):
+        async def list_func(start, count, as_records, **list_arg_dict):
+            return unittest.mock.Mock(total=total_count)
+
+        command = import_command.Command()
+        command.checkpoint = self._checkpoint(path)
+        return asyncio.run(command.begin_phase("sciobj", list_func, {})), command
+
+    def test_1070(self):
+        """Pages completed by an interrupted import are skipped only if the number of
+        items on the source is unchanged."""
+        with tempfile.TemporaryDirectory() as tmp_dir_path:
+            path = os.path.join(tmp_dir_path, "checkpoint.json")
+            (list_arg_dict, total_count), command = self._begin_phase(path, 25)
+            assert total_count == 25
+            to_date = list_arg_dict["toDate"]
+            self._complete_page(command.checkpoint, "sciobj", 0)
+            (list_arg_dict, total_count), command = self._begin_phase(path, 25)
+            assert list_arg_dict["toDate"] == to_date
+            assert command.checkpoint.is_completed("sciobj", 0)
+            (list_arg_dict, total_count), command = self._begin_phase(path, 24)
+            assert total_count == 24
+            assert not command.checkpoint.is_completed("sciobj", 0)
+            assert command.checkpoint.get_source("sciobj")[1] == 24
@@ -0,0 +1,275 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test single pass ingest of uploaded SciObj bytes."""
+import glob
+import hashlib
+import io
+import logging
+import os
+import stat
+import time
+import unittest.mock
+
+import d1_scimeta.util
+import pytest
+import responses
+
+import d1_common.checksum
+import d1_common.resource_map
+import d1_common.types.exceptions
+
+import django.core.files.uploadedfile
+import django.test
+
+import d1_gmn.app.gmn
+import d1_gmn.app.ingest
+import d1_gmn.app.sciobj_store
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_SIZE_LIST = [10 * 1024, 1024**2, 10 * 1024**2]
+
+XML_BYTES = b'<?xml version="1.0"?><root><a>1</a><b>2</b></root>'
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestIngest")
+class TestIngest(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _get_tmp_path_list(self):
+        return glob.glob(
+            os.path.join(
+                d1_gmn.app.sciobj_store.get_abs_sciobj_store_path(),
+                d1_gmn.app.ingest.TMP_FILE_PREFIX + "*",
+            )
+        )
+
+    def _create_upload(self, sciobj_bytes):
+        return django.core.files.uploadedfile.SimpleUploadedFile("object", sciobj_bytes)
+
+    def test_1000(self):
+        """SciObjIngest: Checksums and size are calculated and the bytes are moved
+        into the SciObj store with a single read and write."""
+        sciobj_bytes = b"ingest test bytes " * 1000
+        with d1_gmn.app.ingest.SciObjIngest(
+            self._create_upload(sciobj_bytes), ["MD5", "SHA-1"]
+        ) as sciobj_ingest:
+            assert sciobj_ingest.size == len(sciobj_bytes)
+            assert sciobj_ingest.get_checksum("MD5") == (
+                hashlib.md5(sciobj_bytes).hexdigest()
+            )
+            assert sciobj_ingest.get_checksum("SHA-1") == (
+                hashlib.sha1(sciobj_bytes).hexdigest()
+            )
+            abs_path = sciobj_ingest.commit("ingest_pid_1000")
+        assert sciobj_ingest.read_byte_count == len(sciobj_bytes)
+        assert sciobj_ingest.write_byte_count == len(sciobj_bytes)
+        with open(abs_path, "rb") as f:
+            assert f.read() == sciobj_bytes
+        assert abs_path == d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(
+            "ingest_pid_1000"
+        )
+        os.unlink(abs_path)
+
+    def test_1010(self):
+        """SciObjIngest: Temporary file is removed if the object is not committed."""
+        with d1_gmn.app.ingest.SciObjIngest(
+            self._create_upload(b"discarded bytes"), ["MD5"]
+        ) as sciobj_ingest:
+            sciobj_ingest.get_checksum("MD5")
+            assert len(self._get_tmp_path_list()) == 1
+        assert self._get_tmp_path_list() == []
+
+    def test_1020(self):
+        """SciObjIngest: XML is parsed incrementally across chunk boundaries."""
+        with django.test.override_settings(NUM_CHUNK_BYTES=7):
+            with d1_gmn.app.ingest.SciObjIngest(
+                self._create_upload(XML_BYTES), ["MD5"], is_xml_parsed=True
+            ) as sciobj_ingest:
+                xml_tree = sciobj_ingest.get_xml_tree()
+        assert xml_tree.getroot().tag == "root"
+        assert [e.text for e in xml_tree.getroot()] == ["1", "2"]
+
+    def test_1030(self):
+        """SciObjIngest: XML that is not well formed raises SciMetaError while the
+        checksum is still available."""
+        with d1_gmn.app.ingest.SciObjIngest(
+            self._create_upload(b"<root><a></root>"), ["MD5"], is_xml_parsed=True
+        ) as sciobj_ingest:
+            with pytest.raises(d1_scimeta.util.SciMetaError):
+                sciobj_ingest.get_xml_tree()
+            assert sciobj_ingest.get_checksum("MD5") == (
+                hashlib.md5(b"<root><a></root>").hexdigest()
+            )
+
+    @responses.activate
+    def test_1040(self):
+        """MNStorage.create(): Object with incorrect checksum is rejected and no file
+        is left in the SciObj store."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.generate_sciobj_with_defaults(
+            self.client_v2
+        )
+        sysmeta_pyxb.checksum = d1_common.checksum.create_checksum_object_from_bytes(
+            b"not the object bytes", sysmeta_pyxb.checksum.algorithm
+        )
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            with pytest.raises(d1_common.types.exceptions.InvalidSystemMetadata):
+                self.client_v2.create(pid, io.BytesIO(sciobj_bytes), sysmeta_pyxb)
+        assert not d1_gmn.app.sciobj_store.is_existing_sciobj_file(pid)
+        assert self._get_tmp_path_list() == []
+
+    def _commit_and_get_mode(self, pid):
+        with d1_gmn.app.ingest.SciObjIngest(
+            self._create_upload(b"mode test bytes"), ["MD5"]
+        ) as sciobj_ingest:
+            abs_path = sciobj_ingest.commit(pid)
+        mode = stat.S_IMODE(os.stat(abs_path).st_mode)
+        os.unlink(abs_path)
+        return mode
+
+    def test_1050(self):
+        """SciObjIngest: Committed file gets FILE_UPLOAD_PERMISSIONS, not the 0600 mode
+        of the temporary file."""
+        with django.test.override_settings(FILE_UPLOAD_PERMISSIONS=0o640):
+            assert self._commit_and_get_mode("ingest_pid_1050") == 0o640
+
+    def test_1060(self):
+        """SciObjIngest: Committed file gets the mode set by the umask read at startup
+        if FILE_UPLOAD_PERMISSIONS is None."""
+        with django.test.override_settings(FILE_UPLOAD_PERMISSIONS=None):
+            with unittest.mock.patch("d1_gmn.app.gmn.UMASK_FILE_MODE", 0o640):
+                assert self._commit_and_get_mode("ingest_pid_1060") == 0o640
+
+    def test_1070(self):
+        """_get_umask_file_mode(): Returns the mode for a new file under the umask and
+        leaves the umask unchanged."""
+        old_umask = os.umask(0o027)
+        try:
+            assert d1_gmn.app.gmn._get_umask_file_mode() == 0o640
+            assert os.umask(0o027) == 0o027
+        finally:
+            os.umask(old_umask)
+
+    def test_1080(self):
+        """SciObjIngest: Resource Map is parsed incrementally while the upload is
+        read."""
+        map_bytes = d1_common.resource_map.createSimpleResourceMap(
+            "ingest_ore_pid", "ingest_meta_pid", ["ingest_data_pid"]
+        ).serialize_to_transport()
+        with django.test.override_settings(NUM_CHUNK_BYTES=7):
+            with d1_gmn.app.ingest.SciObjIngest(
+                self._create_upload(map_bytes), ["MD5"], is_resource_map_parsed=True
+            ) as sciobj_ingest:
+                summary = sciobj_ingest.get_resource_map_summary()
+        assert sciobj_ingest.read_byte_count == len(map_bytes)
+        assert summary.getResourceMapPid() == "ingest_ore_pid"
+        assert sorted(summary.getAggregatedPids()) == [
+            "ingest_data_pid",
+            "ingest_meta_pid",
+        ]
+
+    def test_1090(self):
+        """delete_stale_ingest_tmp_files(): Only temporary files that have not been
+        modified recently are deleted."""
+        path_list = []
+        for _ in range(2):
+            with d1_gmn.app.ingest.SciObjIngest(
+                self._create_upload(b"stale bytes"), ["MD5"]
+            ) as sciobj_ingest:
+                sciobj_ingest.get_checksum("MD5")
+                # Keep the temporary file, as for a process that stopped.
+                path_list.append(sciobj_ingest._tmp_path)
+                sciobj_ingest._tmp_path = None
+        stale_ts = time.time() - d1_gmn.app.sciobj_store.STALE_INGEST_TMP_FILE_AGE_SEC
+        os.utime(path_list[0], (stale_ts, stale_ts))
+        try:
+            assert d1_gmn.app.sciobj_store.delete_stale_ingest_tmp_files() == 1
+            assert self._get_tmp_path_list() == [path_list[1]]
+        finally:
+            os.unlink(path_list[1])
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestIngestBenchmark")
+@pytest.mark.skip("Benchmark. Slow, creates large objects")
+class TestIngestBenchmark(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    """Measure the number of bytes read and written while ingesting SciObjs of
+    different sizes with MNStorage.create().
+
+    Before single pass ingest, the upload was read once for the checksum and again
+    for storing it, and Science Metadata was read a third time from the SciObj store
+    for validation.
+
+    """
+
+    @responses.activate
+    def test_1000(self):
+        ingest_list = []
+        original_read = d1_gmn.app.ingest.SciObjIngest._read
+
+        def read_wrapper(sciobj_ingest):
+            if sciobj_ingest not in ingest_list:
+                ingest_list.append(sciobj_ingest)
+            return original_read(sciobj_ingest)
+
+        with unittest.mock.patch.object(
+            d1_gmn.app.ingest.SciObjIngest, "_read", read_wrapper
+        ):
+            for size_int in BENCHMARK_SIZE_LIST:
+                (
+                    pid,
+                    sid,
+                    sciobj_bytes,
+                    sysmeta_pyxb,
+                ) = self.generate_sciobj_with_defaults(self.client_v2)
+                sciobj_bytes = os.urandom(size_int)
+                sysmeta_pyxb.size = size_int
+                sysmeta_pyxb.checksum = (
+                    d1_common.checksum.create_checksum_object_from_bytes(
+                        sciobj_bytes, sysmeta_pyxb.checksum.algorithm
+                    )
+                )
+                io_start_dict = _get_process_io_dict()
+                with d1_gmn.tests.gmn_mock.disable_auth():
+                    self.client_v2.create(pid, io.BytesIO(sciobj_bytes), sysmeta_pyxb)
+                io_end_dict = _get_process_io_dict()
+                sciobj_ingest = ingest_list[-1]
+                logger.info(
+                    "size={} ingest_read={} ingest_write={} "
+                    "process_rchar={} process_wchar={}".format(
+                        size_int,
+                        sciobj_ingest.read_byte_count,
+                        sciobj_ingest.write_byte_count,
+                        io_end_dict.get("rchar", 0) - io_start_dict.get("rchar", 0),
+                        io_end_dict.get("wchar", 0) - io_start_dict.get("wchar", 0),
+                    )
+                )
+
+
+def _get_process_io_dict():
+    """Get the I/O counters for this process from /proc, or an empty dict if not
+    available."""
+    try:
+        with open("/proc/self/io") as f:
+            return {
+                k: int(v)
+                for k, v in (line.split(": ") for line in f.read().splitlines())
+            }
+    except EnvironmentError:
+        return {}
@@ -31,6 +31,9 @@ import responses
 import d1_common
 import d1_common.types.exceptions
 
+import django.db
+import django.test.utils
+
 import d1_gmn.tests.gmn_mock
 import d1_gmn.tests.gmn_test_case
 
@@ -205,3 +208,20 @@ class TestListObjects(d1_gmn.tests.gmn_test_case.GMNTestCase):
                 "replica_status_filter",
                 gmn_client_v1_v2,
             )
+
+    @responses.activate
+    def test_1130(self, gmn_client_v1_v2):
+        """listObjects(): Number of database queries does not depend on the number of
+        objects in the slice."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            with django.test.utils.CaptureQueriesContext(
+                django.db.connection
+            ) as small_ctx:
+                object_list_pyxb = gmn_client_v1_v2.listObjects(start=0, count=2)
+            assert len(object_list_pyxb.objectInfo) == 2
+            with django.test.utils.CaptureQueriesContext(
+                django.db.connection
+            ) as large_ctx:
+                object_list_pyxb = gmn_client_v1_v2.listObjects(start=0, count=50)
+            assert len(object_list_pyxb.objectInfo) == 50
+        assert len(large_ctx.captured_queries) == len(small_ctx.captured_queries)
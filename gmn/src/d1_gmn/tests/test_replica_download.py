@@ -0,0 +1,159 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test download of replica bytes with resume of interrupted transfers."""
+import hashlib
+import os
+import re
+
+import pytest
+import responses
+
+import d1_common.types.exceptions
+import d1_common.utils.filesystem
+
+import d1_client.mnclient
+
+import d1_gmn.app.replica_download
+import d1_gmn.app.sciobj_store
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+import d1_test.instance_generator.random_data
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestReplicaDownload")
+class TestReplicaDownload(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _add_replica_callback(self, sciobj_bytes, honor_range=True):
+        """Mock MNReplication.getReplica() on the source node. Returns the list of
+        Range headers received."""
+        range_list = []
+
+        def callback(request):
+            range_str = request.headers.get("Range")
+            range_list.append(range_str)
+            if range_str is None or not honor_range:
+                return 200, {}, sciobj_bytes
+            start = int(re.match(r"bytes=(\d+)-", range_str).group(1))
+            if start >= len(sciobj_bytes):
+                return 416, {}, b""
+            return (
+                206,
+                {
+                    "Content-Range": "bytes {}-{}/{}".format(
+                        start, len(sciobj_bytes) - 1, len(sciobj_bytes)
+                    )
+                },
+                sciobj_bytes[start:],
+            )
+
+        responses.add_callback(
+            responses.GET,
+            re.compile(r".*/replica/.*"),
+            callback=callback,
+            content_type="application/octet-stream",
+        )
+        return range_list
+
+    def _create_mn_client(self):
+        return d1_client.mnclient.MemberNodeClient(
+            d1_test.d1_test_case.MOCK_REMOTE_BASE_URL, use_stream=True
+        )
+
+    def _write_partial_file(self, pid, partial_bytes):
+        partial_path = d1_gmn.app.replica_download.get_partial_path(pid)
+        d1_common.utils.filesystem.create_missing_directories_for_file(partial_path)
+        with open(partial_path, "wb") as f:
+            f.write(partial_bytes)
+
+    def _read_store_file(self, pid):
+        with open(
+            d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid), "rb"
+        ) as f:
+            return f.read()
+
+    def _download(self, pid, sciobj_bytes, honor_range=True, size=None):
+        range_list = self._add_replica_callback(sciobj_bytes, honor_range)
+        checksum_dict = d1_gmn.app.replica_download.download(
+            self._create_mn_client(), pid, ["MD5", "SHA-1"], size=size
+        )
+        return checksum_dict, range_list
+
+    @responses.activate
+    def test_1000(self):
+        """download(): Replica is downloaded in full and moved to the store."""
+        pid = d1_test.instance_generator.random_data.random_lower_ascii(fixed_len=12)
+        sciobj_bytes = os.urandom(10000)
+        checksum_dict, range_list = self._download(pid, sciobj_bytes)
+        assert range_list == [None]
+        assert checksum_dict["MD5"] == hashlib.md5(sciobj_bytes).hexdigest()
+        assert checksum_dict["SHA-1"] == hashlib.sha1(sciobj_bytes).hexdigest()
+        d1_gmn.app.replica_download.move_to_store(pid)
+        assert self._read_store_file(pid) == sciobj_bytes
+        assert not os.path.exists(d1_gmn.app.replica_download.get_partial_path(pid))
+
+    @responses.activate
+    def test_1010(self):
+        """download(): Interrupted download is resumed with a Range request and the
+        checksums cover the complete replica."""
+        pid = d1_test.instance_generator.random_data.random_lower_ascii(fixed_len=12)
+        sciobj_bytes = os.urandom(10000)
+        self._write_partial_file(pid, sciobj_bytes[:3000])
+        checksum_dict, range_list = self._download(pid, sciobj_bytes)
+        assert range_list == ["bytes=3000-"]
+        assert checksum_dict["SHA-1"] == hashlib.sha1(sciobj_bytes).hexdigest()
+        d1_gmn.app.replica_download.move_to_store(pid)
+        assert self._read_store_file(pid) == sciobj_bytes
+
+    @responses.activate
+    def test_1020(self):
+        """download(): Download restarts from the beginning if the source node does not
+        honor the Range request."""
+        pid = d1_test.instance_generator.random_data.random_lower_ascii(fixed_len=12)
+        sciobj_bytes = os.urandom(10000)
+        self._write_partial_file(pid, sciobj_bytes[:3000])
+        checksum_dict, range_list = self._download(pid, sciobj_bytes, False)
+        assert range_list == ["bytes=3000-"]
+        assert checksum_dict["MD5"] == hashlib.md5(sciobj_bytes).hexdigest()
+        d1_gmn.app.replica_download.move_to_store(pid)
+        assert self._read_store_file(pid) == sciobj_bytes
+
+    @responses.activate
+    def test_1030(self):
+        """download(): Partial file that does not match the object on the source node is
+        discarded."""
+        pid = d1_test.instance_generator.random_data.random_lower_ascii(fixed_len=12)
+        sciobj_bytes = os.urandom(1000)
+        self._write_partial_file(pid, os.urandom(2000))
+        with pytest.raises(d1_common.types.exceptions.ServiceFailure):
+            self._download(pid, sciobj_bytes)
+        assert not os.path.exists(d1_gmn.app.replica_download.get_partial_path(pid))
+
+    @responses.activate
+    def test_1040(self):
+        """download(): A partial file holding the complete replica is used when the
+        source node rejects the Range request as out of range."""
+        pid = d1_test.instance_generator.random_data.random_lower_ascii(fixed_len=12)
+        sciobj_bytes = os.urandom(1000)
+        self._write_partial_file(pid, sciobj_bytes)
+        checksum_dict, range_list = self._download(
+            pid, sciobj_bytes, size=len(sciobj_bytes)
+        )
+        assert range_list == ["bytes=1000-"]
+        assert checksum_dict["MD5"] == hashlib.md5(sciobj_bytes).hexdigest()
+        d1_gmn.app.replica_download.move_to_store(pid)
+        assert self._read_store_file(pid) == sciobj_bytes
@@ -0,0 +1,91 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test that objects and access levels are retrieved from the database only once per
+request."""
+import pytest
+import responses
+
+import d1_common.types.exceptions
+
+import django.db
+import django.test.utils
+
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestRequestCache")
+class TestRequestCache(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _create_readable_obj(self):
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(
+                self.client_v2, permission_list=[(["request_cache_subj"], ["read"])]
+            )
+        return pid
+
+    def _get_sciobj_select_count(self, api_func, *arg_list):
+        with d1_gmn.tests.gmn_mock.set_auth_context(
+            session_subj_list=["request_cache_subj"], trusted_subj_list=[]
+        ):
+            with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+                api_func(*arg_list)
+        return len(
+            [
+                q
+                for q in ctx.captured_queries
+                if q["sql"].startswith("SELECT")
+                and 'FROM "app_scienceobject"' in q["sql"]
+            ]
+        )
+
+    @responses.activate
+    def test_1000(self):
+        """MNRead.get(): ScienceObject is retrieved once."""
+        pid = self._create_readable_obj()
+        assert self._get_sciobj_select_count(self.client_v2.get, pid) == 1
+
+    @responses.activate
+    def test_1010(self):
+        """MNRead.describe(): ScienceObject is retrieved once."""
+        pid = self._create_readable_obj()
+        assert self._get_sciobj_select_count(self.client_v2.describe, pid) == 1
+
+    @responses.activate
+    def test_1020(self):
+        """MNRead.getSystemMetadata(): ScienceObject is retrieved once."""
+        pid = self._create_readable_obj()
+        assert self._get_sciobj_select_count(self.client_v2.getSystemMetadata, pid) == 1
+
+    @responses.activate
+    def test_1030(self):
+        """MNRead.get(): Subject without access is still denied."""
+        pid = self._create_readable_obj()
+        with d1_gmn.tests.gmn_mock.set_auth_context(
+            session_subj_list=["request_cache_other_subj"], trusted_subj_list=[]
+        ):
+            with pytest.raises(d1_common.types.exceptions.NotAuthorized):
+                self.client_v2.get(pid)
+
+    @responses.activate
+    def test_1040(self):
+        """MNRead.describe(): Unknown PID still raises NotFound."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            with pytest.raises(d1_common.types.exceptions.NotFound):
+                self.client_v2.describe("request_cache_unknown_pid")
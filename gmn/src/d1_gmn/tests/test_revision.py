@@ -17,6 +17,7 @@
 # limitations under the License.
 """Test handling of SIDs and revision chains."""
 
+import importlib
 import logging
 import random
 
@@ -235,3 +236,46 @@ class TestRevision(d1_gmn.tests.gmn_test_case.GMNTestCase):
         last_pid = b_chain_list[-1]
         sysmeta_pyxb = self.call_d1_client(gmn_client_v2.getSystemMetadata, a_sid)
         assert sysmeta_pyxb.identifier.value() == last_pid
+
+    def test_1100(self):
+        """The head of a chain that is longer than the Python recursion limit is found,
+        and SID resolution and cut_from_chain() work on the chain."""
+        sid, pid_list = self._create_long_chain(2000)
+        assert d1_gmn.app.revision._find_head_or_latest_connected(pid_list[0]) == (
+            pid_list[-1]
+        )
+        d1_gmn.app.revision._update_sid_to_last_existing_pid_map(pid_list[0])
+        assert d1_gmn.app.revision.resolve_sid(sid) == pid_list[-1]
+        cut_pid = pid_list[1000]
+        d1_gmn.app.revision.cut_from_chain(
+            d1_gmn.app.model_util.get_sci_model(cut_pid)
+        )
+        prev_model = d1_gmn.app.model_util.get_sci_model(pid_list[999])
+        assert prev_model.obsoleted_by.did == pid_list[1001]
+        assert len(d1_gmn.app.revision.get_all_pid_by_sid(sid)) == 2000
+
+    def test_1110(self):
+        """The head of a chain that ends in a dangling obsoletedBy is the last existing
+        object."""
+        sid, pid_list = self._create_long_chain(10)
+        d1_gmn.app.models.ScienceObject.objects.filter(pid__did=pid_list[5]).update(
+            obsoleted_by=d1_gmn.app.did.get_or_create_did("unknown_pid")
+        )
+        assert d1_gmn.app.revision._find_head_or_latest_connected(pid_list[0]) == (
+            pid_list[5]
+        )
+        assert d1_gmn.app.revision._find_head_or_latest_connected("unknown_pid") is None
+
+    def test_1120(self):
+        """diag-revision-chains --benchmark: Generated chain is rolled back."""
+        sciobj_count = d1_gmn.app.models.ScienceObject.objects.count()
+        self.call_management_command(
+            "diag-revision-chains", "--benchmark", "--chain-length", "100"
+        )
+        assert d1_gmn.app.models.ScienceObject.objects.count() == sciobj_count
+
+    def _create_long_chain(self, chain_length):
+        command_module = importlib.import_module(
+            "d1_gmn.app.management.commands.diag-revision-chains"
+        )
+        return command_module.Command().create_benchmark_chain(chain_length)
@@ -0,0 +1,143 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test checksums stored for MNRead.getChecksum() and the checksum scrub."""
+import hashlib
+import unittest.mock
+
+import responses
+
+import d1_common.url
+
+import d1_gmn.app.models
+import d1_gmn.app.sciobj_checksum
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+import d1_test.instance_generator.identifier
+import d1_test.mock_api.get
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestSciObjChecksum")
+class TestSciObjChecksum(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _get_sciobj_model(self, pid):
+        return d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid)
+
+    def _set_stored_checksum(self, pid, algorithm_str, checksum_str):
+        d1_gmn.app.models.ScienceObjectChecksum.objects.filter(
+            sciobj__pid__did=pid, checksum_algorithm__checksum_algorithm=algorithm_str
+        ).update(checksum=checksum_str)
+
+    def _scrub(self):
+        self.call_management_command("process_checksum_scrub", "--min-age-days=0")
+
+    @responses.activate
+    def test_1000(self):
+        """MNStorage.create(): Checksums for the configured algorithms are calculated
+        and stored."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        checksum_dict = d1_gmn.app.sciobj_checksum.get_dict(self._get_sciobj_model(pid))
+        assert checksum_dict["MD5"] == hashlib.md5(sciobj_bytes).hexdigest()
+        assert checksum_dict["SHA-1"] == hashlib.sha1(sciobj_bytes).hexdigest()
+
+    @responses.activate
+    def test_1010(self):
+        """MNRead.getChecksum(): Stored checksum is returned without reading the
+        object bytes."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+            with unittest.mock.patch(
+                "d1_gmn.app.sciobj_store.get_sciobj_iter_by_url"
+            ) as iter_mock:
+                checksum_pyxb = self.client_v2.getChecksum(pid, "SHA-1")
+        assert not iter_mock.called
+        assert checksum_pyxb.algorithm == "SHA-1"
+        assert checksum_pyxb.value() == hashlib.sha1(sciobj_bytes).hexdigest()
+
+    @responses.activate
+    def test_1020(self):
+        """MNRead.getChecksum(): VENDOR_GMN_FRESH_CHECKSUM causes the checksum to be
+        calculated from the object bytes. A fresh checksum that does not match the
+        stored checksum does not replace it."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+            self._set_stored_checksum(pid, "MD5", "0" * 32)
+            assert self.client_v2.getChecksum(pid, "MD5").value() == "0" * 32
+            checksum_pyxb = self.client_v2.getChecksum(
+                pid, "MD5", vendorSpecific={"VENDOR_GMN_FRESH_CHECKSUM": "1"}
+            )
+        assert checksum_pyxb.value() == hashlib.md5(sciobj_bytes).hexdigest()
+        assert (
+            d1_gmn.app.sciobj_checksum.get(self._get_sciobj_model(pid), "MD5")
+            == "0" * 32
+        )
+
+    @responses.activate
+    def test_1030(self):
+        """process_checksum_scrub: Missing checksums are stored."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        d1_gmn.app.models.ScienceObjectChecksum.objects.all().delete()
+        self._scrub()
+        checksum_dict = d1_gmn.app.sciobj_checksum.get_dict(self._get_sciobj_model(pid))
+        assert checksum_dict["SHA-1"] == hashlib.sha1(sciobj_bytes).hexdigest()
+
+    @responses.activate
+    def test_1040(self):
+        """process_checksum_scrub: Stored checksum that does not match the object
+        bytes is not modified."""
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        self._set_stored_checksum(pid, "MD5", "0" * 32)
+        self._scrub()
+        checksum_dict = d1_gmn.app.sciobj_checksum.get_dict(self._get_sciobj_model(pid))
+        assert checksum_dict["MD5"] == "0" * 32
+        assert checksum_dict["SHA-1"] == hashlib.sha1(sciobj_bytes).hexdigest()
+
+    @responses.activate
+    def test_1050(self):
+        """MNRead.getChecksum(): The checksum of a proxy object is calculated from the
+        remote bytes on the first request and is then returned without downloading the
+        bytes again."""
+        d1_test.mock_api.get.add_callback(d1_test.d1_test_case.MOCK_REMOTE_BASE_URL)
+        pid = d1_test.instance_generator.identifier.generate_pid()
+        proxy_url = d1_common.url.joinPathElements(
+            d1_test.d1_test_case.MOCK_REMOTE_BASE_URL,
+            "v2",
+            "object",
+            d1_common.url.encodePathElement(pid),
+        )
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(
+                self.client_v2, pid, vendor_dict=self.vendor_proxy_mode(proxy_url)
+            )
+            checksum_pyxb = self.client_v2.getChecksum(pid, "SHA-1")
+            with unittest.mock.patch(
+                "d1_gmn.app.proxy.get_sciobj_iter_remote"
+            ) as iter_mock:
+                assert (
+                    self.client_v2.getChecksum(pid, "SHA-1").value()
+                    == checksum_pyxb.value()
+                )
+        assert not iter_mock.called
+        assert checksum_pyxb.value() == hashlib.sha1(sciobj_bytes).hexdigest()
+        assert (
+            d1_gmn.app.sciobj_checksum.get(self._get_sciobj_model(pid), "SHA-1")
+            == checksum_pyxb.value()
+        )
@@ -0,0 +1,197 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test the modes in which MNRead.get() and MNReplication.getReplica() return the
+bytes of SciObjs stored in the local filesystem."""
+import logging
+import time
+
+import pytest
+import responses
+
+import d1_common.url
+
+import django.http
+import django.test
+
+import d1_gmn.app.models
+import d1_gmn.app.sciobj_store
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+import d1_test.instance_generator.identifier
+import d1_test.instance_generator.system_metadata
+
+logger = logging.getLogger(__name__)
+
+# Size in MiB of the SciObj used for measuring throughput.
+BENCHMARK_SCIOBJ_SIZE_MIB = 1024
+BENCHMARK_REPEAT_COUNT = 5
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestSciObjServeMode")
+class TestSciObjServeMode(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _get(self, pid):
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            return django.test.Client().get(
+                d1_common.url.joinPathElements("/", "v2", "object", pid.encode("utf-8"))
+            )
+
+    def _get_body(self, response):
+        if response.streaming:
+            return b"".join(response.streaming_content)
+        return response.content
+
+    @responses.activate
+    def test_1000(self):
+        """OBJECT_STORE_SERVE_MODE=stream: SciObj bytes are streamed by GMN."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        with django.test.override_settings(OBJECT_STORE_SERVE_MODE="stream"):
+            response = self._get(pid)
+        assert response.status_code == 200
+        assert "X-Sendfile" not in response
+        assert "X-Accel-Redirect" not in response
+        assert self._get_body(response) == sciobj_bytes
+
+    @responses.activate
+    def test_1010(self):
+        """OBJECT_STORE_SERVE_MODE=file: SciObj bytes are returned via the WSGI file
+        wrapper."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        with django.test.override_settings(OBJECT_STORE_SERVE_MODE="file"):
+            response = self._get(pid)
+        assert response.status_code == 200
+        assert isinstance(response, django.http.FileResponse)
+        assert self._get_body(response) == sciobj_bytes
+
+    @responses.activate
+    def test_1020(self):
+        """OBJECT_STORE_SERVE_MODE=x-sendfile: Response holds absolute path to SciObj
+        and no body."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        with django.test.override_settings(OBJECT_STORE_SERVE_MODE="x-sendfile"):
+            response = self._get(pid)
+        assert response.status_code == 200
+        assert response[
+            "X-Sendfile"
+        ] == d1_gmn.app.sciobj_store.get_abs_sciobj_file_path_by_pid(pid)
+        assert response["Content-Length"] == str(len(sciobj_bytes))
+        assert response.content == b""
+
+    @responses.activate
+    def test_1030(self):
+        """OBJECT_STORE_SERVE_MODE=x-accel-redirect: Response holds internal location of
+        SciObj and no body."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        with django.test.override_settings(
+            OBJECT_STORE_SERVE_MODE="x-accel-redirect",
+            OBJECT_STORE_X_ACCEL_REDIRECT_PREFIX="/internal/store/",
+        ):
+            response = self._get(pid)
+        assert response.status_code == 200
+        assert response["X-Accel-Redirect"] == "/internal/store/{}".format(
+            d1_gmn.app.sciobj_store.get_rel_sciobj_file_path(pid)
+        )
+        assert response.content == b""
+
+    @responses.activate
+    def test_1040(self):
+        """OBJECT_STORE_SERVE_MODE=x-sendfile: Read event is logged."""
+        pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(self.client_v2)
+        with django.test.override_settings(
+            OBJECT_STORE_SERVE_MODE="x-sendfile", LOG_IGNORE_TRUSTED_SUBJECT=False
+        ):
+            self._get(pid)
+        assert d1_gmn.app.models.EventLog.objects.filter(
+            sciobj__pid__did=pid, event__event="read"
+        ).exists()
+
+    def test_1050(self):
+        """get_x_accel_redirect_uri_by_path(): Path outside of the SciObj store returns
+        None."""
+        assert (
+            d1_gmn.app.sciobj_store.get_x_accel_redirect_uri_by_path(
+                "/some/other/location/sciobj.bin"
+            )
+            is None
+        )
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestSciObjServeModeBenchmark")
+@pytest.mark.skip("Benchmark. Slow, creates large test file")
+class TestSciObjServeModeBenchmark(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    """Compare throughput of the serving modes in which GMN itself returns the bytes.
+
+    The x-sendfile and x-accel-redirect modes are handled by the web server, so their
+    throughput can only be measured against a deployed instance.
+
+    """
+
+    def _create_large_obj(self):
+        pid = d1_test.instance_generator.identifier.generate_pid("BENCHMARK_")
+        with d1_test.d1_test_case.temp_sparse_file(
+            mib=BENCHMARK_SCIOBJ_SIZE_MIB
+        ) as large_sparse_stream:
+            sysmeta_pyxb = (
+                d1_test.instance_generator.system_metadata.generate_from_file(
+                    self.client_v2, large_sparse_stream, option_dict={"identifier": pid}
+                )
+            )
+            large_sparse_stream.seek(0)
+            with d1_gmn.tests.gmn_mock.disable_auth():
+                with d1_gmn.tests.gmn_mock.disable_sysmeta_sanity_checks():
+                    self.client_v2.create(pid, large_sparse_stream, sysmeta_pyxb)
+        return pid
+
+    def _measure(self, pid, serve_mode):
+        with django.test.override_settings(OBJECT_STORE_SERVE_MODE=serve_mode):
+            start_ts = time.perf_counter()
+            for _ in range(BENCHMARK_REPEAT_COUNT):
+                with d1_gmn.tests.gmn_mock.disable_auth():
+                    response = django.test.Client().get(
+                        d1_common.url.joinPathElements(
+                            "/", "v2", "object", pid.encode("utf-8")
+                        )
+                    )
+                for _chunk in response.streaming_content:
+                    pass
+                response.close()
+            elapsed_sec = time.perf_counter() - start_ts
+        mib_per_sec = BENCHMARK_SCIOBJ_SIZE_MIB * BENCHMARK_REPEAT_COUNT / elapsed_sec
+        logger.info(
+            "serve_mode={} size_mib={} repeat={} elapsed_sec={:.2f} mib_per_sec={:.2f}".format(
+                serve_mode,
+                BENCHMARK_SCIOBJ_SIZE_MIB,
+                BENCHMARK_REPEAT_COUNT,
+                elapsed_sec,
+                mib_per_sec,
+            )
+        )
+        return mib_per_sec
+
+    @responses.activate
+    def test_1000(self):
+        """Throughput: stream vs. file."""
+        pid = self._create_large_obj()
+        stream_mib_per_sec = self._measure(pid, "stream")
+        file_mib_per_sec = self._measure(pid, "file")
+        logger.info(
+            "file / stream throughput ratio: {:.2f}".format(
+                file_mib_per_sec / stream_mib_per_sec
+            )
+        )
@@ -0,0 +1,103 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test caching of the resolution of SIDs and PIDs passed to the v2 API."""
+import pytest
+import responses
+
+import d1_common.types.exceptions
+
+import django.core.cache
+import django.db
+import django.test
+import django.test.utils
+
+import d1_gmn.app.delete
+import d1_gmn.app.sid_cache
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+import d1_test.instance_generator.identifier
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestSidCache")
+class TestSidCache(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def setup_method(self, method):
+        super().setup_method(method)
+        django.core.cache.caches["sid"].clear()
+
+    def _create_chain(self, chain_len=3):
+        sid = d1_test.instance_generator.identifier.generate_sid()
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            return self.create_revision_chain(self.client_v2, chain_len, sid=sid)
+
+    def _resolve_and_query_count(self, did):
+        with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+            with d1_gmn.tests.gmn_mock.disable_auth():
+                sysmeta_pyxb = self.client_v2.getSystemMetadata(did)
+        return sysmeta_pyxb.identifier.value(), len(ctx.captured_queries)
+
+    @responses.activate
+    def test_1000(self):
+        """getSystemMetadata(): A SID is resolved with the DB on the first call and from the
+        cache on the next."""
+        with django.test.override_settings(SID_CACHE_ALIAS="sid"):
+            sid, pid_list = self._create_chain()
+            first_pid, first_count = self._resolve_and_query_count(sid)
+            second_pid, second_count = self._resolve_and_query_count(sid)
+        assert first_pid == second_pid == pid_list[-1]
+        assert second_count < first_count
+
+    @responses.activate
+    def test_1010(self):
+        """update(): A cached SID resolves to the new head of the chain."""
+        with django.test.override_settings(SID_CACHE_ALIAS="sid"):
+            sid, pid_list = self._create_chain()
+            assert self._resolve_and_query_count(sid)[0] == pid_list[-1]
+            with d1_gmn.tests.gmn_mock.disable_auth():
+                new_pid, _, _, _ = self.update_obj(
+                    self.client_v2, old_pid=pid_list[-1], sid=sid
+                )
+            assert self._resolve_and_query_count(sid)[0] == new_pid
+
+    @responses.activate
+    def test_1020(self):
+        """getSystemMetadata(): A stale resolution to an obsoleted object, as left by changes
+        made in another process, is refreshed."""
+        with django.test.override_settings(SID_CACHE_ALIAS="sid"):
+            sid, pid_list = self._create_chain()
+            d1_gmn.app.sid_cache.add(sid, pid_list[0])
+            assert self._resolve_and_query_count(sid)[0] == pid_list[-1]
+            assert d1_gmn.app.sid_cache.get(sid) == pid_list[-1]
+
+    @responses.activate
+    def test_1030(self):
+        """resolve(): A PID resolves to itself and an unknown identifier to None.
+        Deleting the object removes the cached resolution."""
+        with django.test.override_settings(SID_CACHE_ALIAS="sid"):
+            sid, pid_list = self._create_chain(chain_len=1)
+            pid = pid_list[0]
+            assert d1_gmn.app.sid_cache.resolve(pid) == pid
+            assert d1_gmn.app.sid_cache.get(pid) == pid
+            assert d1_gmn.app.sid_cache.resolve("sid_cache_unknown_did") is None
+            d1_gmn.app.delete.delete_sciobj_from_database(pid)
+            assert d1_gmn.app.sid_cache.get(pid) is None
+            assert d1_gmn.app.sid_cache.get(sid) is None
+            with pytest.raises(d1_common.types.exceptions.NotFound):
+                with d1_gmn.tests.gmn_mock.disable_auth():
+                    self.client_v2.describe(sid)
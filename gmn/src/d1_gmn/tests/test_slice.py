@@ -22,11 +22,15 @@ import logging
 import multiprocessing
 import random
 
+import pytest
 import responses
 
 import d1_common.xml
 
+import django.core.cache
+import django.db
 import django.test
+import django.test.utils
 
 import d1_gmn.tests.gmn_mock
 import d1_gmn.tests.gmn_test_case
@@ -60,6 +64,31 @@ class TestSlice(d1_gmn.tests.gmn_test_case.GMNTestCase):
 
     """
 
+    def _get_slice(self, url, **query_dict):
+        """Get slice with the Django test client.
+
+        Return the response and the deserialized slice. The Django cache is cleared
+        before the request, to simulate a request that is received by a different
+        process than the one that served the previous slice.
+
+        """
+        django.core.cache.cache.clear()
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            response = django.test.Client().get(url, query_dict)
+        if response.status_code != 200:
+            return response, None
+        return (
+            response,
+            d1_common.xml.deserialize(b"".join(response.streaming_content)),
+        )
+
+    def _get_next_slice_url(self, response):
+        link_str = response.get("Link")
+        if link_str is None:
+            return None
+        assert link_str.endswith('>; rel="next"')
+        return link_str[1 : -len('>; rel="next"')]
+
     def _get_api_func(self, client, use_get_log_records):
         if use_get_log_records:
             return client.getLogRecords, "logEntry"
@@ -139,3 +168,61 @@ class TestSlice(d1_gmn.tests.gmn_test_case.GMNTestCase):
                 slice_pyxb = slicable_api_func(start=0, count=100)
                 iterable_pyxb = getattr(slice_pyxb, iterable_attr)
                 assert len(iterable_pyxb) == 5
+
+    @responses.activate
+    @pytest.mark.parametrize(
+        "path_str, iterable_attr",
+        [("/v2/log", "logEntry"), ("/v2/object", "objectInfo")],
+    )
+    def test_1020(self, path_str, iterable_attr):
+        """Following the Link headers returns the same items as a single slice, and
+        pages after the first do not use the OFFSET fallback."""
+        from_date_str = "2000-05-06T15:16:17"
+        response, single_slice_pyxb = self._get_slice(
+            path_str, fromDate=from_date_str, start=0, count=5000
+        )
+        assert response.get("Link") is None
+        single_list = [
+            d1_common.xml.serialize_to_xml_str(v)
+            for v in getattr(single_slice_pyxb, iterable_attr)
+        ]
+
+        response, slice_pyxb = self._get_slice(
+            path_str, fromDate=from_date_str, start=0, count=50
+        )
+        multi_list = [
+            d1_common.xml.serialize_to_xml_str(v)
+            for v in getattr(slice_pyxb, iterable_attr)
+        ]
+        next_url = self._get_next_slice_url(response)
+        while next_url is not None:
+            with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+                response, slice_pyxb = self._get_slice(next_url)
+            assert not any(" OFFSET " in q["sql"] for q in ctx.captured_queries)
+            assert slice_pyxb.start == len(multi_list)
+            multi_list.extend(
+                d1_common.xml.serialize_to_xml_str(v)
+                for v in getattr(slice_pyxb, iterable_attr)
+            )
+            next_url = self._get_next_slice_url(response)
+
+        assert multi_list == single_list
+
+    @responses.activate
+    def test_1030(self):
+        """Modified resumption token is rejected with InvalidRequest."""
+        response, slice_pyxb = self._get_slice("/v2/log", start=0, count=5)
+        next_url = self._get_next_slice_url(response)
+        response, slice_pyxb = self._get_slice(next_url[:-3] + "abc")
+        assert response.status_code == 400
+        assert b"InvalidRequest" in response.content
+
+    @responses.activate
+    def test_1040(self):
+        """Resumption token used with a different filter is rejected with
+        InvalidRequest."""
+        response, slice_pyxb = self._get_slice("/v2/log", start=0, count=5)
+        next_url = self._get_next_slice_url(response)
+        response, slice_pyxb = self._get_slice(next_url + "&event=create")
+        assert response.status_code == 400
+        assert b"InvalidRequest" in response.content
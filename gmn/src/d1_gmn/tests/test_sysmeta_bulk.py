@@ -0,0 +1,153 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test bulk create and update of the database representation of System Metadata."""
+import responses
+
+import d1_common.xml
+
+import django.db
+import django.test.utils
+
+import d1_gmn.app.models
+import d1_gmn.app.revision
+import d1_gmn.app.sciobj_store
+import d1_gmn.app.sysmeta
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestSysMetaBulk")
+class TestSysMetaBulk(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _generate_sysmeta_list(self, count):
+        return [
+            self.generate_sciobj_with_defaults(self.client_v2)[3] for _ in range(count)
+        ]
+
+    def _get_sysmeta_xml(self, pid, as_pid=None):
+        """Get the System Metadata for ``pid`` as stored in the database, with the
+        identifier set to ``as_pid`` if passed."""
+        sysmeta_pyxb = d1_gmn.app.sysmeta.model_to_pyxb(pid)
+        if as_pid is not None:
+            sysmeta_pyxb.identifier = as_pid
+        return d1_common.xml.serialize_to_xml_str(sysmeta_pyxb)
+
+    def _get_db_row_dict(self, pid):
+        """Get the values of the database rows that represent the System Metadata for
+        ``pid``, with the references to dimension tables as ids and without the ids
+        that depend on the PID."""
+        sciobj_model = d1_gmn.app.models.ScienceObject.objects.get(pid__did=pid)
+        assert sciobj_model.url == (
+            d1_gmn.app.sciobj_store.get_rel_sciobj_file_url_by_pid(pid)
+        )
+        sciobj_dict = d1_gmn.app.models.ScienceObject.objects.filter(
+            id=sciobj_model.id
+        ).values()[0]
+        for key_str in ("id", "pid_id", "url"):
+            del sciobj_dict[key_str]
+        replication_policy_filter = {"replication_policy__sciobj": sciobj_model}
+        return {
+            "sciobj": sciobj_dict,
+            "permission": sorted(
+                d1_gmn.app.models.Permission.objects.filter(
+                    sciobj=sciobj_model
+                ).values_list("subject_id", "level")
+            ),
+            "media_type": sorted(
+                d1_gmn.app.models.MediaTypeProperty.objects.filter(
+                    media_type__sciobj=sciobj_model
+                ).values_list("media_type__name", "name", "value")
+            ),
+            "replication_policy": list(
+                d1_gmn.app.models.ReplicationPolicy.objects.filter(
+                    sciobj=sciobj_model
+                ).values_list("replication_is_allowed", "desired_number_of_replicas")
+            ),
+            "preferred_node": sorted(
+                d1_gmn.app.models.PreferredMemberNode.objects.filter(
+                    **replication_policy_filter
+                ).values_list("node_id", flat=True)
+            ),
+            "blocked_node": sorted(
+                d1_gmn.app.models.BlockedMemberNode.objects.filter(
+                    **replication_policy_filter
+                ).values_list("node_id", flat=True)
+            ),
+            "remote_replica": sorted(
+                d1_gmn.app.models.RemoteReplica.objects.filter(
+                    sciobj=sciobj_model
+                ).values_list(
+                    "info__status_id", "info__member_node_id", "info__timestamp"
+                )
+            ),
+            "is_chain_member": d1_gmn.app.models.ChainMember.objects.filter(
+                pid__did=pid
+            ).exists(),
+        }
+
+    def _create_and_count_queries(self, sysmeta_pyxb_list):
+        with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+            d1_gmn.app.sysmeta.create_or_update_bulk(sysmeta_pyxb_list)
+        return len(ctx.captured_queries)
+
+    @responses.activate
+    def test_1000(self):
+        """create_or_update_bulk(): Objects have the same database representation as
+        when written one at a time with create_or_update()."""
+        sysmeta_pyxb_list = self._generate_sysmeta_list(10)
+        bulk_pid_list = [
+            d1_common.xml.get_req_val(s.identifier) for s in sysmeta_pyxb_list
+        ]
+        # Write the same System Metadata one at a time, to a separate set of PIDs.
+        single_pid_list = []
+        for pid, sysmeta_pyxb in zip(bulk_pid_list, sysmeta_pyxb_list):
+            single_sysmeta_pyxb = d1_common.xml.deserialize(
+                d1_common.xml.serialize_for_transport(sysmeta_pyxb)
+            )
+            single_sysmeta_pyxb.identifier = "single_" + pid
+            d1_gmn.app.sysmeta.create_or_update(single_sysmeta_pyxb)
+            single_pid_list.append("single_" + pid)
+        d1_gmn.app.sysmeta.create_or_update_bulk(sysmeta_pyxb_list)
+        for bulk_pid, single_pid in zip(bulk_pid_list, single_pid_list):
+            assert d1_common.xml.are_equivalent(
+                self._get_sysmeta_xml(bulk_pid),
+                self._get_sysmeta_xml(single_pid, as_pid=bulk_pid),
+            )
+            assert self._get_db_row_dict(bulk_pid) == self._get_db_row_dict(single_pid)
+
+    @responses.activate
+    def test_1010(self):
+        """create_or_update_bulk(): Number of queries does not grow with the number of
+        objects."""
+        small_count = self._create_and_count_queries(self._generate_sysmeta_list(5))
+        large_count = self._create_and_count_queries(self._generate_sysmeta_list(50))
+        assert large_count <= small_count + 5
+
+    @responses.activate
+    def test_1020(self):
+        """create_or_update_bulk(): Revision chain with SID is created from objects in
+        the same batch."""
+        sysmeta_pyxb_list = self._generate_sysmeta_list(3)
+        pid_list = [d1_common.xml.get_req_val(s.identifier) for s in sysmeta_pyxb_list]
+        for i, sysmeta_pyxb in enumerate(sysmeta_pyxb_list):
+            sysmeta_pyxb.seriesId = "bulk_sid"
+            sysmeta_pyxb.obsoletes = pid_list[i - 1] if i > 0 else None
+            sysmeta_pyxb.obsoletedBy = pid_list[i + 1] if i < 2 else None
+        d1_gmn.app.sysmeta.create_or_update_bulk(sysmeta_pyxb_list)
+        assert set(d1_gmn.app.revision.get_all_pid_by_sid("bulk_sid")) == set(pid_list)
+        assert d1_gmn.app.revision.resolve_sid("bulk_sid") == pid_list[-1]
@@ -0,0 +1,111 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test caching of the System Metadata XML documents returned by
+MNRead.getSystemMetadata()."""
+import responses
+
+import d1_common.xml
+
+import django.core.cache
+import django.db
+import django.test
+import django.test.utils
+
+import d1_gmn.app.models
+import d1_gmn.app.sysmeta_cache
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestSysMetaCache")
+class TestSysMetaCache(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def setup_method(self, method):
+        super().setup_method(method)
+        django.core.cache.caches["sysmeta"].clear()
+
+    def _get_sysmeta_and_query_count(self, client, pid):
+        with django.test.utils.CaptureQueriesContext(django.db.connection) as ctx:
+            with d1_gmn.tests.gmn_mock.disable_auth():
+                sysmeta_pyxb = client.getSystemMetadata(pid)
+        return sysmeta_pyxb, len(ctx.captured_queries)
+
+    @responses.activate
+    def test_1000(self):
+        """getSystemMetadata(): SysMeta is generated by the first call and retrieved
+        from the cache by the next."""
+        pid = d1_gmn.app.models.ScienceObject.objects.first().pid.did
+        uncached_pyxb, uncached_count = self._get_sysmeta_and_query_count(
+            self.client_v2, pid
+        )
+        with django.test.override_settings(SYSMETA_CACHE_ALIAS="sysmeta"):
+            first_pyxb, first_count = self._get_sysmeta_and_query_count(
+                self.client_v2, pid
+            )
+            second_pyxb, second_count = self._get_sysmeta_and_query_count(
+                self.client_v2, pid
+            )
+        assert first_count == uncached_count
+        assert second_count < first_count
+        assert d1_common.xml.are_equal_pyxb(uncached_pyxb, second_pyxb)
+
+    @responses.activate
+    def test_1010(self):
+        """getSystemMetadata(): v1 and v2 SysMeta are cached separately."""
+        pid = d1_gmn.app.models.ScienceObject.objects.first().pid.did
+        uncached_v1_pyxb, _ = self._get_sysmeta_and_query_count(self.client_v1, pid)
+        with django.test.override_settings(SYSMETA_CACHE_ALIAS="sysmeta"):
+            self._get_sysmeta_and_query_count(self.client_v2, pid)
+            cached_v1_pyxb, _ = self._get_sysmeta_and_query_count(self.client_v1, pid)
+        assert d1_common.xml.are_equal_pyxb(uncached_v1_pyxb, cached_v1_pyxb)
+
+    @responses.activate
+    def test_1020(self):
+        """updateSystemMetadata(): Cached SysMeta is replaced by the updated
+        SysMeta."""
+        with django.test.override_settings(SYSMETA_CACHE_ALIAS="sysmeta"):
+            with d1_gmn.tests.gmn_mock.disable_auth():
+                pid, sid, sciobj_bytes, sysmeta_pyxb = self.create_obj(
+                    self.client_v2, rights_holder="sysmeta_cache_subj"
+                )
+                sysmeta_pyxb = self.client_v2.getSystemMetadata(pid)
+                sysmeta_pyxb.rightsHolder = "sysmeta_cache_new_subj"
+                assert self.client_v2.updateSystemMetadata(pid, sysmeta_pyxb)
+                new_sysmeta_pyxb = self.client_v2.getSystemMetadata(pid)
+        assert new_sysmeta_pyxb.rightsHolder.value() == "sysmeta_cache_new_subj"
+
+    def test_1030(self):
+        """get_or_create(): Cached SysMeta is not used after the serial version of the
+        object changes."""
+        sciobj_model = d1_gmn.app.models.ScienceObject.objects.first()
+        with django.test.override_settings(SYSMETA_CACHE_ALIAS="sysmeta"):
+            d1_gmn.app.sysmeta_cache.get_or_create(sciobj_model, "v2", lambda: "old")
+            assert (
+                d1_gmn.app.sysmeta_cache.get_or_create(
+                    sciobj_model, "v2", lambda: "new"
+                )
+                == "old"
+            )
+            sciobj_model.serial_version += 1
+            assert (
+                d1_gmn.app.sysmeta_cache.get_or_create(
+                    sciobj_model, "v2", lambda: "new"
+                )
+                == "new"
+            )
@@ -0,0 +1,68 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test limiting of the rate at which bytes are transferred."""
+import contextlib
+import unittest.mock
+
+import d1_gmn.app.throttle
+import d1_gmn.tests.gmn_test_case
+
+
+class TestThrottle(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    @contextlib.contextmanager
+    def _simulated_clock(self):
+        """Simulate the clock, so that sleeping advances the time without waiting.
+
+        Yields the list of sleeps. Element 0 holds the current time.
+
+        """
+        clock_list = [0.0]
+
+        def sleep(sec):
+            clock_list.append(sec)
+            clock_list[0] += sec
+
+        with unittest.mock.patch("time.monotonic", side_effect=lambda: clock_list[0]):
+            with unittest.mock.patch("time.sleep", side_effect=sleep):
+                yield clock_list
+
+    def test_1000(self):
+        """add(): Transfers are delayed to the allowed rate once the initial burst has
+        been used."""
+        with self._simulated_clock() as clock_list:
+            throttle = d1_gmn.app.throttle.ByteRateThrottle(1000)
+            for _ in range(10):
+                throttle.add(500)
+        assert clock_list[0] == 4.0
+
+    def test_1010(self):
+        """add(): After an idle period, transfers can only burst for the size of the
+        bucket, not until the average over the whole run catches up."""
+        with self._simulated_clock() as clock_list:
+            throttle = d1_gmn.app.throttle.ByteRateThrottle(1000)
+            throttle.add(1000)
+            clock_list[0] += 100.0
+            for _ in range(4):
+                throttle.add(500)
+        assert sum(clock_list[1:]) == 1.0
+
+    def test_1020(self):
+        """add(): A rate of 0 is unlimited."""
+        with self._simulated_clock() as clock_list:
+            d1_gmn.app.throttle.ByteRateThrottle(0).add(10**9)
+        assert clock_list == [0.0]
@@ -0,0 +1,212 @@
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test that the streamed ObjectList and Log XML documents are byte-identical to the
+documents created via PyXB."""
+import datetime
+
+import pytest
+import responses
+
+import d1_common.date_time
+import d1_common.types.dataoneTypes_v1_1
+import d1_common.types.dataoneTypes_v2_0
+import d1_common.xml
+
+import django.conf
+import django.test
+import django.urls.base
+
+import d1_gmn.app.xml_stream
+import d1_gmn.tests.gmn_mock
+import d1_gmn.tests.gmn_test_case
+
+import d1_test.d1_test_case
+
+XSLT_URL = "/home/xslt"
+
+OBJECT_ROW_LIST = [
+    {
+        "pid__did": "pid_1",
+        "format__format": "text/plain",
+        "checksum": "baddad",
+        "checksum_algorithm__checksum_algorithm": "MD5",
+        "modified_timestamp": datetime.datetime(1967, 5, 27, 1, 2, 3),
+        "size": 1234,
+    },
+    {
+        "pid__did": 'pid_<&>"æøå',
+        "format__format": "http://www.openarchives.org/ore/terms",
+        "checksum": "3f786850e387550fdab836ed7e6dc881de23001b",
+        "checksum_algorithm__checksum_algorithm": "SHA-1",
+        "modified_timestamp": datetime.datetime(
+            2001, 2, 3, 4, 5, 6, 120000, tzinfo=datetime.timezone.utc
+        ),
+        "size": 0,
+    },
+]
+
+LOG_ROW_LIST = [
+    {
+        "id": 1,
+        "sciobj__pid__did": "pid_1",
+        "ip_address__ip_address": "127.0.0.1",
+        "subject__subject": "CN=First Last,O=Google,C=US,DC=cilogon,DC=org",
+        "user_agent__user_agent": 'Agent <&>"',
+        "event__event": "read",
+        "timestamp": datetime.datetime(1977, 5, 27, 1, 2, 3, 1),
+    },
+    {
+        "id": 2,
+        "sciobj__pid__did": "pid_2",
+        "ip_address__ip_address": "10.0.0.1",
+        "subject__subject": "public",
+        "user_agent__user_agent": "",
+        "event__event": "create",
+        "timestamp": datetime.datetime(1977, 5, 27, 1, 2, 3),
+        "redact": True,
+    },
+]
+
+
+@d1_test.d1_test_case.reproducible_random_decorator("TestXmlStream")
+class TestXmlStream(d1_gmn.tests.gmn_test_case.GMNTestCase):
+    def _create_object_list_pyxb(self, binding, row_list, start, total):
+        object_list_pyxb = binding.objectList()
+        for row in row_list:
+            object_info_pyxb = binding.ObjectInfo()
+            object_info_pyxb.identifier = row["pid__did"]
+            object_info_pyxb.formatId = row["format__format"]
+            checksum_pyxb = binding.Checksum(row["checksum"])
+            checksum_pyxb.algorithm = row["checksum_algorithm__checksum_algorithm"]
+            object_info_pyxb.checksum = checksum_pyxb
+            object_info_pyxb.dateSysMetadataModified = (
+                d1_common.date_time.normalize_datetime_to_utc(row["modified_timestamp"])
+            )
+            object_info_pyxb.size = row["size"]
+            object_list_pyxb.objectInfo.append(object_info_pyxb)
+        object_list_pyxb.start = start
+        object_list_pyxb.count = len(row_list)
+        object_list_pyxb.total = total
+        return object_list_pyxb
+
+    def _create_log_pyxb(self, binding, row_list, start, total):
+        log_pyxb = binding.log()
+        for row in row_list:
+            log_entry_pyxb = binding.LogEntry()
+            log_entry_pyxb.entryId = str(row["id"])
+            log_entry_pyxb.identifier = row["sciobj__pid__did"]
+            if row.get("redact", False):
+                log_entry_pyxb.ipAddress = "<NotAuthorized>"
+                log_entry_pyxb.subject = "<NotAuthorized>"
+            else:
+                log_entry_pyxb.ipAddress = row["ip_address__ip_address"]
+                log_entry_pyxb.subject = row["subject__subject"]
+            log_entry_pyxb.userAgent = row["user_agent__user_agent"]
+            log_entry_pyxb.event = row["event__event"]
+            log_entry_pyxb.dateLogged = d1_common.date_time.normalize_datetime_to_utc(
+                row["timestamp"]
+            )
+            log_entry_pyxb.nodeIdentifier = django.conf.settings.NODE_IDENTIFIER
+            log_pyxb.logEntry.append(log_entry_pyxb)
+        log_pyxb.start = start
+        log_pyxb.count = len(row_list)
+        log_pyxb.total = total
+        return log_pyxb
+
+    def _get_body(self, path_str, **query_dict):
+        with d1_gmn.tests.gmn_mock.disable_auth():
+            response = django.test.Client().get(path_str, query_dict)
+        assert response.status_code == 200
+        assert response.streaming
+        return b"".join(response.streaming_content)
+
+    @pytest.mark.parametrize(
+        "binding",
+        [d1_common.types.dataoneTypes_v1_1, d1_common.types.dataoneTypes_v2_0],
+    )
+    @pytest.mark.parametrize("row_count", [0, 1, 2])
+    def test_1000(self, binding, row_count):
+        """generate_object_list(): Output is byte-identical to PyXB."""
+        row_list = OBJECT_ROW_LIST[:row_count]
+        expected_bytes = d1_common.xml.serialize_for_transport(
+            self._create_object_list_pyxb(binding, row_list, 10, 20),
+            xslt_url=XSLT_URL,
+        )
+        received_bytes = b"".join(
+            d1_gmn.app.xml_stream.generate_object_list(
+                binding, row_list, 10, 20, xslt_url=XSLT_URL
+            )
+        )
+        assert received_bytes == expected_bytes
+
+    @pytest.mark.parametrize(
+        "binding",
+        [d1_common.types.dataoneTypes_v1_1, d1_common.types.dataoneTypes_v2_0],
+    )
+    @pytest.mark.parametrize("row_count", [0, 1, 2])
+    def test_1010(self, binding, row_count):
+        """generate_log(): Output is byte-identical to PyXB, including redacted
+        entries."""
+        row_list = LOG_ROW_LIST[:row_count]
+        expected_bytes = d1_common.xml.serialize_for_transport(
+            self._create_log_pyxb(binding, row_list, 0, 2), xslt_url=XSLT_URL
+        )
+        received_bytes = b"".join(
+            d1_gmn.app.xml_stream.generate_log(
+                binding, row_list, 0, 2, xslt_url=XSLT_URL
+            )
+        )
+        assert received_bytes == expected_bytes
+
+    def test_1020(self):
+        """generate_object_list(): Entries are split into multiple chunks."""
+        row_list = OBJECT_ROW_LIST * d1_gmn.app.xml_stream.ROWS_PER_CHUNK
+        chunk_list = list(
+            d1_gmn.app.xml_stream.generate_object_list(
+                d1_common.types.dataoneTypes_v2_0, row_list, 0, len(row_list)
+            )
+        )
+        # Header, 2 chunks of entries, footer
+        assert len(chunk_list) == 4
+        assert b"".join(chunk_list) == d1_common.xml.serialize_for_transport(
+            self._create_object_list_pyxb(
+                d1_common.types.dataoneTypes_v2_0, row_list, 0, len(row_list)
+            )
+        )
+
+    @responses.activate
+    @pytest.mark.parametrize("api_str", ["v1", "v2"])
+    def test_1030(self, api_str):
+        """listObjects(): Streamed response round trips unchanged through PyXB."""
+        body_bytes = self._get_body("/{}/object".format(api_str), start=3, count=25)
+        object_list_pyxb = d1_common.xml.deserialize(body_bytes)
+        assert len(object_list_pyxb.objectInfo) == 25
+        assert body_bytes == d1_common.xml.serialize_for_transport(
+            object_list_pyxb, xslt_url=django.urls.base.reverse("home_xslt")
+        )
+
+    @responses.activate
+    @pytest.mark.parametrize("api_str", ["v1", "v2"])
+    def test_1040(self, api_str):
+        """getLogRecords(): Streamed response round trips unchanged through PyXB."""
+        body_bytes = self._get_body("/{}/log".format(api_str), start=3, count=25)
+        log_pyxb = d1_common.xml.deserialize(body_bytes)
+        assert len(log_pyxb.logEntry) == 25
+        assert body_bytes == d1_common.xml.serialize_for_transport(
+            log_pyxb, xslt_url=django.urls.base.reverse("home_xslt")
+        )
@@ -25,6 +25,7 @@ import ssl
 import aiohttp
 
 import d1_common.const
+import d1_common.type_records
 import d1_common.types.dataoneTypes
 import d1_common.types.exceptions
 import d1_common.typing as t
@@ -161,8 +162,15 @@ class AsyncDataONEClient:
         start=0,
         count=d1_common.const.DEFAULT_SLICE_SIZE,
         vendor_specific=None,
+        as_records=False,
     ):
-        return await self._request_pyxb(
+        """MNRead.listObjects()
+
+        If ``as_records`` is True, return a d1_common.type_records.ObjectListRecord
+        instead of a PyXB ObjectList.
+
+        """
+        return await (self._request_records if as_records else self._request_pyxb)(
             "get",
             "object",
             {
@@ -188,8 +196,15 @@ class AsyncDataONEClient:
         start=0,
         count=d1_common.const.DEFAULT_SLICE_SIZE,
         vendor_specific=None,
+        as_records=False,
     ):
-        return await self._request_pyxb(
+        """MNCore.getLogRecords()
+
+        If ``as_records`` is True, return a d1_common.type_records.LogRecord instead of
+        a PyXB Log.
+
+        """
+        return await (self._request_records if as_records else self._request_pyxb)(
             "get",
             "log",
             {
@@ -239,6 +254,11 @@ class AsyncDataONEClient:
             xml = await response.text()
             return d1_common.types.dataoneTypes.CreateFromDocument(xml)
 
+    async def _request_records(self, *arg_list, **arg_dict):
+        async with await self._retry_request(*arg_list, **arg_dict) as response:
+            self._assert_valid_response(response)
+            return d1_common.type_records.deserialize(await response.read())
+
     async def _request_head(self, *arg_list, **arg_dict):
         async with await self._retry_request(*arg_list, **arg_dict) as response:
             self._assert_valid_response(response)
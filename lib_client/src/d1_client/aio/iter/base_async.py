@@ -41,11 +41,13 @@ class IteratorBaseAsync(object):
         async_client,
         page_size=d1_client.aio.async_client.DEFAULT_PAGE_SIZE,
         list_arg_dict=None,
+        as_records=False,
     ):
         self.log = logging.getLogger(__name__)
         self.async_client = async_client
         self.page_size = page_size
         self.list_arg_dict = list_arg_dict or {}
+        self.as_records = as_records
         self._total = None
         self.task_set = set()
         self.another_task_set = set()
@@ -53,7 +55,8 @@ class IteratorBaseAsync(object):
         self.ignore_errors = False
 
     async def __aiter__(self):
-        """Async iterator returning pyxb objects."""
+        """Async iterator returning pyxb objects, or records if ``as_records`` is
+        True."""
         await self.import_all()
         while self.task_set or self.another_task_set or self.result_set:
             self.log.debug(
@@ -32,14 +32,15 @@ class EventLogIteratorAsync(d1_client.aio.iter.base_async.IteratorBaseAsync):
         async_client,
         page_size=d1_client.aio.async_client.DEFAULT_PAGE_SIZE,
         list_arg_dict=None,
+        as_records=False,
     ):
-        super().__init__(async_client, page_size, list_arg_dict)
+        super().__init__(async_client, page_size, list_arg_dict, as_records)
 
     async def import_all(self):
         """Import all Event Logs on remote MN."""
         self.log.info("Starting Event Log import")
         log_pyxb = await self.async_client.get_log_records(
-            start=0, count=0, **self.list_arg_dict
+            start=0, count=0, as_records=self.as_records, **self.list_arg_dict
         )
         total_count = log_pyxb.total
         self.log.debug("Total event log count: {}".format(total_count))
@@ -57,7 +58,10 @@ class EventLogIteratorAsync(d1_client.aio.iter.base_async.IteratorBaseAsync):
         )
         page_start_idx = page_idx * self.page_size
         log_pyxb = await self.async_client.get_log_records(
-            start=page_start_idx, count=self.page_size, **self.list_arg_dict
+            start=page_start_idx,
+            count=self.page_size,
+            as_records=self.as_records,
+            **self.list_arg_dict
         )
         self._page_check(page_idx, page_count, len(log_pyxb.logEntry))
         for log_entry_pyxb in log_pyxb.logEntry:
@@ -33,14 +33,15 @@ class ObjectListIteratorAsync(d1_client.aio.iter.base_async.IteratorBaseAsync):
         async_client,
         page_size=d1_client.aio.async_client.DEFAULT_PAGE_SIZE,
         list_arg_dict=None,
+        as_records=False,
     ):
-        super().__init__(async_client, page_size, list_arg_dict)
+        super().__init__(async_client, page_size, list_arg_dict, as_records)
 
     async def import_all(self):
         """Import all SciObj on remote MN."""
         self.log.info("Starting SciObj import")
         object_list_pyxb = await self.async_client.list_objects(
-            start=0, count=0, **self.list_arg_dict
+            start=0, count=0, as_records=self.as_records, **self.list_arg_dict
         )
         total_count = object_list_pyxb.total
         self.log.debug("Total SciObj count: {}".format(total_count))
@@ -58,7 +59,10 @@ class ObjectListIteratorAsync(d1_client.aio.iter.base_async.IteratorBaseAsync):
         )
         page_start_idx = page_idx * self.page_size
         object_list_pyxb = await self.async_client.list_objects(
-            start=page_start_idx, count=self.page_size, **self.list_arg_dict
+            start=page_start_idx,
+            count=self.page_size,
+            as_records=self.as_records,
+            **self.list_arg_dict
         )
         self._page_check(page_idx, page_count, len(object_list_pyxb.objectInfo))
         for object_info_pyxb in object_list_pyxb.objectInfo:
@@ -25,6 +25,7 @@ import requests
 
 import d1_common.const
 import d1_common.type_conversions
+import d1_common.type_records
 import d1_common.types.exceptions
 import d1_common.util
 import d1_common.utils.ulog
@@ -360,6 +361,27 @@ class DataONEBaseClient(d1_client.session.Session):
             return d1_pyxb_obj
         self._raise_exception(response)
 
+    def _read_dataone_record_response(self, response, record_class):
+        """Like _read_dataone_type_response(), but deserialize the DataONE type to a
+        lightweight record instead of a PyXB object.
+
+        See d1_common.type_records.
+
+        """
+        if self._status_is_ok(response, False):
+            if not self._content_type_is_xml(response):
+                self._raise_service_failure_invalid_content_type(response)
+            try:
+                d1_record = d1_common.type_records.deserialize(response.content)
+            except ValueError as e:
+                self._raise_service_failure_invalid_dataone_type(response, e)
+            if not isinstance(d1_record, record_class):
+                self._raise_service_failure_incorrect_dataone_type(
+                    response, record_class.__name__, d1_record.__class__.__name__
+                )
+            return d1_record
+        self._raise_exception(response)
+
     def _read_json_response(self, response):
         if self._status_is_ok(response, False) and self._content_type_is_json(response):
             try:
@@ -469,6 +491,37 @@ class DataONEBaseClient(d1_client.session.Session):
         )
         return self._read_dataone_type_response(response, "Log")
 
+    def getLogRecordsAsRecords(
+        self,
+        fromDate=None,
+        toDate=None,
+        event=None,
+        pidFilter=None,  # v1
+        idFilter=None,  # v2
+        start=0,
+        count=d1_common.const.DEFAULT_SLICE_SIZE,
+        vendorSpecific=None,
+    ):
+        """Like getLogRecords(), but return a d1_common.type_records.LogRecord.
+
+        The Log is not validated and no PyXB objects are created unless requested
+        through the pyxb() method of the records.
+
+        """
+        response = self.getLogRecordsResponse(
+            fromDate=fromDate,
+            toDate=toDate,
+            event=event,
+            pidFilter=pidFilter,
+            idFilter=idFilter,
+            start=start,
+            count=count,
+            vendorSpecific=vendorSpecific,
+        )
+        return self._read_dataone_record_response(
+            response, d1_common.type_records.LogRecord
+        )
+
     # CNCore.ping() → null
     # https://releases.dataone.org/online/api-documentation-v2.0.1/apis/CN_APIs.html#CNCore.ping
     # MNRead.ping() → null
@@ -625,6 +678,39 @@ class DataONEBaseClient(d1_client.session.Session):
         )
         return self._read_dataone_type_response(response, "ObjectList")
 
+    def listObjectsAsRecords(
+        self,
+        fromDate=None,
+        toDate=None,
+        formatId=None,
+        identifier=None,
+        replicaStatus=None,
+        nodeId=None,
+        start=0,
+        count=d1_common.const.DEFAULT_SLICE_SIZE,
+        vendorSpecific=None,
+    ):
+        """Like listObjects(), but return a d1_common.type_records.ObjectListRecord.
+
+        The ObjectList is not validated and no PyXB objects are created unless
+        requested through the pyxb() method of the records.
+
+        """
+        response = self.listObjectsResponse(
+            fromDate,
+            toDate,
+            formatId,
+            identifier,
+            replicaStatus,
+            nodeId,
+            start,
+            count,
+            vendorSpecific,
+        )
+        return self._read_dataone_record_response(
+            response, d1_common.type_records.ObjectListRecord
+        )
+
     # ----------------------------------------------------------------------------
     # CNCore / MNStorage
     # ----------------------------------------------------------------------------
@@ -42,11 +42,13 @@ class LogRecordIteratorMulti(d1_client.iter.base_multi.MultiprocessedIteratorBas
         api_major=d1_client.iter.base_multi.API_MAJOR,
         client_arg_dict=None,
         get_log_records_arg_dict=None,
+        as_records=False,
     ):
         super(LogRecordIteratorMulti, self).__init__(
             base_url, page_size, max_workers, max_result_queue_size,
             max_task_queue_size, api_major, client_arg_dict, get_log_records_arg_dict,
-            None, _page_func, _iter_func, _item_proc_func
+            None, _page_records_func if as_records else _page_func, _iter_func,
+            _item_proc_func
         )
 
 
@@ -54,6 +56,10 @@ def _page_func(client):
     return client.getLogRecords
 
 
+def _page_records_func(client):
+    return client.getLogRecordsAsRecords
+
+
 def _iter_func(page_pyxb):
     return page_pyxb.logEntry
 
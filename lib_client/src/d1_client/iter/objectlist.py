@@ -36,7 +36,14 @@ class ObjectListIterator(object):
     """
 
     def __init__(
-        self, client, start=0, fromDate=None, pagesize=500, max_count=-1, nodeId=None
+        self,
+        client,
+        start=0,
+        fromDate=None,
+        pagesize=500,
+        max_count=-1,
+        nodeId=None,
+        as_records=False,
     ):
         """
         :param client: The client instance for retrieving stuff.
@@ -49,6 +56,9 @@ class ObjectListIterator(object):
         :type pagesize: integer
         :param max_count: Maximum number of items to retrieve (all)
         :type max_count: integer
+        :param as_records: Return lightweight ObjectInfoRecord objects instead of
+          PyXB ObjectInfo objects. See d1_common.type_records. (False)
+        :type as_records: bool
 
         """
         self._log = logging.getLogger(__name__)
@@ -65,6 +75,7 @@ class ObjectListIterator(object):
 
         self._fromDate = fromDate
         self._nodeId = nodeId
+        self._as_records = as_records
 
         self._loadMore(start=start)
 
@@ -105,7 +116,12 @@ class ObjectListIterator(object):
         self._pageoffs = 0
         try:
             pyxb.RequireValidWhenParsing(validation)
-            self._object_list = self._client.listObjects(
+            list_objects_func = (
+                self._client.listObjectsAsRecords
+                if self._as_records
+                else self._client.listObjects
+            )
+            self._object_list = list_objects_func(
                 start=start,
                 count=self._pagesize,
                 fromDate=self._fromDate,
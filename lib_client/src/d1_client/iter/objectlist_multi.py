@@ -45,11 +45,13 @@ class ObjectListIteratorMulti(d1_client.iter.base_multi.MultiprocessedIteratorBa
         api_major=d1_client.iter.base_multi.API_MAJOR,
         client_arg_dict=None,
         list_objects_arg_dict=None,
+        as_records=False,
     ):
         super(ObjectListIteratorMulti, self).__init__(
             base_url, page_size, max_workers, max_result_queue_size,
             max_task_queue_size, api_major, client_arg_dict, list_objects_arg_dict,
-            None, _page_func, _iter_func, _item_proc_func
+            None, _page_records_func if as_records else _page_func, _iter_func,
+            _item_proc_func
         )
 
 
@@ -57,6 +59,10 @@ def _page_func(client):
     return client.listObjects
 
 
+def _page_records_func(client):
+    return client.listObjectsAsRecords
+
+
 def _iter_func(page_pyxb):
     return page_pyxb.objectInfo
 
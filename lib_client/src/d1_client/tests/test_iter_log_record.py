@@ -22,6 +22,7 @@ import datetime
 
 import responses
 
+import d1_common.type_records
 import d1_common.types.dataoneTypes
 
 import d1_client.iter.logrecord
@@ -45,6 +46,31 @@ class TestLogRecordIterator(d1_test.d1_test_case.D1TestCase):
         )
         self._log_record_iterator_test(5, 0)
 
+    @responses.activate
+    def test_1010(self):
+        """as_records=True: Iterator returns records that match the PyXB objects."""
+        d1_test.mock_api.get_log_records.add_callback(
+            d1_test.d1_test_case.MOCK_MN_BASE_URL
+        )
+        client = d1_client.mnclient.MemberNodeClient(
+            base_url=d1_test.d1_test_case.MOCK_MN_BASE_URL
+        )
+        pyxb_list = list(d1_client.iter.logrecord.LogRecordIterator(client, count=7))
+        record_list = list(
+            d1_client.iter.logrecord.LogRecordIterator(client, count=7, as_records=True)
+        )
+        assert len(record_list) == len(pyxb_list)
+        for log_entry_record, log_entry_pyxb in zip(record_list, pyxb_list):
+            assert isinstance(log_entry_record, d1_common.type_records.LogEntryRecord)
+            assert log_entry_record.identifier == log_entry_pyxb.identifier.value()
+            assert log_entry_record.subject == log_entry_pyxb.subject.value()
+            assert log_entry_record.event == log_entry_pyxb.event
+            # The mock API generates dateLogged from the current time
+            assert (
+                log_entry_record.pyxb().identifier.value()
+                == log_entry_pyxb.identifier.value()
+            )
+
     def _test_110(self):
         """PageSize=1, start=63."""
         self._log_record_iterator_test(1, 6)
@@ -49,7 +49,13 @@ Note:
 
 """
 
+import functools
+import itertools
 import logging
+import sys
+import urllib.parse
+import xml.etree.ElementTree
+import xml.sax
 
 import rdflib
 import rdflib.term
@@ -65,6 +71,27 @@ CITO = rdflib.Namespace(d1_common.const.ORE_NAMESPACE_DICT["cito"])
 ORE = rdflib.Namespace(d1_common.const.ORE_NAMESPACE_DICT["ore"])
 PROV = rdflib.Namespace(d1_common.const.ORE_NAMESPACE_DICT["prov"])
 
+RDF_NS = str(rdflib.RDF)
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+# ElementTree names of the RDF/XML syntax attributes
+_RDF_ABOUT = "{{{}}}about".format(RDF_NS)
+_RDF_ID = "{{{}}}ID".format(RDF_NS)
+_RDF_NODE_ID = "{{{}}}nodeID".format(RDF_NS)
+_RDF_PARSE_TYPE = "{{{}}}parseType".format(RDF_NS)
+_RDF_RESOURCE = "{{{}}}resource".format(RDF_NS)
+_XML_BASE = "{{{}}}base".format(XML_NS)
+
+# Predicates that are recorded by ResourceMapSummary. All other triples are discarded
+# while parsing.
+SUMMARY_PREDICATE_LIST = [
+    str(DCTERMS.identifier),
+    str(ORE.aggregates),
+    str(CITO.documents),
+    str(CITO.isDocumentedBy),
+    str(rdflib.RDF.type),
+]
+
 
 def createSimpleResourceMap(ore_pid, scimeta_pid, sciobj_pid_list):
     """Create a simple OAI-ORE Resource Map with one Science Metadata document and any
@@ -145,6 +172,279 @@ def createResourceMapFromStream(in_stream, base_url=d1_common.const.URL_DATAONE_
     return ore
 
 
+def createResourceMapSummaryFromStream(in_stream, base_url=""):
+    """Extract the aggregated PIDs, the CiTO documents / isDocumentedBy relationships
+    and the PID of the Resource Map itself from an RDF/XML Resource Map.
+
+    The document is parsed incrementally and elements are discarded as soon as they
+    have been processed, so memory use is bounded by the number of identifiers in the
+    Resource Map rather than by the size of the document or its RDF graph. Use
+    ResourceMap when the full graph is needed, e.g., for modifying the Resource Map.
+
+    The streaming parser handles the RDF/XML constructs used in Resource Maps. If the
+    document uses constructs that it does not handle, such as RDF collections or XML
+    literals, the stream is rewound and parsed with RDFLib instead.
+
+    Args:
+      in_stream: file-like object
+        Stream that returns the bytes of an RDF/XML Resource Map. Must be seekable in
+        order for the RDFLib fallback to be available.
+
+      base_url: str
+        Logical URI to use as the document base for resolving relative URIs.
+
+    Returns:
+      resource_map.ResourceMapSummary
+
+    Raises:
+      xml.sax.SAXException based exception: On parse error.
+
+    """
+    summary = ResourceMapSummary()
+    try:
+        _stream_summary_triples(summary, in_stream, base_url)
+    except _StreamingParseUnsupported as e:
+        if not in_stream.seekable():
+            raise xml.sax.SAXException(
+                "Resource Map uses RDF/XML that requires a seekable stream. "
+                'error="{}"'.format(str(e))
+            )
+        logging.debug(
+            'Falling back to RDFLib for parsing Resource Map. reason="{}"'.format(
+                str(e)
+            )
+        )
+        in_stream.seek(0)
+        summary = ResourceMapSummary()
+        _graph_summary_triples(summary, in_stream, base_url)
+    except xml.etree.ElementTree.ParseError as e:
+        raise xml.sax.SAXException(str(e))
+    return summary
+
+
+class _StreamingParseUnsupported(Exception):
+    pass
+
+
+class ResourceMapSummaryParser(object):
+    """Parse an RDF/XML Resource Map into a ResourceMapSummary from chunks of bytes.
+
+    For use when the bytes of the Resource Map are already being read for another
+    purpose, such as storing them, so that they do not have to be read again for
+    parsing. The chunks are parsed with the same streaming parser as used by
+    createResourceMapSummaryFromStream().
+
+    The RDFLib fallback cannot be used here, as it requires the complete document. If
+    the document uses RDF/XML constructs that the streaming parser does not handle,
+    close() returns None, and the caller must parse the complete document with
+    createResourceMapSummaryFromStream().
+
+    Args:
+      base_url: str
+        Logical URI to use as the document base for resolving relative URIs.
+
+    """
+
+    def __init__(self, base_url=""):
+        self._summary = ResourceMapSummary()
+        self._handler = _SummaryTripleHandler(self._summary, base_url)
+        self._parser = xml.etree.ElementTree.XMLPullParser(events=("start", "end"))
+        self._is_unsupported = False
+
+    def feed(self, chunk_bytes):
+        """Parse a chunk of the Resource Map.
+
+        Raises:
+          xml.sax.SAXException: On parse error.
+
+        """
+        if self._is_unsupported:
+            return
+        try:
+            self._parser.feed(chunk_bytes)
+        except xml.etree.ElementTree.ParseError as e:
+            raise xml.sax.SAXException(str(e))
+        self._handle_events()
+
+    def close(self):
+        """Finish parsing the Resource Map.
+
+        Returns:
+          resource_map.ResourceMapSummary, or None if the Resource Map must be parsed
+          with createResourceMapSummaryFromStream().
+
+        Raises:
+          xml.sax.SAXException: On parse error.
+
+        """
+        if not self._is_unsupported:
+            try:
+                self._parser.close()
+            except xml.etree.ElementTree.ParseError as e:
+                raise xml.sax.SAXException(str(e))
+            self._handle_events()
+        if self._is_unsupported:
+            return None
+        return self._summary
+
+    def _handle_events(self):
+        try:
+            for event_str, el in self._parser.read_events():
+                self._handler.handle(event_str, el)
+        except _StreamingParseUnsupported as e:
+            logging.debug(
+                'Resource Map requires RDFLib for parsing. reason="{}"'.format(str(e))
+            )
+            self._is_unsupported = True
+
+
+def _stream_summary_triples(summary, in_stream, base_url):
+    """Parse RDF/XML with the ElementTree pull parser, adding the triples that are
+    needed by ``summary``."""
+    handler = _SummaryTripleHandler(summary, base_url)
+    for event_str, el in xml.etree.ElementTree.iterparse(
+        in_stream, events=("start", "end")
+    ):
+        handler.handle(event_str, el)
+
+
+class _SummaryTripleHandler(object):
+    """Add the triples in a stream of ElementTree "start" and "end" events for an
+    RDF/XML document to a ResourceMapSummary.
+
+    Node and property elements alternate in RDF/XML, so a stack of frames is enough to
+    track the current subject and predicate. Each frame is a list of: kind ("rdf",
+    "node" or "property"), base URI, subject, predicate and a flag that is set when a
+    property element has received its object.
+
+    """
+
+    def __init__(self, summary, base_url):
+        self._summary = summary
+        self._base_url = base_url
+        self._blank_id_iter = itertools.count()
+        self._frame_stack = []
+        self._root_el = None
+
+    def handle(self, event_str, el):
+        summary = self._summary
+        frame_stack = self._frame_stack
+        if event_str == "end":
+            kind_str, _, subject, predicate, has_object = frame_stack.pop()
+            if kind_str == "property" and not has_object:
+                summary.addTriple(subject, predicate, el.text or "")
+            el.clear()
+            if len(frame_stack) == 1 and self._root_el is not None:
+                self._root_el.clear()
+            return
+
+        parent_frame = frame_stack[-1] if frame_stack else None
+        base = parent_frame[1] if parent_frame else self._base_url
+        if _XML_BASE in el.attrib:
+            base = _resolve_uri(base, el.get(_XML_BASE))
+        tag_uri = _get_tag_uri(el.tag)
+
+        if parent_frame is None and tag_uri == RDF_NS + "RDF":
+            self._root_el = el
+            frame_stack.append(["rdf", base, None, None, False])
+
+        elif parent_frame is None or parent_frame[0] in ("rdf", "property"):
+            subject = _get_node_subject(el, base, self._blank_id_iter)
+            if parent_frame is not None and parent_frame[0] == "property":
+                if parent_frame[4]:
+                    raise _StreamingParseUnsupported(
+                        'Multiple objects in property element. predicate="{}"'.format(
+                            parent_frame[3]
+                        )
+                    )
+                summary.addTriple(parent_frame[2], parent_frame[3], subject)
+                parent_frame[4] = True
+            if tag_uri != RDF_NS + "Description":
+                summary.addTriple(subject, RDF_NS + "type", tag_uri)
+            for attr_name, attr_value in el.attrib.items():
+                attr_uri = _get_tag_uri(attr_name)
+                if attr_uri == RDF_NS + "type":
+                    summary.addTriple(subject, attr_uri, _resolve_uri(base, attr_value))
+                elif not attr_uri.startswith((RDF_NS, XML_NS)):
+                    summary.addTriple(subject, attr_uri, attr_value)
+            frame_stack.append(["node", base, subject, None, False])
+
+        else:
+            subject = parent_frame[2]
+            if tag_uri == RDF_NS + "li":
+                raise _StreamingParseUnsupported("RDF container membership")
+            parse_type_str = el.get(_RDF_PARSE_TYPE)
+            resource_uri = el.get(_RDF_RESOURCE)
+            node_id = el.get(_RDF_NODE_ID)
+            if parse_type_str == "Resource":
+                blank_id = "_:n{}".format(next(self._blank_id_iter))
+                summary.addTriple(subject, tag_uri, blank_id)
+                frame_stack.append(["node", base, blank_id, None, False])
+            elif parse_type_str is not None:
+                raise _StreamingParseUnsupported(
+                    'rdf:parseType="{}"'.format(parse_type_str)
+                )
+            elif resource_uri is not None:
+                summary.addTriple(subject, tag_uri, _resolve_uri(base, resource_uri))
+                frame_stack.append(["property", base, subject, tag_uri, True])
+            elif node_id is not None:
+                summary.addTriple(subject, tag_uri, "_:" + node_id)
+                frame_stack.append(["property", base, subject, tag_uri, True])
+            elif any(
+                not _get_tag_uri(a).startswith((RDF_NS, XML_NS)) for a in el.attrib
+            ):
+                raise _StreamingParseUnsupported("Property attributes on property")
+            else:
+                frame_stack.append(["property", base, subject, tag_uri, False])
+
+
+def _graph_summary_triples(summary, in_stream, base_url):
+    """Parse RDF/XML with RDFLib, adding the triples that are needed by
+    ``summary``."""
+    resource_map = ResourceMap()
+    resource_map.deserialize(
+        data=in_stream.read(), format="xml", publicID=base_url or None
+    )
+    for predicate in SUMMARY_PREDICATE_LIST:
+        for s, o in resource_map.subject_objects(rdflib.term.URIRef(predicate)):
+            summary.addTriple(_node_to_str(s), predicate, _node_to_str(o))
+
+
+def _node_to_str(node):
+    if isinstance(node, rdflib.term.BNode):
+        return "_:" + str(node)
+    return str(node)
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_tag_uri(tag_str):
+    """Convert an ElementTree ``{namespace}name`` tag to the RDF URI that it
+    represents."""
+    if tag_str.startswith("{"):
+        ns_str, name_str = tag_str[1:].split("}", 1)
+        return ns_str + name_str
+    return tag_str
+
+
+def _resolve_uri(base, uri):
+    if not base:
+        return uri
+    return urllib.parse.urljoin(base, uri)
+
+
+def _get_node_subject(el, base, blank_id_iter):
+    about_uri = el.get(_RDF_ABOUT)
+    if about_uri is not None:
+        return _resolve_uri(base, about_uri)
+    node_id = el.get(_RDF_NODE_ID)
+    if node_id is not None:
+        return "_:" + node_id
+    rdf_id = el.get(_RDF_ID)
+    if rdf_id is not None:
+        return _resolve_uri(base, "#" + rdf_id)
+    return "_:n{}".format(next(blank_id_iter))
+
+
 # ===============================================================================
 
 
@@ -645,3 +945,112 @@ class ResourceMap(rdflib.ConjunctiveGraph):
     def _check_initialized(self):
         if not self._ore_initialized:
             raise ValueError("ResourceMap is not initialized.")
+
+
+# ===============================================================================
+
+
+class ResourceMapSummary(object):
+    """The subset of an OAI-ORE Resource Map that is needed for finding its members.
+
+    Only the triples with predicates in SUMMARY_PREDICATE_LIST are kept, and they are
+    held as plain strings in dicts. The query methods return the same results as the
+    corresponding methods in ResourceMap.
+
+    See Also:   createResourceMapSummaryFromStream(), ResourceMapSummaryParser
+
+    """
+
+    def __init__(self):
+        # Dicts are used as ordered sets, so that results are returned in document
+        # order, and repeated triples are stored only once, as in an RDF graph.
+        self._identifier_dict = {}
+        self._aggregates_dict = {}
+        self._documents_dict = {}
+        self._documented_by_dict = {}
+        self._resource_map_dict = {}
+
+    def addTriple(self, subject, predicate, obj):
+        """Add a triple if its predicate is one that is kept in the summary.
+
+        Args:
+          subject, predicate, obj: str
+
+        """
+        if predicate not in SUMMARY_PREDICATE_LIST:
+            return
+        # The same URIs are repeated in many triples, so share a single copy of each.
+        subject = sys.intern(subject)
+        if predicate == SUMMARY_PREDICATE_LIST[0]:
+            pid_list = self._identifier_dict.setdefault(subject, [])
+            if obj not in pid_list:
+                pid_list.append(obj)
+            return
+        obj = sys.intern(obj)
+        if predicate == SUMMARY_PREDICATE_LIST[1]:
+            self._aggregates_dict[(subject, obj)] = None
+        elif predicate == SUMMARY_PREDICATE_LIST[2]:
+            self._documents_dict[(subject, obj)] = None
+        elif predicate == SUMMARY_PREDICATE_LIST[3]:
+            self._documented_by_dict[(subject, obj)] = None
+        elif obj == str(ORE.ResourceMap):
+            self._resource_map_dict[subject] = None
+
+    def getResourceMapPid(self):
+        """Returns:
+
+        str : PID of the Resource Map itself.
+
+        """
+        return self._get_pid_list(list(self._resource_map_dict)[:1])[0]
+
+    def getAggregatedPids(self):
+        """Returns: list of str: All aggregated PIDs."""
+        return self._get_pid_list(o for _, o in self._aggregates_dict)
+
+    def getAggregatedScienceMetadataPids(self):
+        """Returns: list of str: All aggregated Science Metadata PIDs.
+
+        Science Metadata objects are the aggregated objects that have a
+        ``cito:documents`` relationship.
+
+        """
+        return self._get_aggregated_pid_list_by_relationship(self._documents_dict)
+
+    def getAggregatedScienceDataPids(self):
+        """Returns: list of str: All aggregated Science Data PIDs.
+
+        Science Data objects are the aggregated objects that have a
+        ``cito:isDocumentedBy`` relationship.
+
+        """
+        return self._get_aggregated_pid_list_by_relationship(self._documented_by_dict)
+
+    def getDocumentsDict(self):
+        """Returns: dict: Science Metadata PID -> list of the Science Data PIDs that it
+        documents.
+
+        Both the ``cito:documents`` and the ``cito:isDocumentedBy`` relationships are
+        included.
+
+        """
+        documents_dict = {}
+        pair_list = list(self._documents_dict) + [
+            (o, s) for s, o in self._documented_by_dict
+        ]
+        for scimeta_id, scidata_id in pair_list:
+            for scimeta_pid in self._get_pid_list([scimeta_id]):
+                pid_dict = documents_dict.setdefault(scimeta_pid, {})
+                for scidata_pid in self._get_pid_list([scidata_id]):
+                    pid_dict[scidata_pid] = None
+        return {k: list(v) for k, v in documents_dict.items()}
+
+    def _get_pid_list(self, id_iter):
+        return [pid for s in id_iter for pid in self._identifier_dict.get(s, ())]
+
+    def _get_aggregated_pid_list_by_relationship(self, relationship_dict):
+        related_id_set = {s for s, _ in relationship_dict}
+        aggregated_id_dict = {
+            o: None for _, o in self._aggregates_dict if o in related_id_set
+        }
+        return list(dict.fromkeys(self._get_pid_list(aggregated_id_dict)))
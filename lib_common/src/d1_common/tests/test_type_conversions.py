@@ -18,10 +18,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import logging
+import timeit
+
+import pytest
+
 import d1_common.type_conversions
 
 import d1_test.d1_test_case
 
+BENCHMARK_REPEAT_COUNT = 100
+
 
 class TestTypeConversions(d1_test.d1_test_case.D1TestCase):
     def test_1000(self):
@@ -106,3 +113,98 @@ class TestTypeConversions(d1_test.d1_test_case.D1TestCase):
         )
         assert d1_common.type_conversions.str_is_v1(systemMetadata_v1_str)
         assert not d1_common.type_conversions.str_is_v2(systemMetadata_v1_str)
+
+    def test_1100(self):
+        """str_get_root_namespace(): Returns the namespace of the root element."""
+        assert (
+            d1_common.type_conversions.str_get_root_namespace(
+                self.test_files.load_xml_to_str("systemMetadata_v1_0.xml")
+            )
+            == "http://ns.dataone.org/service/types/v1"
+        )
+        assert (
+            d1_common.type_conversions.str_get_root_namespace(
+                self.test_files.load_xml_to_str("log_v2_0.xml")
+            )
+            == "http://ns.dataone.org/service/types/v2.0"
+        )
+        assert d1_common.type_conversions.str_get_root_namespace("<a><b/></a>") is None
+
+    def test_1110(self):
+        """str_get_root_namespace(): Stops at the root element, so content after the
+        start tag is not checked."""
+        assert (
+            d1_common.type_conversions.str_get_root_namespace(
+                '<v1:a xmlns:v1="http://ns.dataone.org/service/types/v1">' + "x" * 10000
+            )
+            == "http://ns.dataone.org/service/types/v1"
+        )
+
+    def test_1120(self):
+        """str_to_v1_pyxb(): SystemMetadata v2 to v1 PyXB object."""
+        systemMetadata_v1_pyxb = d1_common.type_conversions.str_to_v1_pyxb(
+            self.test_files.load_xml_to_str("systemMetadata_v2_0.xml")
+        )
+        assert d1_common.type_conversions.pyxb_is_v1(systemMetadata_v1_pyxb)
+        assert not hasattr(systemMetadata_v1_pyxb, "seriesId")
+
+    def test_1130(self):
+        """str_to_v2_str(): Doc that is already v2 is returned unchanged."""
+        systemMetadata_v2_0_str = self.test_files.load_xml_to_str(
+            "systemMetadata_v2_0.xml"
+        )
+        assert (
+            d1_common.type_conversions.str_to_v2_str(systemMetadata_v2_0_str)
+            is systemMetadata_v2_0_str
+        )
+
+
+@pytest.mark.skip("Benchmark")
+class TestTypeConversionsBenchmark(d1_test.d1_test_case.D1TestCase):
+    """Measure the time used for converting common DataONE types between v1 and v2.
+
+    Before the version was detected from the namespace of the root element, each
+    conversion parsed the doc with PyXB just to check the version, then again with
+    ElementTree. Conversions to the version that the doc already has were the most
+    expensive, e.g., about 0.4 s for a v1 ObjectList with 1000 records.
+
+    """
+
+    def _benchmark(self, doc_name, convert_func):
+        xml_str = self.test_files.load_xml_to_str(doc_name)
+        elapsed_sec = timeit.timeit(
+            lambda: convert_func(xml_str), number=BENCHMARK_REPEAT_COUNT
+        )
+        logging.info(
+            "doc={} func={} avg_ms={:.3f}".format(
+                doc_name,
+                convert_func.__name__,
+                elapsed_sec / BENCHMARK_REPEAT_COUNT * 1000,
+            )
+        )
+
+    def test_1000(self):
+        """SystemMetadata."""
+        for convert_func in (
+            d1_common.type_conversions.str_to_v1_str,
+            d1_common.type_conversions.str_to_v2_str,
+        ):
+            self._benchmark("systemMetadata_v1_0.xml", convert_func)
+            self._benchmark("systemMetadata_v2_0.xml", convert_func)
+
+    def test_1010(self):
+        """ObjectList."""
+        for convert_func in (
+            d1_common.type_conversions.str_to_v1_str,
+            d1_common.type_conversions.str_to_v2_str,
+        ):
+            self._benchmark("object_list_v1_1000_records.xml", convert_func)
+
+    def test_1020(self):
+        """Log."""
+        for convert_func in (
+            d1_common.type_conversions.str_to_v1_str,
+            d1_common.type_conversions.str_to_v2_str,
+        ):
+            self._benchmark("log_v1_10_items.xml", convert_func)
+            self._benchmark("log_v2_0.xml", convert_func)
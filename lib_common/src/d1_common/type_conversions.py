@@ -58,14 +58,20 @@ import d1_common.types.dataoneTypes_v1
 import d1_common.types.dataoneTypes_v1_1
 import d1_common.types.dataoneTypes_v1_2
 import d1_common.types.dataoneTypes_v2_0
+import d1_common.types.lazy_binding
 
 # Map common namespace prefixes to namespaces
+#
+# The DataONE namespaces are the same as the Namespace attributes of the PyXB bindings.
+# They are listed as literals so that the bindings are not loaded just for creating this
+# dict. See d1_common.types.lazy_binding.
 NS_DICT = {
     # TODO: 'v1' should map to v1_2.Namespace
-    "v1": str(d1_common.types.dataoneTypes_v1.Namespace),
-    "v1_1": str(d1_common.types.dataoneTypes_v1_1.Namespace),
-    "v1_2": str(d1_common.types.dataoneTypes_v1_2.Namespace),
-    "v2": str(d1_common.types.dataoneTypes_v2_0.Namespace),
+    "v1": "http://ns.dataone.org/service/types/v1",
+    "v1_1": "http://ns.dataone.org/service/types/v1.1",
+    # The v1.2 types are in the v1.1 namespace
+    "v1_2": "http://ns.dataone.org/service/types/v1.1",
+    "v2": "http://ns.dataone.org/service/types/v2.0",
     "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
     "ore": "http://www.openarchives.org/ore/terms/",
     "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
@@ -93,6 +99,10 @@ VERSION_TO_BINDING_DICT = {
     (2, 0): d1_common.types.dataoneTypes_v2_0,
 }
 
+# Number of bytes of an XML doc to pass to the parser at a time while searching for the
+# root element
+ROOT_SNIFF_CHUNK_SIZE = 1024
+
 # Register global namespace prefixes for use by ElementTree when serializing.
 for prefix_str, uri_str in list(NS_DICT.items()):
     xml.etree.ElementTree.register_namespace(prefix_str, uri_str)
@@ -181,6 +191,7 @@ def get_pyxb_namespaces():
     list of str: XML namespaces currently known to PyXB
 
     """
+    d1_common.types.lazy_binding.load(d1_common.types.dataoneTypes_v2_0)
     return pyxb.namespace.utility.AvailableNamespaces()
 
 
@@ -194,7 +205,9 @@ def str_to_v1_str(xml_str):
 
     Removes elements that are only valid for v2 and changes namespace to v1.
 
-    If doc is already v1, it is returned unchanged.
+    If doc is already v1, it is returned unchanged. The version is determined from the
+    namespace of the root element, so the doc is only fully parsed if it needs to be
+    converted.
 
     Args:
       xml_str : str
@@ -225,6 +238,8 @@ def pyxb_to_v1_str(pyxb_obj):
       str : API v1 XML doc. E.g.: ``SystemMetadata v1``.
 
     """
+    if pyxb_is_v1(pyxb_obj):
+        return pyxb_to_str(pyxb_obj)
     return str_to_v1_str(pyxb_to_str(pyxb_obj))
 
 
@@ -241,7 +256,7 @@ def str_to_v1_pyxb(xml_str):
       PyXB object: API v1 PyXB object. E.g.: ``SystemMetadata v1_2``.
 
     """
-    str_to_pyxb(str_to_v1_str(xml_str))
+    return str_to_pyxb(str_to_v1_str(xml_str))
 
 
 #
@@ -254,6 +269,10 @@ def str_to_v2_str(xml_str):
 
     All v1 elements are valid for v2, so only changes namespace.
 
+    If doc is already v2, it is returned unchanged. The version is determined from the
+    namespace of the root element, so the doc is only fully parsed if it needs to be
+    converted.
+
     Args:
       xml_str : str
         API v1 XML doc. E.g.: ``SystemMetadata v1``.
@@ -282,6 +301,8 @@ def pyxb_to_v2_str(pyxb_obj):
       str : API v2 XML doc. E.g.: ``SystemMetadata v2``.
 
     """
+    if pyxb_is_v2(pyxb_obj):
+        return pyxb_to_str(pyxb_obj)
     return str_to_v2_str(pyxb_to_str(pyxb_obj))
 
 
@@ -298,7 +319,7 @@ def str_to_v2_pyxb(xml_str):
       PyXB object: API v2 PyXB object. E.g.: ``SystemMetadata v2_0``.
 
     """
-    str_to_pyxb(str_to_v2_str(xml_str))
+    return str_to_pyxb(str_to_v2_str(xml_str))
 
 
 # Type checks
@@ -379,7 +400,7 @@ def str_is_v1(xml_str):
   Returns: bool
     ``True`` if XML doc is a DataONE API v1 type.
   """
-    return pyxb_is_v1(str_to_pyxb(xml_str))
+    return str_get_root_namespace(xml_str) == NS_DICT["v1"]
 
 
 def str_is_v2(xml_str):
@@ -391,7 +412,37 @@ def str_is_v2(xml_str):
   Returns: bool:
     ``True`` if XML doc is a DataONE API v2 type.
   """
-    return pyxb_is_v2(str_to_pyxb(xml_str))
+    return str_get_root_namespace(xml_str) == NS_DICT["v2"]
+
+
+def str_get_root_namespace(xml_str):
+    """Get the namespace of the root element of an XML doc.
+
+    The doc is passed to the parser in chunks, and parsing stops at the start tag of
+    the root element. So the cost does not depend on the size of the doc, and the doc
+    is not checked beyond the root element.
+
+    Args:
+      xml_str : str or bytes
+        XML doc.
+
+    Returns:
+      str: Namespace of the root element. E.g.:
+      ``http://ns.dataone.org/service/types/v1``. None if the root element is not in a
+      namespace.
+
+    Raises:
+      xml.etree.ElementTree.ParseError: If the doc ends before the root element.
+
+    """
+    parser = xml.etree.ElementTree.XMLPullParser(events=("start",))
+    for i in range(0, len(xml_str), ROOT_SNIFF_CHUNK_SIZE):
+        parser.feed(xml_str[i : i + ROOT_SNIFF_CHUNK_SIZE])
+        for _, el in parser.read_events():
+            if el.tag.startswith("{"):
+                return el.tag[1 : el.tag.index("}")]
+            return None
+    parser.close()
 
 
 def str_is_error(xml_str):
@@ -643,14 +694,12 @@ def etree_replace_namespace(etree_obj, ns_str):
 
     """
 
-    def _replace_recursive(el, n):
-        el.tag = re.sub(r"{.*\}", "{{{}}}".format(n), el.tag)
+    ns_tag_str = "{{{}}}".format(ns_str)
+    for el in etree_obj.iter():
+        if el.tag.startswith("{"):
+            el.tag = ns_tag_str + el.tag[el.tag.index("}") + 1 :]
         el.text = el.text.strip() if el.text else None
         el.tail = el.tail.strip() if el.tail else None
-        for child_el in el:
-            _replace_recursive(child_el, n)
-
-    _replace_recursive(etree_obj, ns_str)
 
 
 def strip_v2_elements(etree_obj):
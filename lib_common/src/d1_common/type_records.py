@@ -0,0 +1,427 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""Fast deserialization of DataONE ObjectList, Log and SystemMetadata docs to records.
+
+``d1_common.xml.deserialize()`` creates a PyXB object tree for a DataONE XML doc while
+validating the doc against the DataONE schemas. For ObjectList and Log pages with
+thousands of entries, building and validating the tree dominates the time spent on each
+page, even when the caller only needs a few values, such as the identifiers.
+
+``deserialize()`` in this module parses the same docs with ElementTree into lightweight
+record objects. The records use ``__slots__`` and hold one attribute per simple value,
+named after the corresponding element in the DataONE type. The values are native Python
+types:
+
+- Strings, identifiers, subjects and node references: ``str``
+- ``size``, ``serialVersion``, ``start``, ``count`` and ``total``: ``int``
+- ``archived``: ``bool``
+- Dates: ``datetime``. tz-aware values are adjusted to UTC. tz-naive values are
+  returned as tz-naive, as they are by PyXB.
+- ``checksum``: ``str``, with the algorithm in ``checksum_algorithm``.
+
+Optional values that are not present in the doc are ``None``.
+
+The docs are not validated against the schemas, and the values are only converted as far
+as required for creating the records. Where a validated PyXB object is required for a
+record, it can be created on demand with the ``pyxb()`` method of the record. The PyXB
+object is created the first time the method is called, and cached in the record.
+
+Examples:
+
+  ::
+
+    object_list_record = d1_common.type_records.deserialize(object_list_xml)
+    for object_info_record in object_list_record.objectInfo:
+        print(object_info_record.identifier, object_info_record.size)
+        # Create a full PyXB object only for records that need it
+        if object_info_record.formatId == "text/csv":
+            object_info_pyxb = object_info_record.pyxb()
+
+"""
+import io
+import xml.etree.ElementTree
+
+import iso8601
+
+import d1_common.date_time
+import d1_common.type_conversions
+import d1_common.types.dataoneTypes_v1
+import d1_common.types.dataoneTypes_v2_0
+import d1_common.xml
+
+V1_NS = d1_common.type_conversions.NS_DICT["v1"]
+V2_NS = d1_common.type_conversions.NS_DICT["v2"]
+
+NS_TO_BINDING_DICT = {
+    V1_NS: d1_common.types.dataoneTypes_v1,
+    V2_NS: d1_common.types.dataoneTypes_v2_0,
+}
+
+
+def deserialize(doc_xml):
+    """Deserialize a DataONE ObjectList, Log or SystemMetadata XML doc to a record.
+
+    Args:
+      doc_xml: UTF-8 encoded ``bytes`` or ``str``
+
+    Returns:
+      ObjectListRecord, LogRecord or SystemMetadataRecord
+
+    Raises:
+      ValueError: If the doc is not well formed XML, if its root element is not one of
+      the supported types, or if a value cannot be converted to the type of the record
+      attribute.
+
+    """
+    if isinstance(doc_xml, str):
+        doc_xml = doc_xml.encode("utf-8")
+    doc_record = None
+    depth = 0
+    try:
+        for event_str, el in xml.etree.ElementTree.iterparse(
+            io.BytesIO(doc_xml), events=("start", "end")
+        ):
+            if event_str == "start":
+                if doc_record is None:
+                    doc_record = _create_doc_record(el, doc_xml)
+                    if doc_record is None:
+                        break
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                doc_record._add_child_element(el)
+                # Release the subtree of each entry as soon as it has been processed.
+                el.clear()
+    except xml.etree.ElementTree.ParseError as e:
+        raise ValueError(
+            'Unable to deserialize XML to record. error="{}" xml="{}"'.format(
+                str(e), doc_xml
+            )
+        )
+    except (ValueError, TypeError) as e:
+        raise ValueError(
+            'Unable to deserialize XML to record. Invalid value. error="{}" '
+            'xml="{}"'.format(str(e), doc_xml)
+        )
+    if doc_record is None:
+        raise ValueError(
+            "Unable to deserialize XML to record. Root element must be ObjectList, "
+            'Log or SystemMetadata. xml="{}"'.format(doc_xml)
+        )
+    return doc_record
+
+
+def _create_doc_record(root_el, doc_xml):
+    """Create the record for the doc, or return None if the root element is not a
+    supported type."""
+    record_class = ROOT_TAG_TO_RECORD_CLASS_DICT.get(root_el.tag)
+    if record_class is None:
+        return None
+    ns_str = root_el.tag[1:].partition("}")[0]
+    return record_class._from_root_element(root_el, ns_str, doc_xml)
+
+
+# Converters from element text to record attribute values
+
+
+def _to_str(el):
+    return el.text or ""
+
+
+def _to_int(el):
+    return int(el.text)
+
+
+def _to_bool(el):
+    return (el.text or "").strip() in ("true", "1")
+
+
+def _to_datetime(el):
+    dt = iso8601.parse_date((el.text or "").strip(), default_timezone=None)
+    if d1_common.date_time.has_tz(dt):
+        dt = d1_common.date_time.normalize_datetime_to_utc(dt)
+    return dt
+
+
+class _Record(object):
+    """Base for records.
+
+    Subclasses declare the elements they hold in ``_FIELD_DICT``, which maps the
+    element name to a function that converts the element to the attribute value.
+
+    """
+
+    __slots__ = ("_ns", "_pyxb")
+    _FIELD_DICT = {}
+    _SLOT_LIST = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._SLOT_LIST = tuple(
+            slot_name
+            for c in reversed(cls.__mro__)
+            for slot_name in c.__dict__.get("__slots__", ())
+        )
+
+    def __init__(self, ns=V2_NS, **field_dict):
+        for slot_name in self._SLOT_LIST:
+            setattr(self, slot_name, field_dict.pop(slot_name, None))
+        self._ns = ns
+        if field_dict:
+            raise TypeError(
+                'Unknown record attribute. record="{}" attr="{}"'.format(
+                    self.__class__.__name__, ", ".join(sorted(field_dict))
+                )
+            )
+
+    def __repr__(self):
+        return "<{}: {}>".format(
+            self.__class__.__name__,
+            ", ".join(
+                "{}={!r}".format(k, getattr(self, k))
+                for k in self._SLOT_LIST
+                if not k.startswith("_")
+            ),
+        )
+
+    def pyxb(self):
+        """Return a PyXB object with the values of this record.
+
+        The PyXB object is created and validated on the first call, then cached.
+
+        """
+        if self._pyxb is None:
+            self._pyxb = self._create_pyxb()
+        return self._pyxb
+
+    @property
+    def binding(self):
+        """PyXB binding for the DataONE API version of the record."""
+        return NS_TO_BINDING_DICT[self._ns]
+
+    def _set_field_from_element(self, el):
+        convert_func = self._FIELD_DICT.get(el.tag)
+        if convert_func is not None:
+            setattr(self, el.tag, convert_func(el))
+            if el.tag == "checksum":
+                self.checksum_algorithm = el.get("algorithm")
+
+    def _create_pyxb(self):
+        raise NotImplementedError
+
+
+class _ListRecord(_Record):
+    """Base for records holding a page of a DataONE list type."""
+
+    __slots__ = ("start", "count", "total")
+    _ENTRY_NAME = None
+    _ENTRY_CLASS = None
+
+    @classmethod
+    def _from_root_element(cls, root_el, ns_str, _doc_xml):
+        record = cls(ns_str, **{cls._ENTRY_NAME: []})
+        record.start = int(root_el.get("start"))
+        record.count = int(root_el.get("count"))
+        record.total = int(root_el.get("total"))
+        return record
+
+    def _add_child_element(self, el):
+        if el.tag == self._ENTRY_NAME:
+            entry_record = self._ENTRY_CLASS(self._ns)
+            for child_el in el:
+                entry_record._set_field_from_element(child_el)
+            getattr(self, self._ENTRY_NAME).append(entry_record)
+
+
+class ObjectInfoRecord(_Record):
+    """Record holding the values of a DataONE ObjectInfo entry."""
+
+    __slots__ = (
+        "identifier",
+        "formatId",
+        "checksum",
+        "checksum_algorithm",
+        "dateSysMetadataModified",
+        "size",
+    )
+    _FIELD_DICT = {
+        "identifier": _to_str,
+        "formatId": _to_str,
+        "checksum": _to_str,
+        "dateSysMetadataModified": _to_datetime,
+        "size": _to_int,
+    }
+
+    def _create_pyxb(self):
+        return self.binding.ObjectInfo(
+            identifier=self.identifier,
+            formatId=self.formatId,
+            checksum=self.binding.Checksum(
+                self.checksum, algorithm=self.checksum_algorithm
+            ),
+            dateSysMetadataModified=self.dateSysMetadataModified,
+            size=self.size,
+        )
+
+
+class ObjectListRecord(_ListRecord):
+    """Record holding a page of a DataONE ObjectList.
+
+    The entries are in ``objectInfo``, as a list of ``ObjectInfoRecord``.
+
+    """
+
+    __slots__ = ("objectInfo",)
+    _ENTRY_NAME = "objectInfo"
+    _ENTRY_CLASS = ObjectInfoRecord
+
+    def _create_pyxb(self):
+        return self.binding.objectList(
+            objectInfo=[v.pyxb() for v in self.objectInfo],
+            start=self.start,
+            count=self.count,
+            total=self.total,
+        )
+
+
+class LogEntryRecord(_Record):
+    """Record holding the values of a DataONE LogEntry."""
+
+    __slots__ = (
+        "entryId",
+        "identifier",
+        "ipAddress",
+        "userAgent",
+        "subject",
+        "event",
+        "dateLogged",
+        "nodeIdentifier",
+    )
+    _FIELD_DICT = {
+        "entryId": _to_str,
+        "identifier": _to_str,
+        "ipAddress": _to_str,
+        "userAgent": _to_str,
+        "subject": _to_str,
+        "event": _to_str,
+        "dateLogged": _to_datetime,
+        "nodeIdentifier": _to_str,
+    }
+
+    def _create_pyxb(self):
+        return self.binding.LogEntry(
+            entryId=self.entryId,
+            identifier=self.identifier,
+            ipAddress=self.ipAddress,
+            userAgent=self.userAgent,
+            subject=self.subject,
+            event=self.event,
+            dateLogged=self.dateLogged,
+            nodeIdentifier=self.nodeIdentifier,
+        )
+
+
+class LogRecord(_ListRecord):
+    """Record holding a page of a DataONE Log.
+
+    The entries are in ``logEntry``, as a list of ``LogEntryRecord``.
+
+    """
+
+    __slots__ = ("logEntry",)
+    _ENTRY_NAME = "logEntry"
+    _ENTRY_CLASS = LogEntryRecord
+
+    def _create_pyxb(self):
+        return self.binding.log(
+            logEntry=[v.pyxb() for v in self.logEntry],
+            start=self.start,
+            count=self.count,
+            total=self.total,
+        )
+
+
+class SystemMetadataRecord(_Record):
+    """Record holding the simple values of a DataONE SystemMetadata doc.
+
+    Values that are held in nested elements, such as the Access Policy, Replication
+    Policy and Replicas, are only available through the PyXB object returned by
+    ``pyxb()``, which is created by deserializing the original doc.
+
+    """
+
+    __slots__ = (
+        "serialVersion",
+        "identifier",
+        "formatId",
+        "size",
+        "checksum",
+        "checksum_algorithm",
+        "submitter",
+        "rightsHolder",
+        "obsoletes",
+        "obsoletedBy",
+        "archived",
+        "dateUploaded",
+        "dateSysMetadataModified",
+        "originMemberNode",
+        "authoritativeMemberNode",
+        "seriesId",
+        "fileName",
+        "_doc_xml",
+    )
+    _FIELD_DICT = {
+        "serialVersion": _to_int,
+        "identifier": _to_str,
+        "formatId": _to_str,
+        "size": _to_int,
+        "checksum": _to_str,
+        "submitter": _to_str,
+        "rightsHolder": _to_str,
+        "obsoletes": _to_str,
+        "obsoletedBy": _to_str,
+        "archived": _to_bool,
+        "dateUploaded": _to_datetime,
+        "dateSysMetadataModified": _to_datetime,
+        "originMemberNode": _to_str,
+        "authoritativeMemberNode": _to_str,
+        "seriesId": _to_str,
+        "fileName": _to_str,
+    }
+
+    @classmethod
+    def _from_root_element(cls, _root_el, ns_str, doc_xml):
+        record = cls(ns_str)
+        record._doc_xml = doc_xml
+        return record
+
+    def _add_child_element(self, el):
+        self._set_field_from_element(el)
+
+    def _create_pyxb(self):
+        return d1_common.xml.deserialize(self._doc_xml)
+
+
+ROOT_TAG_TO_RECORD_CLASS_DICT = {
+    "{{{}}}objectList".format(V1_NS): ObjectListRecord,
+    "{{{}}}log".format(V1_NS): LogRecord,
+    "{{{}}}log".format(V2_NS): LogRecord,
+    "{{{}}}systemMetadata".format(V1_NS): SystemMetadataRecord,
+    "{{{}}}systemMetadata".format(V2_NS): SystemMetadataRecord,
+}
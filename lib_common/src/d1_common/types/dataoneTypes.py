@@ -19,17 +19,16 @@
 
 import logging
 
-from d1_common.types.generated.dataoneTypes_v1 import *
-# noinspection PyUnresolvedReferences
-from d1_common.types.generated.dataoneTypes_v1_1 import *
-# from d1_common.types.generated.dataoneTypes_v1_2 import *
-# noinspection PyUnresolvedReferences
-from d1_common.types.generated.dataoneTypes_v2_0 import *
+import d1_common.types.lazy_binding
 
-# noinspection PyUnresolvedReferences
-
-
-# flake8: noqa: F403
+d1_common.types.lazy_binding.install(
+    __name__,
+    [
+        "d1_common.types.generated.dataoneTypes_v1",
+        "d1_common.types.generated.dataoneTypes_v1_1",
+        "d1_common.types.generated.dataoneTypes_v2_0",
+    ],
+)
 
 # Suppress PyXB warnings, such as the following:
 #
@@ -19,10 +19,14 @@
 
 import logging
 
-# noinspection PyUnresolvedReferences
-from d1_common.types.generated.dataoneTypes_v1 import *
+import d1_common.types.lazy_binding
 
-# flake8: noqa: F403
+d1_common.types.lazy_binding.install(
+    __name__,
+    [
+        "d1_common.types.generated.dataoneTypes_v1",
+    ],
+)
 
 # Suppress PyXB warnings, such as the following:
 #
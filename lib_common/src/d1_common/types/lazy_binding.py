@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+# This work was created by participants in the DataONE project, and is
+# jointly copyrighted by participating institutions in DataONE. For
+# more information on DataONE, see our web site at http://dataone.org.
+#
+#   Copyright 2009-2019 DataONE
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""Defer importing the generated PyXB bindings until they are used.
+
+The generated PyXB modules for the DataONE types hold around 13,000 lines of code, and
+importing them creates the PyXB namespaces, classes and content model automata for all
+the types in the schemas. Most of the DataONE Python stack imports the binding modules
+in ``d1_common.types`` at module level, so without deferral, every process pays for
+that, including CLI invocations that exit after printing help, Django management
+commands that never touch a DataONE type, and the worker processes spawned by the
+multiprocessed iterators.
+
+``install()`` turns a binding module in ``d1_common.types`` into a lazy module. The
+generated modules are imported the first time a public attribute of the lazy module is
+accessed. After that, the names are regular module globals, so there is no overhead on
+later accesses.
+
+The behavior matches a series of ``from <generated module> import *`` statements, so
+later modules in the list override names in earlier modules.
+
+Example:
+
+  ::
+
+    # d1_common/types/dataoneTypes_v2_0.py
+    d1_common.types.lazy_binding.install(
+        __name__,
+        [
+            "d1_common.types.generated.dataoneTypes_v1",
+            "d1_common.types.generated.dataoneTypes_v2_0",
+        ],
+    )
+
+"""
+import importlib
+import sys
+import threading
+
+# The generated modules import each other, and may be imported from multiple threads,
+# e.g., by the views in GMN.
+_load_lock = threading.RLock()
+
+
+def install(module_name, generated_module_name_list):
+    """Add lazy loading of generated PyXB modules to a module.
+
+    Args:
+      module_name: str
+        Name of the module to which lazy loading is added. Typically ``__name__``.
+
+      generated_module_name_list: list of str
+        Fully qualified names of the generated PyXB modules from which to import names.
+
+    """
+    module = sys.modules[module_name]
+
+    def load():
+        with _load_lock:
+            if module.__dict__.get("_is_loaded"):
+                return
+            # The names are merged into a local dict and published with a single
+            # update. Names that are already in the module globals are read without
+            # going through __getattr__ and the lock, so publishing them one at a time
+            # would let other threads see names from earlier modules, such as the v1
+            # Namespace and CreateFromDocument, before they are overridden.
+            name_dict = {}
+            for generated_module_name in generated_module_name_list:
+                generated_module = importlib.import_module(generated_module_name)
+                name_list = getattr(generated_module, "__all__", None) or [
+                    k for k in vars(generated_module) if not k.startswith("_")
+                ]
+                for name_str in name_list:
+                    name_dict[name_str] = getattr(generated_module, name_str)
+            module.__dict__.update(name_dict)
+            module.__all__ = sorted(name_dict)
+            module._is_loaded = True
+
+    def __getattr__(name_str):
+        # Private and special names, except "__all__", which is used by "import *", do
+        # not trigger loading. This keeps tools that probe modules for attributes such
+        # as "__path__" or "__file__" from loading the bindings.
+        if name_str.startswith("_") and name_str != "__all__":
+            raise AttributeError(
+                'module "{}" has no attribute "{}"'.format(module_name, name_str)
+            )
+        load()
+        try:
+            return module.__dict__[name_str]
+        except KeyError:
+            raise AttributeError(
+                'module "{}" has no attribute "{}"'.format(module_name, name_str)
+            )
+
+    def __dir__():
+        load()
+        return sorted(module.__dict__)
+
+    module.__getattr__ = __getattr__
+    module.__dir__ = __dir__
+    module._lazy_binding_load = load
+
+
+def load(module):
+    """Import the generated PyXB modules for a lazy binding module now.
+
+    This is only required before calling PyXB functions that depend on the bindings
+    having been imported without going through the binding module, such as
+    ``pyxb.namespace.utility.AvailableNamespaces()``.
+
+    """
+    module._lazy_binding_load()
+
+
+def is_loaded(module):
+    """Return True if the generated PyXB modules for a lazy binding module have been
+    imported."""
+    return bool(module.__dict__.get("_is_loaded"))
@@ -18,6 +18,7 @@
 """Utilities for handling XML docs."""
 
 import difflib
+import functools
 import logging
 import re
 import xml.dom
@@ -25,6 +26,9 @@ import xml.dom.minidom
 import xml.sax
 
 import pyxb
+import pyxb.binding.basis
+import pyxb.binding.content
+import pyxb.utils.domutils
 
 import d1_common.type_conversions
 import d1_common.types.dataoneErrors
@@ -34,6 +38,23 @@ from d1_common.type_conversions import str_to_etree
 
 logger = logging.getLogger(__name__)
 
+# Backends for serialize_gen():
+#
+# - "dom": PyXB generates a minidom DOM, which is then serialized. The content of the
+#   PyXB object is validated against the content model of its type.
+# - "stream": The XML doc is written directly from the PyXB object, without creating a
+#   DOM. Elements are written in the order in which they are declared in the type. This
+#   is the order that the "dom" backend also uses for the DataONE types, as the DataONE
+#   schemas only use sequences. Attributes are validated. Of the element content model,
+#   only the presence of required elements is checked, so an object that breaks the
+#   content model in other ways, such as by holding too many or too few occurrences of a
+#   repeated element, is written without error. Objects that are missing a required
+#   element, or that use XML Schema features beyond sequences, such as wildcards, mixed
+#   content, xsi:type or substitution groups, are serialized with the "dom" backend.
+SERIALIZE_BACKEND_LIST = ["dom", "stream"]
+
+_serialize_backend = "dom"
+
 
 def deserialize(doc_xml, pyxb_binding=None):
     """Deserialize DataONE XML types to PyXB.
@@ -81,8 +102,35 @@ def deserialize_d1_exception(doc_xml):
     return doc_pyxb
 
 
+def set_serialize_backend(backend):
+    """Set the backend used by serialize_gen() when no backend is passed to it.
+
+    Args:
+      backend: str
+        One of SERIALIZE_BACKEND_LIST.
+
+    """
+    global _serialize_backend
+    _assert_valid_serialize_backend(backend)
+    _serialize_backend = backend
+
+
+def get_serialize_backend():
+    """Returns:
+
+    str: The backend used by serialize_gen() when no backend is passed to it.
+
+    """
+    return _serialize_backend
+
+
 def serialize_gen(
-    obj_pyxb, encoding="utf-8", pretty=False, strip_prolog=False, xslt_url=None
+    obj_pyxb,
+    encoding="utf-8",
+    pretty=False,
+    strip_prolog=False,
+    xslt_url=None,
+    backend=None,
 ):
     """Serialize PyXB object to XML.
 
@@ -104,12 +152,51 @@ def serialize_gen(
         If specified, add a processing instruction to the XML doc that specifies the
         download location for an XSLT stylesheet.
 
+      backend: str
+        One of SERIALIZE_BACKEND_LIST. If not specified, the backend set with
+        set_serialize_backend() is used. The backends create identical XML docs for
+        valid objects. See SERIALIZE_BACKEND_LIST for how they differ in validation.
+
     Returns:
       XML document
 
     """
     assert d1_common.type_conversions.is_pyxb(obj_pyxb)
     assert encoding in (None, "utf-8", "UTF-8")
+    backend = backend or _serialize_backend
+    _assert_valid_serialize_backend(backend)
+
+    xml_str = None
+    if backend == "stream":
+        xml_str = _serialize_stream(obj_pyxb, encoding, pretty, xslt_url)
+    if xml_str is None:
+        xml_str = _serialize_dom(obj_pyxb, encoding, pretty, xslt_url)
+
+    if pretty:
+        # Remove empty lines in the result caused by a bug in toprettyxml()
+        if encoding is None:
+            xml_str = re.sub(r"^\s*$\n", r"", xml_str, flags=re.MULTILINE)
+        else:
+            xml_str = re.sub(b"^\s*$\n", b"", xml_str, flags=re.MULTILINE)
+    if strip_prolog:
+        if encoding is None:
+            xml_str = re.sub(r"^<\?(.*)\?>", r"", xml_str)
+        else:
+            xml_str = re.sub(b"^<\?(.*)\?>", b"", xml_str)
+
+    return xml_str.strip()
+
+
+def _assert_valid_serialize_backend(backend):
+    if backend not in SERIALIZE_BACKEND_LIST:
+        raise ValueError(
+            'Invalid serialization backend. backend="{}" valid="{}"'.format(
+                backend, ", ".join(SERIALIZE_BACKEND_LIST)
+            )
+        )
+
+
+def _serialize_dom(obj_pyxb, encoding, pretty, xslt_url):
     try:
         obj_dom = obj_pyxb.toDOM()
     except pyxb.ValidationError as e:
@@ -127,21 +214,242 @@ def serialize_gen(
         obj_dom.insertBefore(xslt_processing_instruction, root)
 
     if pretty:
-        xml_str = obj_dom.toprettyxml(indent="  ", encoding=encoding)
-        # Remove empty lines in the result caused by a bug in toprettyxml()
-        if encoding is None:
-            xml_str = re.sub(r"^\s*$\n", r"", xml_str, flags=re.MULTILINE)
-        else:
-            xml_str = re.sub(b"^\s*$\n", b"", xml_str, flags=re.MULTILINE)
+        return obj_dom.toprettyxml(indent="  ", encoding=encoding)
+    return obj_dom.toxml(encoding)
+
+
+class _StreamSerializeUnsupported(Exception):
+    pass
+
+
+class _StreamBindingSupport(pyxb.utils.domutils.BindingDOMSupport):
+    """PyXB DOM support that records attributes in a list instead of adding them to a
+    DOM element.
+
+    This lets the "stream" backend use PyXB's own logic for selecting which attributes
+    to write and how to format their values and namespace prefixes.
+
+    """
+
+    def addAttribute(self, element, expanded_name, value):
+        name = expanded_name
+        if isinstance(name, pyxb.namespace.ExpandedName):
+            name = self.qnameAsText(expanded_name, enable_default_namespace=False)
+        element.append((name, self.valueAsText(value)))
+
+
+def _serialize_stream(obj_pyxb, encoding, pretty, xslt_url):
+    """Serialize with the "stream" backend.
+
+    The XML doc is generated in the same format as minidom's ``toxml()`` and
+    ``toprettyxml()``.
+
+    Returns:
+      XML document, or None if ``obj_pyxb`` must be serialized with the "dom" backend.
+
+    """
+    bds = _StreamBindingSupport()
+    try:
+        element_binding = obj_pyxb._element()
+        if element_binding is None or element_binding.typeDefinition()._RequireXSIType(
+            type(obj_pyxb)
+        ):
+            raise _StreamSerializeUnsupported()
+        part_list = []
+        _stream_element(
+            bds, part_list, element_binding.name(), obj_pyxb, 0, pretty, True
+        )
+    except _StreamSerializeUnsupported:
+        return None
+    except pyxb.ValidationError as e:
+        raise ValueError(
+            'Unable to serialize PyXB to XML. error="{}"'.format(e.details())
+        )
+    except pyxb.PyXBException as e:
+        raise ValueError('Unable to serialize PyXB to XML. error="{}"'.format(str(e)))
+
+    # PyXB adds the XML namespace declarations to the root element after generating the
+    # rest of the doc. Let it do the same here, on a placeholder element.
+    ns_dom = bds.document()
+    ns_dom.appendChild(ns_dom.createElement("ns"))
+    bds.finalize()
+    ns_attr_list = list(ns_dom.documentElement.attributes.items())
+    if len(ns_attr_list) > 1:
+        # The order of multiple declarations is not defined
+        return None
+    part_list[0] += _format_attr_list(ns_attr_list)
+
+    newl = "\n" if pretty else ""
+    if encoding is None:
+        prolog_list = ['<?xml version="1.0" ?>', newl]
     else:
-        xml_str = obj_dom.toxml(encoding)
-    if strip_prolog:
-        if encoding is None:
-            xml_str = re.sub(r"^<\?(.*)\?>", r"", xml_str)
+        prolog_list = ['<?xml version="1.0" encoding="{}"?>'.format(encoding), newl]
+    if xslt_url:
+        prolog_list.extend(
+            [
+                '<?xml-stylesheet type="text/xsl" href="{}"?>'.format(xslt_url),
+                newl,
+            ]
+        )
+    xml_str = "".join(prolog_list + part_list)
+    if encoding is None:
+        return xml_str
+    return xml_str.encode(encoding, "xmlcharrefreplace")
+
+
+def _stream_element(bds, part_list, name, value, depth, pretty, is_root=False):
+    """Append the parts of an XML element to ``part_list``.
+
+    For the root element, the first part is the start tag without the closing ``>``,
+    so that the namespace declarations can be added after the rest of the doc has been
+    generated.
+
+    """
+    if value._isNil():
+        raise _StreamSerializeUnsupported()
+    indent = "  " * depth if pretty else ""
+    newl = "\n" if pretty else ""
+    tag_str = bds.qnameAsText(name)
+    attr_list = []
+    child_list = []
+    text_str = None
+
+    if isinstance(value, pyxb.binding.basis.complexTypeDefinition):
+        if value.wildcardAttributeMap() or value.wildcardElements():
+            raise _StreamSerializeUnsupported()
+        for attribute_use in type(value)._AttributeMap.values():
+            if pyxb.GlobalValidationConfig.forDocument:
+                attribute_use.validate(value)
+            attribute_use.addDOMAttribute(bds, value, attr_list)
+        content_type = value._ContentTypeTag
+        if content_type == value._CT_SIMPLE:
+            if value.value() is None:
+                raise pyxb.SimpleContentAbsentError(value, value._location())
+            text_str = bds.valueAsText(value.value())
+        elif content_type == value._CT_ELEMENT_ONLY:
+            child_list = _get_stream_child_list(value)
+        elif content_type != value._CT_EMPTY:
+            raise _StreamSerializeUnsupported()
+    else:
+        text_str = bds.valueAsText(value)
+
+    start_str = "{}<{}{}".format(indent, tag_str, _format_attr_list(attr_list))
+    if is_root:
+        part_list.append(start_str)
+        start_str = ""
+    if text_str is not None:
+        part_list.append(
+            "{}>{}</{}>{}".format(
+                start_str, _escape_minidom(text_str, False), tag_str, newl
+            )
+        )
+    elif child_list:
+        part_list.append("{}>{}".format(start_str, newl))
+        for child_name, child_value in child_list:
+            _stream_element(bds, part_list, child_name, child_value, depth + 1, pretty)
+        part_list.append("{}</{}>{}".format(indent, tag_str, newl))
+    else:
+        part_list.append("{}/>{}".format(start_str, newl))
+
+
+def _get_stream_child_list(value):
+    """Get the child elements of a complex type in declaration order.
+
+    Returns:
+      list of (ExpandedName, PyXB object) tuples
+
+    """
+    child_list = []
+    required_decl_set = _get_required_element_decl_set(type(value))
+    for element_decl in type(value)._ElementMap.values():
+        child_value = element_decl.value(value)
+        if child_value is None or (element_decl.isPlural() and not child_value):
+            if element_decl in required_decl_set:
+                # Let the "dom" backend raise the error for the invalid content
+                raise _StreamSerializeUnsupported()
+            continue
+        if not element_decl.isPlural():
+            child_value = [child_value]
+        element_binding = element_decl.elementBinding()
+        elt_type = element_binding.typeDefinition()
+        for v in child_value:
+            if (
+                not isinstance(v, pyxb.binding.basis._TypeBinding_mixin)
+                or v._substitutesFor(element_binding)
+                or not isinstance(v, elt_type)
+                or elt_type._RequireXSIType(type(v))
+            ):
+                raise _StreamSerializeUnsupported()
+            child_list.append((element_binding.name(), v))
+    return child_list
+
+
+@functools.lru_cache(maxsize=None)
+def _get_required_element_decl_set(type_class):
+    """Get the element declarations that must be present in the content of a complex
+    type.
+
+    An element is required if the content model automaton of the type cannot reach a
+    final state without passing a state for the element. Occurrence counters are
+    ignored, so minOccurs above 1 is not detected, but no element is wrongly found to
+    be required.
+
+    Returns:
+      set of ElementDeclaration
+
+    """
+    automaton = type_class._Automaton
+    if automaton is None or automaton.nullable:
+        return frozenset()
+    required_decl_set = set()
+    for element_decl in type_class._ElementMap.values():
+        visited_set = set()
+        state_list = [t.destination for t in automaton.initialTransitions]
+        while state_list:
+            state = state_list.pop()
+            if state in visited_set or (
+                isinstance(state.symbol, pyxb.binding.content.ElementUse)
+                and state.symbol.elementDeclaration() is element_decl
+            ):
+                continue
+            if state in automaton.finalStates:
+                break
+            visited_set.add(state)
+            state_list.extend(t.destination for t in state.transitionSet)
         else:
-            xml_str = re.sub(b"^<\?(.*)\?>", b"", xml_str)
+            required_decl_set.add(element_decl)
+    return frozenset(required_decl_set)
 
-    return xml_str.strip()
+
+def _format_attr_list(attr_list):
+    return "".join(' {}="{}"'.format(k, _escape_minidom(v, True)) for k, v in attr_list)
+
+
+def _escape_minidom(text_str, is_attr):
+    return text_str.translate(_get_minidom_escape_dict(is_attr))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_minidom_escape_dict(is_attr):
+    """Get the character escapes that minidom uses for text or attribute values.
+
+    The escapes have changed between Python versions, so they are found by letting
+    minidom serialize each character that may be escaped.
+
+    """
+    escape_dict = {}
+    for c in "&<>\"'\r\n\t":
+        dom = xml.dom.minidom.Document()
+        el = dom.createElement("a")
+        if is_attr:
+            el.setAttribute("b", c)
+            escaped_str = el.toxml()[len('<a b="') : -len('"/>')]
+        else:
+            el.appendChild(dom.createTextNode(c))
+            escaped_str = el.toxml()[len("<a>") : -len("</a>")]
+        if escaped_str != c:
+            escape_dict[ord(c)] = escaped_str
+    return escape_dict
 
 
 def serialize_for_transport(obj_pyxb, pretty=False, strip_prolog=False, xslt_url=None):